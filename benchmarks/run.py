@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+"""Run the benchmark suite and compare against the stored baseline.
+
+Usage:
+    python benchmarks/run.py                      # stub model, compare to baseline
+    python benchmarks/run.py -o results.json      # also save the results
+    python benchmarks/run.py --update-baseline    # replace benchmarks/baseline.json
+
+Extra options are passed through to `whisper-transcriber bench`.
+"""
+
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent
+sys.path.insert(0, str(ROOT.parent / "src"))
+
+from transcriber.cli import main  # noqa: E402
+
+BASELINE = ROOT / "baseline.json"
+
+
+def run(argv: list) -> None:
+    args = ["bench", *argv]
+    if "--update-baseline" in args:
+        args.remove("--update-baseline")
+        args += ["--output", str(BASELINE)]
+    elif BASELINE.exists() and "--baseline" not in args:
+        args += ["--baseline", str(BASELINE)]
+    main(args)
+
+
+if __name__ == "__main__":
+    run(sys.argv[1:])
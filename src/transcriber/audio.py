@@ -0,0 +1,260 @@
+"""Audio loading to 16 kHz mono float32 samples: memory-mapped PCM or ffmpeg."""
+
+import struct
+import subprocess
+import wave
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+import numpy as np
+
+try:
+    from transcriber.vad import SAMPLE_RATE
+except ImportError:
+    from .vad import SAMPLE_RATE
+
+
+# Extensions treated as headerless s16le mono PCM at the target sample rate,
+# the format `live --source` reads and `sox -t raw` / `arecord -t raw` write.
+RAW_PCM_EXTENSIONS = (".pcm", ".raw", ".s16le")
+
+_WAVE_FORMAT_PCM = 1
+_WAVE_FORMAT_IEEE_FLOAT = 3
+_WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+
+def load_audio(
+    audio: Union[str, Path, np.ndarray], sample_rate: int = SAMPLE_RATE
+) -> np.ndarray:
+    """Return mono float32 samples for a file or an in-memory array.
+
+    Files already stored as mono PCM at `sample_rate` (16-bit or float WAV,
+    or raw s16le with a RAW_PCM_EXTENSIONS suffix) are memory-mapped instead
+    of decoded: float WAV data is used in place and 16-bit data is scaled in
+    a single pass, without reading the file into a buffer first. Anything
+    else is decoded by ffmpeg, streaming PCM through a pipe.
+
+    Args:
+        audio: Input file (any format ffmpeg understands) or samples already
+            at `sample_rate` (1-D, or 2-D with channels last)
+        sample_rate: Output sample rate
+
+    Returns:
+        Mono float32 samples in [-1, 1]
+
+    Raises:
+        RuntimeError: If ffmpeg is needed but missing or cannot decode the input
+    """
+    if isinstance(audio, np.ndarray):
+        return _as_mono_float32(audio)
+
+    mapped = map_pcm(audio, sample_rate)
+    if mapped is not None:
+        return mapped
+    return _ffmpeg_decode(["-i", str(audio)], str(audio), sample_rate)
+
+
+def map_pcm(
+    path: Union[str, Path], sample_rate: int = SAMPLE_RATE
+) -> Optional[np.ndarray]:
+    """Memory-map a WAV or raw PCM file that needs no resampling or downmixing.
+
+    Args:
+        path: Input file
+        sample_rate: Required sample rate
+
+    Returns:
+        Mono float32 samples, or None if the file must be decoded by ffmpeg
+    """
+    path = Path(path)
+    if path.suffix.lower() in RAW_PCM_EXTENSIONS:
+        size = _file_size(path)
+        if size is None:
+            return None
+        return _map_samples(path, "<i2", 0, size // 2)
+
+    header = wav_header(path)
+    if (
+        header is None
+        or header["channels"] != 1
+        or header["sample_rate"] != sample_rate
+        or header["dtype"] is None
+    ):
+        return None
+    itemsize = np.dtype(header["dtype"]).itemsize
+    return _map_samples(
+        path, header["dtype"], header["data_offset"], header["data_size"] // itemsize
+    )
+
+
+def wav_header(path: Union[str, Path]) -> Optional[Dict[str, Any]]:
+    """Parse the fmt and data chunks of a RIFF/WAVE file.
+
+    Args:
+        path: Input file
+
+    Returns:
+        "channels", "sample_rate", "bits", "dtype" (NumPy dtype string for
+        16-bit integer or 32-bit float samples, else None), "data_offset" and
+        "data_size" (clamped to the file, for headers written before the
+        recording finished); None if the file is not a readable WAV
+    """
+    size = _file_size(path)
+    if size is None:
+        return None
+    try:
+        with open(path, "rb") as f:
+            riff = f.read(12)
+            if len(riff) < 12 or riff[:4] != b"RIFF" or riff[8:12] != b"WAVE":
+                return None
+            fmt: Optional[Dict[str, Any]] = None
+            while True:
+                chunk = f.read(8)
+                if len(chunk) < 8:
+                    return None
+                chunk_id = chunk[:4]
+                (chunk_size,) = struct.unpack("<I", chunk[4:])
+                if chunk_id == b"fmt ":
+                    fmt = _parse_fmt(f.read(chunk_size))
+                    if chunk_size % 2:
+                        f.seek(1, 1)
+                elif chunk_id == b"data":
+                    if fmt is None:
+                        return None
+                    offset = f.tell()
+                    fmt["data_offset"] = offset
+                    fmt["data_size"] = min(chunk_size, size - offset)
+                    return fmt
+                else:
+                    f.seek(chunk_size + chunk_size % 2, 1)
+    except (OSError, struct.error):
+        return None
+
+
+def _parse_fmt(data: bytes) -> Dict[str, Any]:
+    """Decode a WAV fmt chunk."""
+    format_tag, channels, rate = struct.unpack("<HHI", data[:8])
+    (bits,) = struct.unpack("<H", data[14:16])
+    if format_tag == _WAVE_FORMAT_EXTENSIBLE and len(data) >= 26:
+        # The real format tag is the first two bytes of the subformat GUID.
+        (format_tag,) = struct.unpack("<H", data[24:26])
+
+    dtype = None
+    if format_tag == _WAVE_FORMAT_PCM and bits == 16:
+        dtype = "<i2"
+    elif format_tag == _WAVE_FORMAT_IEEE_FLOAT and bits == 32:
+        dtype = "<f4"
+    return {"channels": channels, "sample_rate": rate, "bits": bits, "dtype": dtype}
+
+
+def _file_size(path: Union[str, Path]) -> Optional[int]:
+    try:
+        return Path(path).stat().st_size
+    except OSError:
+        return None
+
+
+def _map_samples(path: Path, dtype: str, offset: int, count: int) -> np.ndarray:
+    """Map `count` samples at `offset` and return them as float32 in [-1, 1]."""
+    if count <= 0:
+        return np.zeros(0, dtype=np.float32)
+    # Copy-on-write, so callers may modify the array without touching the file.
+    samples = np.memmap(path, dtype=dtype, mode="c", offset=offset, shape=(count,))
+    if samples.dtype.kind == "f":
+        return np.asarray(samples, dtype=np.float32)
+    scaled: np.ndarray = np.multiply(samples, 1 / 32768.0, dtype=np.float32)
+    return scaled
+
+
+def _as_mono_float32(audio: np.ndarray) -> np.ndarray:
+    """Convert in-memory samples to mono float32, copying only when needed."""
+    if audio.ndim == 2:
+        audio = audio.mean(axis=1)
+    if audio.dtype == np.int16:
+        scaled: np.ndarray = np.multiply(audio, 1 / 32768.0, dtype=np.float32)
+        return scaled
+    return audio.astype(np.float32, copy=False)
+
+
+def load_audio_url(
+    url: str,
+    sample_rate: int = SAMPLE_RATE,
+    headers: Optional[Dict[str, str]] = None,
+) -> np.ndarray:
+    """Download and decode a remote media stream in one pass, without a file.
+
+    ffmpeg reads the URL itself and writes PCM to a pipe as it arrives, so the
+    compressed stream is never stored or re-encoded.
+
+    Args:
+        url: Direct http(s) or HLS media URL
+        sample_rate: Output sample rate
+        headers: HTTP headers the server expects (e.g. User-Agent, Cookie)
+
+    Returns:
+        Mono float32 samples in [-1, 1]
+
+    Raises:
+        RuntimeError: If ffmpeg is missing or the stream cannot be read
+    """
+    input_args = [
+        "-reconnect",
+        "1",
+        "-reconnect_streamed",
+        "1",
+        "-reconnect_delay_max",
+        "5",
+    ]
+    if headers:
+        header_lines = "".join(
+            f"{name}: {value}\r\n" for name, value in headers.items()
+        )
+        input_args += ["-headers", header_lines]
+    input_args += ["-i", url]
+    return _ffmpeg_decode(input_args, "stream", sample_rate)
+
+
+def _ffmpeg_decode(input_args: List[str], source: str, sample_rate: int) -> np.ndarray:
+    """Run ffmpeg with the given input arguments and return mono float32 PCM."""
+    command = (
+        ["ffmpeg", "-nostdin", "-threads", "0"]
+        + input_args
+        + [
+            "-vn",
+            "-f",
+            "s16le",
+            "-ac",
+            "1",
+            "-acodec",
+            "pcm_s16le",
+            "-ar",
+            str(sample_rate),
+            "-",
+        ]
+    )
+    try:
+        process = subprocess.run(command, capture_output=True, check=True)
+    except FileNotFoundError:
+        raise RuntimeError(
+            "ffmpeg not found — required to decode audio. "
+            "Install with: brew install ffmpeg"
+        ) from None
+    except subprocess.CalledProcessError as e:
+        message = e.stderr.decode(errors="replace").strip().splitlines()
+        raise RuntimeError(
+            f"ffmpeg failed to decode {source}: {message[-1] if message else e}"
+        ) from None
+
+    return np.frombuffer(process.stdout, dtype="<i2").astype(np.float32) / 32768.0
+
+
+def write_wav(
+    path: Union[str, Path], audio: np.ndarray, sample_rate: int = SAMPLE_RATE
+) -> None:
+    """Write float32 samples as a 16-bit PCM mono WAV file."""
+    pcm = np.clip(audio * 32768.0, -32768, 32767).astype("<i2")
+    with wave.open(str(path), "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(sample_rate)
+        f.writeframes(pcm.tobytes())
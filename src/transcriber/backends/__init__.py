@@ -0,0 +1,47 @@
+"""Transcription backends selectable with --backend."""
+
+from typing import Dict, List, Type
+
+from .base import AudioInput, Backend
+from .stub import StubBackend
+from .whisper_cpp import WhisperCppBackend, WhisperCppServerBackend
+from .whisper_py import WhisperBackend
+
+BACKENDS: Dict[str, Type[Backend]] = {
+    WhisperBackend.name: WhisperBackend,
+    WhisperCppBackend.name: WhisperCppBackend,
+    WhisperCppServerBackend.name: WhisperCppServerBackend,
+    StubBackend.name: StubBackend,
+}
+
+
+def get_backend(name: str) -> Type[Backend]:
+    """Return the backend class registered under a name.
+
+    Raises:
+        ValueError: If the backend is unknown
+    """
+    try:
+        return BACKENDS[name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown backend '{name}'. Available: {', '.join(available_backends())}"
+        ) from None
+
+
+def available_backends() -> List[str]:
+    """Return the registered backend names."""
+    return list(BACKENDS)
+
+
+__all__ = [
+    "AudioInput",
+    "BACKENDS",
+    "Backend",
+    "StubBackend",
+    "WhisperBackend",
+    "WhisperCppBackend",
+    "WhisperCppServerBackend",
+    "available_backends",
+    "get_backend",
+]
@@ -0,0 +1,59 @@
+"""Base class for transcription backends."""
+
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+import numpy as np
+
+AudioInput = Union[str, np.ndarray]
+
+
+class Backend:
+    """Runs a speech-to-text model and returns Whisper-style result dicts.
+
+    Results have the shape produced by `whisper.transcribe`: a "text" string,
+    a list of "segments" with "start"/"end" seconds and "text", and the
+    detected "language".
+    """
+
+    name = ""
+
+    def __init__(self, model: str, device: str = "cpu", verbose: bool = False):
+        """Initialize the backend.
+
+        Args:
+            model: Model name or path
+            device: Device to run on
+            verbose: Enable verbose output
+        """
+        self.model_name = model
+        self.device = device
+        self.verbose = verbose
+        self.model: Any = None
+
+    def load(self) -> None:
+        """Load the model."""
+        raise NotImplementedError
+
+    def transcribe(
+        self, audio: AudioInput, language: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Transcribe a file path or 16 kHz mono float32 samples."""
+        raise NotImplementedError
+
+    def transcribe_batch(
+        self, audios: Sequence[AudioInput], language: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Transcribe several short inputs, one result per input.
+
+        Backends that can share work between inputs (one padded model batch,
+        one process) override this; by default each is transcribed in turn.
+        """
+        return [self.transcribe(audio, language=language) for audio in audios]
+
+    @property
+    def memory_bytes(self) -> Optional[int]:
+        """Memory held by the loaded model, if known."""
+        return None
+
+    def close(self) -> None:
+        """Release external resources (processes, files)."""
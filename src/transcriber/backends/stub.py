@@ -0,0 +1,103 @@
+"""Deterministic CPU-only stand-in model for benchmarks and smoke tests."""
+
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+try:
+    from transcriber.audio import load_audio
+    from transcriber.registry import MODEL_SIZES_MB
+    from transcriber.vad import SAMPLE_RATE
+except ImportError:
+    from ..audio import load_audio
+    from ..registry import MODEL_SIZES_MB
+    from ..vad import SAMPLE_RATE
+
+from .base import AudioInput, Backend
+
+# Weights are this fraction of the real checkpoint so load time and memory
+# still scale with the model size without needing gigabytes of RAM.
+WEIGHT_SCALE = 0.1
+
+FRAME_LENGTH = 400  # 25 ms analysis frames, as in Whisper's log-mel front end
+HOP_LENGTH = 160
+N_FEATURES = 80
+SEGMENT_SECONDS = 5.0
+
+
+class StubBackend(Backend):
+    """Does real numeric work proportional to the audio, but no recognition.
+
+    Loading allocates and touches weights sized from the model name;
+    transcription computes framed spectra and projects them through the
+    weights, then emits one placeholder segment per five seconds of audio.
+    """
+
+    name = "stub"
+
+    def load(self) -> None:
+        size_mb = MODEL_SIZES_MB.get(self.model_name, MODEL_SIZES_MB["base"])
+        n_values = int(size_mb * WEIGHT_SCALE * 1024 * 1024) // 4
+        rng = np.random.default_rng(0)
+        columns = FRAME_LENGTH // 2 + 1
+        projection = rng.standard_normal((columns, N_FEATURES), dtype=np.float32)
+        # The bulk of the weights only exists to occupy memory like a model.
+        self.model = {
+            "projection": projection,
+            "weights": np.full(max(n_values, 1), 0.01, dtype=np.float32),
+        }
+
+    def transcribe(
+        self, audio: AudioInput, language: Optional[str] = None
+    ) -> Dict[str, Any]:
+        samples = audio if isinstance(audio, np.ndarray) else load_audio(audio)
+        if len(samples) >= FRAME_LENGTH:
+            self._features(samples[np.newaxis])
+        return self._result(len(samples) / SAMPLE_RATE, language)
+
+    def transcribe_batch(
+        self, audios: Sequence[AudioInput], language: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Compute the features of all inputs in one pass over their concatenation."""
+        clips = [a if isinstance(a, np.ndarray) else load_audio(a) for a in audios]
+        samples = np.concatenate(clips) if clips else np.zeros(0, dtype=np.float32)
+        if len(samples) >= FRAME_LENGTH:
+            self._features(samples[np.newaxis])
+        return [self._result(len(clip) / SAMPLE_RATE, language) for clip in clips]
+
+    def _features(self, batch: np.ndarray) -> np.ndarray:
+        """Project framed spectra of (clips, samples) audio through the weights."""
+        frames = sliding_window_view(batch, FRAME_LENGTH, axis=1)[:, ::HOP_LENGTH]
+        spectrum = np.abs(np.fft.rfft(frames * np.hanning(FRAME_LENGTH), axis=2))
+        features: np.ndarray = np.log10(
+            np.abs(spectrum @ self.model["projection"]) + 1e-10
+        )
+        return features
+
+    def _result(self, duration: float, language: Optional[str]) -> Dict[str, Any]:
+        segments: List[Dict[str, Any]] = []
+        start = 0.0
+        while start < duration:
+            end = min(duration, start + SEGMENT_SECONDS)
+            segments.append(
+                {
+                    "id": len(segments),
+                    "start": round(start, 3),
+                    "end": round(end, 3),
+                    "text": f" Segment {len(segments) + 1}.",
+                }
+            )
+            start = end
+
+        return {
+            "text": "".join(s["text"] for s in segments),
+            "segments": segments,
+            "language": language or "en",
+        }
+
+    @property
+    def memory_bytes(self) -> Optional[int]:
+        if not self.model:
+            return None
+        return int(sum(array.nbytes for array in self.model.values()))
@@ -0,0 +1,414 @@
+"""whisper.cpp backends: per-file `whisper-cli` runs or a warm `whisper-server`."""
+
+import json
+import os
+import re
+import shutil
+import socket
+import subprocess
+import tempfile
+import time
+import urllib.error
+import urllib.request
+import uuid
+from contextlib import ExitStack
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:
+    from transcriber.audio import load_audio, wav_header, write_wav
+    from transcriber.vad import SAMPLE_RATE
+except ImportError:
+    from ..audio import load_audio, wav_header, write_wav
+    from ..vad import SAMPLE_RATE
+
+from .base import AudioInput, Backend
+
+CLI_BIN_ENV = "WHISPER_CLI_BIN"
+SERVER_BIN_ENV = "WHISPER_SERVER_BIN"
+MODELS_DIR_ENV = "WHISPER_CPP_MODELS_DIR"
+SERVER_TIMEOUT_ENV = "WHISPER_SERVER_TIMEOUT"
+
+# Seconds whisper-server may take to answer an inference request, on top of
+# twice the audio's duration; enough for large models on slow CPUs, while a
+# hung server still fails the job instead of blocking it forever.
+DEFAULT_SERVER_TIMEOUT = 600.0
+
+_SRT_TIME = re.compile(r"(\d+):(\d+):(\d+)[,.](\d+)")
+
+
+def resolve_ggml_model(model: str) -> Path:
+    """Find the ggml model file for a model name or path.
+
+    Looks for ggml-<name>.bin, then ggml-<name>.en.bin, in
+    $WHISPER_CPP_MODELS_DIR (default: ~/whisper-models).
+
+    Raises:
+        FileNotFoundError: If no model file exists
+    """
+    if Path(model).expanduser().is_file():
+        return Path(model).expanduser()
+
+    models_dir = Path(os.environ.get(MODELS_DIR_ENV, "~/whisper-models")).expanduser()
+    for name in (f"ggml-{model}.bin", f"ggml-{model}.en.bin"):
+        candidate = models_dir / name
+        if candidate.is_file():
+            return candidate
+
+    raise FileNotFoundError(
+        f"No whisper.cpp model for '{model}' in {models_dir}. Download it with:\n"
+        f"  curl -L -o {models_dir}/ggml-{model}.bin "
+        f"https://huggingface.co/ggerganov/whisper.cpp/resolve/main/ggml-{model}.bin"
+    )
+
+
+def _find_binary(env: str, default: str) -> str:
+    binary = os.environ.get(env, default)
+    resolved = shutil.which(binary)
+    if resolved is None:
+        raise FileNotFoundError(
+            f"'{binary}' not found. Install whisper.cpp "
+            f"(https://github.com/ggerganov/whisper.cpp) or set ${env}."
+        )
+    return resolved
+
+
+def _srt_seconds(timestamp: str) -> float:
+    match = _SRT_TIME.match(timestamp.strip())
+    if not match:
+        raise ValueError(f"Invalid SRT timestamp: {timestamp!r}")
+    hours, minutes, seconds, millis = (int(g) for g in match.groups())
+    return hours * 3600 + minutes * 60 + seconds + millis / 1000
+
+
+def _build_result(
+    segments: List[Dict[str, Any]], language: Optional[str]
+) -> Dict[str, Any]:
+    for index, segment in enumerate(segments):
+        segment["id"] = index
+    return {
+        "text": "".join(segment["text"] for segment in segments),
+        "segments": segments,
+        "language": language,
+    }
+
+
+def parse_cli_json(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert `whisper-cli -oj` output into a Whisper-style result."""
+    segments = [
+        {
+            "start": item["offsets"]["from"] / 1000,
+            "end": item["offsets"]["to"] / 1000,
+            "text": item["text"],
+        }
+        for item in data.get("transcription", [])
+    ]
+    language = (data.get("result") or {}).get("language") or (
+        data.get("params") or {}
+    ).get("language")
+    return _build_result(segments, language)
+
+
+def parse_srt(text: str, language: Optional[str] = None) -> Dict[str, Any]:
+    """Convert SRT subtitles (e.g. `whisper-cli -osrt`) into a Whisper-style result."""
+    segments = []
+    for block in re.split(r"\n\s*\n", text.strip()):
+        lines = block.strip().splitlines()
+        timing = next((i for i, line in enumerate(lines) if "-->" in line), None)
+        if timing is None:
+            continue
+        start, end = lines[timing].split("-->")
+        segments.append(
+            {
+                "start": _srt_seconds(start),
+                "end": _srt_seconds(end),
+                "text": " " + " ".join(lines[timing + 1 :]).strip(),
+            }
+        )
+    return _build_result(segments, language)
+
+
+class _WavInput:
+    """Provides a 16 kHz mono WAV path for an input, creating a temp file if needed."""
+
+    def __init__(self, audio: AudioInput):
+        self.audio = audio
+        self._tmp_dir: Optional[str] = None
+
+    def __enter__(self) -> Path:
+        if isinstance(self.audio, str) and self._is_compatible_wav(self.audio):
+            return Path(self.audio)
+
+        samples = (
+            self.audio if isinstance(self.audio, np.ndarray) else load_audio(self.audio)
+        )
+        self._tmp_dir = tempfile.mkdtemp(prefix="whisper_cpp_")
+        path = Path(self._tmp_dir) / "input.wav"
+        write_wav(path, samples)
+        return path
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        if self._tmp_dir:
+            shutil.rmtree(self._tmp_dir, ignore_errors=True)
+
+    @staticmethod
+    def _is_compatible_wav(path: str) -> bool:
+        header = wav_header(path)
+        return (
+            header is not None
+            and header["sample_rate"] == 16000
+            and header["channels"] == 1
+            and header["dtype"] == "<i2"
+        )
+
+
+class WhisperCppBackend(Backend):
+    """Runs the `whisper-cli` binary once per input and parses its JSON/SRT output."""
+
+    name = "whisper-cpp"
+
+    def __init__(
+        self, model: str, device: str = "cpu", verbose: bool = False, threads: int = 0
+    ):
+        super().__init__(model, device, verbose)
+        self.threads = threads
+        self.binary = ""
+
+    def load(self) -> None:
+        self.binary = _find_binary(CLI_BIN_ENV, "whisper-cli")
+        self.model = resolve_ggml_model(self.model_name)
+
+    def transcribe(
+        self, audio: AudioInput, language: Optional[str] = None
+    ) -> Dict[str, Any]:
+        return self.transcribe_batch([audio], language=language)[0]
+
+    def transcribe_batch(
+        self, audios: Sequence[AudioInput], language: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Transcribe all inputs in one whisper-cli run, loading the model once."""
+        with ExitStack() as stack:
+            wav_paths = [stack.enter_context(_WavInput(audio)) for audio in audios]
+            out_dir = Path(stack.enter_context(tempfile.TemporaryDirectory()))
+            output_bases = [out_dir / f"transcript{i}" for i in range(len(audios))]
+            command = [self.binary, "-m", str(self.model)]
+            for wav_path in wav_paths:
+                command += ["-f", str(wav_path)]
+            for output_base in output_bases:
+                command += ["-of", str(output_base)]
+            command += ["-l", language or "auto", "-oj", "-osrt", "-np"]
+            if self.threads:
+                command += ["-t", str(self.threads)]
+            if self.device == "cpu":
+                command.append("-ng")
+
+            process = subprocess.run(command, capture_output=True, text=True)
+            return [
+                self._read_output(output_base, process, language)
+                for output_base in output_bases
+            ]
+
+    @staticmethod
+    def _read_output(
+        output_base: Path,
+        process: "subprocess.CompletedProcess[str]",
+        language: Optional[str],
+    ) -> Dict[str, Any]:
+        # whisper-cli can exit 0 without writing output (e.g. unreadable
+        # audio), so the output files are checked rather than the code.
+        json_path = output_base.with_suffix(".json")
+        srt_path = output_base.with_suffix(".srt")
+        if json_path.exists():
+            with open(json_path, encoding="utf-8") as f:
+                result = parse_cli_json(json.load(f))
+        elif srt_path.exists():
+            result = parse_srt(srt_path.read_text(encoding="utf-8"), language)
+        else:
+            detail = (process.stderr or process.stdout or "").strip().splitlines()
+            raise RuntimeError(
+                f"whisper-cli produced no transcript (exit {process.returncode})"
+                + (f": {detail[-1]}" if detail else "")
+            )
+
+        if result["language"] is None:
+            result["language"] = language
+        return result
+
+    @property
+    def memory_bytes(self) -> Optional[int]:
+        # The model is only resident while whisper-cli runs.
+        return 0
+
+
+class WhisperCppServerBackend(Backend):
+    """Keeps one `whisper-server` process warm and posts audio to it over HTTP."""
+
+    name = "whisper-cpp-server"
+
+    def __init__(
+        self,
+        model: str,
+        device: str = "cpu",
+        verbose: bool = False,
+        threads: int = 0,
+        startup_timeout: float = 60.0,
+        request_timeout: Optional[float] = None,
+    ):
+        """Initialize the backend; the server starts on load().
+
+        Args:
+            model: ggml model name or path (see resolve_ggml_model)
+            device: "cpu" disables the GPU
+            verbose: Show the server's output
+            threads: Threads for whisper-server (0: its default)
+            startup_timeout: Seconds to wait for the server to accept requests
+            request_timeout: Seconds a request may take besides twice the
+                audio's duration (default: $WHISPER_SERVER_TIMEOUT or 600)
+        """
+        super().__init__(model, device, verbose)
+        self.threads = threads
+        self.startup_timeout = startup_timeout
+        if request_timeout is None:
+            request_timeout = float(
+                os.environ.get(SERVER_TIMEOUT_ENV, DEFAULT_SERVER_TIMEOUT)
+            )
+        self.request_timeout = request_timeout
+        self.process: Optional[subprocess.Popen] = None
+        self.url = ""
+
+    def load(self) -> None:
+        binary = _find_binary(SERVER_BIN_ENV, "whisper-server")
+        self.model = resolve_ggml_model(self.model_name)
+
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            port = sock.getsockname()[1]
+
+        command = [
+            binary,
+            "-m",
+            str(self.model),
+            "--host",
+            "127.0.0.1",
+            "--port",
+            str(port),
+        ]
+        if self.threads:
+            command += ["-t", str(self.threads)]
+        if self.device == "cpu":
+            command.append("-ng")
+
+        self.process = subprocess.Popen(
+            command,
+            stdout=None if self.verbose else subprocess.DEVNULL,
+            stderr=None if self.verbose else subprocess.DEVNULL,
+        )
+        self.url = f"http://127.0.0.1:{port}"
+        self._wait_until_ready()
+
+    def _wait_until_ready(self) -> None:
+        deadline = time.monotonic() + self.startup_timeout
+        while time.monotonic() < deadline:
+            assert self.process is not None
+            if self.process.poll() is not None:
+                raise RuntimeError(
+                    f"whisper-server exited during startup (code {self.process.returncode})"
+                )
+            try:
+                with urllib.request.urlopen(self.url + "/", timeout=1):
+                    return
+            except urllib.error.HTTPError:
+                # Any HTTP response means the server is accepting requests.
+                return
+            except OSError:
+                time.sleep(0.1)
+        self.close()
+        raise RuntimeError(
+            f"whisper-server did not start within {self.startup_timeout:.0f}s"
+        )
+
+    def transcribe(
+        self, audio: AudioInput, language: Optional[str] = None
+    ) -> Dict[str, Any]:
+        if self.process is None or self.process.poll() is not None:
+            raise RuntimeError("whisper-server is not running")
+
+        with _WavInput(audio) as wav_path:
+            fields = {
+                "response_format": "verbose_json",
+                "language": language or "auto",
+                "temperature": "0.0",
+            }
+            body, content_type = _multipart(fields, wav_path)
+
+        request = urllib.request.Request(
+            self.url + "/inference",
+            data=body,
+            headers={"Content-Type": content_type},
+            method="POST",
+        )
+        audio_seconds = len(body) / (2 * SAMPLE_RATE)  # 16-bit mono samples
+        timeout = self.request_timeout + 2 * audio_seconds
+        try:
+            with urllib.request.urlopen(request, timeout=timeout) as response:
+                data = json.loads(response.read().decode("utf-8"))
+        except OSError as e:
+            # urlopen wraps a timeout while connecting in URLError.
+            if not isinstance(getattr(e, "reason", e), socket.timeout):
+                raise
+            raise RuntimeError(
+                f"whisper-server did not answer within {timeout:.0f}s"
+            ) from e
+
+        if "error" in data:
+            raise RuntimeError(f"whisper-server error: {data['error']}")
+
+        segments = []
+        for item in data.get("segments", []):
+            if "start" in item:
+                start, end = float(item["start"]), float(item["end"])
+            else:
+                # Older servers report centisecond t0/t1.
+                start, end = item["t0"] / 100, item["t1"] / 100
+            segments.append({"start": start, "end": end, "text": item["text"]})
+
+        result = _build_result(segments, data.get("language") or language)
+        if not segments and data.get("text"):
+            result["text"] = data["text"]
+        return result
+
+    @property
+    def memory_bytes(self) -> Optional[int]:
+        return Path(self.model).stat().st_size if self.model else None
+
+    def close(self) -> None:
+        if self.process is not None and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+        self.process = None
+
+    def __del__(self) -> None:
+        self.close()
+
+
+def _multipart(fields: Dict[str, str], file_path: Path) -> Tuple[bytes, str]:
+    """Encode form fields and a WAV file as multipart/form-data."""
+    boundary = uuid.uuid4().hex
+    parts = []
+    for name, value in fields.items():
+        parts.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n'
+            f"{value}\r\n".encode()
+        )
+    parts.append(
+        f'--{boundary}\r\nContent-Disposition: form-data; name="file"; '
+        f'filename="{file_path.name}"\r\nContent-Type: audio/wav\r\n\r\n'.encode()
+    )
+    parts.append(file_path.read_bytes())
+    parts.append(f"\r\n--{boundary}--\r\n".encode())
+    return b"".join(parts), f"multipart/form-data; boundary={boundary}"
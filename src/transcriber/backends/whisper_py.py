@@ -0,0 +1,200 @@
+"""OpenAI Whisper (PyTorch) backend."""
+
+from importlib.util import find_spec
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+try:
+    from transcriber.audio import load_audio
+    from transcriber.registry import estimate_model_bytes
+except ImportError:
+    from ..audio import load_audio
+    from ..registry import estimate_model_bytes
+
+from .base import AudioInput, Backend
+
+# torch and whisper take seconds to import, so only check that they are
+# installed here and import them when a model is first loaded.
+WHISPER_AVAILABLE = find_spec("torch") is not None and find_spec("whisper") is not None
+whisper: Any = None
+torch: Any = None
+
+# whisper.transcribe's defaults for giving up on a decode: a result this
+# repetitive or unlikely is retried at higher temperatures, and one this
+# likely to be silence is dropped.
+COMPRESSION_RATIO_THRESHOLD = 2.4
+LOGPROB_THRESHOLD = -1.0
+NO_SPEECH_THRESHOLD = 0.6
+TIME_PRECISION = 0.02  # seconds per timestamp token
+
+
+def _whisper_module() -> Any:
+    """Import openai-whisper (and torch) on first use."""
+    global whisper, torch
+    if whisper is None:
+        import torch as torch_module
+        import whisper as module
+
+        whisper, torch = module, torch_module
+    return whisper
+
+
+class WhisperBackend(Backend):
+    """Runs openai-whisper models in-process."""
+
+    name = "whisper"
+
+    def load(self) -> None:
+        if not WHISPER_AVAILABLE:
+            raise ImportError(
+                "Python Whisper is not installed. "
+                "Install openai-whisper and torch, or use the whisper.cpp backend "
+                "(--backend whisper-cpp) with whisper-cli from: "
+                "https://github.com/ggerganov/whisper.cpp"
+            )
+        self.model = _whisper_module().load_model(self.model_name, device=self.device)
+
+    def transcribe(
+        self, audio: AudioInput, language: Optional[str] = None
+    ) -> Dict[str, Any]:
+        if not isinstance(audio, np.ndarray):
+            # Our loader memory-maps PCM/WAV instead of always running ffmpeg.
+            audio = load_audio(audio)
+        result: Dict[str, Any] = self.model.transcribe(
+            audio,
+            verbose=self.verbose,
+            language=language,
+            task="transcribe",
+        )
+        return result
+
+    def transcribe_batch(
+        self, audios: Sequence[AudioInput], language: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Run the encoder and decoder once over a padded batch of clips.
+
+        Every clip is padded to Whisper's 30 s window, so clips that fit one
+        window share a single forward pass instead of one each. Decoding is
+        greedy; clips whose batched decode fails whisper.transcribe's
+        quality checks are transcribed again on their own, with its
+        temperature fallback. Longer inputs fall back to one at a time.
+        """
+        module = _whisper_module()
+        clips = [a if isinstance(a, np.ndarray) else load_audio(a) for a in audios]
+        if not clips or max(map(len, clips)) > module.audio.N_SAMPLES:
+            return super().transcribe_batch(clips, language=language)
+
+        mel = torch.stack(
+            [
+                module.log_mel_spectrogram(
+                    module.pad_or_trim(clip), n_mels=self.model.dims.n_mels
+                )
+                for clip in clips
+            ]
+        ).to(self.model.device)
+
+        if language:
+            languages = [language] * len(clips)
+        elif self.model.is_multilingual:
+            _, probs = self.model.detect_language(mel)
+            languages = [max(p, key=p.get) for p in probs]
+        else:
+            languages = ["en"] * len(clips)
+
+        results: List[Dict[str, Any]] = [{}] * len(clips)
+        for lang in dict.fromkeys(languages):
+            indices = [i for i, code in enumerate(languages) if code == lang]
+            options = module.DecodingOptions(
+                language=lang, task="transcribe", fp16=self.device != "cpu"
+            )
+            decoded = module.decode(self.model, mel[indices], options)
+            tokenizer = module.tokenizer.get_tokenizer(
+                self.model.is_multilingual,
+                num_languages=self.model.num_languages,
+                language=lang,
+                task="transcribe",
+            )
+            for index, result in zip(indices, decoded):
+                duration = len(clips[index]) / module.audio.SAMPLE_RATE
+                silent = (
+                    result.no_speech_prob > NO_SPEECH_THRESHOLD
+                    and result.avg_logprob < LOGPROB_THRESHOLD
+                )
+                if not silent and (
+                    result.compression_ratio > COMPRESSION_RATIO_THRESHOLD
+                    or result.avg_logprob < LOGPROB_THRESHOLD
+                ):
+                    results[index] = self.transcribe(clips[index], language=lang)
+                    continue
+                segments = (
+                    [] if silent else _timed_segments(result, tokenizer, duration)
+                )
+                results[index] = {
+                    "text": "".join(segment["text"] for segment in segments),
+                    "segments": segments,
+                    "language": lang,
+                }
+        return results
+
+    @property
+    def memory_bytes(self) -> Optional[int]:
+        return estimate_model_bytes(self.model, self.model_name)
+
+
+def _timed_segments(
+    result: Any, tokenizer: Any, duration: float
+) -> List[Dict[str, Any]]:
+    """Split a DecodingResult at its timestamp tokens, as whisper.transcribe does.
+
+    Segments end at each pair of consecutive timestamp tokens, and a single
+    timestamp after the last text closes the final one. Without any pair
+    the whole decode is one segment ending at its last timestamp. Text left
+    after the last timestamp runs to the end of the clip, where
+    whisper.transcribe would decode it again from the next window.
+    """
+    tokens = list(result.tokens)
+    begin: int = tokenizer.timestamp_begin
+    timed = [token >= begin for token in tokens]
+    segments: List[Dict[str, Any]] = []
+
+    def seconds(token: int) -> float:
+        return (token - begin) * TIME_PRECISION
+
+    def add(start: float, end: float, piece: List[int]) -> None:
+        text_tokens = [token for token in piece if token < begin]
+        if not text_tokens:
+            return
+        segments.append(
+            {
+                "id": len(segments),
+                "seek": 0,
+                "start": start,
+                "end": min(end, duration),
+                "text": tokenizer.decode(text_tokens),
+                "tokens": text_tokens,
+                "temperature": result.temperature,
+                "avg_logprob": result.avg_logprob,
+                "compression_ratio": result.compression_ratio,
+                "no_speech_prob": result.no_speech_prob,
+            }
+        )
+
+    slices = [i + 1 for i in range(len(tokens) - 1) if timed[i] and timed[i + 1]]
+    if not slices:
+        times = [token for token in tokens if token >= begin]
+        end = seconds(times[-1]) if times and times[-1] != begin else duration
+        add(0.0, end, tokens)
+        return segments
+
+    if timed[-2:] == [False, True]:
+        slices.append(len(tokens))
+    last = 0
+    for current in slices:
+        piece = tokens[last:current]
+        start = seconds(piece[0]) if timed[last] else 0.0
+        add(start, seconds(piece[-1]), piece)
+        last = current
+    if last < len(tokens):
+        add(seconds(tokens[last]) if timed[last] else 0.0, duration, tokens[last:])
+    return segments
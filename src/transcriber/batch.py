@@ -0,0 +1,430 @@
+"""Batch transcription of many files over a worker process pool."""
+
+import glob
+import math
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing.queues import SimpleQueue
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+try:
+    from transcriber.engine import DEFAULT_BATCH_SIZE
+    from transcriber.outputs import output_paths
+    from transcriber.scheduler import ThreadBudget, plan_budgets, plan_devices
+except ImportError:
+    from .engine import DEFAULT_BATCH_SIZE
+    from .outputs import output_paths
+    from .scheduler import ThreadBudget, plan_budgets, plan_devices
+
+AUDIO_EXTENSIONS = {
+    ".aac",
+    ".flac",
+    ".m4a",
+    ".mkv",
+    ".mov",
+    ".mp3",
+    ".mp4",
+    ".oga",
+    ".ogg",
+    ".opus",
+    ".wav",
+    ".webm",
+    ".wma",
+}
+
+# Engine owned by each worker process, created once by _init_worker.
+_worker_engine: Any = None
+
+Job = Tuple[str, Dict[str, str], Dict[str, Any]]
+
+
+def collect_inputs(
+    sources: Iterable[str],
+    manifest: Optional[str] = None,
+) -> List[Path]:
+    """Expand directories, glob patterns and a manifest into a list of files.
+
+    Args:
+        sources: Files, directories (searched recursively) or glob patterns
+        manifest: Text file listing one input path per line; blank lines and
+            lines starting with '#' are ignored, relative paths are resolved
+            against the manifest's directory
+
+    Returns:
+        De-duplicated input files in discovery order
+    """
+    found: List[Path] = []
+
+    for source in sources:
+        path = Path(source)
+        if path.is_dir():
+            found.extend(
+                sorted(
+                    p
+                    for p in path.rglob("*")
+                    if p.is_file() and p.suffix.lower() in AUDIO_EXTENSIONS
+                )
+            )
+        elif glob.has_magic(source):
+            found.extend(
+                sorted(
+                    Path(p)
+                    for p in glob.glob(source, recursive=True)
+                    if Path(p).is_file()
+                )
+            )
+        else:
+            found.append(path)
+
+    if manifest:
+        manifest_path = Path(manifest)
+        with open(manifest_path, encoding="utf-8") as f:
+            for line in f:
+                entry = line.strip()
+                if not entry or entry.startswith("#"):
+                    continue
+                path = Path(entry).expanduser()
+                if not path.is_absolute():
+                    path = manifest_path.parent / path
+                found.append(path)
+
+    unique: List[Path] = []
+    seen = set()
+    for path in found:
+        key = os.path.abspath(path)
+        if key not in seen:
+            seen.add(key)
+            unique.append(path)
+    return unique
+
+
+def audio_seconds(result: Dict[str, Any]) -> float:
+    """Return the duration of audio covered by a transcription result."""
+    if result.get("duration"):
+        return float(result["duration"])
+    segments = result.get("segments") or []
+    return float(segments[-1]["end"]) if len(segments) else 0.0
+
+
+def plan_outputs(
+    inputs: List[Path],
+    formats: List[str],
+    output_dir: Optional[Path] = None,
+) -> List[Dict[str, Path]]:
+    """Resolve every input's output paths, keeping them apart.
+
+    Transcripts are named after their input's stem. When two inputs would
+    share an output (a/x.wav and b/x.wav), each input's directory relative
+    to the inputs' common parent is kept under the output directory
+    (out/a/x_transcript.txt and out/b/x_transcript.txt).
+
+    Args:
+        inputs: Files to transcribe
+        formats: Output formats
+        output_dir: Directory for transcripts (default: current directory)
+
+    Returns:
+        One mapping of format to output path per input
+
+    Raises:
+        ValueError: If two inputs still share an output path, e.g. x.wav and
+            x.mp3 in the same directory
+    """
+    planned = [output_paths(path, formats, output_dir=output_dir) for path in inputs]
+    if not _first_collision(inputs, planned):
+        return planned
+
+    parents = [os.path.dirname(os.path.abspath(path)) for path in inputs]
+    common = os.path.commonpath(parents)
+    base = Path(output_dir) if output_dir else Path()
+    planned = [
+        output_paths(path, formats, output_dir=base / os.path.relpath(parent, common))
+        for path, parent in zip(inputs, parents)
+    ]
+    collision = _first_collision(inputs, planned)
+    if collision:
+        first, second, output = collision
+        raise ValueError(
+            f"{first} and {second} would both be transcribed to {output}; "
+            "rename one or transcribe them in separate batches"
+        )
+    return planned
+
+
+def _first_collision(
+    inputs: List[Path], planned: List[Dict[str, Path]]
+) -> Optional[Tuple[Path, Path, Path]]:
+    """Return two inputs sharing an output path, and the path, if any."""
+    owners: Dict[str, Path] = {}
+    for input_path, paths in zip(inputs, planned):
+        for path in paths.values():
+            key = os.path.abspath(path)
+            if key in owners:
+                return owners[key], input_path, path
+            owners[key] = input_path
+    return None
+
+
+def _init_worker(
+    model: str,
+    device: str,
+    verbose: bool,
+    cache: bool = False,
+    backend: str = "whisper",
+    budget: Any = None,
+) -> None:
+    """Load the model once per worker process, within its CPU budget.
+
+    `budget` is a ThreadBudget, or a queue holding a (ThreadBudget, device)
+    pair for each worker; a queued device replaces `device`.
+    """
+    global _worker_engine
+    if budget is not None and not isinstance(budget, ThreadBudget):
+        budget, device = budget.get()
+    if budget is not None:
+        budget.apply()
+    try:
+        from transcriber.cache import TranscriptCache
+        from transcriber.engine import TranscriptionEngine
+    except ImportError:
+        from .cache import TranscriptCache
+        from .engine import TranscriptionEngine
+
+    _worker_engine = TranscriptionEngine(
+        model=model,
+        device=device,
+        verbose=verbose,
+        cache=TranscriptCache() if cache else None,
+        backend=backend,
+    )
+
+
+def _transcribe_one(
+    input_path: str,
+    outputs: Dict[str, str],
+    options: Dict[str, Any],
+) -> Dict[str, Any]:
+    """Transcribe one file in a worker and write every requested format."""
+    start = time.perf_counter()
+    try:
+        result = _worker_engine.transcribe(input_path, **options)
+    except Exception as e:
+        return _save(input_path, outputs, e, start)
+    return _save(input_path, outputs, result, start)
+
+
+def _transcribe_jobs(jobs: List[Job], batch_size: int) -> List[Dict[str, Any]]:
+    """Transcribe files in a worker, batching short ones through the model.
+
+    All jobs share the options of the first. The time spent in the model is
+    split evenly between the files. Cache counters are flushed afterwards,
+    since pool workers exit without running atexit handlers.
+    """
+    try:
+        return _transcribe_group(jobs, batch_size)
+    finally:
+        if _worker_engine.cache is not None:
+            _worker_engine.cache.flush()
+
+
+def _transcribe_group(jobs: List[Job], batch_size: int) -> List[Dict[str, Any]]:
+    if len(jobs) == 1:
+        return [_transcribe_one(*jobs[0])]
+    start = time.perf_counter()
+    try:
+        results = _worker_engine.transcribe_many(
+            [input_path for input_path, _, _ in jobs],
+            batch_size=batch_size,
+            **jobs[0][2],
+        )
+    except Exception as e:
+        results = [e] * len(jobs)
+    share = (time.perf_counter() - start) / len(jobs)
+
+    outcomes = []
+    for (input_path, outputs, _), result in zip(jobs, results):
+        outcomes.append(_save(input_path, outputs, result, time.perf_counter() - share))
+    return outcomes
+
+
+def _save(
+    input_path: str,
+    outputs: Dict[str, str],
+    result: Any,
+    start: float,
+) -> Dict[str, Any]:
+    """Write a result (or report the exception it is) as a per-file outcome."""
+    try:
+        if isinstance(result, Exception):
+            raise result
+        _worker_engine.save_many(result, {fmt: Path(p) for fmt, p in outputs.items()})
+    except Exception as e:
+        return {
+            "input": input_path,
+            "outputs": outputs,
+            "ok": False,
+            "error": str(e) or type(e).__name__,
+            "seconds": time.perf_counter() - start,
+        }
+
+    return {
+        "input": input_path,
+        "outputs": outputs,
+        "ok": True,
+        "audio_seconds": audio_seconds(result),
+        "removed_seconds": (result.get("vad") or {}).get("removed_seconds", 0.0),
+        "seconds": time.perf_counter() - start,
+    }
+
+
+class BatchSummary:
+    """Aggregate outcome of a batch run."""
+
+    def __init__(self) -> None:
+        self.completed: List[Dict[str, Any]] = []
+        self.failed: List[Dict[str, Any]] = []
+        self.skipped: List[Path] = []
+        self.audio_seconds = 0.0
+        self.removed_seconds = 0.0
+        self.wall_seconds = 0.0
+
+    @property
+    def throughput(self) -> float:
+        """Audio hours transcribed per wall-clock hour."""
+        return self.audio_seconds / self.wall_seconds if self.wall_seconds else 0.0
+
+    def add(self, outcome: Dict[str, Any]) -> None:
+        if outcome["ok"]:
+            self.completed.append(outcome)
+            self.audio_seconds += outcome["audio_seconds"]
+            self.removed_seconds += outcome["removed_seconds"]
+        else:
+            self.failed.append(outcome)
+
+
+def run_batch(
+    inputs: List[Path],
+    output_dir: Optional[Path] = None,
+    formats: Iterable[str] = ("txt",),
+    model: str = "base",
+    device: str = "cpu",
+    workers: int = 1,
+    language: Optional[str] = None,
+    overwrite: bool = False,
+    vad: bool = True,
+    vad_threshold: Optional[float] = None,
+    cache: bool = False,
+    backend: str = "whisper",
+    verbose: bool = False,
+    on_result: Optional[Callable[[Dict[str, Any]], None]] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    threads: Optional[int] = None,
+    pin: bool = False,
+) -> BatchSummary:
+    """Transcribe many files, continuing past per-file failures.
+
+    Args:
+        inputs: Files to transcribe
+        output_dir: Directory for transcripts (default: current directory)
+        formats: Output formats, all written from one transcription pass
+        model: Whisper model size
+        device: Device to run on
+        workers: Number of worker processes; 1 runs in-process
+        language: Language code (optional, auto-detected if None)
+        overwrite: Re-transcribe files whose outputs already exist
+        vad: Skip silence before inference
+        vad_threshold: VAD speech threshold in dB relative to the loudest frames
+        cache: Reuse cached transcripts of identical audio
+        backend: Inference backend (see transcriber.backends)
+        verbose: Enable verbose output
+        on_result: Called with each per-file outcome as it completes
+        batch_size: Files handed to a worker at once; those short enough
+            share model batches (see TranscriptionEngine.transcribe_many).
+            1 transcribes each file on its own
+        threads: CPU threads per worker (default: the available cores
+            divided between the workers)
+        pin: Pin each worker to its own cores (Linux)
+
+    Returns:
+        Batch summary
+
+    Raises:
+        ValueError: If two inputs would be written to the same output
+            (see plan_outputs)
+    """
+    summary = BatchSummary()
+    start = time.perf_counter()
+
+    if output_dir:
+        Path(output_dir).mkdir(parents=True, exist_ok=True)
+
+    formats = list(formats)
+    options = {"language": language, "vad": vad, "vad_threshold": vad_threshold}
+    jobs: List[Job] = []
+    for input_path, paths in zip(inputs, plan_outputs(inputs, formats, output_dir)):
+        if not overwrite and all(p.exists() for p in paths.values()):
+            summary.skipped.append(input_path)
+            continue
+        for path in paths.values():
+            path.parent.mkdir(parents=True, exist_ok=True)
+        outputs = {fmt: str(p) for fmt, p in paths.items()}
+        jobs.append((str(input_path), outputs, options))
+
+    def record(outcome: Dict[str, Any]) -> None:
+        summary.add(outcome)
+        if on_result:
+            on_result(outcome)
+
+    # Groups are kept small enough that every worker gets some.
+    size = max(1, min(batch_size, math.ceil(len(jobs) / max(workers, 1))))
+    groups = [jobs[i : i + size] for i in range(0, len(jobs), size)]
+
+    if jobs and workers <= 1:
+        # In-process, the caller's thread settings stand unless overridden.
+        budget = (
+            plan_budgets(1, threads=threads, pin=pin)[0] if threads or pin else None
+        )
+        _init_worker(model, device, verbose, cache, backend, budget)
+        for group in groups:
+            for outcome in _transcribe_jobs(group, batch_size):
+                record(outcome)
+    elif jobs:
+        processes = min(workers, len(groups))
+        slots: SimpleQueue[Tuple[ThreadBudget, str]] = multiprocessing.SimpleQueue()
+        for slot in zip(
+            plan_budgets(processes, threads=threads, pin=pin),
+            plan_devices(device, processes),
+        ):
+            slots.put(slot)
+        with ProcessPoolExecutor(
+            max_workers=processes,
+            initializer=_init_worker,
+            initargs=(model, device, verbose, cache, backend, slots),
+        ) as pool:
+            futures = {
+                pool.submit(_transcribe_jobs, group, batch_size): group
+                for group in groups
+            }
+            for future in as_completed(futures):
+                try:
+                    outcomes = future.result()
+                except Exception as e:
+                    # Worker crashed or failed to initialize.
+                    outcomes = [
+                        {
+                            "input": job[0],
+                            "outputs": job[1],
+                            "ok": False,
+                            "error": str(e) or type(e).__name__,
+                            "seconds": 0.0,
+                        }
+                        for job in futures[future]
+                    ]
+                for outcome in outcomes:
+                    record(outcome)
+
+    summary.wall_seconds = time.perf_counter() - start
+    return summary
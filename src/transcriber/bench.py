@@ -0,0 +1,762 @@
+"""Benchmarks for model loading, transcription speed, memory and output writers.
+
+Each benchmark returns named metrics; `run_benchmarks` collects them into a
+JSON-serializable report and `compare` checks a report against a baseline.
+More benchmarks can be plugged in with `register_benchmark`.
+"""
+
+import json
+import multiprocessing
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack, contextmanager
+from pathlib import Path
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+import numpy as np
+
+try:
+    from transcriber.engine import TranscriptionEngine, clean_result_for_json
+    from transcriber.formatters import open_writer
+    from transcriber.profiling import peak_rss_bytes
+    from transcriber.refine import transcribe_refined
+    from transcriber.registry import ModelRegistry
+    from transcriber.scheduler import (
+        THREAD_ENV_VARS,
+        ThreadBudget,
+        available_cpus,
+        plan_budgets,
+        plan_workers,
+    )
+    from transcriber.segments import SegmentStore, compact_result
+    from transcriber.vad import SAMPLE_RATE
+except ImportError:
+    from .engine import TranscriptionEngine, clean_result_for_json
+    from .formatters import open_writer
+    from .profiling import peak_rss_bytes
+    from .refine import transcribe_refined
+    from .registry import ModelRegistry
+    from .scheduler import (
+        THREAD_ENV_VARS,
+        ThreadBudget,
+        available_cpus,
+        plan_budgets,
+        plan_workers,
+    )
+    from .segments import SegmentStore, compact_result
+    from .vad import SAMPLE_RATE
+
+SCHEMA_VERSION = 1
+
+Metrics = Dict[str, Dict[str, Any]]
+BenchmarkFn = Callable[["BenchConfig"], Metrics]
+
+BENCHMARKS: Dict[str, BenchmarkFn] = {}
+
+# Modules that must not be imported just to start the CLI.
+HEAVY_MODULES = ("torch", "whisper", "yt_dlp")
+
+# Upper bound on the segments written by the serialize benchmark.
+SERIALIZE_SEGMENTS = 5_000
+
+# Short clips transcribed by the batch benchmark, like a folder of voice notes.
+BATCH_CLIPS = 32
+BATCH_CLIP_SECONDS = (2.0, 25.0)
+
+# Draft model of the refine benchmark; the configured model refines.
+REFINE_DRAFT_MODEL = "tiny"
+# Window of the refine benchmark, so short audio still has several windows.
+REFINE_WINDOW_SECONDS = 10.0
+
+# Transcriptions each worker runs in the threads benchmark.
+THREADS_JOBS_PER_WORKER = 4
+
+# Encoder the threads benchmark multiplies through on the stub backend:
+# Whisper base's 50 frames per second, width and layer count.
+ENCODER_FRAMES_PER_SECOND = 50
+ENCODER_WIDTH = 512
+ENCODER_LAYERS = 6
+
+# Engine of each threads benchmark worker process, created by
+# _init_threads_worker.
+_threads_engine: Any = None
+
+_STARTUP_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+from transcriber.cli import main
+try:
+    main(sys.argv[1:], prog_name="whisper-transcriber")
+except SystemExit:
+    pass
+sys.stderr.write(json.dumps([time.perf_counter() - start, sorted(sys.modules)]))
+"""
+
+
+class BenchConfig:
+    """Settings shared by all benchmarks in a run."""
+
+    def __init__(
+        self,
+        model: str = "base",
+        backend: str = "stub",
+        device: str = "cpu",
+        audio_seconds: float = 60.0,
+        segments: int = 50_000,
+        repeats: int = 3,
+        formats: Iterable[str] = ("srt", "vtt", "json"),
+    ):
+        """Initialize the configuration.
+
+        Args:
+            model: Model name
+            backend: Inference backend; "stub" needs no downloads or GPU
+            device: Device to run on
+            audio_seconds: Length of the synthetic audio transcribed
+            segments: Number of synthetic segments written by formatter benchmarks
+            repeats: Timed repetitions; the best run is reported
+            formats: Output formats to benchmark
+        """
+        self.model = model
+        self.backend = backend
+        self.device = device
+        self.audio_seconds = audio_seconds
+        self.segments = segments
+        self.repeats = max(1, repeats)
+        self.formats = list(formats)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(vars(self))
+
+
+def metric(value: float, unit: str, better: str = "lower") -> Dict[str, Any]:
+    """Build a metric entry; `better` is "lower" or "higher"."""
+    return {"value": value, "unit": unit, "better": better}
+
+
+def register_benchmark(name: str) -> Callable[[BenchmarkFn], BenchmarkFn]:
+    """Register a benchmark function under a name (usable as a decorator)."""
+
+    def decorator(fn: BenchmarkFn) -> BenchmarkFn:
+        BENCHMARKS[name] = fn
+        return fn
+
+    return decorator
+
+
+def available_benchmarks() -> List[str]:
+    """Return the registered benchmark names."""
+    return list(BENCHMARKS)
+
+
+def best_of(repeats: int, fn: Callable[[], Any]) -> float:
+    """Return the fastest wall-clock time of `repeats` calls to fn."""
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def synthetic_audio(seconds: float, seed: int = 0) -> np.ndarray:
+    """Return speech-like audio: noisy tone bursts separated by pauses."""
+    rng = np.random.default_rng(seed)
+    total = int(seconds * SAMPLE_RATE)
+    audio = rng.normal(0, 1e-4, total).astype(np.float32)
+    position = 0
+    while position < total:
+        burst = int(rng.uniform(1.0, 6.0) * SAMPLE_RATE)
+        pause = int(rng.uniform(0.2, 1.5) * SAMPLE_RATE)
+        end = min(total, position + burst)
+        t = np.arange(end - position, dtype=np.float32) / SAMPLE_RATE
+        pitch = rng.uniform(100, 300)
+        audio[position:end] += (
+            0.3 * np.sin(2 * np.pi * pitch * t) * (1 + 0.5 * np.sin(2 * np.pi * 3 * t))
+        )
+        position = end + pause
+    return audio
+
+
+def synthetic_result(
+    n_segments: int, seed: int = 0, decoder_fields: bool = False
+) -> Dict[str, Any]:
+    """Return a transcription result with n_segments segments and word timings.
+
+    Args:
+        n_segments: Number of segments
+        seed: Random seed
+        decoder_fields: Also add the per-segment fields openai-whisper emits
+            (seek, tokens, temperature, log-probability, compression ratio,
+            no-speech probability) and word probabilities
+    """
+    rng = np.random.default_rng(seed)
+    words = ["lorem", "ipsum", "dolor", "sit", "amet", "consectetur", "adipiscing"]
+    segments: List[Dict[str, Any]] = []
+    start = 0.0
+    for index in range(n_segments):
+        count = int(rng.integers(4, 14))
+        chosen = rng.choice(words, size=count)
+        end = start + count * 0.3
+        segments.append(
+            {
+                "id": index,
+                "start": round(start, 3),
+                "end": round(end, 3),
+                "text": " " + " ".join(chosen),
+                "words": [
+                    {
+                        "word": f" {word}",
+                        "start": round(start + i * 0.3, 3),
+                        "end": round(start + (i + 1) * 0.3, 3),
+                    }
+                    for i, word in enumerate(chosen)
+                ],
+            }
+        )
+        if decoder_fields:
+            segment = segments[-1]
+            segment["seek"] = int(start * 100) // 3000 * 3000
+            segment["tokens"] = rng.integers(0, 51865, size=count * 2).tolist()
+            segment["temperature"] = 0.0
+            segment["avg_logprob"] = float(rng.uniform(-1.0, 0.0))
+            segment["compression_ratio"] = float(rng.uniform(1.0, 2.4))
+            segment["no_speech_prob"] = float(rng.uniform(0.0, 0.1))
+            for word in segment["words"]:
+                word["probability"] = float(rng.uniform(0.5, 1.0))
+        start = end + 0.2
+    return {
+        "text": "".join(s["text"] for s in segments),
+        "segments": segments,
+        "language": "en",
+    }
+
+
+@register_benchmark("model_load")
+def bench_model_load(config: BenchConfig) -> Metrics:
+    """Cold load through a fresh registry, then a warm registry hit."""
+
+    def cold() -> None:
+        TranscriptionEngine(
+            model=config.model,
+            device=config.device,
+            backend=config.backend,
+            registry=ModelRegistry(),
+        )
+
+    cold_seconds = best_of(config.repeats, cold)
+
+    registry = ModelRegistry()
+    TranscriptionEngine(
+        model=config.model,
+        device=config.device,
+        backend=config.backend,
+        registry=registry,
+    )
+    warm_seconds = best_of(
+        config.repeats,
+        lambda: TranscriptionEngine(
+            model=config.model,
+            device=config.device,
+            backend=config.backend,
+            registry=registry,
+        ),
+    )
+    return {
+        "model_load_cold_seconds": metric(cold_seconds, "s"),
+        "model_load_warm_seconds": metric(warm_seconds, "s"),
+    }
+
+
+@register_benchmark("transcribe")
+def bench_transcribe(config: BenchConfig) -> Metrics:
+    """Real-time factor on synthetic audio, with and without VAD."""
+    engine = TranscriptionEngine(
+        model=config.model,
+        device=config.device,
+        backend=config.backend,
+        registry=ModelRegistry(),
+    )
+    audio = synthetic_audio(config.audio_seconds)
+    metrics: Metrics = {}
+    for vad in (False, True):
+
+        def run(vad: bool = vad) -> None:
+            engine.transcribe(audio, vad=vad)
+
+        seconds = best_of(config.repeats, run)
+        name = "rtf_vad" if vad else "rtf"
+        metrics[name] = metric(seconds / config.audio_seconds, "x")
+    return metrics
+
+
+@register_benchmark("batch")
+def bench_batch(config: BenchConfig) -> Metrics:
+    """Throughput on many short clips, one at a time and batched."""
+    engine = TranscriptionEngine(
+        model=config.model,
+        device=config.device,
+        backend=config.backend,
+        registry=ModelRegistry(),
+    )
+    rng = np.random.default_rng(0)
+    clips = [
+        synthetic_audio(rng.uniform(*BATCH_CLIP_SECONDS), seed=seed)
+        for seed in range(BATCH_CLIPS)
+    ]
+    single = best_of(config.repeats, lambda: [engine.transcribe(c) for c in clips])
+    batched = best_of(config.repeats, lambda: engine.transcribe_many(clips))
+    return {
+        "batch_single_clips_per_second": metric(
+            len(clips) / single, "clips/s", better="higher"
+        ),
+        "batch_clips_per_second": metric(
+            len(clips) / batched, "clips/s", better="higher"
+        ),
+        "batch_speedup": metric(single / batched, "x", better="higher"),
+    }
+
+
+@register_benchmark("refine")
+def bench_refine(config: BenchConfig) -> Metrics:
+    """Seconds to the first text and to the final text, one pass and two-tier."""
+    registry = ModelRegistry()
+    draft, final = (
+        TranscriptionEngine(
+            model=model,
+            device=config.device,
+            backend=config.backend,
+            registry=registry,
+        )
+        for model in (REFINE_DRAFT_MODEL, config.model)
+    )
+    audio = synthetic_audio(config.audio_seconds)
+    single = best_of(config.repeats, lambda: final.transcribe(audio, vad=False))
+    runs = [
+        transcribe_refined(
+            draft, final, audio, window_seconds=REFINE_WINDOW_SECONDS, vad=False
+        )["refine"]
+        for _ in range(config.repeats)
+    ]
+    return {
+        "refine_single_pass_seconds": metric(single, "s"),
+        "refine_first_text_seconds": metric(
+            min(run["time_to_first_text"] for run in runs), "s"
+        ),
+        "refine_final_seconds": metric(min(run["time_to_final"] for run in runs), "s"),
+    }
+
+
+def _init_threads_worker(
+    model: str, device: str, backend: str, budget: ThreadBudget
+) -> None:
+    global _threads_engine
+    budget.apply()
+    _threads_engine = TranscriptionEngine(
+        model=model, device=device, backend=backend, registry=ModelRegistry()
+    )
+
+
+def _encoder_products(audio: np.ndarray) -> None:
+    """Run the matrix products of an encoder the size of Whisper base's.
+
+    The stub backend skips them, but they are what a real model spends its
+    threads on; NumPy hands them to BLAS, whose thread pool follows the
+    budget's thread-count variables as torch's does.
+    """
+    frames = max(1, int(len(audio) / SAMPLE_RATE * ENCODER_FRAMES_PER_SECOND))
+    rng = np.random.default_rng(0)
+    hidden = rng.standard_normal((frames, ENCODER_WIDTH), dtype=np.float32)
+    up = rng.standard_normal((ENCODER_WIDTH, 4 * ENCODER_WIDTH), dtype=np.float32)
+    down = up.T.copy()
+    for _ in range(ENCODER_LAYERS):
+        hidden = np.tanh(np.maximum(hidden @ up, 0) @ down)
+
+
+def _threads_job(audio: np.ndarray) -> Tuple[float, float]:
+    """Transcribe in a worker; return wall-clock start and end times."""
+    start = time.time()
+    _threads_engine.transcribe(audio, vad=False)
+    if _threads_engine.backend_name == "stub":
+        _encoder_products(audio)
+    return start, time.time()
+
+
+def _threads_ready() -> None:
+    """Return once a worker process is up (see _concurrent_throughput)."""
+
+
+@contextmanager
+def _thread_env(budget: ThreadBudget) -> Iterator[None]:
+    """Set the budget's thread-count variables inside the block only."""
+    previous = {name: os.environ.get(name) for name in THREAD_ENV_VARS}
+    os.environ.update({name: str(budget.threads) for name in THREAD_ENV_VARS})
+    try:
+        yield
+    finally:
+        for name, value in previous.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+
+def _concurrent_throughput(
+    config: BenchConfig, audio: np.ndarray, budgets: List[ThreadBudget]
+) -> float:
+    """Audio seconds per second transcribed by one worker per budget.
+
+    Every worker is a fresh (spawned) process started with its budget's
+    thread-count variables, because BLAS and OpenMP size their thread pools
+    once, when they are loaded: a forked worker would keep the pools of
+    this process whatever its budget says.
+    """
+    context = multiprocessing.get_context("spawn")
+    with ExitStack() as stack:
+        pools = []
+        for budget in budgets:
+            with _thread_env(budget):
+                pool = stack.enter_context(
+                    ProcessPoolExecutor(
+                        max_workers=1,
+                        mp_context=context,
+                        initializer=_init_threads_worker,
+                        initargs=(config.model, config.device, config.backend, budget),
+                    )
+                )
+                pool.submit(_threads_ready).result()
+            pools.append(pool)
+        futures = [
+            pool.submit(_threads_job, audio)
+            for pool in pools
+            for _ in range(THREADS_JOBS_PER_WORKER)
+        ]
+        spans = [future.result() for future in futures]
+    wall = max(end for _, end in spans) - min(start for start, _ in spans)
+    return len(spans) * len(audio) / SAMPLE_RATE / wall
+
+
+@register_benchmark("threads")
+def bench_threads(config: BenchConfig) -> Metrics:
+    """Aggregate throughput of concurrent engines, unbudgeted and budgeted.
+
+    The naive setup gives every engine all the cores, as torch does by
+    default; the budgeted one divides the cores between the engines as
+    serve and transcribe-batch do by default (without pinning). At least
+    two engines run, so both compete.
+    """
+    workers = max(2, plan_workers(config.model, device=config.device))
+    cpus = available_cpus()
+    audio = synthetic_audio(config.audio_seconds)
+    naive = [ThreadBudget(len(cpus)) for _ in range(workers)]
+    budgeted = plan_budgets(workers, cpus)
+    naive_rate = max(
+        _concurrent_throughput(config, audio, naive) for _ in range(config.repeats)
+    )
+    budgeted_rate = max(
+        _concurrent_throughput(config, audio, budgeted) for _ in range(config.repeats)
+    )
+    return {
+        "threads_naive_audio_seconds_per_second": metric(
+            naive_rate, "audio s/s", better="higher"
+        ),
+        "threads_budgeted_audio_seconds_per_second": metric(
+            budgeted_rate, "audio s/s", better="higher"
+        ),
+        "threads_speedup": metric(budgeted_rate / naive_rate, "x", better="higher"),
+    }
+
+
+@register_benchmark("formatters")
+def bench_formatters(config: BenchConfig) -> Metrics:
+    """Throughput of each output writer on a large synthetic result."""
+    result = synthetic_result(config.segments)
+    metrics: Metrics = {}
+    with tempfile.TemporaryDirectory(prefix="whisper_bench_") as tmp:
+        for format in config.formats:
+            path = Path(tmp) / f"bench.{format}"
+
+            def write(format: str = format, path: Path = path) -> None:
+                open_writer(format, path).write_result(result)
+
+            seconds = best_of(config.repeats, write)
+            size = path.stat().st_size
+            metrics[f"{format}_segments_per_second"] = metric(
+                config.segments / seconds, "segments/s", better="higher"
+            )
+            metrics[f"{format}_mb_per_second"] = metric(
+                size / seconds / 1024 / 1024, "MB/s", better="higher"
+            )
+    return metrics
+
+
+@register_benchmark("segment_memory")
+def bench_segment_memory(config: BenchConfig) -> Metrics:
+    """Memory held by a large result's segments as dicts and as a SegmentStore."""
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        segments = synthetic_result(config.segments, decoder_fields=True)["segments"]
+        legacy = tracemalloc.get_traced_memory()[0] - before
+        store = SegmentStore(segments)
+        del segments
+        compact = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+
+    started = time.perf_counter()
+    segments = store.tolist()
+    tolist_seconds = time.perf_counter() - started
+    build_seconds = best_of(config.repeats, lambda: SegmentStore(segments))
+    return {
+        "segments_dict_mb": metric(legacy / 1024 / 1024, "MB"),
+        "segments_store_mb": metric(compact / 1024 / 1024, "MB"),
+        "segments_memory_reduction": metric(legacy / compact, "x", better="higher"),
+        "segment_store_build_seconds": metric(build_seconds, "s"),
+        "segment_store_tolist_seconds": metric(tolist_seconds, "s"),
+    }
+
+
+# Finished jobs a long-running server holds at once in segment_peak.
+RETAINED_RESULTS = 10
+
+
+@register_benchmark("segment_peak")
+def bench_segment_peak(config: BenchConfig) -> Metrics:
+    """Peak memory of keeping many finished results, with and without compaction.
+
+    Each result is built as the backend returns it, a list of dicts, so the
+    compact run still peaks with one result held twice; what it saves is
+    the memory of every result already kept.
+    """
+    per_result = max(1, config.segments // RETAINED_RESULTS)
+
+    def peak(compact: bool) -> int:
+        tracemalloc.start()
+        try:
+            kept: List[Dict[str, Any]] = []
+            for seed in range(RETAINED_RESULTS):
+                result = synthetic_result(per_result, seed, decoder_fields=True)
+                kept.append(compact_result(result) if compact else result)
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    legacy = peak(compact=False)
+    compact = peak(compact=True)
+    return {
+        "segments_peak_dict_mb": metric(legacy / 1024 / 1024, "MB"),
+        "segments_peak_store_mb": metric(compact / 1024 / 1024, "MB"),
+        "segments_peak_reduction": metric(legacy / compact, "x", better="higher"),
+    }
+
+
+@register_benchmark("serialize")
+def bench_serialize(config: BenchConfig) -> Metrics:
+    """Writing a large result as JSON the old way, streamed, and as NPZ.
+
+    The old path deep-copied the result (clean_result_for_json) and wrote
+    it with json.dump; the streamed path writes a compact (SegmentStore)
+    result through the JSON writer. At
+    most SERIALIZE_SEGMENTS segments are written: memory tracing makes each
+    pure-Python JSON run several times slower.
+    """
+    count = min(config.segments, SERIALIZE_SEGMENTS)
+    legacy = synthetic_result(count, decoder_fields=True)
+    compact = {**legacy, "segments": SegmentStore(legacy["segments"])}
+    metrics: Metrics = {}
+
+    with tempfile.TemporaryDirectory(prefix="whisper_bench_") as tmp:
+        json_path = Path(tmp) / "bench.json"
+        npz_path = Path(tmp) / "bench.npz"
+
+        def old_json() -> None:
+            with open(json_path, "w", encoding="utf-8") as f:
+                json.dump(clean_result_for_json(legacy), f, indent=2)
+
+        paths = {"json_legacy": json_path, "json_stream": json_path, "npz": npz_path}
+        runs = {
+            "json_legacy": old_json,
+            "json_stream": lambda: open_writer("json", json_path).write_result(compact),
+            "npz": lambda: open_writer("npz", npz_path).write_result(compact),
+        }
+        for name, run in runs.items():
+            seconds = best_of(config.repeats, run)
+            tracemalloc.start()
+            try:
+                run()
+                peak = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+            metrics[f"{name}_seconds"] = metric(seconds, "s")
+            metrics[f"{name}_peak_mb"] = metric(peak / 1024 / 1024, "MB")
+            metrics[f"{name}_file_mb"] = metric(
+                paths[name].stat().st_size / 1024 / 1024, "MB"
+            )
+    return metrics
+
+
+def measure_cli_startup(args: Sequence[str] = ("--help",)) -> Tuple[float, List[str]]:
+    """Run the CLI in a fresh interpreter.
+
+    Args:
+        args: Command-line arguments
+
+    Returns:
+        Seconds from import to exit, and the HEAVY_MODULES that got imported
+    """
+    package_root = str(Path(__file__).resolve().parent.parent)
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        filter(None, [package_root, env.get("PYTHONPATH")])
+    )
+    process = subprocess.run(
+        [sys.executable, "-c", _STARTUP_PROBE, *args],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=True,
+    )
+    seconds, modules = json.loads(process.stderr.strip().splitlines()[-1])
+    loaded = [name for name in HEAVY_MODULES if name in modules]
+    return seconds, loaded
+
+
+@register_benchmark("startup")
+def bench_startup(config: BenchConfig) -> Metrics:
+    """Wall time of `whisper-transcriber --help` in a fresh interpreter."""
+    seconds = min(measure_cli_startup()[0] for _ in range(config.repeats))
+    return {"cli_help_seconds": metric(seconds, "s")}
+
+
+def environment() -> Dict[str, Any]:
+    """Describe the machine so reports from different hosts are not confused."""
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+    }
+
+
+def run_benchmarks(
+    config: BenchConfig,
+    only: Optional[Iterable[str]] = None,
+    on_metric: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+) -> Dict[str, Any]:
+    """Run benchmarks and collect their metrics into a report.
+
+    Args:
+        config: Benchmark settings
+        only: Names of benchmarks to run (default: all registered)
+        on_metric: Called with each metric as it is produced
+
+    Returns:
+        Report with "config", "environment" and flat "metrics"
+    """
+    names = list(only) if only else available_benchmarks()
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        raise ValueError(
+            f"Unknown benchmark(s) {', '.join(unknown)}. "
+            f"Available: {', '.join(available_benchmarks())}"
+        )
+
+    metrics: Metrics = {}
+    started = time.perf_counter()
+    for name in names:
+        for key, value in BENCHMARKS[name](config).items():
+            metrics[key] = value
+            if on_metric:
+                on_metric(key, value)
+
+    metrics["peak_rss_mb"] = metric(peak_rss_bytes() / 1024 / 1024, "MB")
+    if on_metric:
+        on_metric("peak_rss_mb", metrics["peak_rss_mb"])
+
+    return {
+        "schema": SCHEMA_VERSION,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "config": config.to_dict(),
+        "environment": environment(),
+        "benchmarks": names,
+        "wall_seconds": time.perf_counter() - started,
+        "metrics": metrics,
+    }
+
+
+def save_report(report: Dict[str, Any], path: Path) -> None:
+    """Write a report as JSON."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+        f.write("\n")
+
+
+def load_report(path: Path) -> Dict[str, Any]:
+    """Read a report written by save_report."""
+    with open(path, encoding="utf-8") as f:
+        report: Dict[str, Any] = json.load(f)
+    return report
+
+
+def compare(
+    report: Dict[str, Any],
+    baseline: Dict[str, Any],
+    tolerance: float = 0.10,
+) -> List[Dict[str, Any]]:
+    """Compare a report's metrics with a baseline.
+
+    Args:
+        report: Current report
+        baseline: Stored report to compare against
+        tolerance: Relative change treated as noise (0.10 = 10%)
+
+    Returns:
+        One entry per metric present in both: name, baseline, current,
+        change (relative, positive = better) and status
+        ("improved", "regressed" or "unchanged")
+    """
+    rows = []
+    for name, current in report["metrics"].items():
+        previous = baseline.get("metrics", {}).get(name)
+        if previous is None or not previous["value"]:
+            continue
+        change = (current["value"] - previous["value"]) / previous["value"]
+        if current.get("better", "lower") == "lower":
+            change = -change
+        if change > tolerance:
+            status = "improved"
+        elif change < -tolerance:
+            status = "regressed"
+        else:
+            status = "unchanged"
+        rows.append(
+            {
+                "name": name,
+                "baseline": previous["value"],
+                "current": current["value"],
+                "unit": current["unit"],
+                "change": change,
+                "status": status,
+            }
+        )
+    return rows
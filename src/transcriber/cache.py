@@ -0,0 +1,340 @@
+"""Content-addressed on-disk cache of transcription results."""
+
+import atexit
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+
+if sys.platform != "win32":
+    import fcntl
+
+try:
+    from transcriber.formatters import iter_json
+except ImportError:
+    from .formatters import iter_json
+
+CACHE_DIR_ENV = "WHISPER_TRANSCRIBER_CACHE_DIR"
+CACHE_MB_ENV = "WHISPER_TRANSCRIBER_CACHE_MB"
+DEFAULT_CACHE_MB = 1024
+COUNTER_FLUSH_EVERY = 64
+
+
+def default_cache_dir() -> Path:
+    """Return the cache directory ($WHISPER_TRANSCRIBER_CACHE_DIR or ~/.cache)."""
+    configured = os.environ.get(CACHE_DIR_ENV)
+    if configured:
+        return Path(configured).expanduser()
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "whisper-transcriber"
+
+
+def audio_fingerprint(audio: np.ndarray) -> str:
+    """Hash decoded audio samples."""
+    data = np.ascontiguousarray(audio, dtype=np.float32)
+    return hashlib.blake2b(data.data.cast("B"), digest_size=20).hexdigest()
+
+
+def make_key(
+    fingerprint: str,
+    model: str,
+    language: Optional[str],
+    options: Dict[str, Any],
+) -> str:
+    """Build the cache key for an audio fingerprint and decode settings.
+
+    Args:
+        fingerprint: Hash of the decoded audio (or another stable source id)
+        model: Model name
+        language: Language code, None for auto-detect
+        options: Other options that change the transcript
+    """
+    payload = json.dumps(
+        {
+            "audio": fingerprint,
+            "model": model,
+            "language": language,
+            "options": options,
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def transcript_key(
+    fingerprint: str,
+    model: str,
+    language: Optional[str] = None,
+    vad: bool = True,
+    vad_threshold: Optional[float] = None,
+    window: Optional[float] = None,
+) -> str:
+    """Build the cache key for a transcription with the engine's decode options.
+
+    `window` is the parallel long-file window length, None when the audio
+    was transcribed in one pass.
+    """
+    options: Dict[str, Any] = {
+        "vad": vad,
+        "vad_threshold": vad_threshold if vad else None,
+    }
+    if window is not None:
+        options["window"] = window
+    return make_key(fingerprint, model, language, options)
+
+
+def write_atomic(path: Path, content: Union[str, Iterable[str]]) -> None:
+    """Write a text file via a temporary file so readers never see partial data.
+
+    `content` may also be an iterable of chunks, written as they are produced.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            if isinstance(content, str):
+                f.write(content)
+            else:
+                f.writelines(content)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+@contextmanager
+def file_lock(path: Path, lock: threading.Lock) -> Iterator[None]:
+    """Hold `lock` and an advisory lock on `path` against other processes.
+
+    Used around read-modify-write of JSON files that batch workers share.
+    Without fcntl (Windows) only this process's threads are serialized.
+    """
+    with lock:
+        if sys.platform == "win32":
+            yield
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            yield
+
+
+class TranscriptCache:
+    """Stores results by key, evicting least recently used entries over a size cap.
+
+    stats.json keeps the total size of the stored transcripts, so a put
+    only scans the directory when that total goes over the cap. Hit and
+    miss counts are buffered in memory and written with the next put,
+    every COUNTER_FLUSH_EVERY lookups, by stats() and flush(), and at exit.
+    """
+
+    def __init__(
+        self,
+        directory: Optional[Path] = None,
+        max_bytes: Optional[int] = None,
+    ):
+        """Initialize the cache.
+
+        Args:
+            directory: Cache directory (default: default_cache_dir())
+            max_bytes: Size cap for stored transcripts
+                (default: $WHISPER_TRANSCRIBER_CACHE_MB or 1024 MB)
+        """
+        if max_bytes is None:
+            max_mb = float(os.environ.get(CACHE_MB_ENV, DEFAULT_CACHE_MB))
+            max_bytes = int(max_mb * 1024 * 1024)
+
+        self.directory = Path(directory) if directory else default_cache_dir()
+        self.max_bytes = max_bytes
+        self._entries = self.directory / "transcripts"
+        self._aliases = self.directory / "aliases"
+        self._stats_path = self.directory / "stats.json"
+        self._stats_lock_path = self.directory / "stats.lock"
+        self._lock = threading.Lock()
+        self._pending: Dict[str, int] = {}
+        atexit.register(self.flush)
+
+    def _entry_path(self, key: str) -> Path:
+        return self._entries / f"{key}.json"
+
+    def _alias_path(self, alias: str) -> Path:
+        digest = hashlib.sha256(alias.encode("utf-8")).hexdigest()
+        return self._aliases / digest
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached result for a key, or None on a miss."""
+        path = self._entry_path(key)
+        try:
+            with open(path, encoding="utf-8") as f:
+                result: Dict[str, Any] = json.load(f)
+        except (OSError, ValueError):
+            self._count("misses")
+            return None
+
+        # Touch the entry so eviction is least-recently-used.
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self._count("hits")
+        return result
+
+    def put(self, key: str, result: Dict[str, Any]) -> None:
+        """Store a result and evict old entries if over the size cap."""
+        path = self._entry_path(key)
+        try:
+            replaced = path.stat().st_size
+        except OSError:
+            replaced = 0
+        self._write_atomic(path, iter_json(result, indent=None))
+        try:
+            with file_lock(self._stats_lock_path, self._lock):
+                counters = self._read_counters()
+                if "bytes" in counters:
+                    counters["bytes"] += path.stat().st_size - replaced
+                else:
+                    counters["bytes"] = self._total_bytes()
+                if counters["bytes"] > self.max_bytes:
+                    self._evict(counters)
+                self._write_counters(counters)
+        except OSError:
+            pass
+
+    def alias(self, name: str, key: str, **metadata: Any) -> None:
+        """Point an external id (e.g. a YouTube video id) at a cache key.
+
+        Args:
+            name: Alias name
+            key: Cache key of the stored result
+            **metadata: Extra JSON-serializable fields kept with the alias
+        """
+        self._write_atomic(self._alias_path(name), json.dumps({**metadata, "key": key}))
+
+    def resolve_alias(self, name: str) -> Optional[Dict[str, Any]]:
+        """Return the alias record ({"key": ..., **metadata}), or None."""
+        try:
+            with open(self._alias_path(name), encoding="utf-8") as f:
+                record: Dict[str, Any] = json.load(f)
+                return record
+        except (OSError, ValueError):
+            return None
+
+    def lookup_alias(self, name: str) -> Optional[Dict[str, Any]]:
+        """Return the result an alias points to, or None."""
+        record = self.resolve_alias(name)
+        if record is None:
+            self._count("misses")
+            return None
+        return self.get(record["key"])
+
+    def _write_atomic(self, path: Path, content: Union[str, Iterable[str]]) -> None:
+        write_atomic(path, content)
+
+    def _scan(self) -> List[Tuple[float, int, Path]]:
+        entries = []
+        for path in self._entries.glob("*.json"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue  # evicted while we were counting
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def _total_bytes(self) -> int:
+        return sum(size for _, size, _ in self._scan())
+
+    def _evict(self, counters: Dict[str, int]) -> None:
+        """Delete least recently used entries until under the cap.
+
+        The directory is rescanned, which also corrects any drift in the
+        tracked total (e.g. entries deleted by hand). Called with the
+        counters locked.
+        """
+        entries = self._scan()
+        total = sum(size for _, size, _ in entries)
+        evicted = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= size
+            evicted += 1
+        counters["bytes"] = total
+        counters["evictions"] = counters.get("evictions", 0) + evicted
+
+    def _read_counters(self) -> Dict[str, int]:
+        try:
+            with open(self._stats_path, encoding="utf-8") as f:
+                counters: Dict[str, int] = json.load(f)
+                return counters
+        except (OSError, ValueError):
+            return {}
+
+    def _write_counters(self, counters: Dict[str, int]) -> None:
+        """Write counters with the buffered hits and misses added (locked)."""
+        for name, amount in self._pending.items():
+            counters[name] = counters.get(name, 0) + amount
+        self._pending.clear()
+        self._write_atomic(self._stats_path, json.dumps(counters))
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._pending[name] = self._pending.get(name, 0) + 1
+            due = sum(self._pending.values()) >= COUNTER_FLUSH_EVERY
+        if due:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write buffered hit and miss counts to stats.json."""
+        if not self._pending:
+            return
+        try:
+            with file_lock(self._stats_lock_path, self._lock):
+                self._write_counters(self._read_counters())
+        except OSError:
+            pass
+
+    def stats(self) -> Dict[str, Any]:
+        """Return entry count, size and hit/miss counters."""
+        self.flush()
+        sizes = [size for _, size, _ in self._scan()]
+        counters = self._read_counters()
+        hits = counters.get("hits", 0)
+        misses = counters.get("misses", 0)
+        return {
+            "directory": str(self.directory),
+            "entries": len(sizes),
+            "bytes": sum(sizes),
+            "max_bytes": self.max_bytes,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+            "evictions": counters.get("evictions", 0),
+        }
+
+    def clear(self) -> int:
+        """Delete all cached transcripts, aliases and counters.
+
+        Returns:
+            Number of transcripts removed
+        """
+        removed = len(list(self._entries.glob("*.json")))
+        for path in (self._entries, self._aliases):
+            shutil.rmtree(path, ignore_errors=True)
+        with self._lock:
+            self._pending.clear()
+        if self._stats_path.exists():
+            self._stats_path.unlink()
+        return removed
@@ -0,0 +1,126 @@
+"""Sidecar checkpoints that let an interrupted long transcription resume."""
+
+import json
+import os
+import time
+from pathlib import Path
+from typing import IO, Any, Dict, List, Optional, Union
+
+try:
+    from transcriber.cache import write_atomic
+except ImportError:
+    from .cache import write_atomic
+
+CHECKPOINT_VERSION = 1
+# Completed windows are flushed at once but only forced to disk this often.
+DEFAULT_SYNC_SECONDS = 10.0
+
+
+def checkpoint_path(output_path: Union[str, Path]) -> Path:
+    """Return the sidecar checkpoint path kept next to an output file."""
+    output_path = Path(output_path)
+    return output_path.with_name(output_path.name + ".checkpoint")
+
+
+class Checkpoint:
+    """Append-only record of the windows of one transcription that are done.
+
+    The file holds a JSON header line identifying the job (audio, model and
+    decode options) followed by one JSON line per finished window, in
+    timeline order. Appending keeps each save proportional to one window, and
+    a line torn by a crash is simply dropped on resume.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        resume: bool = False,
+        sync_seconds: float = DEFAULT_SYNC_SECONDS,
+    ):
+        """Initialize the checkpoint.
+
+        Args:
+            path: Sidecar file
+            resume: Continue from windows already recorded in the file
+                (otherwise any existing checkpoint is overwritten)
+            sync_seconds: Longest time a finished window may sit in the OS
+                cache before it is fsynced
+        """
+        self.path = Path(path)
+        self.resume = resume
+        self.sync_seconds = sync_seconds
+        self._file: Optional[IO[str]] = None
+        self._synced = 0.0
+
+    def start(self, key: str, windows: int) -> List[Dict[str, Any]]:
+        """Open the checkpoint for a job and return the windows already done.
+
+        Args:
+            key: Identity of the job (see TranscriptionEngine.cache_key)
+            windows: Number of windows the audio is split into
+
+        Returns:
+            Results of the leading windows finished by an earlier run; empty
+            unless resuming a checkpoint written for the same job
+        """
+        done = self._load(key, windows) if self.resume else []
+        header = {"checkpoint": CHECKPOINT_VERSION, "key": key, "windows": windows}
+        lines = [json.dumps(header)]
+        lines += [json.dumps({"window": i, "result": r}) for i, r in enumerate(done)]
+        # Rewrite rather than append so a torn trailing line is not kept.
+        write_atomic(self.path, "\n".join(lines) + "\n")
+        self._file = open(self.path, "a", encoding="utf-8")
+        self._synced = time.monotonic()
+        return done
+
+    def add(self, index: int, result: Dict[str, Any]) -> None:
+        """Record a finished window."""
+        if self._file is None:
+            raise RuntimeError("Checkpoint not started")
+        self._file.write(json.dumps({"window": index, "result": result}) + "\n")
+        self._file.flush()
+        if time.monotonic() - self._synced >= self.sync_seconds:
+            os.fsync(self._file.fileno())
+            self._synced = time.monotonic()
+
+    def close(self) -> None:
+        """Flush the checkpoint to disk and close it."""
+        if self._file is not None:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+            self._file = None
+
+    def remove(self) -> None:
+        """Delete the checkpoint once the outputs are safely written."""
+        self.close()
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
+
+    def _load(self, key: str, windows: int) -> List[Dict[str, Any]]:
+        """Read the finished windows, or nothing if the file is for another job."""
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                lines = f.read().split("\n")
+        except OSError:
+            return []
+
+        try:
+            header = json.loads(lines[0])
+        except ValueError:
+            return []
+        if header != {"checkpoint": CHECKPOINT_VERSION, "key": key, "windows": windows}:
+            return []
+
+        done: List[Dict[str, Any]] = []
+        for line in lines[1:]:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                break
+            if entry.get("window") != len(done):
+                break
+            done.append(entry["result"])
+        return done[:windows]
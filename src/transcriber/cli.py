@@ -1,20 +1,356 @@
 """Command-line interface for Whisper Transcriber."""
 
+import functools
 import os
 import sys
+import time
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Optional
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
 
 import click
+import numpy as np
 
 try:
     # Try absolute imports first (when installed as package)
-    from transcriber.engine import TranscriptionEngine
-    from transcriber.downloader import YouTubeDownloader
+    from transcriber.backends import available_backends
+    from transcriber.batch import collect_inputs, run_batch
+    from transcriber.bench import (
+        BenchConfig,
+        available_benchmarks,
+        compare,
+        load_report,
+        run_benchmarks,
+        save_report,
+    )
+    from transcriber.cache import TranscriptCache, transcript_key
+    from transcriber.checkpoint import Checkpoint, checkpoint_path
+    from transcriber.downloader import StreamingUnavailable, YouTubeDownloader
+    from transcriber.engine import DEFAULT_BATCH_SIZE, TranscriptionEngine, model_id
+    from transcriber.formatters import (
+        MultiWriter,
+        format_timestamp,
+        open_writer,
+        write_results,
+    )
+    from transcriber.live import LiveTranscriber, open_source
+    from transcriber.outputs import expand_formats, output_paths
+    from transcriber.pipeline import run_pipeline
+    from transcriber.profiling import Profiler, profiling
+    from transcriber.refine import transcribe_refined
+    from transcriber.scheduler import plan_budgets, plan_workers
+    from transcriber.search import TranscriptIndex, default_transcript_dir
+    from transcriber.server import (
+        TranscriptionService,
+        make_server,
+        parse_model_spec,
+        server_address,
+    )
+    from transcriber.vad import DEFAULT_THRESHOLD_DB
+    from transcriber.youtube_cache import InfoCache, StrategyStats
 except ImportError:
     # Fall back to relative imports (when running as module)
-    from .engine import TranscriptionEngine
-    from .downloader import YouTubeDownloader
+    from .backends import available_backends
+    from .batch import collect_inputs, run_batch
+    from .bench import (
+        BenchConfig,
+        available_benchmarks,
+        compare,
+        load_report,
+        run_benchmarks,
+        save_report,
+    )
+    from .cache import TranscriptCache, transcript_key
+    from .checkpoint import Checkpoint, checkpoint_path
+    from .downloader import StreamingUnavailable, YouTubeDownloader
+    from .engine import DEFAULT_BATCH_SIZE, TranscriptionEngine, model_id
+    from .formatters import (
+        MultiWriter,
+        format_timestamp,
+        open_writer,
+        write_results,
+    )
+    from .live import LiveTranscriber, open_source
+    from .outputs import expand_formats, output_paths
+    from .pipeline import run_pipeline
+    from .profiling import Profiler, profiling
+    from .refine import transcribe_refined
+    from .scheduler import plan_budgets, plan_workers
+    from .search import TranscriptIndex, default_transcript_dir
+    from .server import (
+        TranscriptionService,
+        make_server,
+        parse_model_spec,
+        server_address,
+    )
+    from .vad import DEFAULT_THRESHOLD_DB
+    from .youtube_cache import InfoCache, StrategyStats
+
+
+def _parse_formats(
+    ctx: click.Context, param: click.Parameter, value: Tuple[str, ...]
+) -> Tuple[str, ...]:
+    """Expand repeated/comma-separated --format values and "all"."""
+    try:
+        return tuple(expand_formats(value))
+    except ValueError as e:
+        raise click.BadParameter(str(e)) from None
+
+
+MODEL_NAMES = ["tiny", "base", "small", "medium", "large", "large-v2", "large-v3"]
+
+model_option = click.option(
+    "--model",
+    default="base",
+    type=click.Choice(MODEL_NAMES),
+    help="Whisper model size (default: base)",
+)
+
+
+backend_option = click.option(
+    "--backend",
+    default="whisper",
+    type=click.Choice(available_backends()),
+    help="Inference backend: openai-whisper, whisper-cli per file, "
+    "or a warm whisper-server (default: whisper)",
+)
+
+
+device_option = click.option(
+    "--device",
+    default="cpu",
+    type=click.Choice(["cpu", "cuda", "auto"]),
+    help="Device to run transcription on; auto uses CUDA when available (default: cpu)",
+)
+
+
+class WorkerCount(click.ParamType):
+    """A number of workers, or "auto" to size the pool to the machine."""
+
+    name = "count|auto"
+
+    def convert(
+        self, value: Any, param: Optional[click.Parameter], ctx: Optional[click.Context]
+    ) -> Union[int, str]:
+        if value == "auto":
+            return "auto"
+        try:
+            count = int(value)
+        except (TypeError, ValueError):
+            self.fail(f"{value!r} is not a number or 'auto'", param, ctx)
+        if count < 1:
+            self.fail(f"{count} is smaller than 1", param, ctx)
+        return count
+
+
+def thread_options(command: Callable[..., Any]) -> Callable[..., Any]:
+    """Add --threads and --pin to a command running several engines at once."""
+    command = click.option(
+        "--pin/--no-pin",
+        default=False,
+        help="Pin each worker to its own CPU cores (Linux; default: off)",
+    )(command)
+    command = click.option(
+        "--threads",
+        type=click.IntRange(min=1),
+        help="CPU threads per worker (default: the cores divided between workers)",
+    )(command)
+    return command
+
+
+@contextmanager
+def _profiled(
+    command: str, summary: bool, jsonl: Optional[str], prom: Optional[str]
+) -> Iterator[None]:
+    """Profile the stages run inside the block and report them at the end."""
+    if not (summary or jsonl or prom):
+        yield
+        return
+
+    profiler = Profiler(labels={"command": command})
+    try:
+        with profiling(profiler), profiler.stage("total") as total:
+            try:
+                yield
+            finally:
+                decoded = sum(
+                    r["audio_seconds"] or 0.0
+                    for r in profiler.records
+                    if r["stage"] == "decode"
+                )
+                total["audio_seconds"] = decoded or None
+    finally:
+        if summary:
+            click.echo(profiler.summary(), err=True)
+        if jsonl:
+            with click.open_file(jsonl, "a") as f:
+                profiler.write_json_lines(f)
+        if prom:
+            profiler.write_prometheus(prom)
+
+
+def profile_options(command: Callable[..., Any]) -> Callable[..., Any]:
+    """Add --profile, --profile-jsonl and --profile-prom to a command."""
+
+    @functools.wraps(command)
+    def wrapper(
+        *args: Any,
+        profile: bool,
+        profile_jsonl: Optional[str],
+        profile_prom: Optional[str],
+        **kwargs: Any,
+    ) -> Any:
+        with _profiled(command.__name__, profile, profile_jsonl, profile_prom):
+            return command(*args, **kwargs)
+
+    options = [
+        click.option(
+            "--profile",
+            is_flag=True,
+            help="Print wall time, CPU time, peak RSS and real-time factor per stage",
+        ),
+        click.option(
+            "--profile-jsonl",
+            type=click.Path(dir_okay=False, allow_dash=True),
+            help="Append one JSON line per stage to this file ('-' for stdout)",
+        ),
+        click.option(
+            "--profile-prom",
+            type=click.Path(dir_okay=False),
+            help="Write per-stage metrics to this Prometheus textfile-collector file",
+        ),
+    ]
+    for option in reversed(options):
+        wrapper = option(wrapper)
+    return wrapper
+
+
+def _echo_vad_stats(result: Dict[str, Any]) -> None:
+    """Report how much silence the VAD pre-pass removed."""
+    stats = result.get("vad")
+    if stats:
+        click.echo(
+            f"VAD skipped {stats['removed_seconds']:.1f}s of "
+            f"{stats['total_seconds']:.1f}s audio "
+            f"({stats['removed_ratio']:.0%} silence)"
+        )
+
+
+def _transcribe_to_outputs(
+    input_path: Union[str, np.ndarray],
+    outputs: Dict[str, Path],
+    model: str,
+    device: str,
+    vad: bool,
+    vad_threshold: float,
+    verbose: bool,
+    cache: Optional[TranscriptCache],
+    backend: str = "whisper",
+    workers: int = 1,
+    chunk_length: int = 30,
+    label: Optional[str] = None,
+    checkpoint: Optional[Checkpoint] = None,
+    threads: Optional[int] = None,
+    pin: bool = False,
+) -> TranscriptionEngine:
+    """Transcribe one file (or decoded samples) and write every requested output.
+
+    A checkpoint is removed once every output has been written.
+    """
+    engine = TranscriptionEngine(
+        model=model,
+        device=device,
+        verbose=verbose,
+        cache=cache,
+        backend=backend,
+        threads=threads,
+        pin=pin,
+    )
+
+    click.echo(f"Transcribing {label or input_path}...")
+    result = engine.transcribe(
+        input_path,
+        vad=vad,
+        vad_threshold=vad_threshold,
+        workers=workers,
+        chunk_length=chunk_length,
+        checkpoint=checkpoint,
+    )
+    if result.get("windows"):
+        click.echo(f"Transcribed {result['windows']} windows with {workers} workers")
+    _echo_vad_stats(result)
+    engine.save_many(result, outputs)
+    if checkpoint is not None:
+        checkpoint.remove()
+
+    for output_path in outputs.values():
+        click.echo(f"Transcription saved to {output_path}")
+
+    return engine
+
+
+def _refine_to_outputs(
+    input_path: str,
+    outputs: Dict[str, Path],
+    model: str,
+    refine_model: str,
+    device: str,
+    vad: bool,
+    vad_threshold: float,
+    verbose: bool,
+    cache: Optional[TranscriptCache],
+    backend: str = "whisper",
+    chunk_length: int = 30,
+) -> None:
+    """Write a draft transcript at once and refine it with a larger model."""
+    draft = TranscriptionEngine(
+        model=model, device=device, verbose=verbose, cache=cache, backend=backend
+    )
+
+    def load_final() -> TranscriptionEngine:
+        return TranscriptionEngine(
+            model=refine_model,
+            device=device,
+            verbose=verbose,
+            cache=cache,
+            backend=backend,
+        )
+
+    def drafted(index: int, result: Dict[str, Any]) -> None:
+        if index == 0:
+            for output_path in outputs.values():
+                click.echo(f"Draft written to {output_path}")
+
+    click.echo(
+        f"Transcribing {input_path} with {model}, refining with {refine_model}..."
+    )
+    result = transcribe_refined(
+        draft,
+        load_final,
+        input_path,
+        outputs,
+        window_seconds=chunk_length,
+        on_draft=drafted,
+        vad=vad,
+        vad_threshold=vad_threshold,
+    )
+    _echo_refine_stats(result["refine"])
+    for output_path in outputs.values():
+        click.echo(f"Transcription saved to {output_path}")
+
+
+def _echo_refine_stats(stats: Dict[str, Any], err: bool = False) -> None:
+    """Report when the first draft text and the final transcript were ready."""
+    first, final = stats["time_to_first_text"], stats["time_to_final"]
+    message = "No speech" if first is None else f"First text after {first:.1f}s"
+    if final is not None:
+        message += f", final transcript after {final:.1f}s"
+    else:
+        message += (
+            f"; {stats['failed_windows']} of {stats['windows']} windows kept "
+            "their draft because the refining model failed"
+        )
+    click.echo(message, err=err)
 
 
 @click.group()
@@ -29,130 +365,1073 @@ def main() -> None:
 @click.option(
     "--output",
     "-o",
-    type=click.Path(),
-    help="Output file path (default: auto-generated)",
+    help="Output path or template with {stem} and {format} (default: {stem}_transcript.{format})",
 )
+@model_option
 @click.option(
-    "--model",
-    default="base",
-    type=click.Choice(["tiny", "base", "small", "medium", "large", "large-v2", "large-v3"]),
-    help="Whisper model size (default: base)",
+    "--format",
+    multiple=True,
+    default=["txt"],
+    callback=_parse_formats,
+    help="Output format(s): txt, srt, vtt, json, npz or all; repeat or comma-separate (default: txt)",
 )
+@device_option
 @click.option(
-    "--format",
-    type=click.Choice(["txt", "srt", "vtt", "json"]),
-    default="txt",
-    help="Output format (default: txt)",
+    "--vad/--no-vad",
+    default=True,
+    help="Skip silence before inference (default: on)",
 )
 @click.option(
-    "--device",
-    default="cpu",
-    type=click.Choice(["cpu", "cuda"]),
-    help="Device to run transcription on (default: cpu)",
+    "--vad-threshold",
+    type=float,
+    default=DEFAULT_THRESHOLD_DB,
+    show_default=True,
+    help="VAD speech threshold in dB below the loudest frames",
+)
+@click.option(
+    "--cache/--no-cache",
+    default=False,
+    help="Reuse cached transcripts of identical audio (default: off)",
+)
+@backend_option
+@click.option(
+    "--workers",
+    "-j",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="Split long audio at silence and transcribe windows on this many processes",
 )
+@click.option(
+    "--chunk-length",
+    type=click.IntRange(min=5),
+    default=30,
+    show_default=True,
+    help="Longest window in seconds when --workers is above 1 or checkpointing",
+)
+@click.option(
+    "--checkpoint",
+    is_flag=True,
+    help="Record finished windows in <output>.checkpoint so the run can be resumed",
+)
+@click.option(
+    "--resume",
+    is_flag=True,
+    help="Continue from the checkpoint of an interrupted run (implies --checkpoint)",
+)
+@click.option(
+    "--refine-model",
+    type=click.Choice(MODEL_NAMES),
+    help="Write a fast --model draft first, then replace it window by window "
+    "with this model's transcript",
+)
+@thread_options
 @click.option("--verbose", "-v", is_flag=True, help="Enable verbose output")
+@profile_options
 def transcribe(
     input_path: str,
     output: Optional[str],
     model: str,
-    format: str,
+    format: Tuple[str, ...],
     device: str,
+    vad: bool,
+    vad_threshold: float,
+    cache: bool,
+    backend: str,
+    workers: int,
+    chunk_length: int,
+    checkpoint: bool,
+    resume: bool,
+    refine_model: Optional[str],
+    threads: Optional[int],
+    pin: bool,
     verbose: bool,
 ) -> None:
-    """Transcribe audio/video file."""
+    """Transcribe audio/video file into one or more formats."""
     # Check if input file exists
     input_file = Path(input_path)
     if not input_file.exists():
         click.echo(f"Error: Input file '{input_path}' does not exist.", err=True)
         sys.exit(2)
+    if refine_model and (workers > 1 or checkpoint or resume):
+        click.echo(
+            "Error: --refine-model cannot be combined with --workers or --checkpoint.",
+            err=True,
+        )
+        sys.exit(2)
 
     try:
-        engine = TranscriptionEngine(model=model, device=device, verbose=verbose)
+        if workers <= 1 and (threads or pin):
+            # In-process, the budget applies to this process as in run_batch.
+            plan_budgets(1, threads=threads, pin=pin)[0].apply()
+        outputs = output_paths(input_file, list(format), output=output)
+        if refine_model:
+            _refine_to_outputs(
+                input_path,
+                outputs,
+                model=model,
+                refine_model=refine_model,
+                device=device,
+                vad=vad,
+                vad_threshold=vad_threshold,
+                verbose=verbose,
+                cache=TranscriptCache() if cache else None,
+                backend=backend,
+                chunk_length=chunk_length,
+            )
+            return
+        sidecar = None
+        if checkpoint or resume:
+            first_output = next(iter(outputs.values()))
+            sidecar = Checkpoint(checkpoint_path(first_output), resume=resume)
+        _transcribe_to_outputs(
+            input_path,
+            outputs,
+            model=model,
+            device=device,
+            vad=vad,
+            vad_threshold=vad_threshold,
+            verbose=verbose,
+            cache=TranscriptCache() if cache else None,
+            backend=backend,
+            workers=workers,
+            chunk_length=chunk_length,
+            checkpoint=sidecar,
+            threads=threads,
+            pin=pin,
+        )
 
-        if output:
-            output_path = Path(output)
-        else:
-            input_stem = Path(input_path).stem
-            output_path = Path(f"{input_stem}_transcript.{format}")
-
-        click.echo(f"Transcribing {input_path}...")
-        result = engine.transcribe(input_path)
-
-        if format == "json":
-            engine.save_json(result, output_path)
-        elif format == "srt":
-            engine.save_srt(result, output_path)
-        elif format == "vtt":
-            engine.save_vtt(result, output_path)
-        else:
-            engine.save_txt(result, output_path)
+    except Exception as e:
+        click.echo(f"Error: {e}", err=True)
+        if verbose:
+            import traceback
+
+            click.echo(traceback.format_exc(), err=True)
+        sys.exit(1)
 
-        click.echo(f"Transcription saved to {output_path}")
 
+@main.command("transcribe-batch")
+@click.argument("sources", nargs=-1)
+@click.option(
+    "--manifest",
+    type=click.Path(exists=True, dir_okay=False),
+    help="Text file listing one input path per line",
+)
+@click.option(
+    "--output-dir",
+    "-d",
+    type=click.Path(file_okay=False),
+    help="Directory for transcripts (default: current directory)",
+)
+@model_option
+@click.option(
+    "--format",
+    multiple=True,
+    default=["txt"],
+    callback=_parse_formats,
+    help="Output format(s): txt, srt, vtt, json, npz or all; repeat or comma-separate (default: txt)",
+)
+@device_option
+@click.option(
+    "--workers",
+    "-j",
+    type=WorkerCount(),
+    default="auto",
+    show_default=True,
+    help="Number of worker processes, each loading the model once; "
+    "auto fits them to the CPU cores and free memory",
+)
+@click.option("--language", help="Language code (default: auto-detect)")
+@click.option(
+    "--overwrite", is_flag=True, help="Re-transcribe files whose output exists"
+)
+@click.option(
+    "--vad/--no-vad",
+    default=True,
+    help="Skip silence before inference (default: on)",
+)
+@click.option(
+    "--vad-threshold",
+    type=float,
+    default=DEFAULT_THRESHOLD_DB,
+    show_default=True,
+    help="VAD speech threshold in dB below the loudest frames",
+)
+@click.option(
+    "--cache/--no-cache",
+    default=False,
+    help="Reuse cached transcripts of identical audio (default: off)",
+)
+@click.option(
+    "--batch-size",
+    type=click.IntRange(min=1),
+    default=DEFAULT_BATCH_SIZE,
+    show_default=True,
+    help="Files of up to 30 s of speech decoded as one model batch; 1 disables",
+)
+@thread_options
+@backend_option
+@click.option("--verbose", "-v", is_flag=True, help="Enable verbose output")
+def transcribe_batch(
+    sources: Tuple[str, ...],
+    manifest: Optional[str],
+    output_dir: Optional[str],
+    model: str,
+    format: Tuple[str, ...],
+    device: str,
+    workers: Union[int, str],
+    language: Optional[str],
+    overwrite: bool,
+    vad: bool,
+    vad_threshold: float,
+    cache: bool,
+    batch_size: int,
+    threads: Optional[int],
+    pin: bool,
+    backend: str,
+    verbose: bool,
+) -> None:
+    """Transcribe many files (directories, globs or a manifest) in parallel."""
+    try:
+        inputs = collect_inputs(sources, manifest=manifest)
+    except OSError as e:
+        click.echo(f"Error: {e}", err=True)
+        sys.exit(2)
+
+    if not inputs:
+        click.echo("Error: No input files found.", err=True)
+        sys.exit(2)
+
+    jobs = (
+        plan_workers(model, threads=threads, device=device)
+        if workers == "auto"
+        else int(workers)
+    )
+    click.echo(f"Transcribing {len(inputs)} files with {jobs} worker(s)...")
+    done = 0
+
+    def report(outcome: Dict[str, Any]) -> None:
+        nonlocal done
+        done += 1
+        if outcome["ok"]:
+            outputs = ", ".join(outcome["outputs"].values())
+            click.echo(f"[{done}] {outcome['input']} -> {outputs}")
+        else:
+            click.echo(
+                f"[{done}] FAILED {outcome['input']}: {outcome['error']}", err=True
+            )
+
+    try:
+        summary = run_batch(
+            inputs,
+            output_dir=Path(output_dir) if output_dir else None,
+            formats=format,
+            model=model,
+            device=device,
+            workers=jobs,
+            language=language,
+            overwrite=overwrite,
+            vad=vad,
+            vad_threshold=vad_threshold,
+            cache=cache,
+            backend=backend,
+            verbose=verbose,
+            on_result=report,
+            batch_size=batch_size,
+            threads=threads,
+            pin=pin,
+        )
     except Exception as e:
         click.echo(f"Error: {e}", err=True)
         if verbose:
             import traceback
+
             click.echo(traceback.format_exc(), err=True)
         sys.exit(1)
 
+    click.echo(
+        f"Done: {len(summary.completed)} transcribed, {len(summary.skipped)} skipped, "
+        f"{len(summary.failed)} failed"
+    )
+    click.echo(
+        f"Audio: {summary.audio_seconds / 3600:.2f} h in "
+        f"{summary.wall_seconds / 3600:.2f} h wall-clock "
+        f"({summary.throughput:.1f} audio hours per hour)"
+    )
+    if summary.removed_seconds:
+        click.echo(f"VAD skipped {summary.removed_seconds / 3600:.2f} h of silence")
+
+    if summary.failed:
+        sys.exit(1)
+
+
+def _read_url_file(path: str) -> List[str]:
+    """Read one URL per line, ignoring blank lines and '#' comments."""
+    with open(path, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip() and not line.startswith("#")]
+
 
 @main.command()
-@click.argument("url")
+@click.argument("urls", nargs=-1)
+@click.option(
+    "--url-file",
+    type=click.Path(exists=True, dir_okay=False),
+    help="Text file listing one video, playlist or channel URL per line",
+)
 @click.option(
     "--output",
     "-o",
-    type=click.Path(),
-    help="Output transcript path",
+    help="Output transcript path or template with {stem} and {format}",
 )
 @click.option(
-    "--model",
-    default="base",
-    type=click.Choice(["tiny", "base", "small", "medium", "large", "large-v2", "large-v3"]),
-    help="Whisper model size",
+    "--output-dir",
+    "-d",
+    type=click.Path(file_okay=False),
+    help="Directory for transcripts (default: current directory)",
 )
+@model_option
 @click.option(
     "--format",
-    type=click.Choice(["txt", "srt", "vtt", "json"]),
-    default="txt",
-    help="Output format",
+    multiple=True,
+    default=["txt"],
+    callback=_parse_formats,
+    help="Output format(s): txt, srt, vtt, json, npz or all; repeat or comma-separate",
 )
 @click.option(
     "--quality",
     default="best[height<=480]",
     help="Video quality to download (yt-dlp format)",
 )
+@click.option(
+    "--cache/--no-cache",
+    default=False,
+    help="Reuse cached transcripts of identical audio (default: off)",
+)
+@click.option(
+    "--prefetch",
+    type=click.IntRange(min=1),
+    default=2,
+    show_default=True,
+    help="Downloads allowed to wait ahead of transcription",
+)
+@click.option(
+    "--disk-budget-mb",
+    type=click.FloatRange(min=1),
+    default=2048,
+    show_default=True,
+    help="Pause downloads while this much downloaded or streamed audio awaits "
+    "transcription",
+)
+@click.option(
+    "--race",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="yt-dlp strategies to try concurrently; the first to succeed is used",
+)
+@click.option(
+    "--attempt-timeout",
+    type=click.FloatRange(min=1),
+    help="Abandon a yt-dlp strategy after this many seconds and try the next",
+)
+@click.option(
+    "--stream/--no-stream",
+    default=True,
+    help="Decode audio straight from the network without a temporary file, "
+    "falling back to a download when that fails (default: on)",
+)
+@device_option
+@backend_option
+@profile_options
 def youtube(
-    url: str,
+    urls: Tuple[str, ...],
+    url_file: Optional[str],
     output: Optional[str],
+    output_dir: Optional[str],
     model: str,
-    format: str,
+    format: Tuple[str, ...],
     quality: str,
+    cache: bool,
+    prefetch: int,
+    disk_budget_mb: float,
+    stream: bool,
+    race: int,
+    attempt_timeout: Optional[float],
+    device: str,
+    backend: str,
 ) -> None:
-    """Download and transcribe YouTube video."""
+    """Download and transcribe YouTube videos, playlists or channels.
+
+    Audio is streamed straight into the decoder when possible; otherwise it
+    is downloaded to a temporary file. Several URLs (or a playlist) are
+    pipelined: the next video is fetched while the current one is
+    transcribed, and each download is deleted as soon as its transcript is
+    written.
+    """
+    sources = list(urls) + (_read_url_file(url_file) if url_file else [])
+    if not sources:
+        raise click.UsageError("Missing argument 'URLS...' (or --url-file).")
+
+    transcript_cache = TranscriptCache() if cache else None
+    downloader: Optional[YouTubeDownloader] = None
+
+    def get_downloader() -> YouTubeDownloader:
+        # Created on first use so cached single videos need no yt-dlp.
+        nonlocal downloader
+        if downloader is None:
+            downloader = YouTubeDownloader(race=race, attempt_timeout=attempt_timeout)
+        return downloader
+
     try:
-        # Download audio
-        downloader = YouTubeDownloader()
-        click.echo(f"Downloading audio from {url}...")
-        audio_path = downloader.download_audio(url, quality=quality)
-
-        # Transcribe
-        transcribe.callback(
-            input_path=str(audio_path),
-            output=output,
+        items: List[Dict[str, Any]] = []
+        for url in sources:
+            video_id = YouTubeDownloader.video_id(url)
+            if video_id and "list=" not in url:
+                items.append({"url": url, "id": video_id, "title": None})
+            else:
+                click.echo(f"Listing videos in {url}...")
+                items.extend(get_downloader().expand_url(url))
+    except Exception as e:
+        click.echo(f"Error: {e}", err=True)
+        sys.exit(1)
+
+    if len(items) > 1 and output and "{stem}" not in output:
+        click.echo(
+            "Error: --output must include {stem} when transcribing several videos.",
+            err=True,
+        )
+        sys.exit(2)
+    out_dir = Path(output_dir) if output_dir else None
+    if out_dir:
+        out_dir.mkdir(parents=True, exist_ok=True)
+
+    def alias_for(item: Dict[str, Any]) -> Optional[str]:
+        if transcript_cache is None or not item["id"]:
+            return None
+        return transcript_key(
+            f"youtube:{item['id']}",
+            model_id(model, backend),
+            None,
+            True,
+            DEFAULT_THRESHOLD_DB,
+        )
+
+    def fetch(item: Dict[str, Any]) -> Any:
+        alias = alias_for(item)
+        if alias and transcript_cache is not None:
+            record = transcript_cache.resolve_alias(alias)
+            result = transcript_cache.get(record["key"]) if record else None
+            if record and result is not None:
+                # Cached: no download and no model load needed.
+                return {"result": result, "stem": record["stem"]}
+
+        if stream:
+            click.echo(f"Streaming audio from {item['url']}...")
+            try:
+                audio, stem = get_downloader().stream_audio(
+                    item["url"], quality=quality
+                )
+                return {"audio": audio, "stem": stem}
+            except StreamingUnavailable as e:
+                click.echo(f"{e}; downloading instead")
+
+        click.echo(f"Downloading audio from {item['url']}...")
+        return get_downloader().download_audio(item["url"], quality=quality)
+
+    def process(item: Dict[str, Any], payload: Any) -> Dict[str, Any]:
+        if isinstance(payload, dict) and "result" in payload:
+            outputs = output_paths(
+                Path(payload["stem"]), list(format), output=output, output_dir=out_dir
+            )
+            write_results(payload["result"], outputs)
+            click.echo(f"Using cached transcript for video {item['id']}")
+            for output_path in outputs.values():
+                click.echo(f"Transcription saved to {output_path}")
+            return {"ok": True}
+
+        if isinstance(payload, dict):
+            source: Union[str, np.ndarray] = payload["audio"]
+            stem = payload["stem"]
+        else:
+            source, stem = str(payload), payload.stem
+        outputs = output_paths(
+            Path(stem), list(format), output=output, output_dir=out_dir
+        )
+        engine = _transcribe_to_outputs(
+            source,
+            outputs,
             model=model,
-            format=format,
-            device="cpu",
+            device=device,
+            vad=True,
+            vad_threshold=DEFAULT_THRESHOLD_DB,
             verbose=False,
+            cache=transcript_cache,
+            backend=backend,
+            label=stem,
+        )
+
+        alias = alias_for(item)
+        if alias and transcript_cache is not None and engine.last_cache_key:
+            transcript_cache.alias(alias, engine.last_cache_key, stem=stem)
+        return {"ok": True}
+
+    def cleanup(payload: Any) -> None:
+        # Delete each download as soon as its transcript is written.
+        if isinstance(payload, Path) and payload.exists():
+            os.unlink(payload)
+
+    def report(outcome: Dict[str, Any]) -> None:
+        if not outcome["ok"]:
+            click.echo(f"Error: {outcome['error']}", err=True)
+
+    summary = run_pipeline(
+        items,
+        fetch=fetch,
+        process=process,
+        cleanup=cleanup,
+        prefetch=prefetch,
+        disk_budget=int(disk_budget_mb * 1024 * 1024),
+        on_result=report,
+    )
+
+    if len(items) > 1:
+        utilisation = summary.utilisation()
+        bottleneck = "download" if summary.bottleneck == "fetch" else "transcribe"
+        click.echo(
+            f"Done: {len(summary.completed)} transcribed, {len(summary.failed)} failed "
+            f"in {summary.wall_seconds:.1f}s"
+        )
+        click.echo(
+            f"Utilisation: download {utilisation['fetch']:.0%}, "
+            f"transcribe {utilisation['process']:.0%} "
+            f"(bottleneck: {bottleneck}; "
+            f"peak disk {summary.peak_disk_bytes / 1024 / 1024:.0f} MB)"
+        )
+
+    if summary.failed:
+        sys.exit(1)
+
+
+@main.command()
+@click.option(
+    "--source",
+    default="mic",
+    show_default=True,
+    help="Capture source: 'mic' (sox rec), '-' for stdin, or a raw s16le 16 kHz mono PCM file",
+)
+@click.option(
+    "--output",
+    "-o",
+    help="Transcript path or template with {stem} and {format} (default: print only)",
+)
+@model_option
+@click.option(
+    "--format",
+    multiple=True,
+    default=["txt"],
+    callback=_parse_formats,
+    help="Output format(s) when --output is given (default: txt)",
+)
+@device_option
+@click.option("--language", help="Language code (default: auto-detect)")
+@click.option(
+    "--window",
+    type=click.FloatRange(min=1.0),
+    default=10.0,
+    show_default=True,
+    help="Seconds of audio per transcription pass",
+)
+@click.option(
+    "--overlap",
+    type=click.FloatRange(min=0.0),
+    default=2.0,
+    show_default=True,
+    help="Seconds shared with the previous window for context",
+)
+@click.option(
+    "--save-audio",
+    type=click.Path(dir_okay=False),
+    help="Also save the captured audio as a WAV file",
+)
+@click.option(
+    "--refine-model",
+    type=click.Choice(MODEL_NAMES),
+    help="Re-transcribe every window with this larger model in the background "
+    "and replace the draft text in --output",
+)
+@backend_option
+@click.option("--verbose", "-v", is_flag=True, help="Enable verbose output")
+def live(
+    source: str,
+    output: Optional[str],
+    model: str,
+    format: Tuple[str, ...],
+    device: str,
+    language: Optional[str],
+    window: float,
+    overlap: float,
+    save_audio: Optional[str],
+    refine_model: Optional[str],
+    backend: str,
+    verbose: bool,
+) -> None:
+    """Transcribe live audio as it is captured, keeping one model loaded."""
+    try:
+        engine = TranscriptionEngine(
+            model=model, device=device, verbose=verbose, backend=backend
+        )
+
+        writer = None
+        outputs: Dict[str, Path] = {}
+        if output:
+            outputs = output_paths(Path("live"), list(format), output=output)
+            if not refine_model:
+                writer = MultiWriter(
+                    [
+                        open_writer(fmt, path, flush_every=1)
+                        for fmt, path in outputs.items()
+                    ]
+                )
+
+        load_final: Optional[Callable[[], TranscriptionEngine]] = None
+        if refine_model:
+
+            def load_final() -> TranscriptionEngine:
+                return TranscriptionEngine(
+                    model=refine_model, device=device, verbose=verbose, backend=backend
+                )
+
+        transcriber = LiveTranscriber(
+            engine,
+            window_seconds=window,
+            overlap_seconds=overlap,
+            language=language,
+            writer=writer,
+            on_text=click.echo,
+            save_audio=Path(save_audio) if save_audio else None,
+            refine_engine=load_final,
+            outputs=outputs,
+            on_refine=lambda text: click.echo(f"✓ {text}"),
+        )
+
+        capture = open_source(source)
+        if source == "mic":
+            click.echo("🔴 Recording... (Press Ctrl+C to stop)", err=True)
+        stats = transcriber.run(capture)
+
+        click.echo(
+            f"Transcribed {stats['audio_seconds']:.1f}s of audio in "
+            f"{stats['windows']} windows "
+            f"(real-time factor {stats['real_time_factor']:.2f})",
+            err=True,
+        )
+        if refine_model:
+            _echo_refine_stats(stats["refine"], err=True)
+        if output:
+            for output_path in outputs.values():
+                click.echo(f"Transcription saved to {output_path}", err=True)
+
+    except Exception as e:
+        click.echo(f"Error: {e}", err=True)
+        if verbose:
+            import traceback
+
+            click.echo(traceback.format_exc(), err=True)
+        sys.exit(1)
+
+
+@main.command()
+@click.option(
+    "--host", default="127.0.0.1", show_default=True, help="Interface to bind"
+)
+@click.option("--port", default=8765, show_default=True, help="TCP port to listen on")
+@click.option(
+    "--socket",
+    "socket_path",
+    type=click.Path(dir_okay=False),
+    help="Listen on a Unix socket instead of TCP",
+)
+@click.option(
+    "--model",
+    "model_specs",
+    multiple=True,
+    default=["base"],
+    help="Model to keep warm, optionally with its worker count: base or small=2 "
+    "(repeatable; default: base)",
+)
+@click.option(
+    "--concurrency",
+    "-c",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="Workers per model when --model gives no count",
+)
+@click.option(
+    "--max-queue",
+    type=click.IntRange(min=0),
+    default=16,
+    show_default=True,
+    help="Jobs allowed to wait; further submissions get HTTP 429",
+)
+@click.option(
+    "--max-upload-mb",
+    type=click.FloatRange(min=1),
+    default=1024,
+    show_default=True,
+    help="Largest audio upload accepted",
+)
+@click.option(
+    "--allow-dir",
+    "allow_dirs",
+    multiple=True,
+    type=click.Path(exists=True, file_okay=False),
+    help="Directory whose files may be submitted by path (repeatable; "
+    "default: uploads only)",
+)
+@device_option
+@click.option(
+    "--cache/--no-cache",
+    default=False,
+    help="Reuse cached transcripts of identical audio (default: off)",
+)
+@click.option(
+    "--batch-size",
+    type=click.IntRange(min=1),
+    default=DEFAULT_BATCH_SIZE,
+    show_default=True,
+    help="Queued jobs a worker transcribes together; short ones share model batches",
+)
+@thread_options
+@click.option("--verbose", "-v", is_flag=True, help="Log every request")
+@backend_option
+def serve(
+    host: str,
+    port: int,
+    socket_path: Optional[str],
+    model_specs: Tuple[str, ...],
+    concurrency: int,
+    max_queue: int,
+    max_upload_mb: float,
+    allow_dirs: Tuple[str, ...],
+    device: str,
+    cache: bool,
+    batch_size: int,
+    threads: Optional[int],
+    pin: bool,
+    verbose: bool,
+    backend: str,
+) -> None:
+    """Serve transcription over HTTP with warm models.
+
+    Submit with POST /jobs (the audio itself as the body, or a JSON body
+    {"path": ..., "model": ...} for a file under an --allow-dir), poll
+    GET /jobs/<id> and fetch GET /jobs/<id>/transcript?format=srt.
+    """
+    models: Dict[str, int] = {}
+    for spec in model_specs:
+        try:
+            name, workers = parse_model_spec(spec, concurrency)
+        except ValueError as e:
+            raise click.BadParameter(str(e), param_hint="--model") from None
+        if name not in MODEL_NAMES:
+            raise click.BadParameter(
+                f"Unknown model '{name}'. Choose from: {', '.join(MODEL_NAMES)}",
+                param_hint="--model",
+            )
+        models[name] = workers
+
+    try:
+        service = TranscriptionService(
+            models,
+            backend=backend,
+            device=device,
+            max_queue=max_queue,
+            cache=TranscriptCache() if cache else None,
+            batch_size=batch_size,
+            threads=threads,
+            pin=pin,
         )
+        click.echo(f"Loading {', '.join(f'{m} x{n}' for m, n in models.items())}...")
+        service.start()
+        server = make_server(
+            service,
+            host=host,
+            port=port,
+            socket_path=socket_path,
+            max_upload_bytes=int(max_upload_mb * 1024 * 1024),
+            verbose=verbose,
+            allow_dirs=allow_dirs,
+        )
+    except Exception as e:
+        click.echo(f"Error: {e}", err=True)
+        sys.exit(1)
+
+    click.echo(f"Serving on {server_address(server)} (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        click.echo("\nShutting down...")
+    finally:
+        server.server_close()
+        service.shutdown(wait=False)
+        if socket_path and os.path.exists(socket_path):
+            os.unlink(socket_path)
+
+
+@main.group("cache")
+def cache_group() -> None:
+    """Inspect or clear the transcript cache."""
+
+
+@cache_group.command("stats")
+def cache_stats() -> None:
+    """Show cache sizes, hit rates and download strategy statistics."""
+    stats = TranscriptCache().stats()
+    click.echo(f"Directory: {stats['directory']}")
+    click.echo(f"Entries:   {stats['entries']}")
+    click.echo(
+        f"Size:      {stats['bytes'] / 1024 / 1024:.1f} MB "
+        f"of {stats['max_bytes'] / 1024 / 1024:.0f} MB"
+    )
+    click.echo(
+        f"Hits:      {stats['hits']}  Misses: {stats['misses']}  "
+        f"Hit rate: {stats['hit_rate']:.0%}  Evictions: {stats['evictions']}"
+    )
+
+    info = InfoCache().stats()
+    click.echo(
+        f"YouTube info: {info['entries']} entries  Hits: {info['hits']}  "
+        f"Misses: {info['misses']}  Expired: {info['expired']}  "
+        f"Hit rate: {info['hit_rate']:.0%}"
+    )
+    strategies = StrategyStats().stats()
+    if strategies:
+        click.echo("Download strategies (best first):")
+    for name, record in sorted(strategies.items(), key=lambda item: -item[1]["score"]):
+        latency = record["mean_success_seconds"]
+        click.echo(
+            f"  {name:<10} {record['successes']} ok, {record['failures']} failed "
+            f"({record['success_rate']:.0%})"
+            + (f", {latency:.1f}s per success" if latency is not None else "")
+        )
+
+
+@cache_group.command("clear")
+@click.confirmation_option(prompt="Delete all cached transcripts?")
+def cache_clear() -> None:
+    """Delete all cached transcripts."""
+    removed = TranscriptCache().clear()
+    click.echo(f"Removed {removed} cached transcripts")
+
+
+index_path_option = click.option(
+    "--index-path",
+    type=click.Path(dir_okay=False),
+    help="Index database (default: <cache dir>/search.sqlite)",
+)
 
-        # Clean up downloaded file
-        os.unlink(audio_path)
 
+@main.command()
+@click.argument("directories", nargs=-1, type=click.Path(file_okay=False))
+@index_path_option
+@click.option("--rebuild", is_flag=True, help="Re-read every transcript")
+def index(
+    directories: Tuple[str, ...], index_path: Optional[str], rebuild: bool
+) -> None:
+    """Index the transcripts under DIRECTORIES for `search`.
+
+    Reads the JSON, SRT, VTT or text output of each transcription
+    (default directory: ~/Documents/Transcripts). Later runs only re-read
+    files that changed.
+    """
+    roots = [Path(d) for d in directories] or [default_transcript_dir()]
+    missing = [str(root) for root in roots if not root.is_dir()]
+    if missing:
+        click.echo(f"Error: Not a directory: {', '.join(missing)}", err=True)
+        sys.exit(1)
+
+    started = time.perf_counter()
+    try:
+        with TranscriptIndex(Path(index_path) if index_path else None) as db:
+            if rebuild:
+                db.rebuild()
+            counts = db.update(roots)
+            stats = db.stats()
     except Exception as e:
         click.echo(f"Error: {e}", err=True)
         sys.exit(1)
 
+    click.echo(
+        f"Indexed {counts['added']} new, {counts['updated']} changed, "
+        f"{counts['removed']} removed, {counts['unchanged']} unchanged files "
+        f"in {time.perf_counter() - started:.1f}s"
+    )
+    click.echo(
+        f"{stats['files']} transcripts, {stats['segments']} segments in {stats['path']}"
+    )
+
+
+@main.command()
+@click.argument("query", nargs=-1, required=True)
+@index_path_option
+@click.option(
+    "--limit",
+    "-n",
+    type=click.IntRange(min=1),
+    default=20,
+    show_default=True,
+    help="Most hits shown",
+)
+@click.option(
+    "--raw",
+    is_flag=True,
+    help="Use FTS5 query syntax (AND, OR, NEAR, prefix*) instead of a phrase",
+)
+def search(
+    query: Tuple[str, ...], index_path: Optional[str], limit: int, raw: bool
+) -> None:
+    """Find where QUERY was said in the indexed transcripts.
+
+    Prints the file and start time of each matching segment, best match
+    first. Run `index` first to pick up new transcripts.
+    """
+    started = time.perf_counter()
+    try:
+        with TranscriptIndex(Path(index_path) if index_path else None) as db:
+            hits = db.search(
+                " ".join(query),
+                limit=limit,
+                raw=raw,
+                marks=(click.style("", bold=True, reset=False), click.style("")),
+            )
+    except Exception as e:
+        click.echo(f"Error: {e}", err=True)
+        sys.exit(1)
+    elapsed = time.perf_counter() - started
+
+    for hit in hits:
+        timecode = format_timestamp(hit["start"]) if hit["start"] is not None else "-"
+        click.echo(f"{hit['path']}  {timecode}  {hit['highlighted']}")
+    click.echo(f"{len(hits)} hits in {elapsed * 1000:.0f} ms", err=True)
+
+
+@main.command()
+@click.option(
+    "--model",
+    default="base",
+    type=click.Choice(MODEL_NAMES),
+    help="Model size to benchmark (default: base)",
+)
+@click.option(
+    "--backend",
+    default="stub",
+    type=click.Choice(available_backends()),
+    help="Inference backend; 'stub' runs on CPU without downloads (default: stub)",
+)
+@device_option
+@click.option(
+    "--only",
+    multiple=True,
+    type=click.Choice(available_benchmarks()),
+    help="Run only these benchmarks (repeatable)",
+)
+@click.option(
+    "--audio-seconds",
+    type=click.FloatRange(min=1.0),
+    default=60.0,
+    show_default=True,
+    help="Length of synthetic audio for the real-time factor",
+)
+@click.option(
+    "--segments",
+    type=click.IntRange(min=1),
+    default=50_000,
+    show_default=True,
+    help="Synthetic segments written by the formatter benchmarks",
+)
+@click.option(
+    "--repeats",
+    type=click.IntRange(min=1),
+    default=3,
+    show_default=True,
+    help="Timed repetitions; the best is reported",
+)
+@click.option(
+    "--output",
+    "-o",
+    type=click.Path(dir_okay=False),
+    help="Write the results as JSON",
+)
+@click.option(
+    "--baseline",
+    type=click.Path(exists=True, dir_okay=False),
+    help="Compare against a stored results JSON",
+)
+@click.option(
+    "--tolerance",
+    type=click.FloatRange(min=0.0),
+    default=0.10,
+    show_default=True,
+    help="Relative change vs the baseline treated as noise",
+)
+@click.option(
+    "--fail-on-regression",
+    is_flag=True,
+    help="Exit with status 1 if any metric regressed beyond the tolerance",
+)
+def bench(
+    model: str,
+    backend: str,
+    device: str,
+    only: Tuple[str, ...],
+    audio_seconds: float,
+    segments: int,
+    repeats: int,
+    output: Optional[str],
+    baseline: Optional[str],
+    tolerance: float,
+    fail_on_regression: bool,
+) -> None:
+    """Measure model load, real-time factor, peak RSS and writer throughput."""
+    config = BenchConfig(
+        model=model,
+        backend=backend,
+        device=device,
+        audio_seconds=audio_seconds,
+        segments=segments,
+        repeats=repeats,
+    )
+
+    def show(name: str, value: Dict[str, Any]) -> None:
+        click.echo(f"{name:32} {value['value']:>14.4f} {value['unit']}")
+
+    try:
+        report = run_benchmarks(config, only=only, on_metric=show)
+    except Exception as e:
+        click.echo(f"Error: {e}", err=True)
+        sys.exit(1)
+
+    if output:
+        save_report(report, Path(output))
+        click.echo(f"Results saved to {output}")
+
+    if not baseline:
+        return
+
+    rows = compare(report, load_report(Path(baseline)), tolerance=tolerance)
+    click.echo(f"\nCompared with {baseline} (tolerance {tolerance:.0%}):")
+    for row in rows:
+        click.echo(
+            f"{row['name']:32} {row['baseline']:>12.4f} -> {row['current']:>12.4f} "
+            f"{row['unit']:11} {row['change']:+7.1%}  {row['status']}"
+        )
+    regressions = [row for row in rows if row["status"] == "regressed"]
+    if regressions:
+        click.echo(f"{len(regressions)} metric(s) regressed", err=True)
+        if fail_on_regression:
+            sys.exit(1)
+
 
 @main.command()
 def models() -> None:
@@ -178,18 +1457,30 @@ def models() -> None:
 @main.command()
 def main_script() -> None:
     """Run the main transcription script."""
-    import subprocess
     import os
+    import subprocess
 
-    script_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "..", "whisper-transcribe-with-download.sh")
+    script_path = os.path.join(
+        os.path.dirname(os.path.dirname(__file__)),
+        "..",
+        "whisper-transcribe-with-download.sh",
+    )
 
     if not os.path.exists(script_path):
         click.echo("❌ Main script not found!", err=True)
         click.echo(f"Expected at: {script_path}", err=True)
         click.echo("\n📋 Setup Instructions:", err=True)
-        click.echo("1. Install whisper-cli: https://github.com/ggerganov/whisper.cpp", err=True)
-        click.echo("2. Install dependencies: pip install yt-dlp && brew install ffmpeg sox", err=True)
-        click.echo("3. Place whisper-transcribe-with-download.sh in the parent directory", err=True)
+        click.echo(
+            "1. Install whisper-cli: https://github.com/ggerganov/whisper.cpp", err=True
+        )
+        click.echo(
+            "2. Install dependencies: pip install yt-dlp && brew install ffmpeg sox",
+            err=True,
+        )
+        click.echo(
+            "3. Place whisper-transcribe-with-download.sh in the parent directory",
+            err=True,
+        )
         click.echo("4. Download Whisper models to ~/whisper-models/", err=True)
         click.echo("\n💡 Or run: make quick-setup", err=True)
         sys.exit(1)
@@ -200,8 +1491,9 @@ def main_script() -> None:
     try:
         # Change to the script directory and run it
         script_dir = os.path.dirname(script_path)
-        result = subprocess.run(["./whisper-transcribe-with-download.sh"],
-                              cwd=script_dir, shell=True)
+        result = subprocess.run(
+            ["./whisper-transcribe-with-download.sh"], cwd=script_dir, shell=True
+        )
         sys.exit(result.returncode)
     except Exception as e:
         click.echo(f"Error running main script: {e}", err=True)
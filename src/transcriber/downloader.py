@@ -1,24 +1,91 @@
 """YouTube audio downloader using yt-dlp."""
 
+import math
+import queue
+import re
+import shutil
 import tempfile
+import threading
+import time
+from importlib.util import find_spec
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import numpy as np
 
 try:
-    import yt_dlp
-    YT_DLP_AVAILABLE = True
+    from transcriber.audio import load_audio_url
+    from transcriber.profiling import stage
+    from transcriber.vad import SAMPLE_RATE
+    from transcriber.youtube_cache import InfoCache, StrategyStats
 except ImportError:
-    YT_DLP_AVAILABLE = False
+    from .audio import load_audio_url
+    from .profiling import stage
+    from .vad import SAMPLE_RATE
+    from .youtube_cache import InfoCache, StrategyStats
+
+# yt-dlp loads hundreds of extractor modules, so it is imported on first use.
+YT_DLP_AVAILABLE = find_spec("yt_dlp") is not None
+yt_dlp: Any = None
+
+
+def _yt_dlp() -> Any:
+    """Import yt-dlp on first use."""
+    global yt_dlp
+    if yt_dlp is None:
+        import yt_dlp as module
+
+        yt_dlp = module
+    return yt_dlp
+
+
+_VIDEO_ID_PATTERN = re.compile(
+    r"(?:youtube(?:-nocookie)?\.com/(?:watch\?(?:.*&)?v=|shorts/|embed/|live/|v/)"
+    r"|youtu\.be/)([A-Za-z0-9_-]{11})"
+)
+
+# Names of the _download_strategies entries, in the same order; strategy
+# statistics are stored under these names.
+STRATEGY_NAMES = ("requested", "m4a", "itag-140", "any")
+
+# Protocols ffmpeg can read directly from the resolved media URL.
+STREAMABLE_PROTOCOLS = ("http", "https", "m3u8", "m3u8_native")
+
+
+class StreamingUnavailable(RuntimeError):
+    """The video cannot be streamed into the decoder; download it instead."""
+
+
+def _all_strategies_failed(last_error: str) -> str:
+    return (
+        "Failed to download YouTube audio after multiple strategies. "
+        "Update yt-dlp (`yt-dlp -U`) and retry. "
+        f"Last error: {last_error}"
+    )
 
 
 class YouTubeDownloader:
     """Handles downloading audio from YouTube videos."""
 
-    def __init__(self, output_dir: Optional[str] = None):
+    def __init__(
+        self,
+        output_dir: Optional[str] = None,
+        info_cache: Optional[InfoCache] = None,
+        strategy_stats: Optional[StrategyStats] = None,
+        race: int = 1,
+        attempt_timeout: Optional[float] = None,
+    ):
         """Initialize the downloader.
 
         Args:
             output_dir: Directory to save downloads (default: system temp)
+            info_cache: Video metadata cache (default: persistent, six-hour TTL)
+            strategy_stats: Learned download-strategy ordering
+                (default: persisted in the cache directory)
+            race: Strategies whose metadata extraction runs concurrently; the
+                first to succeed is used. 1 tries them one after another.
+            attempt_timeout: Seconds a strategy's extraction may take before
+                it is abandoned and the next one starts (default: no limit)
         """
         if not YT_DLP_AVAILABLE:
             raise ImportError(
@@ -28,7 +95,70 @@ class YouTubeDownloader:
 
         self.output_dir = Path(output_dir) if output_dir else Path(tempfile.gettempdir())
         self.output_dir.mkdir(exist_ok=True)
+        self.info_cache = info_cache if info_cache is not None else InfoCache()
+        self.strategy_stats = (
+            strategy_stats if strategy_stats is not None else StrategyStats()
+        )
+        self.race = max(1, race)
+        self.attempt_timeout = attempt_timeout
+
+    @staticmethod
+    def video_id(url: str) -> Optional[str]:
+        """Extract the YouTube video id from a URL without any network access.
+
+        Args:
+            url: YouTube URL
+
+        Returns:
+            11-character video id, or None if the URL is not recognized
+        """
+        match = _VIDEO_ID_PATTERN.search(url)
+        return match.group(1) if match else None
+
+    def expand_url(self, url: str) -> List[Dict[str, Any]]:
+        """List the videos behind a playlist or channel URL.
+
+        Single-video URLs are returned as-is without network access.
+
+        Args:
+            url: Video, playlist or channel URL
+
+        Returns:
+            Entries with "url", "id" and "title" (title may be None)
+        """
+        video_id = self.video_id(url)
+        if video_id and "list=" not in url:
+            return [{"url": url, "id": video_id, "title": None}]
+
+        ydl_opts = {
+            "quiet": True,
+            "no_warnings": True,
+            "extract_flat": "in_playlist",
+        }
+        with _yt_dlp().YoutubeDL(ydl_opts) as ydl:
+            info = ydl.extract_info(url, download=False)
+
+        entries: List[Dict[str, Any]] = []
+        self._flatten_entries(info, entries)
+        return entries
 
+    def _flatten_entries(
+        self, info: Dict[str, Any], entries: List[Dict[str, Any]]
+    ) -> None:
+        """Collect video entries, descending into nested playlists (channel tabs)."""
+        if info.get("entries") is None:
+            video_id = info.get("id")
+            url = info.get("webpage_url") or info.get("url")
+            if url and video_id:
+                if not url.startswith("http"):
+                    url = f"https://www.youtube.com/watch?v={video_id}"
+                entries.append({"url": url, "id": video_id, "title": info.get("title")})
+            return
+        for entry in info["entries"]:
+            if entry:
+                self._flatten_entries(entry, entries)
+
+    @stage("download")
     def download_audio(
         self,
         url: str,
@@ -62,29 +192,324 @@ class YouTubeDownloader:
                 }
             ],
         }
+        if self._racing:
+            return self._download_raced(url, base_opts, quality, format)
+
         errors: List[str] = []
-        for strategy in self._download_strategies(quality):
+        for name, strategy in self._ordered_strategies(quality):
             ydl_opts = dict(base_opts)
             ydl_opts.update(strategy)
 
+            started = time.perf_counter()
             try:
-                with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+                with _yt_dlp().YoutubeDL(ydl_opts) as ydl:
                     info = ydl.extract_info(url, download=True)
                     filename = ydl.prepare_filename(info)
-                return self._resolve_audio_path(
+                audio_path = self._resolve_audio_path(
                     filename=filename,
                     input_ext=info.get("ext", ""),
                     output_format=format,
                 )
             except Exception as exc:  # pragma: no cover - passthrough from yt-dlp
+                self._record(name, False, started)
                 errors.append(str(exc))
+                continue
+
+            self._record(name, True, started)
+            self._remember_info(info)
+            return audio_path
 
         last_error = errors[-1] if errors else "unknown yt-dlp failure"
-        raise RuntimeError(
-            "Failed to download YouTube audio after multiple strategies. "
-            "Update yt-dlp (`yt-dlp -U`) and retry. "
-            f"Last error: {last_error}"
-        )
+        raise RuntimeError(_all_strategies_failed(last_error))
+
+    @property
+    def _racing(self) -> bool:
+        return self.race > 1 or self.attempt_timeout is not None
+
+    def _download_raced(
+        self, url: str, base_opts: Dict[str, Any], quality: str, format: str
+    ) -> Path:
+        """Download with the strategy whose metadata extraction won the race.
+
+        If that download fails, the strategies not yet known to fail race
+        again, as the sequential path would go on to the next one. The
+        winner's outcome is recorded once, after its download.
+        """
+        candidates = []
+        for name, strategy in self._ordered_strategies(quality):
+            ydl_opts = dict(base_opts)
+            ydl_opts.update(strategy)
+            candidates.append((name, ydl_opts))
+
+        failed: Set[str] = set()
+        errors: List[str] = []
+        while candidates:
+            started = time.perf_counter()
+            try:
+                name, ydl_opts, info = self._race_extract(
+                    url, candidates, failed, record=False
+                )
+            except RuntimeError as e:
+                errors.append(str(e))
+                break
+
+            try:
+                with _yt_dlp().YoutubeDL(ydl_opts) as ydl:
+                    info = ydl.process_ie_result(info, download=True)
+                    filename = ydl.prepare_filename(info)
+                audio_path = self._resolve_audio_path(
+                    filename=filename,
+                    input_ext=info.get("ext", ""),
+                    output_format=format,
+                )
+            except Exception as exc:  # pragma: no cover - passthrough from yt-dlp
+                self._record(name, False, started)
+                errors.append(str(exc))
+                failed.add(name)
+                candidates = [c for c in candidates if c[0] not in failed]
+                continue
+
+            self._record(name, True, started)
+            self._remember_info(info)
+            return audio_path
+
+        last_error = errors[-1] if errors else "unknown yt-dlp failure"
+        raise RuntimeError(_all_strategies_failed(last_error))
+
+    def _race_extract(
+        self,
+        url: str,
+        candidates: List[Tuple[str, Dict[str, Any]]],
+        failed: Optional[Set[str]] = None,
+        record: bool = True,
+    ) -> Tuple[str, Dict[str, Any], Dict[str, Any]]:
+        """Extract metadata with up to `race` strategies at once; first success wins.
+
+        A failed or timed-out attempt is replaced by the next strategy in
+        line. Losing attempts cannot be interrupted inside yt-dlp, so they
+        are abandoned on daemon threads; `socket_timeout` bounds how long
+        they linger.
+
+        Args:
+            url: YouTube URL
+            candidates: (name, yt-dlp options) pairs in the order to try
+            failed: Names of the strategies that fail or time out are added
+            record: Record the winner's success; pass False when the caller
+                records the outcome of what it does with the result
+
+        Returns:
+            Winning strategy name, its options and the extracted info dict
+
+        Raises:
+            RuntimeError: With the last error if every strategy failed
+        """
+        timeout = self.attempt_timeout
+        results: queue.Queue[Tuple[int, Any, Optional[str]]] = queue.Queue()
+        waiting = list(range(len(candidates)))
+        deadlines: Dict[int, float] = {}
+        started: Dict[int, float] = {}
+        errors: List[str] = []
+        module = _yt_dlp()  # Import once here rather than racing in threads.
+
+        def attempt(index: int, ydl_opts: Dict[str, Any]) -> None:
+            try:
+                with module.YoutubeDL(ydl_opts) as ydl:
+                    info = ydl.extract_info(url, download=False)
+                results.put((index, info, None))
+            except Exception as exc:  # pragma: no cover - passthrough from yt-dlp
+                results.put((index, None, str(exc) or type(exc).__name__))
+
+        def launch() -> None:
+            while waiting and len(deadlines) < self.race:
+                index = waiting.pop(0)
+                name, ydl_opts = candidates[index]
+                if timeout is not None:
+                    ydl_opts = {**ydl_opts, "socket_timeout": timeout}
+                started[index] = time.perf_counter()
+                deadlines[index] = started[index] + (timeout or math.inf)
+                threading.Thread(
+                    target=attempt,
+                    args=(index, ydl_opts),
+                    name=f"yt-dlp-{name}",
+                    daemon=True,
+                ).start()
+
+        launch()
+        while deadlines:
+            wait = min(deadlines.values()) - time.perf_counter()
+            try:
+                index, info, error = results.get(
+                    timeout=None if math.isinf(wait) else max(0.0, wait)
+                )
+            except queue.Empty:
+                now = time.perf_counter()
+                for index, deadline in list(deadlines.items()):
+                    if deadline <= now:
+                        del deadlines[index]
+                        name = candidates[index][0]
+                        self._record(name, False, started[index])
+                        errors.append(f"{name} timed out after {timeout:g}s")
+                        if failed is not None:
+                            failed.add(name)
+                launch()
+                continue
+
+            if index not in deadlines:
+                continue  # Finished after its deadline; already counted.
+            del deadlines[index]
+            name, ydl_opts = candidates[index]
+            if error is None:
+                if record:
+                    self._record(name, True, started[index])
+                return name, ydl_opts, info
+            self._record(name, False, started[index])
+            errors.append(error)
+            if failed is not None:
+                failed.add(name)
+            launch()
+
+        raise RuntimeError(errors[-1] if errors else "unknown yt-dlp failure")
+
+    @stage("stream")
+    def stream_audio(
+        self,
+        url: str,
+        quality: str = "best[height<=480]",
+        sample_rate: int = SAMPLE_RATE,
+    ) -> Tuple[np.ndarray, str]:
+        """Decode a video's audio track straight from the network.
+
+        yt-dlp only resolves the media URL; ffmpeg then downloads and decodes
+        it to PCM in one pass, so nothing is written to disk and the audio is
+        not re-encoded.
+
+        Args:
+            url: YouTube URL
+            quality: Fallback yt-dlp format when no audio-only stream exists
+            sample_rate: Output sample rate
+
+        Returns:
+            Mono float32 samples and the file stem download_audio would use
+
+        Raises:
+            StreamingUnavailable: If no stream can be resolved or decoded;
+                download_audio may still succeed
+        """
+        if shutil.which("ffmpeg") is None:
+            raise StreamingUnavailable("ffmpeg not found")
+
+        base_opts = {
+            "outtmpl": str(self.output_dir / "%(title)s.%(ext)s"),
+            "quiet": True,
+            "no_warnings": True,
+        }
+        candidates = []
+        for name, strategy in self._ordered_strategies(quality):
+            ydl_opts = dict(base_opts)
+            ydl_opts.update(strategy)
+            # Prefer audio-only formats: video would be downloaded and dropped.
+            ydl_opts["format"] = f"bestaudio/{strategy['format']}"
+            candidates.append((name, ydl_opts))
+
+        if self._racing:
+            return self._stream_raced(url, candidates, sample_rate)
+
+        errors: List[str] = []
+        for name, ydl_opts in candidates:
+            started = time.perf_counter()
+            try:
+                with _yt_dlp().YoutubeDL(ydl_opts) as ydl:
+                    info = ydl.extract_info(url, download=False)
+                    stem = Path(ydl.prepare_filename(info)).stem
+            except Exception as exc:  # pragma: no cover - passthrough from yt-dlp
+                self._record(name, False, started)
+                errors.append(str(exc))
+                continue
+
+            try:
+                audio = self._decode_stream(info, sample_rate)
+            except StreamingUnavailable as exc:
+                if self._streamable_format(info) is None:
+                    raise
+                self._record(name, False, started)
+                errors.append(str(exc))
+                continue
+            self._record(name, True, started)
+            return audio, stem
+
+        last_error = errors[-1] if errors else "unknown yt-dlp failure"
+        raise StreamingUnavailable(f"Streaming failed: {last_error}")
+
+    def _stream_raced(
+        self,
+        url: str,
+        candidates: List[Tuple[str, Dict[str, Any]]],
+        sample_rate: int,
+    ) -> Tuple[np.ndarray, str]:
+        """Decode the stream of the strategy whose metadata extraction won the race.
+
+        If decoding fails, the remaining strategies race again, as in the
+        sequential loop. The winner's outcome is recorded once, after decoding.
+        """
+        failed: Set[str] = set()
+        errors: List[str] = []
+        while candidates:
+            started = time.perf_counter()
+            try:
+                name, ydl_opts, info = self._race_extract(
+                    url, candidates, failed, record=False
+                )
+                with _yt_dlp().YoutubeDL(ydl_opts) as ydl:
+                    stem = Path(ydl.prepare_filename(info)).stem
+            except RuntimeError as e:
+                errors.append(str(e))
+                break
+
+            try:
+                audio = self._decode_stream(info, sample_rate)
+            except StreamingUnavailable as exc:
+                if self._streamable_format(info) is None:
+                    raise
+                self._record(name, False, started)
+                errors.append(str(exc))
+                failed.add(name)
+                candidates = [c for c in candidates if c[0] not in failed]
+                continue
+            self._record(name, True, started)
+            return audio, stem
+
+        last_error = errors[-1] if errors else "unknown yt-dlp failure"
+        raise StreamingUnavailable(f"Streaming failed: {last_error}")
+
+    def _decode_stream(self, info: Dict[str, Any], sample_rate: int) -> np.ndarray:
+        """Decode the audio stream selected in an info dict."""
+        media = self._streamable_format(info)
+        if media is None:
+            raise StreamingUnavailable(
+                "No directly readable audio stream for this video"
+            )
+        try:
+            with stage("decode") as record:
+                audio = load_audio_url(
+                    media["url"],
+                    sample_rate=sample_rate,
+                    headers=media.get("http_headers"),
+                )
+                record["audio_seconds"] = len(audio) / sample_rate
+            return audio
+        except RuntimeError as exc:
+            raise StreamingUnavailable(str(exc)) from None
+
+    @staticmethod
+    def _streamable_format(info: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Return the selected format carrying audio, if ffmpeg can read it."""
+        candidates: List[Dict[str, Any]] = info.get("requested_formats") or [info]
+        for media in candidates:
+            if media.get("acodec") == "none" or not media.get("url"):
+                continue
+            if media.get("protocol", "https") in STREAMABLE_PROTOCOLS:
+                return media
+        return None
 
     def get_video_info(self, url: str) -> dict:
         """Get video information without downloading.
@@ -106,9 +531,23 @@ class YouTubeDownloader:
             },
         }
 
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            info = ydl.extract_info(url, download=False)
-            return info
+        video_id = self.video_id(url)
+        if video_id:
+            cached = self.info_cache.get(video_id)
+            if cached is not None:
+                return cached
+
+        with stage("metadata"), _yt_dlp().YoutubeDL(ydl_opts) as ydl:
+            info: Dict[str, Any] = ydl.extract_info(url, download=False)
+        self._remember_info(info)
+        return info
+
+    def stats(self) -> Dict[str, Any]:
+        """Return info-cache hit rates and per-strategy success/latency counters."""
+        return {
+            "info_cache": self.info_cache.stats(),
+            "strategies": self.strategy_stats.stats(),
+        }
 
     def list_formats(self, url: str) -> None:
         """List available formats for a video.
@@ -127,9 +566,29 @@ class YouTubeDownloader:
             },
         }
 
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+        with _yt_dlp().YoutubeDL(ydl_opts) as ydl:
             ydl.extract_info(url, download=False)
 
+    def _ordered_strategies(self, quality: str) -> List[Tuple[str, Dict[str, Any]]]:
+        """Return (name, options) pairs, strategies that recently worked first."""
+        strategies = dict(zip(STRATEGY_NAMES, self._download_strategies(quality)))
+        order = self.strategy_stats.order(STRATEGY_NAMES)
+        return [(name, strategies[name]) for name in order]
+
+    def _record(self, name: str, success: bool, started: float) -> None:
+        self.strategy_stats.record(
+            name, success, time.perf_counter() - started, names=STRATEGY_NAMES
+        )
+
+    def _remember_info(self, info: Dict[str, Any]) -> None:
+        """Cache a single video's info dict under its id."""
+        video_id = info.get("id")
+        if video_id and info.get("_type", "video") == "video":
+            try:
+                self.info_cache.put(video_id, info)
+            except OSError:
+                pass
+
     def _download_strategies(self, quality: str) -> List[Dict[str, Any]]:
         """Return prioritized yt-dlp download strategies for flaky YouTube clients."""
         return [
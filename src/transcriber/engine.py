@@ -1,26 +1,103 @@
-"""Transcription engine using OpenAI Whisper."""
+"""Transcription engine running Whisper through a pluggable backend."""
 
-import json
+import sys
+from importlib.util import find_spec
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
 
 try:
-    import torch
-    import whisper
-    WHISPER_AVAILABLE = True
+    from transcriber.audio import load_audio
+    from transcriber.backends import Backend, get_backend
+    from transcriber.cache import TranscriptCache, audio_fingerprint, transcript_key
+    from transcriber.checkpoint import Checkpoint
+    from transcriber.formatters import format_timestamp, write_result, write_results
+    from transcriber.profiling import stage
+    from transcriber.registry import ModelRegistry, get_registry
+    from transcriber.segments import compact_result
+    from transcriber.vad import DEFAULT_THRESHOLD_DB, SAMPLE_RATE, SpeechMap, apply_vad
+    from transcriber.windows import transcribe_windows
 except ImportError:
-    # Fallback when Python Whisper is not installed (using whisper-cli)
-    WHISPER_AVAILABLE = False
+    from .audio import load_audio
+    from .backends import Backend, get_backend
+    from .cache import TranscriptCache, audio_fingerprint, transcript_key
+    from .checkpoint import Checkpoint
+    from .formatters import format_timestamp, write_result, write_results
+    from .profiling import stage
+    from .registry import ModelRegistry, get_registry
+    from .segments import compact_result
+    from .vad import DEFAULT_THRESHOLD_DB, SAMPLE_RATE, SpeechMap, apply_vad
+    from .windows import transcribe_windows
+
+# Only check that Python Whisper is installed; the backend imports torch and
+# whisper when a model is loaded, keeping CLI startup fast. When it is missing
+# the whisper.cpp backends can still be used.
+WHISPER_AVAILABLE = find_spec("torch") is not None and find_spec("whisper") is not None
+
+# Inputs whose speech fits one Whisper window are batched by transcribe_many.
+BATCH_MAX_SECONDS = 30.0
+DEFAULT_BATCH_SIZE = 16
+
+
+def _cuda_available() -> bool:
+    """Return True if torch is installed and sees a CUDA device."""
+    try:
+        import torch
+    except ImportError:
+        return False
+    return bool(torch.cuda.is_available())
+
+
+def model_id(model: str, backend: str = "whisper") -> str:
+    """Return the name identifying a model/backend pair in registries and cache keys.
+
+    Whisper models keep their bare name so existing keys stay valid.
+    """
+    return model if backend == "whisper" else f"{backend}:{model}"
+
+
+def clean_result_for_json(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Return a copy of a result with torch tensors converted to lists.
+
+    The writers convert tensors and arrays while streaming (see
+    formatters.json_default), so this deep copy is only kept for callers
+    that json.dump results themselves.
+    """
+    clean_result = {}
+    # Tensors can only exist if a backend has already imported torch.
+    torch = sys.modules.get("torch")
+
+    for key, value in result.items():
+        if torch is not None and isinstance(value, torch.Tensor):
+            clean_result[key] = value.tolist()
+        elif isinstance(value, dict):
+            clean_result[key] = clean_result_for_json(value)
+        elif isinstance(value, list):
+            clean_result[key] = [
+                clean_result_for_json(item) if isinstance(item, dict) else item
+                for item in value
+            ]
+        else:
+            clean_result[key] = value
+
+    return clean_result
 
 
 class TranscriptionEngine:
-    """Handles audio transcription using OpenAI Whisper."""
+    """Handles audio transcription with Whisper or whisper.cpp."""
 
     def __init__(
         self,
         model: str = "base",
         device: str = "cpu",
         verbose: bool = False,
+        registry: Optional[ModelRegistry] = None,
+        cache: Optional[TranscriptCache] = None,
+        backend: str = "whisper",
+        threads: Optional[int] = None,
+        pin: bool = False,
+        compact: bool = False,
     ):
         """Initialize the transcription engine.
 
@@ -28,154 +105,458 @@ class TranscriptionEngine:
             model: Whisper model size (tiny, base, small, medium, large, large-v2, large-v3)
             device: Device to run on (cpu, cuda)
             verbose: Enable verbose output
+            registry: Model registry to share loaded models through
+                (default: the process-wide registry)
+            cache: Transcript cache consulted before running the model
+            backend: "whisper" (openai-whisper), "whisper-cpp" (runs
+                whisper-cli per file) or "whisper-cpp-server" (keeps a
+                whisper-server process warm)
+            threads: CPU threads per window worker (default: the available
+                cores divided between the workers)
+            pin: Pin each window worker to its own cores (Linux)
+            compact: Return each result's segments as a SegmentStore rather
+                than a list of dicts, for callers that keep many results
         """
-        if not WHISPER_AVAILABLE:
+        backend_class = get_backend(backend)
+        if backend_class.name == "whisper" and not WHISPER_AVAILABLE:
             raise ImportError(
                 "Python Whisper is not installed. "
-                "This project uses whisper-cli for transcription. "
-                "Install whisper-cli from: https://github.com/ggerganov/whisper.cpp"
+                "Install openai-whisper and torch, or use the whisper.cpp backend "
+                "(--backend whisper-cpp) with whisper-cli from: "
+                "https://github.com/ggerganov/whisper.cpp"
             )
 
         self.model_name = model
         self.device = device
         self.verbose = verbose
-        self.model = None
+        self.backend_name = backend_class.name
+        self.backend: Optional[Backend] = None
+        self.model: Any = None
+        self.registry = registry if registry is not None else get_registry()
+        self.cache = cache
+        self.last_cache_key: Optional[str] = None
+        self.threads = threads
+        self.pin = pin
+        self.compact = compact
 
         # Auto-detect device if not specified
         if device == "auto":
-            self.device = "cuda" if torch.cuda.is_available() else "cpu"
+            cuda = WHISPER_AVAILABLE and _cuda_available()
+            self.device = "cuda" if cuda else "cpu"
 
         self._load_model()
 
     def _load_model(self) -> None:
-        """Load the Whisper model."""
-        if self.verbose:
-            print(f"Loading Whisper model: {self.model_name}")
+        """Load the backend model, reusing an already loaded one when possible."""
+        backend_class = get_backend(self.backend_name)
+        key = model_id(self.model_name, self.backend_name)
+        cached = (key, self.device) in self.registry
 
-        self.model = whisper.load_model(
-            self.model_name,
-            device=self.device,
-        )
+        if self.verbose and not cached:
+            print(f"Loading {self.backend_name} model: {self.model_name}")
+
+        def load() -> Backend:
+            backend = backend_class(
+                self.model_name, device=self.device, verbose=self.verbose
+            )
+            backend.load()
+            return backend
+
+        with stage("model_load"):
+            self.backend = self.registry.get(key, self.device, load)
+        self.model = self.backend.model
 
         if self.verbose:
-            print(f"Model loaded on device: {self.device}")
+            source = "Reusing cached" if cached else "Loaded"
+            print(f"{source} model on device: {self.device}")
+            print(self.registry.summary())
 
     def transcribe(
         self,
-        audio_path: str,
+        audio_path: Union[str, np.ndarray],
         language: Optional[str] = None,
         chunk_length: int = 30,
+        vad: bool = True,
+        vad_threshold: Optional[float] = None,
+        workers: int = 1,
+        checkpoint: Optional[Checkpoint] = None,
     ) -> Dict[str, Any]:
         """Transcribe audio file.
 
         Args:
-            audio_path: Path to audio file
+            audio_path: Path to audio file, or 16 kHz mono float32 samples
             language: Language code (optional, auto-detected if None)
-            chunk_length: Length of audio chunks in seconds
+            chunk_length: With workers > 1 or a checkpoint, the longest window
+                (seconds) the audio is cut into at quiet points
+            vad: Skip silence before inference; timestamps still refer to
+                the original audio and result["vad"] reports what was removed
+            vad_threshold: Speech threshold in dB relative to the loudest
+                frames (default: transcriber.vad.DEFAULT_THRESHOLD_DB)
+            workers: Transcribe windows of long audio over this many worker
+                processes, each loading its own model; 1 runs in-process
+            checkpoint: Record each finished window in this sidecar so an
+                interrupted run can resume (see transcriber.checkpoint)
 
         Returns:
-            Transcription result dictionary
+            Transcription result dictionary; with compact=True,
+            result["segments"] is a SegmentStore (see
+            transcriber.segments.legacy_result)
         """
+        return self._output(
+            self._transcribe(
+                audio_path,
+                language,
+                chunk_length,
+                vad,
+                vad_threshold,
+                workers,
+                checkpoint,
+            )
+        )
+
+    def _output(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Return a result as the caller asked for it (see compact)."""
+        return compact_result(result) if self.compact else result
+
+    def _transcribe(
+        self,
+        audio_path: Union[str, np.ndarray],
+        language: Optional[str],
+        chunk_length: int,
+        vad: bool,
+        vad_threshold: Optional[float],
+        workers: int,
+        checkpoint: Optional[Checkpoint],
+    ) -> Dict[str, Any]:
+        """Transcribe with the cache, VAD and windowing options of transcribe."""
         if not self.model:
             raise RuntimeError("Model not loaded")
 
         if self.verbose:
-            print(f"Transcribing: {audio_path}")
-
-        # Transcribe with options
-        result = self.model.transcribe(
-            audio_path,
-            verbose=self.verbose,
-            language=language,
-            task="transcribe",
+            source = audio_path if isinstance(audio_path, str) else "in-memory audio"
+            print(f"Transcribing: {source}")
+
+        if vad_threshold is None:
+            vad_threshold = DEFAULT_THRESHOLD_DB
+        window = float(chunk_length) if workers > 1 or checkpoint else None
+
+        if self.cache is None and checkpoint is None:
+            if not vad and window is None:
+                return self._run_model(audio_path, language)
+            audio = self._load_audio(audio_path)
+            if not vad:
+                return self._run_model(audio, language, window, workers)
+            return self._transcribe_with_vad(
+                audio, language, vad_threshold, window, workers
+            )
+
+        audio = self._load_audio(audio_path)
+        key = self.cache_key(
+            audio_fingerprint(audio), language, vad, vad_threshold, window
         )
+        self.last_cache_key = key
+        if self.cache is None:
+            return self._transcribe_decoded(
+                audio, language, vad, vad_threshold, window, workers, checkpoint, key
+            )
 
+        cached = self.cache.get(key)
+        if cached is not None:
+            if self.verbose:
+                print(f"Using cached transcript ({key[:12]})")
+            return cached
+
+        result = self._transcribe_decoded(
+            audio, language, vad, vad_threshold, window, workers, checkpoint, key
+        )
+        self.cache.put(key, result)
         return result
 
-    def save_txt(self, result: Dict[str, Any], output_path: Path) -> None:
-        """Save transcription as plain text."""
-        text = result["text"].strip()
+    def transcribe_many(
+        self,
+        audio_paths: Sequence[Union[str, np.ndarray]],
+        language: Optional[str] = None,
+        vad: bool = True,
+        vad_threshold: Optional[float] = None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+    ) -> List[Union[Dict[str, Any], Exception]]:
+        """Transcribe many inputs, running short ones through the model together.
+
+        Inputs whose speech fits in BATCH_MAX_SECONDS (one Whisper window)
+        are passed to the backend's transcribe_batch `batch_size` at a time,
+        shortest first, so they share forward passes; longer inputs are
+        transcribed one by one as by transcribe. If a batch fails, its
+        inputs are retried one at a time so a bad file only fails itself.
+
+        Args:
+            audio_paths: Paths to audio files, or 16 kHz mono float32 samples
+            language: Language code (optional, auto-detected per input if None)
+            vad: Skip silence before inference
+            vad_threshold: Speech threshold in dB relative to the loudest frames
+            batch_size: Most inputs run through the model at once
+
+        Returns:
+            Per input, in order, its result (as from transcribe) or the
+            exception it failed with
+        """
+        if not self.model:
+            raise RuntimeError("Model not loaded")
+        if vad_threshold is None:
+            vad_threshold = DEFAULT_THRESHOLD_DB
+
+        results: List[Any] = [None] * len(audio_paths)
+        short: List[Tuple[int, np.ndarray, Optional[SpeechMap], Optional[str]]] = []
+
+        def finish(
+            index: int,
+            result: Optional[Dict[str, Any]],
+            speech_map: Optional[SpeechMap],
+            key: Optional[str],
+        ) -> None:
+            if speech_map is not None:
+                result = self._vad_result(result, speech_map, language)
+            assert result is not None
+            if self.cache is not None and key is not None:
+                self.cache.put(key, result)
+            results[index] = self._output(result)
+
+        for index, audio_path in enumerate(audio_paths):
+            try:
+                audio = self._load_audio(audio_path)
+                key = None
+                if self.cache is not None:
+                    key = self.cache_key(
+                        audio_fingerprint(audio), language, vad, vad_threshold
+                    )
+                    cached = self.cache.get(key)
+                    if cached is not None:
+                        results[index] = self._output(cached)
+                        continue
+                speech, speech_map = (
+                    self._apply_vad(audio, vad_threshold) if vad else (audio, None)
+                )
+                if speech_map is not None and not len(speech):
+                    finish(index, None, speech_map, key)
+                elif len(speech) <= BATCH_MAX_SECONDS * SAMPLE_RATE:
+                    short.append((index, speech, speech_map, key))
+                else:
+                    finish(index, self._run_model(speech, language), speech_map, key)
+            except Exception as e:
+                results[index] = e
+
+        assert self.backend is not None
+        short.sort(key=lambda clip: len(clip[1]))
+        for start in range(0, len(short), max(batch_size, 1)):
+            batch = short[start : start + max(batch_size, 1)]
+            clips = [speech for _, speech, _, _ in batch]
+            seconds = sum(map(len, clips)) / SAMPLE_RATE
+            try:
+                with stage("inference", audio_seconds=seconds):
+                    outputs = self.backend.transcribe_batch(clips, language=language)
+            except Exception as e:
+                if self.verbose:
+                    print(f"Batch of {len(batch)} failed, retrying one by one: {e}")
+                with stage("batch_fallback", audio_seconds=seconds) as record:
+                    record["error"] = f"{type(e).__name__}: {e}"
+                    for index, speech, speech_map, key in batch:
+                        try:
+                            result = self._run_model(speech, language)
+                            finish(index, result, speech_map, key)
+                        except Exception as item_error:
+                            results[index] = item_error
+                continue
+            for output, (index, _, speech_map, key) in zip(outputs, batch):
+                try:
+                    finish(index, output, speech_map, key)
+                except Exception as e:
+                    results[index] = e
+        return results
+
+    def _transcribe_decoded(
+        self,
+        audio: np.ndarray,
+        language: Optional[str],
+        vad: bool,
+        vad_threshold: float,
+        window: Optional[float],
+        workers: int,
+        checkpoint: Optional[Checkpoint],
+        key: str,
+    ) -> Dict[str, Any]:
+        """Transcribe decoded audio, with VAD if enabled."""
+        if vad:
+            return self._transcribe_with_vad(
+                audio, language, vad_threshold, window, workers, checkpoint, key
+            )
+        return self._run_model(audio, language, window, workers, checkpoint, key)
+
+    def cache_key(
+        self,
+        fingerprint: str,
+        language: Optional[str] = None,
+        vad: bool = True,
+        vad_threshold: Optional[float] = None,
+        window: Optional[float] = None,
+    ) -> str:
+        """Return the transcript cache key for audio decoded with these options."""
+        if vad_threshold is None:
+            vad_threshold = DEFAULT_THRESHOLD_DB
+        return transcript_key(
+            fingerprint,
+            model_id(self.model_name, self.backend_name),
+            language,
+            vad,
+            vad_threshold,
+            window,
+        )
 
-        with open(output_path, "w", encoding="utf-8") as f:
-            f.write(text)
+    def _transcribe_with_vad(
+        self,
+        audio: np.ndarray,
+        language: Optional[str],
+        vad_threshold: float,
+        window: Optional[float] = None,
+        workers: int = 1,
+        checkpoint: Optional[Checkpoint] = None,
+        key: str = "",
+    ) -> Dict[str, Any]:
+        """Transcribe only the speech regions of decoded audio."""
+        speech, speech_map = self._apply_vad(audio, vad_threshold)
+        result = None
+        if len(speech):
+            result = self._run_model(speech, language, window, workers, checkpoint, key)
+        return self._vad_result(result, speech_map, language)
+
+    def _apply_vad(
+        self, audio: np.ndarray, vad_threshold: float
+    ) -> Tuple[np.ndarray, SpeechMap]:
+        """Cut decoded audio down to its speech regions."""
+        with stage("vad", audio_seconds=len(audio) / SAMPLE_RATE):
+            speech, speech_map = apply_vad(audio, threshold_db=vad_threshold)
 
         if self.verbose:
-            print(f"Saved text to: {output_path}")
+            stats = speech_map.stats()
+            print(
+                f"VAD removed {stats['removed_seconds']:.1f}s of "
+                f"{stats['total_seconds']:.1f}s ({stats['removed_ratio']:.0%})"
+            )
+        return speech, speech_map
 
-    def save_srt(self, result: Dict[str, Any], output_path: Path) -> None:
-        """Save transcription as SRT subtitle file."""
-        segments = result.get("segments", [])
+    def _vad_result(
+        self,
+        result: Optional[Dict[str, Any]],
+        speech_map: SpeechMap,
+        language: Optional[str],
+    ) -> Dict[str, Any]:
+        """Map a result on the speech back to the original audio's timeline.
 
-        with open(output_path, "w", encoding="utf-8") as f:
-            for i, segment in enumerate(segments, 1):
-                start = self._format_timestamp(segment["start"])
-                end = self._format_timestamp(segment["end"])
-                text = segment["text"].strip()
+        A None result (no speech at all) becomes an empty transcript.
+        """
+        stats = speech_map.stats()
+        if result is None:
+            result = {"text": "", "segments": [], "language": language}
+        else:
+            speech_map.remap_result(result)
+        result["duration"] = stats["total_seconds"]
+        result["vad"] = stats
+        return result
 
-                f.write(f"{i}\n")
-                f.write(f"{start} --> {end}\n")
-                f.write(f"{text}\n\n")
+    def _run_model(
+        self,
+        audio: Union[str, np.ndarray],
+        language: Optional[str],
+        window: Optional[float] = None,
+        workers: int = 1,
+        checkpoint: Optional[Checkpoint] = None,
+        key: str = "",
+    ) -> Dict[str, Any]:
+        """Run the backend on a path or sample array.
 
-        if self.verbose:
-            print(f"Saved SRT to: {output_path}")
+        Audio longer than `window` seconds is split at quiet points and the
+        windows are transcribed over `workers` processes (in-process for one
+        worker) within the engine's thread budgets, recording each finished
+        window in `checkpoint` under `key`.
+        """
+        assert self.backend is not None
+        seconds = len(audio) / SAMPLE_RATE if isinstance(audio, np.ndarray) else None
+        with stage("inference", audio_seconds=seconds):
+            if seconds is None or window is None or seconds <= window:
+                return self.backend.transcribe(audio, language=language)
+
+            assert isinstance(audio, np.ndarray)  # seconds is only known for samples
+            return transcribe_windows(
+                audio,
+                model=self.model_name,
+                device=self.device,
+                backend=self.backend_name,
+                language=language,
+                workers=workers,
+                window_seconds=window,
+                verbose=self.verbose,
+                local_backend=self.backend,
+                checkpoint=checkpoint,
+                checkpoint_key=key,
+                threads=self.threads,
+                pin=self.pin,
+            )
 
-    def save_vtt(self, result: Dict[str, Any], output_path: Path) -> None:
-        """Save transcription as VTT subtitle file."""
-        segments = result.get("segments", [])
+    def _load_audio(self, audio: Union[str, np.ndarray]) -> np.ndarray:
+        """Decode a path, or normalise an array, to 16 kHz mono float32 samples."""
+        with stage("decode") as record:
+            samples = load_audio(audio, sample_rate=SAMPLE_RATE)
+            record["audio_seconds"] = len(samples) / SAMPLE_RATE
+        return samples
 
-        with open(output_path, "w", encoding="utf-8") as f:
-            f.write("WEBVTT\n\n")
+    def save(self, result: Dict[str, Any], output_path: Path, format: str) -> None:
+        """Save transcription in any registered format (txt, srt, vtt, json, ...)."""
+        self._write(result, output_path, format)
 
-            for segment in segments:
-                start = self._format_timestamp(segment["start"], vtt=True)
-                end = self._format_timestamp(segment["end"], vtt=True)
-                text = segment["text"].strip()
+    def save_many(self, result: Dict[str, Any], outputs: Dict[str, Path]) -> None:
+        """Save one result in several formats in a single pass over its segments.
 
-                f.write(f"{start} --> {end}\n")
-                f.write(f"{text}\n\n")
+        Args:
+            result: Transcription result
+            outputs: Mapping of format name to output path
+        """
+        with stage("write"):
+            write_results(result, outputs)
 
         if self.verbose:
-            print(f"Saved VTT to: {output_path}")
+            for format, output_path in outputs.items():
+                print(f"Saved {format.upper()} to: {output_path}")
+
+    def save_txt(self, result: Dict[str, Any], output_path: Path) -> None:
+        """Save transcription as plain text."""
+        self._write(result, output_path, "txt")
+
+    def save_srt(self, result: Dict[str, Any], output_path: Path) -> None:
+        """Save transcription as SRT subtitle file."""
+        self._write(result, output_path, "srt")
+
+    def save_vtt(self, result: Dict[str, Any], output_path: Path) -> None:
+        """Save transcription as VTT subtitle file."""
+        self._write(result, output_path, "vtt")
 
     def save_json(self, result: Dict[str, Any], output_path: Path) -> None:
         """Save transcription as JSON."""
-        # Remove binary data if present
-        clean_result = self._clean_result_for_json(result)
+        self._write(result, output_path, "json")
+
+    def save_npz(self, result: Dict[str, Any], output_path: Path) -> None:
+        """Save transcription as NumPy arrays (see formatters.load_npz)."""
+        self._write(result, output_path, "npz")
 
-        with open(output_path, "w", encoding="utf-8") as f:
-            json.dump(clean_result, f, indent=2, ensure_ascii=False)
+    def _write(self, result: Dict[str, Any], output_path: Path, format: str) -> None:
+        """Stream a result to disk through the registered formatter."""
+        with stage("write"):
+            write_result(result, output_path, format)
 
         if self.verbose:
-            print(f"Saved JSON to: {output_path}")
+            print(f"Saved {format.upper()} to: {output_path}")
 
     def _format_timestamp(self, seconds: float, vtt: bool = False) -> str:
         """Format timestamp for subtitle files."""
-        hours = int(seconds // 3600)
-        minutes = int((seconds % 3600) // 60)
-        seconds = seconds % 60
-
-        if vtt:
-            return f"{hours:02d}:{minutes:02d}:{seconds:06.3f}".replace(".", ",")
-        else:
-            return f"{hours:02d}:{minutes:02d}:{seconds:06.3f}"
+        return format_timestamp(seconds, vtt=vtt)
 
     def _clean_result_for_json(self, result: Dict[str, Any]) -> Dict[str, Any]:
-        """Remove non-serializable data from result."""
-        # Create a copy to avoid modifying original
-        clean_result = {}
-
-        for key, value in result.items():
-            if isinstance(value, torch.Tensor):
-                # Convert tensors to lists
-                clean_result[key] = value.tolist()
-            elif isinstance(value, dict):
-                clean_result[key] = self._clean_result_for_json(value)
-            elif isinstance(value, list):
-                clean_result[key] = [
-                    self._clean_result_for_json(item) if isinstance(item, dict) else item
-                    for item in value
-                ]
-            else:
-                clean_result[key] = value
-
-        return clean_result
+        """Remove non-serializable data from result (see clean_result_for_json)."""
+        return clean_result_for_json(result)
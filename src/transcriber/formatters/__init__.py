@@ -1 +1,96 @@
-"""Output formatters for different transcription formats."""
+"""Output formatters for different transcription formats.
+
+Writers accept segments one at a time and flush incrementally. Additional
+formats can be plugged in with `register_formatter`.
+"""
+
+from typing import Any, Callable, Dict, List, Mapping, Type, TypeVar
+
+from .base import MultiWriter, Output, SegmentWriter
+from .binary import NpzWriter, load_npz, save_npz
+from .structured import JsonWriter, dump_json, iter_json, json_default
+from .subtitles import SrtWriter, VttWriter
+from .text import TxtWriter
+from .timestamps import format_timestamp
+
+__all__ = [
+    "JsonWriter",
+    "MultiWriter",
+    "NpzWriter",
+    "SegmentWriter",
+    "SrtWriter",
+    "TxtWriter",
+    "VttWriter",
+    "available_formats",
+    "dump_json",
+    "format_timestamp",
+    "get_formatter",
+    "iter_json",
+    "json_default",
+    "load_npz",
+    "open_writer",
+    "register_formatter",
+    "save_npz",
+    "write_result",
+    "write_results",
+]
+
+W = TypeVar("W", bound=Type[SegmentWriter])
+
+FORMATTERS: Dict[str, Type[SegmentWriter]] = {}
+
+
+def register_formatter(name: str) -> Callable[[W], W]:
+    """Register a writer class under a format name (usable as a decorator)."""
+
+    def decorator(writer_cls: W) -> W:
+        FORMATTERS[name] = writer_cls
+        return writer_cls
+
+    return decorator
+
+
+def get_formatter(name: str) -> Type[SegmentWriter]:
+    """Return the writer class for a format name."""
+    try:
+        return FORMATTERS[name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown output format '{name}'. Available: {', '.join(available_formats())}"
+        ) from None
+
+
+def available_formats() -> List[str]:
+    """Return the registered format names."""
+    return list(FORMATTERS)
+
+
+def open_writer(format: str, output: Output, **kwargs: Any) -> SegmentWriter:
+    """Create a writer for the given format."""
+    return get_formatter(format)(output, **kwargs)
+
+
+def write_result(result: Mapping[str, Any], output: Output, format: str) -> None:
+    """Write a complete transcription result in the given format."""
+    open_writer(format, output).write_result(result)
+
+
+def write_results(result: Mapping[str, Any], outputs: Mapping[str, Output]) -> None:
+    """Write one result in several formats in a single pass over its segments.
+
+    Args:
+        result: Transcription result
+        outputs: Mapping of format name to output path or stream
+    """
+    writers = [open_writer(fmt, output) for fmt, output in outputs.items()]
+    MultiWriter(writers).write_result(result)
+
+
+for _name, _writer in (
+    ("txt", TxtWriter),
+    ("srt", SrtWriter),
+    ("vtt", VttWriter),
+    ("json", JsonWriter),
+    ("npz", NpzWriter),
+):
+    register_formatter(_name)(_writer)
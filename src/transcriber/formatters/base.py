@@ -0,0 +1,168 @@
+"""Base class for incremental transcript writers."""
+
+from pathlib import Path
+from typing import IO, Any, Dict, List, Mapping, Optional, Tuple, Union
+
+try:
+    from transcriber.segments import SegmentStore
+except ImportError:
+    from ..segments import SegmentStore
+
+Output = Union[str, Path, IO[str], IO[bytes]]
+
+
+class SegmentWriter:
+    """Writes a transcript one segment at a time.
+
+    Subclasses implement `_begin`, `_write_segment` and `_finish`. Output is
+    flushed every `flush_every` segments so long transcripts land on disk while
+    they are still being produced.
+
+    `fields` names the segment keys a writer reads; when the segments come
+    from a SegmentStore only those are rebuilt (None means all of them).
+    Writers with `binary` set write bytes and take binary streams.
+    """
+
+    extension = ""
+    fields: Optional[Tuple[str, ...]] = None
+    binary = False
+
+    def __init__(self, output: Output, flush_every: int = 100):
+        """Initialize the writer.
+
+        Args:
+            output: Path to write to, or an open text (binary for binary
+                writers) stream, left open on close
+            flush_every: Flush the output after this many segments (0 disables)
+        """
+        if isinstance(output, (str, Path)):
+            self.path: Optional[Path] = Path(output)
+            if self.binary:
+                self._file: IO[Any] = open(output, "wb")
+            else:
+                self._file = open(output, "w", encoding="utf-8")
+            self._owns_file = True
+        else:
+            self.path = None
+            self._file = output
+            self._owns_file = False
+
+        self.flush_every = flush_every
+        self.count = 0
+        self._started = False
+        self._closed = False
+
+    def begin(self, metadata: Optional[Mapping[str, Any]] = None) -> None:
+        """Write the header; called automatically before the first segment.
+
+        Args:
+            metadata: Result fields known before any segments are written
+        """
+        if not self._started:
+            self._started = True
+            self._begin(metadata or {})
+
+    def write_segment(self, segment: Mapping[str, Any]) -> None:
+        """Write one segment."""
+        self.begin()
+        self._write_segment(segment)
+        self.count += 1
+        if self.flush_every and self.count % self.flush_every == 0:
+            self._file.flush()
+
+    def close(self, metadata: Optional[Mapping[str, Any]] = None) -> None:
+        """Write the trailer and release the output.
+
+        Args:
+            metadata: Result fields only known after all segments (e.g. text)
+        """
+        if self._closed:
+            return
+        self.begin()
+        self._finish(metadata or {})
+        self._closed = True
+        self._file.flush()
+        if self._owns_file:
+            self._file.close()
+
+    def write_result(self, result: Mapping[str, Any]) -> None:
+        """Write a complete transcription result and close the writer."""
+        _write_result(self, result, self.fields)
+
+    def __enter__(self) -> "SegmentWriter":
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        self.close()
+
+    def _begin(self, metadata: Mapping[str, Any]) -> None:
+        pass
+
+    def _write_segment(self, segment: Mapping[str, Any]) -> None:
+        raise NotImplementedError
+
+    def _finish(self, metadata: Mapping[str, Any]) -> None:
+        pass
+
+
+class MultiWriter:
+    """Fans each segment out to several writers."""
+
+    def __init__(self, writers: List[SegmentWriter]):
+        self.writers = writers
+
+    def begin(self, metadata: Optional[Mapping[str, Any]] = None) -> None:
+        for writer in self.writers:
+            writer.begin(metadata)
+
+    def write_segment(self, segment: Mapping[str, Any]) -> None:
+        for writer in self.writers:
+            writer.write_segment(segment)
+
+    def close(self, metadata: Optional[Mapping[str, Any]] = None) -> None:
+        for writer in self.writers:
+            writer.close(metadata)
+
+    def write_result(self, result: Mapping[str, Any]) -> None:
+        """Write a complete result to every writer in one pass and close them."""
+        fields: Optional[Tuple[str, ...]] = ()
+        for writer in self.writers:
+            if writer.fields is None or fields is None:
+                fields = None
+            else:
+                fields += tuple(f for f in writer.fields if f not in fields)
+        _write_result(self, result, fields)
+
+    def __enter__(self) -> "MultiWriter":
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        self.close()
+
+
+def _write_result(
+    writer: Union[SegmentWriter, MultiWriter],
+    result: Mapping[str, Any],
+    fields: Optional[Tuple[str, ...]],
+) -> None:
+    """Write a result's header, segments and trailer, then close the writer.
+
+    Fields listed before "segments" go to `begin`, every field to `close`;
+    `fields` limits what is rebuilt from a SegmentStore.
+    """
+    header: Dict[str, Any] = {}
+    trailer: Dict[str, Any] = {}
+    target = header
+    for key, value in result.items():
+        if key == "segments":
+            target = trailer
+        else:
+            target[key] = value
+
+    segments = result.get("segments") or ()
+    if isinstance(segments, SegmentStore):
+        segments = segments.iter_segments(fields)
+    writer.begin(header)
+    for segment in segments:
+        writer.write_segment(segment)
+    writer.close({**header, **trailer})
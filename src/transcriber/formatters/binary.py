@@ -0,0 +1,84 @@
+"""NPZ writer: the result as NumPy arrays for downstream loaders."""
+
+import json
+from pathlib import Path
+from typing import IO, Any, Dict, List, Mapping, Union
+
+import numpy as np
+
+try:
+    from transcriber.segments import SegmentStore
+except ImportError:
+    from ..segments import SegmentStore
+
+from .base import SegmentWriter
+from .structured import iter_json
+
+NPZ_FORMAT = "whisper-transcriber-npz"
+NPZ_VERSION = 1
+
+
+def save_npz(result: Mapping[str, Any], output: Union[str, Path, IO[bytes]]) -> None:
+    """Write a result as an uncompressed NPZ archive.
+
+    Segment columns are stored as arrays (see SegmentStore.to_arrays); every
+    other result field, plus the segment layout, goes into a UTF-8 JSON
+    document in the "meta" array. No pickles are used, so the archive loads
+    with allow_pickle=False.
+
+    Args:
+        result: Transcription result; segments may be a list or a SegmentStore
+        output: Path or binary stream
+    """
+    store = SegmentStore.from_segments(result.get("segments") or [])
+    arrays, layout = store.to_arrays()
+    meta = {
+        "format": NPZ_FORMAT,
+        "version": NPZ_VERSION,
+        "result": {k: v for k, v in result.items() if k != "segments"},
+        "segments": layout,
+    }
+    text = "".join(iter_json(meta, indent=None))
+    arrays["meta"] = np.frombuffer(text.encode("utf-8"), dtype=np.uint8)
+    np.savez(output, **arrays)  # type: ignore[arg-type]
+
+
+def load_npz(source: Union[str, Path, IO[bytes]]) -> Dict[str, Any]:
+    """Read a result written by save_npz; its segments are a SegmentStore."""
+    with np.load(source, allow_pickle=False) as archive:
+        arrays = {name: archive[name] for name in archive.files}
+    meta = json.loads(bytes(arrays.pop("meta")).decode("utf-8"))
+    if meta.get("format") != NPZ_FORMAT:
+        raise ValueError("Not a whisper-transcriber NPZ file")
+    result: Dict[str, Any] = meta["result"]
+    result["segments"] = SegmentStore.from_arrays(arrays, meta["segments"])
+    return result
+
+
+class NpzWriter(SegmentWriter):
+    """Writes the result with save_npz when the writer is closed.
+
+    An archive cannot be appended to, so segments written one at a time are
+    collected and stored together; write_result hands a SegmentStore over
+    without rebuilding any segment.
+    """
+
+    extension = "npz"
+    binary = True
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self._segments: List[Mapping[str, Any]] = []
+        self._result: Mapping[str, Any] = {}
+
+    def write_result(self, result: Mapping[str, Any]) -> None:
+        """Write a complete result and close the writer."""
+        self._result = result
+        self.close()
+
+    def _write_segment(self, segment: Mapping[str, Any]) -> None:
+        self._segments.append(segment)
+
+    def _finish(self, metadata: Mapping[str, Any]) -> None:
+        result = self._result or {**metadata, "segments": self._segments}
+        save_npz(result, self._file)
@@ -0,0 +1,243 @@
+"""JSON writer and a streaming JSON encoder."""
+
+import json
+import math
+import sys
+from json.encoder import encode_basestring
+from typing import IO, Any, Iterable, Iterator, Mapping, Optional, Tuple
+
+import numpy as np
+
+try:
+    from transcriber.segments import SegmentStore
+except ImportError:
+    from ..segments import SegmentStore
+
+from .base import SegmentWriter
+
+# Containers with more items than this are streamed item by item instead of
+# being encoded in one call.
+STREAM_ITEMS = 1000
+# Elements of a 1-D array converted to Python numbers at a time.
+ARRAY_CHUNK = 4096
+
+
+class _NotNative(Exception):
+    """Raised when a value needs the streaming encoder."""
+
+
+def _not_native(value: Any) -> Any:
+    raise _NotNative
+
+
+def json_default(value: Any) -> Any:
+    """Convert tensors, arrays and NumPy scalars for json.dumps."""
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def iter_json(value: Any, indent: Optional[int] = 2, level: int = 0) -> Iterator[str]:
+    """Yield the JSON text of a value in chunks.
+
+    The text is identical to json.dumps(value, indent=indent,
+    ensure_ascii=False, default=json_default), but NumPy arrays, torch
+    tensors and SegmentStores are encoded in place rather than converted to
+    lists first, and large containers are produced item by item, so memory
+    stays flat however big the value is. Plain values are encoded in one
+    call: by the C encoder for single-line output, and otherwise by
+    _encode, which is faster than json's pure-Python indenting encoder.
+
+    Args:
+        value: Value to encode
+        indent: Spaces per nesting level, or None for single-line output
+        level: Nesting level of the value (indents continuation lines)
+
+    Yields:
+        Consecutive pieces of the JSON text
+    """
+    if not (isinstance(value, (list, tuple, dict)) and len(value) > STREAM_ITEMS):
+        try:
+            if indent is None:
+                yield json.dumps(value, ensure_ascii=False, default=_not_native)
+            else:
+                yield _encode(value, indent, level)
+            return
+        except _NotNative:
+            pass
+
+    value = _as_array(value)
+    if isinstance(value, np.ndarray):
+        yield from _iter_array(value, indent, level)
+    elif isinstance(value, np.generic):
+        yield from iter_json(value.item(), indent, level)
+    elif isinstance(value, Mapping):
+        items = ((_key(k) + ": ", v) for k, v in value.items())
+        yield from _iter_container("{", "}", items, indent, level)
+    elif isinstance(value, (list, tuple, SegmentStore)):
+        yield from _iter_container("[", "]", (("", v) for v in value), indent, level)
+    else:
+        yield from iter_json(json_default(value), indent, level)
+
+
+def _encode(value: Any, indent: int, level: int) -> str:
+    """Encode plain JSON values with indentation; raise _NotNative otherwise."""
+    kind = type(value)
+    if kind is str:
+        return encode_basestring(value)
+    if kind is float:
+        return _float_text(value)
+    if kind is int:
+        return int.__repr__(value)
+    if kind is bool:
+        return "true" if value else "false"
+    if value is None:
+        return "null"
+    if kind is list or kind is tuple:
+        if not value:
+            return "[]"
+        kinds = set(map(type, value))
+        if kinds == {int}:
+            items: Iterable[str] = map(int.__repr__, value)
+        elif kinds == {float}:
+            items = map(_float_text, value)
+        else:
+            items = [_encode(item, indent, level + 1) for item in value]
+        open, close = "[", "]"
+    elif kind is dict:
+        if not value:
+            return "{}"
+        items = [
+            _key(key) + ": " + _encode(item, indent, level + 1)
+            for key, item in value.items()
+        ]
+        open, close = "{", "}"
+    elif isinstance(value, (str, int, float)):  # subclasses, e.g. enums
+        return json.dumps(value, ensure_ascii=False)
+    else:
+        raise _NotNative
+    inner = "\n" + " " * (indent * (level + 1))
+    return (
+        open + inner + ("," + inner).join(items) + "\n" + " " * (indent * level) + close
+    )
+
+
+def dump_json(value: Any, output: IO[str], indent: Optional[int] = 2) -> None:
+    """Stream the JSON text of a value to a text file (see iter_json)."""
+    output.writelines(iter_json(value, indent))
+
+
+def _as_array(value: Any) -> Any:
+    """Return a torch tensor as a NumPy array (a view when it is on the CPU)."""
+    # Tensors can only exist if a backend has already imported torch.
+    torch = sys.modules.get("torch")
+    if torch is None or not isinstance(value, torch.Tensor):
+        return value
+    tensor = value.detach().cpu()
+    try:
+        return tensor.numpy()
+    except TypeError:  # bfloat16 and other types NumPy lacks
+        return tensor.float().numpy()
+
+
+def _key(key: Any) -> str:
+    if isinstance(key, str):
+        return encode_basestring(key)
+    if isinstance(key, (bool, int, float)) or key is None:
+        return json.dumps(json.dumps(key))
+    raise TypeError(f"keys must be str, int, float, bool or None, not {type(key)}")
+
+
+def _iter_container(
+    open: str,
+    close: str,
+    items: Iterable[Tuple[str, Any]],
+    indent: Optional[int],
+    level: int,
+) -> Iterator[str]:
+    """Yield a JSON array or object from (key prefix, value) pairs."""
+    if indent is None:
+        first, separator, end = "", ", ", ""
+    else:
+        first = "\n" + " " * (indent * (level + 1))
+        separator = "," + first
+        end = "\n" + " " * (indent * level)
+
+    empty = True
+    for prefix, item in items:
+        yield (open + first if empty else separator) + prefix
+        empty = False
+        yield from iter_json(item, indent, level + 1)
+    yield open + close if empty else end + close
+
+
+def _iter_array(array: np.ndarray, indent: Optional[int], level: int) -> Iterator[str]:
+    if array.ndim == 0:
+        yield from iter_json(array.item(), indent, level)
+    elif array.ndim > 1 or array.dtype.kind not in "biuf":
+        items = (("", item) for item in array)
+        yield from _iter_container("[", "]", items, indent, level)
+    elif not len(array):
+        yield "[]"
+    else:
+        if indent is None:
+            first, separator, end = "", ", ", ""
+        else:
+            first = "\n" + " " * (indent * (level + 1))
+            separator = "," + first
+            end = "\n" + " " * (indent * level)
+        number = _float_text if array.dtype.kind == "f" else _int_text
+        for start in range(0, len(array), ARRAY_CHUNK):
+            chunk = array[start : start + ARRAY_CHUNK].tolist()
+            yield ("[" + first if start == 0 else separator) + separator.join(
+                map(number, chunk)
+            )
+        yield end + "]"
+
+
+def _float_text(value: float) -> str:
+    # As json.dumps writes floats, including its NaN/Infinity extension.
+    if math.isfinite(value):
+        return float.__repr__(value)
+    if math.isnan(value):
+        return "NaN"
+    return "Infinity" if value > 0 else "-Infinity"
+
+
+def _int_text(value: Any) -> str:
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return int.__repr__(value)
+
+
+class JsonWriter(SegmentWriter):
+    """Writes the result as indented JSON, streaming the segments array.
+
+    Fields passed to `begin` are written before the segments and the remaining
+    fields passed to `close` after them, so `write_result` reproduces the
+    output of json.dump(result, indent=2). Arrays and tensors are encoded by
+    iter_json without being copied into lists.
+    """
+
+    extension = "json"
+
+    def _begin(self, metadata: Mapping[str, Any]) -> None:
+        self._written_keys = set(metadata)
+        self._file.write("{")
+        for key, value in metadata.items():
+            self._file.write(f"\n  {_key(key)}: ")
+            self._file.writelines(iter_json(value, level=1))
+            self._file.write(",")
+        self._file.write('\n  "segments": [')
+
+    def _write_segment(self, segment: Mapping[str, Any]) -> None:
+        self._file.write("\n    " if self.count == 0 else ",\n    ")
+        self._file.writelines(iter_json(segment, level=2))
+
+    def _finish(self, metadata: Mapping[str, Any]) -> None:
+        self._file.write("\n  ]" if self.count else "]")
+        for key, value in metadata.items():
+            if key not in self._written_keys and key != "segments":
+                self._file.write(f",\n  {_key(key)}: ")
+                self._file.writelines(iter_json(value, level=1))
+        self._file.write("\n}")
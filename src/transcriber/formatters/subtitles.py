@@ -0,0 +1,35 @@
+"""SRT and VTT subtitle writers."""
+
+from typing import Any, Mapping
+
+from .base import SegmentWriter
+from .timestamps import format_timestamp
+
+
+class SrtWriter(SegmentWriter):
+    """Writes numbered SRT cues."""
+
+    extension = "srt"
+    fields = ("start", "end", "text")
+
+    def _write_segment(self, segment: Mapping[str, Any]) -> None:
+        start = format_timestamp(segment["start"])
+        end = format_timestamp(segment["end"])
+        text = segment["text"].strip()
+        self._file.write(f"{self.count + 1}\n{start} --> {end}\n{text}\n\n")
+
+
+class VttWriter(SegmentWriter):
+    """Writes WebVTT cues."""
+
+    extension = "vtt"
+    fields = ("start", "end", "text")
+
+    def _begin(self, metadata: Mapping[str, Any]) -> None:
+        self._file.write("WEBVTT\n\n")
+
+    def _write_segment(self, segment: Mapping[str, Any]) -> None:
+        start = format_timestamp(segment["start"], vtt=True)
+        end = format_timestamp(segment["end"], vtt=True)
+        text = segment["text"].strip()
+        self._file.write(f"{start} --> {end}\n{text}\n\n")
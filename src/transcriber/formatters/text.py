@@ -0,0 +1,45 @@
+"""Plain text writer."""
+
+from typing import Any, Mapping
+
+from .base import SegmentWriter
+
+
+class TxtWriter(SegmentWriter):
+    """Writes the transcript text with surrounding whitespace stripped."""
+
+    extension = "txt"
+    fields = ("text",)
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        # Trailing whitespace is held back until more text follows, so the
+        # output matches the stripped full text without buffering it.
+        self._pending = ""
+        self._has_text = False
+
+    def write_result(self, result: Mapping[str, Any]) -> None:
+        """Write result["text"] when present, otherwise the segment texts."""
+        if isinstance(result.get("text"), str):
+            self.begin()
+            self._file.write(result["text"].strip())
+            self._has_text = True
+            self.close()
+        else:
+            super().write_result(result)
+
+    def _write_segment(self, segment: Mapping[str, Any]) -> None:
+        text = segment["text"]
+        if not self._has_text:
+            text = text.lstrip()
+        stripped = text.rstrip()
+        if stripped:
+            self._file.write(self._pending + stripped)
+            self._pending = text[len(stripped) :]
+            self._has_text = True
+        elif self._has_text:
+            self._pending += text
+
+    def _finish(self, metadata: Mapping[str, Any]) -> None:
+        if not self._has_text and metadata.get("text"):
+            self._file.write(metadata["text"].strip())
@@ -0,0 +1,22 @@
+"""Timestamp formatting shared by the subtitle writers."""
+
+
+def format_timestamp(seconds: float, vtt: bool = False) -> str:
+    """Format a position in seconds as HH:MM:SS.mmm.
+
+    Uses integer millisecond arithmetic so it stays cheap across millions of
+    segments and never rounds up to an invalid "60.000" seconds field.
+
+    Args:
+        seconds: Position in seconds
+        vtt: Use a comma as the millisecond separator
+
+    Returns:
+        Formatted timestamp
+    """
+    milliseconds = int(seconds * 1000 + 0.5) if seconds > 0 else 0
+    hours, milliseconds = divmod(milliseconds, 3_600_000)
+    minutes, milliseconds = divmod(milliseconds, 60_000)
+    secs, milliseconds = divmod(milliseconds, 1000)
+    separator = "," if vtt else "."
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}{separator}{milliseconds:03d}"
@@ -0,0 +1,455 @@
+"""Live transcription from a PCM capture source with a persistent model."""
+
+import re
+import subprocess
+import sys
+import threading
+import time
+import wave
+from pathlib import Path
+from typing import IO, Any, Callable, Dict, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+try:
+    from transcriber.refine import RefinedTranscript, Refiner
+    from transcriber.vad import SAMPLE_RATE
+except ImportError:
+    from .refine import RefinedTranscript, Refiner
+    from .vad import SAMPLE_RATE
+
+# Capture format: 16-bit signed little-endian mono PCM.
+BYTES_PER_SAMPLE = 2
+
+
+class RingBuffer:
+    """Fixed-size circular buffer of float32 samples addressed by absolute position."""
+
+    def __init__(self, capacity: int):
+        """Initialize the buffer.
+
+        Args:
+            capacity: Number of most recent samples retained
+        """
+        self.capacity = capacity
+        self._data = np.zeros(capacity, dtype=np.float32)
+        self.total = 0
+
+    @property
+    def start(self) -> int:
+        """Absolute position of the oldest retained sample."""
+        return max(0, self.total - self.capacity)
+
+    def write(self, samples: np.ndarray) -> None:
+        """Append samples, overwriting the oldest ones when full."""
+        if len(samples) >= self.capacity:
+            self.total += len(samples) - self.capacity
+            samples = samples[-self.capacity :]
+        offset = self.total % self.capacity
+        first = min(len(samples), self.capacity - offset)
+        self._data[offset : offset + first] = samples[:first]
+        self._data[: len(samples) - first] = samples[first:]
+        self.total += len(samples)
+
+    def read(self, start: int, end: int) -> np.ndarray:
+        """Return a copy of samples in the absolute range [start, end).
+
+        Raises:
+            ValueError: If the range is no longer (or not yet) in the buffer
+        """
+        if start < self.start or end > self.total or start > end:
+            raise ValueError(
+                f"Range [{start}, {end}) outside buffered [{self.start}, {self.total})"
+            )
+        begin = start % self.capacity
+        length = end - start
+        if begin + length <= self.capacity:
+            chunk: np.ndarray = self._data[begin : begin + length].copy()
+            return chunk
+        first = self.capacity - begin
+        return np.concatenate((self._data[begin:], self._data[: length - first]))
+
+
+class AudioSource:
+    """A source of 16 kHz mono float32 samples."""
+
+    def read(self, n_samples: int) -> Optional[np.ndarray]:
+        """Return up to n_samples samples, or None when the source is exhausted."""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class PCMStreamSource(AudioSource):
+    """Reads raw s16le PCM from a binary stream (a file, a pipe or stdin)."""
+
+    def __init__(self, stream: IO[bytes], owns_stream: bool = False):
+        self.stream = stream
+        self.owns_stream = owns_stream
+        self._remainder = b""
+
+    def read(self, n_samples: int) -> Optional[np.ndarray]:
+        data = self._remainder + self.stream.read(n_samples * BYTES_PER_SAMPLE)
+        if not data:
+            return None
+        usable = len(data) - len(data) % BYTES_PER_SAMPLE
+        self._remainder = data[usable:]
+        samples = np.frombuffer(data[:usable], dtype="<i2")
+        return samples.astype(np.float32) / 32768.0
+
+    def close(self) -> None:
+        if self.owns_stream:
+            self.stream.close()
+
+
+class MicrophoneSource(PCMStreamSource):
+    """Captures the default microphone through sox's `rec`."""
+
+    def __init__(self, command: Optional[List[str]] = None):
+        """Start recording.
+
+        Args:
+            command: Capture command writing s16le 16 kHz mono PCM to stdout
+        """
+        command = command or [
+            "rec",
+            "-q",
+            "-t",
+            "raw",
+            "-r",
+            str(SAMPLE_RATE),
+            "-c",
+            "1",
+            "-b",
+            "16",
+            "-e",
+            "signed-integer",
+            "-L",
+            "-",
+        ]
+        try:
+            self.process = subprocess.Popen(
+                command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+            )
+        except FileNotFoundError:
+            raise RuntimeError(
+                f"'{command[0]}' not found. Install sox (brew install sox) "
+                "or pass --source with a PCM file or '-' for stdin."
+            ) from None
+        assert self.process.stdout is not None
+        super().__init__(self.process.stdout)
+
+    def close(self) -> None:
+        self.process.terminate()
+        try:
+            self.process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+        super().close()
+
+
+def open_source(spec: str) -> AudioSource:
+    """Open a capture source: "mic", "-" for stdin, or a raw PCM file path."""
+    if spec == "mic":
+        return MicrophoneSource()
+    if spec == "-":
+        return PCMStreamSource(sys.stdin.buffer)
+    return PCMStreamSource(open(Path(spec), "rb"), owns_stream=True)
+
+
+def _normalize(word: str) -> str:
+    return re.sub(r"[^\w']", "", word.lower())
+
+
+def merge_overlap(previous: List[str], text: str, max_words: int = 30) -> str:
+    """Drop the words at the start of `text` that repeat the end of `previous`.
+
+    Consecutive windows share `overlap_seconds` of audio, so the model usually
+    transcribes the same few words twice. The longest run of words that ends
+    `previous` and starts `text` (ignoring case and punctuation) is removed.
+
+    Args:
+        previous: Words already emitted
+        text: Transcript of the new window
+        max_words: Longest overlap considered
+
+    Returns:
+        New text with the repeated prefix removed
+    """
+    words = text.split()
+    tail = [_normalize(w) for w in previous[-max_words:]]
+    head = [_normalize(w) for w in words[:max_words]]
+    for size in range(min(len(tail), len(head)), 0, -1):
+        if tail[-size:] == head[:size]:
+            return " ".join(words[size:])
+    return " ".join(words)
+
+
+class LiveTranscriber:
+    """Transcribes overlapping windows of captured audio as they fill.
+
+    With a `refine_engine`, each window's text is a draft: a larger model
+    transcribes the window again on a background thread, and its text
+    replaces the draft in `outputs`, which are rewritten atomically.
+    """
+
+    def __init__(
+        self,
+        engine: Any,
+        window_seconds: float = 10.0,
+        overlap_seconds: float = 2.0,
+        language: Optional[str] = None,
+        vad: bool = True,
+        writer: Any = None,
+        on_text: Optional[Callable[[str], None]] = None,
+        save_audio: Optional[Path] = None,
+        read_seconds: float = 0.5,
+        refine_engine: Any = None,
+        outputs: Optional[Mapping[str, Path]] = None,
+        on_refine: Optional[Callable[[str], None]] = None,
+    ):
+        """Initialize the live transcriber.
+
+        Args:
+            engine: Loaded TranscriptionEngine, reused for every window
+            window_seconds: Audio per transcription pass, including the overlap
+            overlap_seconds: Audio repeated from the previous window for context
+            language: Language code (optional, auto-detected if None)
+            vad: Skip silence inside each window
+            writer: Optional SegmentWriter receiving one segment per window
+            on_text: Called with new (de-duplicated) text as it appears
+            save_audio: Also write the captured audio to this WAV file
+            read_seconds: Capture read size
+            refine_engine: Engine with a larger model that re-transcribes every
+                window in the background, or a function loading one (see
+                transcriber.refine.Refiner)
+            outputs: With refine_engine, files (format -> path) kept up to
+                date instead of `writer`
+            on_refine: Called with a window's final text when it differs
+                from the draft
+        """
+        if overlap_seconds >= window_seconds:
+            raise ValueError("overlap_seconds must be smaller than window_seconds")
+        if writer is not None and refine_engine is not None:
+            raise ValueError("Refined transcripts are written to outputs, not a writer")
+
+        self.engine = engine
+        self.window = int(window_seconds * SAMPLE_RATE)
+        self.overlap = int(overlap_seconds * SAMPLE_RATE)
+        self.language = language
+        self.vad = vad
+        self.writer = writer
+        self.on_text = on_text
+        self.save_audio = save_audio
+        self.read_size = max(1, int(read_seconds * SAMPLE_RATE))
+        self.refine_engine = refine_engine
+        self.outputs = outputs
+        self.on_refine = on_refine
+        self.transcript: Optional[RefinedTranscript] = None
+        self._refiner: Optional[Refiner] = None
+        self._final_words: List[str] = []
+        # Window index -> (start, length, draft text) until refined.
+        self._drafts: Dict[int, Tuple[int, int, str]] = {}
+        # Keep at least a minute so capture can run ahead of slow inference.
+        self.buffer = RingBuffer(max(4 * self.window, 60 * SAMPLE_RATE))
+        self.words: List[str] = []
+        self.windows = 0
+        self.inference_seconds = 0.0
+        self._transcribed_to = 0
+        self._finished = False
+        self._ready = threading.Condition()
+
+    def run(self, source: AudioSource) -> Dict[str, Any]:
+        """Capture and transcribe until the source ends or Ctrl+C.
+
+        Capture runs on a background thread so the source keeps draining
+        while a window is being transcribed.
+
+        Returns:
+            Summary statistics
+        """
+        recording = None
+        if self.save_audio:
+            recording = wave.open(str(self.save_audio), "wb")
+            recording.setnchannels(1)
+            recording.setsampwidth(BYTES_PER_SAMPLE)
+            recording.setframerate(SAMPLE_RATE)
+
+        if self.refine_engine is not None:
+            self.transcript = RefinedTranscript(self.outputs)
+            self._refiner = Refiner(
+                self.refine_engine,
+                on_result=self._refined,
+                on_error=self._refine_failed,
+                language=self.language,
+                vad=self.vad,
+            )
+
+        capture = threading.Thread(
+            target=self._capture,
+            args=(source, recording),
+            name="live-capture",
+            daemon=True,
+        )
+        capture.start()
+
+        try:
+            while True:
+                with self._ready:
+                    self._ready.wait_for(self._window_ready)
+                    if not self._full_window():
+                        break
+                self._transcribe_window()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            source.close()
+            capture.join(timeout=5)
+            if recording is not None:
+                recording.close()
+
+        try:
+            while self.buffer.total > self._transcribed_to:
+                self._transcribe_window()
+        finally:
+            if self._refiner is not None:
+                self._refiner.close()
+            if self.transcript is not None:
+                self.transcript.flush()
+        if self.writer is not None:
+            self.writer.close({"text": " ".join(self.words)})
+
+        return self.stats()
+
+    def _next_start(self) -> int:
+        return (
+            max(0, self._transcribed_to - self.overlap) if self._transcribed_to else 0
+        )
+
+    def _full_window(self) -> bool:
+        return self.buffer.total - self._next_start() >= self.window
+
+    def _window_ready(self) -> bool:
+        return self._finished or self._full_window()
+
+    def _capture(
+        self, source: AudioSource, recording: Optional[wave.Wave_write]
+    ) -> None:
+        """Read the source into the ring buffer until it is exhausted."""
+        try:
+            while True:
+                samples = source.read(self.read_size)
+                if samples is None:
+                    break
+                with self._ready:
+                    self.buffer.write(samples)
+                    self._ready.notify()
+                if recording is not None:
+                    pcm = np.clip(samples * 32768.0, -32768, 32767).astype("<i2")
+                    recording.writeframes(pcm.tobytes())
+        except (OSError, ValueError):
+            # The source was closed underneath us (Ctrl+C).
+            pass
+        finally:
+            with self._ready:
+                self._finished = True
+                self._ready.notify()
+
+    def _transcribe_window(self) -> None:
+        """Transcribe the next window: the overlap plus up to one step of new audio."""
+        with self._ready:
+            # If inference fell behind further than the ring buffer reaches,
+            # the oldest untranscribed audio is lost.
+            start = max(self.buffer.start, self._next_start())
+            end = min(self.buffer.total, start + self.window)
+            audio = self.buffer.read(start, end)
+            self._transcribed_to = end
+
+        began = time.perf_counter()
+        result = self.engine.transcribe(audio, language=self.language, vad=self.vad)
+        self.inference_seconds += time.perf_counter() - began
+        index = self.windows
+        self.windows += 1
+
+        segment = _window_segment(self.words, result, start, len(audio))
+        if self._refiner is not None:
+            assert self.transcript is not None
+            draft = segment["text"] if segment else ""
+            self._drafts[index] = (start, len(audio), draft)
+            self.transcript.update(index, _segment_result(segment, result))
+            self._refiner.submit(index, audio)
+        if segment is None:
+            return
+        if self.writer is not None:
+            self.writer.write_segment(segment)
+        if self.on_text:
+            self.on_text(segment["text"].strip())
+
+    def _refined(self, index: int, result: Dict[str, Any]) -> None:
+        """Replace a window's draft with the final model's text (refiner thread)."""
+        assert self.transcript is not None
+        start, length, draft = self._drafts.pop(index)
+        segment = _window_segment(self._final_words, result, start, length)
+        self.transcript.update(index, _segment_result(segment, result), final=True)
+        text = segment["text"] if segment else ""
+        if self.on_refine and text and text != draft:
+            self.on_refine(text.strip())
+
+    def _refine_failed(self, index: int, error: Exception) -> None:
+        """Keep a window's draft when the final model fails on it."""
+        assert self.transcript is not None
+        self._drafts.pop(index, None)
+        self.transcript.fail()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return capture and inference statistics.
+
+        When refining, "refine" holds the seconds from the start of the run
+        to the first draft text and to the final transcript.
+        """
+        audio_seconds = self.buffer.total / SAMPLE_RATE
+        stats: Dict[str, Any] = {
+            "audio_seconds": audio_seconds,
+            "windows": self.windows,
+            "inference_seconds": self.inference_seconds,
+            "real_time_factor": (
+                self.inference_seconds / audio_seconds if audio_seconds else 0.0
+            ),
+        }
+        if self.transcript is not None:
+            stats["refine"] = self.transcript.stats()
+        return stats
+
+
+def _window_segment(
+    words: List[str], result: Dict[str, Any], start: int, length: int
+) -> Optional[Dict[str, Any]]:
+    """Build one segment for a window's new text, extending `words` with it.
+
+    Returns None when the window adds nothing beyond the overlap.
+    """
+    text = merge_overlap(words, result.get("text", ""))
+    if not text:
+        return None
+    words.extend(text.split())
+
+    offset = start / SAMPLE_RATE
+    segments = result.get("segments") or []
+    first = segments[0]["start"] if segments else 0.0
+    last = segments[-1]["end"] if segments else length / SAMPLE_RATE
+    return {
+        "start": round(offset + first, 3),
+        "end": round(offset + last, 3),
+        "text": " " + text,
+    }
+
+
+def _segment_result(
+    segment: Optional[Dict[str, Any]], result: Dict[str, Any]
+) -> Dict[str, Any]:
+    return {
+        "text": segment["text"] if segment else "",
+        "segments": [segment] if segment else [],
+        "language": result.get("language"),
+    }
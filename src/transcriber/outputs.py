@@ -0,0 +1,91 @@
+"""Output path naming shared by the transcription commands."""
+
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+try:
+    from transcriber.formatters import available_formats, get_formatter
+except ImportError:
+    from .formatters import available_formats, get_formatter
+
+DEFAULT_TEMPLATE = "{stem}_transcript.{format}"
+
+
+def expand_formats(values: Iterable[str]) -> List[str]:
+    """Normalize --format values into a list of registered format names.
+
+    Accepts repeated values, comma-separated lists and "all" (every text
+    format; binary ones such as npz must be named).
+
+    Raises:
+        ValueError: If a format is not registered
+    """
+    known = available_formats()
+    formats: List[str] = []
+    for value in values:
+        for name in value.split(","):
+            name = name.strip().lower()
+            if not name:
+                continue
+            if name == "all":
+                candidates = [f for f in known if not get_formatter(f).binary]
+            elif name in known:
+                candidates = [name]
+            else:
+                raise ValueError(
+                    f"Unknown output format '{name}'. Available: {', '.join(known)}, all"
+                )
+            formats.extend(f for f in candidates if f not in formats)
+    return formats
+
+
+def default_output_path(
+    input_path: Path,
+    format: str,
+    output_dir: Optional[Path] = None,
+) -> Path:
+    """Return the output path used by `transcribe` when no --output is given."""
+    return output_paths(input_path, [format], output_dir=output_dir)[format]
+
+
+def output_paths(
+    input_path: Path,
+    formats: List[str],
+    output: Optional[str] = None,
+    output_dir: Optional[Path] = None,
+) -> Dict[str, Path]:
+    """Resolve one output path per format.
+
+    Args:
+        input_path: Input file the transcript is named after
+        formats: Output formats
+        output: Explicit path or template using {stem} and {format}; a plain
+            path has its suffix replaced per format when several are requested
+        output_dir: Directory for the default naming (default: current directory)
+
+    Returns:
+        Mapping of format to output path
+
+    Raises:
+        ValueError: If the output path would be the same for several formats
+    """
+    stem = Path(input_path).stem
+
+    if output is None:
+        template = DEFAULT_TEMPLATE
+        if output_dir:
+            template = str(Path(output_dir) / template)
+    elif "{" in output:
+        template = output
+    elif len(formats) == 1:
+        return {formats[0]: Path(output)}
+    else:
+        template = str(Path(output).with_suffix("")) + ".{format}"
+
+    paths = {fmt: Path(template.format(stem=stem, format=fmt)) for fmt in formats}
+    if len(set(paths.values())) != len(paths):
+        raise ValueError(
+            f"Output template '{template}' must include {{format}} "
+            "when writing several formats"
+        )
+    return paths
@@ -0,0 +1,224 @@
+"""Producer-consumer pipeline overlapping downloads with transcription."""
+
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+
+# Queue marker telling the consumer that the producer is done.
+_DONE = object()
+
+
+class DiskBudget:
+    """Tracks bytes of fetched-but-unprocessed payloads; blocks when over budget."""
+
+    def __init__(self, max_bytes: Optional[int] = None):
+        """Initialize the budget.
+
+        Args:
+            max_bytes: Bytes allowed on disk at once (None: unlimited). A
+                single file larger than the budget is still allowed when
+                nothing else is held, so the pipeline cannot stall.
+        """
+        self.max_bytes = max_bytes
+        self.used = 0
+        self.peak = 0
+        self._changed = threading.Condition()
+
+    def wait_for_room(self, stop: Optional[threading.Event] = None) -> None:
+        """Block until more data may be fetched (or `stop` is set)."""
+        if self.max_bytes is None:
+            return
+        with self._changed:
+            while self.used and self.used >= self.max_bytes:
+                if stop is not None and stop.is_set():
+                    return
+                self._changed.wait(timeout=0.5)
+
+    def add(self, size: int) -> None:
+        with self._changed:
+            self.used += size
+            self.peak = max(self.peak, self.used)
+
+    def release(self, size: int) -> None:
+        with self._changed:
+            self.used = max(0, self.used - size)
+            self._changed.notify_all()
+
+
+def payload_size(payload: Any) -> int:
+    """Return the bytes a fetched payload holds.
+
+    A downloaded file counts its size on disk and streamed audio its decoded
+    samples in memory, also inside a dict payload; anything else counts 0.
+    """
+    if isinstance(payload, dict):
+        return sum(payload_size(value) for value in payload.values())
+    if isinstance(payload, np.ndarray):
+        return int(payload.nbytes)
+    if isinstance(payload, Path):
+        try:
+            return payload.stat().st_size
+        except OSError:
+            return 0
+    return 0
+
+
+class PipelineSummary:
+    """Outcome and per-stage timing of a pipeline run."""
+
+    def __init__(self) -> None:
+        self.outcomes: List[Dict[str, Any]] = []
+        self.fetch_busy = 0.0
+        self.fetch_blocked = 0.0
+        self.process_busy = 0.0
+        self.process_idle = 0.0
+        self.wall_seconds = 0.0
+        self.peak_disk_bytes = 0
+
+    @property
+    def completed(self) -> List[Dict[str, Any]]:
+        return [o for o in self.outcomes if o["ok"]]
+
+    @property
+    def failed(self) -> List[Dict[str, Any]]:
+        return [o for o in self.outcomes if not o["ok"]]
+
+    def utilisation(self) -> Dict[str, float]:
+        """Fraction of wall-clock time each stage spent working."""
+        if not self.wall_seconds:
+            return {"fetch": 0.0, "process": 0.0}
+        return {
+            "fetch": self.fetch_busy / self.wall_seconds,
+            "process": self.process_busy / self.wall_seconds,
+        }
+
+    @property
+    def bottleneck(self) -> str:
+        """The stage the other one waited on: "fetch" or "process"."""
+        return "fetch" if self.process_idle > self.fetch_blocked else "process"
+
+
+def run_pipeline(
+    items: Iterable[Any],
+    fetch: Callable[[Any], Any],
+    process: Callable[[Any, Any], Dict[str, Any]],
+    cleanup: Optional[Callable[[Any], None]] = None,
+    prefetch: int = 2,
+    disk_budget: Optional[int] = None,
+    size_of: Callable[[Any], int] = payload_size,
+    on_result: Optional[Callable[[Dict[str, Any]], None]] = None,
+) -> PipelineSummary:
+    """Fetch items on a background thread while processing earlier ones.
+
+    The producer fetches (downloads) items in order into a queue holding at
+    most `prefetch` items, pausing while fetched data exceeds `disk_budget`.
+    The consumer processes (transcribes) them on the calling thread and
+    cleans up each payload as soon as it is processed.
+
+    Args:
+        items: Work items, in order
+        fetch: Produces a payload for an item (e.g. a downloaded file)
+        process: Consumes an item and its payload; returns an outcome dict
+            with at least "ok"
+        cleanup: Called with each payload after processing (or on abort)
+        prefetch: Maximum fetched items waiting to be processed
+        disk_budget: Maximum bytes of fetched payloads held at once
+        size_of: Bytes a payload holds (see payload_size)
+        on_result: Called with each outcome as it completes
+
+    Returns:
+        Outcomes and per-stage utilisation
+    """
+    summary = PipelineSummary()
+    budget = DiskBudget(disk_budget)
+    ready: queue.Queue[Any] = queue.Queue(maxsize=max(1, prefetch))
+    stop = threading.Event()
+
+    def put(entry: Any) -> None:
+        blocked = time.perf_counter()
+        while not stop.is_set():
+            try:
+                ready.put(entry, timeout=0.5)
+                break
+            except queue.Full:
+                continue
+        summary.fetch_blocked += time.perf_counter() - blocked
+
+    def produce() -> None:
+        try:
+            for item in items:
+                waited = time.perf_counter()
+                budget.wait_for_room(stop)
+                summary.fetch_blocked += time.perf_counter() - waited
+                if stop.is_set():
+                    return
+
+                started = time.perf_counter()
+                try:
+                    payload = fetch(item)
+                    error = None
+                except Exception as e:
+                    payload, error = None, str(e) or type(e).__name__
+                summary.fetch_busy += time.perf_counter() - started
+
+                size = size_of(payload) if error is None else 0
+                budget.add(size)
+                put((item, payload, size, error))
+        finally:
+            put(_DONE)
+
+    producer = threading.Thread(target=produce, name="pipeline-fetch", daemon=True)
+    start = time.perf_counter()
+    producer.start()
+
+    try:
+        while True:
+            waited = time.perf_counter()
+            entry = ready.get()
+            summary.process_idle += time.perf_counter() - waited
+            if entry is _DONE:
+                break
+
+            item, payload, size, error = entry
+            started = time.perf_counter()
+            try:
+                if error is not None:
+                    outcome = {"item": item, "ok": False, "error": error}
+                else:
+                    try:
+                        outcome = process(item, payload)
+                    except Exception as e:
+                        outcome = {
+                            "item": item,
+                            "ok": False,
+                            "error": str(e) or type(e).__name__,
+                        }
+            finally:
+                if cleanup is not None and payload is not None:
+                    cleanup(payload)
+                budget.release(size)
+            summary.process_busy += time.perf_counter() - started
+
+            outcome.setdefault("item", item)
+            summary.outcomes.append(outcome)
+            if on_result:
+                on_result(outcome)
+    finally:
+        stop.set()
+        # Release anything fetched but never processed (e.g. on Ctrl+C).
+        while True:
+            try:
+                entry = ready.get_nowait()
+            except queue.Empty:
+                break
+            if entry is not _DONE and cleanup is not None and entry[1] is not None:
+                cleanup(entry[1])
+        producer.join(timeout=5)
+
+    summary.wall_seconds = time.perf_counter() - start
+    summary.peak_disk_bytes = budget.peak
+    return summary
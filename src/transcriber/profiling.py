@@ -0,0 +1,208 @@
+"""Per-stage timing and resource instrumentation.
+
+Code marks its stages with `stage("inference", audio_seconds=...)`. Nothing
+is recorded unless a `Profiler` has been activated with `profiling()`, so
+the marks cost next to nothing in normal runs. A profiler reports what it
+recorded as JSON lines, a human summary, or a Prometheus text file for the
+node exporter's textfile collector.
+"""
+
+import json
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import IO, Any, Dict, Iterator, List, Optional, Union
+
+try:
+    from transcriber.cache import write_atomic
+except ImportError:
+    from .cache import write_atomic
+
+METRIC_PREFIX = "whisper_transcriber"
+
+# Profiler that stage() records into; set by profiling().
+_active: Optional["Profiler"] = None
+
+
+def peak_rss_bytes() -> int:
+    """Return the peak resident set size of this process."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes.
+    return int(peak if sys.platform == "darwin" else peak * 1024)
+
+
+class Profiler:
+    """Collects one record per completed stage.
+
+    Each record holds the stage's wall time, the process CPU time spent
+    meanwhile (all threads, so stages overlapping in a pipeline share it),
+    the process's peak RSS when the stage ended, and, where known, the
+    seconds of audio it handled and the resulting real-time factor.
+    """
+
+    def __init__(self, labels: Optional[Dict[str, str]] = None):
+        """Initialize the profiler.
+
+        Args:
+            labels: Attached to every record and Prometheus sample,
+                e.g. {"command": "youtube"}
+        """
+        self.labels = dict(labels or {})
+        self.records: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(
+        self, name: str, audio_seconds: Optional[float] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """Time a stage; the yielded record's "audio_seconds" may be set inside."""
+        record: Dict[str, Any] = {"stage": name, "audio_seconds": audio_seconds}
+        started = time.time()
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        try:
+            yield record
+        except BaseException:
+            record["failed"] = True
+            raise
+        finally:
+            record["wall_seconds"] = time.perf_counter() - wall
+            record["cpu_seconds"] = time.process_time() - cpu
+            record["peak_rss_bytes"] = peak_rss_bytes()
+            audio = record["audio_seconds"]
+            record["rtf"] = record["wall_seconds"] / audio if audio else None
+            record["started"] = started
+            record.update(self.labels)
+            with self._lock:
+                self.records.append(record)
+
+    def totals(self) -> Dict[str, Dict[str, Any]]:
+        """Return per-stage sums in first-seen order."""
+        totals: Dict[str, Dict[str, Any]] = {}
+        with self._lock:
+            records = list(self.records)
+        for record in records:
+            total = totals.setdefault(
+                record["stage"],
+                {
+                    "calls": 0,
+                    "wall_seconds": 0.0,
+                    "cpu_seconds": 0.0,
+                    "audio_seconds": 0.0,
+                    "peak_rss_bytes": 0,
+                },
+            )
+            total["calls"] += 1
+            total["wall_seconds"] += record["wall_seconds"]
+            total["cpu_seconds"] += record["cpu_seconds"]
+            total["audio_seconds"] += record["audio_seconds"] or 0.0
+            total["peak_rss_bytes"] = max(
+                total["peak_rss_bytes"], record["peak_rss_bytes"]
+            )
+        for total in totals.values():
+            audio = total["audio_seconds"]
+            total["rtf"] = total["wall_seconds"] / audio if audio else None
+        return totals
+
+    def write_json_lines(self, stream: IO[str]) -> None:
+        """Write one JSON object per stage record."""
+        with self._lock:
+            records = list(self.records)
+        for record in records:
+            stream.write(json.dumps(record) + "\n")
+        stream.flush()
+
+    def summary(self) -> str:
+        """Return a table of per-stage totals."""
+        lines = [
+            f"{'Stage':<14}{'Calls':>6}{'Wall s':>10}{'CPU s':>10}"
+            f"{'Audio s':>10}{'RTF':>8}{'Peak RSS':>11}"
+        ]
+        for name, total in self.totals().items():
+            audio = total["audio_seconds"]
+            rtf = total["rtf"]
+            lines.append(
+                f"{name:<14}{total['calls']:>6}{total['wall_seconds']:>10.2f}"
+                f"{total['cpu_seconds']:>10.2f}"
+                f"{f'{audio:.1f}' if audio else '-':>10}"
+                f"{f'{rtf:.3f}' if rtf is not None else '-':>8}"
+                f"{total['peak_rss_bytes'] / 1024 / 1024:>8.0f} MB"
+            )
+        return "\n".join(lines)
+
+    def prometheus(self) -> str:
+        """Return per-stage totals in the Prometheus text exposition format."""
+        gauges = [
+            ("stage_calls", "calls", "Times each stage ran in the last run."),
+            ("stage_wall_seconds", "wall_seconds", "Wall-clock time per stage."),
+            ("stage_cpu_seconds", "cpu_seconds", "Process CPU time per stage."),
+            ("stage_audio_seconds", "audio_seconds", "Audio handled per stage."),
+            ("stage_real_time_factor", "rtf", "Wall time per second of audio."),
+            ("stage_peak_rss_bytes", "peak_rss_bytes", "Peak RSS at stage end."),
+        ]
+        totals = self.totals()
+        lines: List[str] = []
+        for metric, field, help_text in gauges:
+            name = f"{METRIC_PREFIX}_{metric}"
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} gauge")
+            for stage_name, total in totals.items():
+                if total[field] is None:
+                    continue
+                labels = _format_labels({**self.labels, "stage": stage_name})
+                lines.append(f"{name}{{{labels}}} {total[field]:g}")
+        finished = f"{METRIC_PREFIX}_last_run_timestamp_seconds"
+        lines.append(f"# HELP {finished} When the last profiled run finished.")
+        lines.append(f"# TYPE {finished} gauge")
+        labels = _format_labels(self.labels)
+        lines.append(f"{finished}{{{labels}}} {time.time():.3f}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: Union[str, Path]) -> None:
+        """Atomically replace a textfile-collector file with these totals."""
+        write_atomic(Path(path), self.prometheus())
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    escaped = (
+        (key, str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for key, value in sorted(labels.items())
+    )
+    return ",".join(f'{key}="{value}"' for key, value in escaped)
+
+
+@contextmanager
+def profiling(profiler: Profiler) -> Iterator[Profiler]:
+    """Record stages from any thread into `profiler` while the block runs."""
+    global _active
+    previous, _active = _active, profiler
+    try:
+        yield profiler
+    finally:
+        _active = previous
+
+
+@contextmanager
+def stage(name: str, audio_seconds: Optional[float] = None) -> Iterator[Dict[str, Any]]:
+    """Time a stage into the active profiler, if any.
+
+    Args:
+        name: Stage name, e.g. "download", "decode", "inference"
+        audio_seconds: Seconds of audio the stage handles, when known up
+            front; otherwise set record["audio_seconds"] inside the block
+
+    Yields:
+        The stage's record (a scratch dict when profiling is off)
+    """
+    profiler = _active
+    if profiler is None:
+        yield {}
+        return
+    with profiler.stage(name, audio_seconds) as record:
+        yield record
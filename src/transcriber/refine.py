@@ -0,0 +1,356 @@
+"""Two-tier transcription: a fast draft first, a larger model's text later.
+
+A small model transcribes each window and its draft is written out at once.
+A `Refiner` thread transcribes the same windows again with a larger model,
+and each final window replaces its draft in a `RefinedTranscript`, which
+rewrites the outputs atomically, at most once per WRITE_INTERVAL and once
+more when flushed. Readers of the files always see a complete transcript:
+final where the large model has caught up, draft (segments marked
+"draft": true in JSON) everywhere else.
+"""
+
+import os
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple, Union
+
+import numpy as np
+
+try:
+    from transcriber.audio import load_audio
+    from transcriber.formatters import write_results
+    from transcriber.profiling import stage
+    from transcriber.vad import SAMPLE_RATE
+    from transcriber.windows import plan_windows, stitch_results
+except ImportError:
+    from .audio import load_audio
+    from .formatters import write_results
+    from .profiling import stage
+    from .vad import SAMPLE_RATE
+    from .windows import plan_windows, stitch_results
+
+# Queue marker telling the refiner thread to stop.
+_DONE = object()
+
+# Seconds between rewrites of a transcript's outputs while updates stream in.
+WRITE_INTERVAL = 1.0
+
+
+class RefinedTranscript:
+    """Per-window results, each a draft until its final version replaces it."""
+
+    def __init__(
+        self,
+        outputs: Optional[Mapping[str, Path]] = None,
+        write_interval: float = WRITE_INTERVAL,
+    ):
+        """Initialize an empty transcript; its clock starts now.
+
+        Args:
+            outputs: Files (format -> path) rewritten as updates arrive
+            write_interval: Fewest seconds between rewrites; updates in
+                between are written by the next rewrite or by flush()
+        """
+        self.outputs = dict(outputs or {})
+        self.started = time.perf_counter()
+        self.first_text_at: Optional[float] = None
+        self.drafted_at: Optional[float] = None
+        self.final_at: Optional[float] = None
+        self.failed = 0
+        self.write_interval = write_interval
+        self._windows: List[Optional[Tuple[Dict[str, Any], float, bool]]] = []
+        self._lock = threading.Lock()
+        # Updates so far, the last one taken for writing and when, and the
+        # last one on disk; writes run outside _lock, one at a time.
+        self._version = 0
+        self._taken = 0
+        self._taken_at = float("-inf")
+        self._written = 0
+        self._write_lock = threading.Lock()
+
+    def update(
+        self,
+        index: int,
+        result: Mapping[str, Any],
+        offset: float = 0.0,
+        final: bool = False,
+    ) -> None:
+        """Set a window's draft or final result and rewrite the outputs.
+
+        The outputs are rewritten unless they were less than write_interval
+        seconds ago. A draft arriving after the window's final result is
+        ignored.
+
+        Args:
+            index: Window number, counting from 0
+            result: Result of the window, with times relative to `offset`
+            offset: Start of the window in seconds
+            final: Whether this is the larger model's result
+        """
+        with self._lock:
+            self._windows.extend([None] * (index + 1 - len(self._windows)))
+            current = self._windows[index]
+            if current is not None and current[2] and not final:
+                return
+            self._windows[index] = (dict(result), offset, final)
+
+            now = time.perf_counter() - self.started
+            if self.first_text_at is None and str(result.get("text", "")).strip():
+                self.first_text_at = now
+            if final:
+                self.final_at = now
+            else:
+                self.drafted_at = now
+            self._version += 1
+            snapshot = self._snapshot()
+        self._write(snapshot)
+
+    def flush(self) -> None:
+        """Write any updates the outputs do not have yet."""
+        with self._lock:
+            snapshot = self._snapshot(force=True)
+        self._write(snapshot)
+
+    def fail(self) -> None:
+        """Record that a window's final transcription failed; its draft stays."""
+        with self._lock:
+            self.failed += 1
+
+    def result(self) -> Dict[str, Any]:
+        """Return the transcript so far, with draft segments marked."""
+        with self._lock:
+            return self._result()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return window counts and seconds to the first, draft and final text.
+
+        time_to_final stays None until every window is final.
+        """
+        with self._lock:
+            return self._stats()
+
+    def _stats(self) -> Dict[str, Any]:
+        windows = [w for w in self._windows if w is not None]
+        final = sum(1 for _, _, is_final in windows if is_final)
+        return {
+            "windows": len(windows),
+            "final_windows": final,
+            "failed_windows": self.failed,
+            "time_to_first_text": self.first_text_at,
+            "time_to_draft": self.drafted_at,
+            "time_to_final": (
+                self.final_at if windows and final == len(windows) else None
+            ),
+        }
+
+    def _result(self) -> Dict[str, Any]:
+        results, offsets = [], []
+        for window in self._windows:
+            if window is None:
+                continue
+            result, offset, final = window
+            if not final:
+                segments = [
+                    {**segment, "draft": True}
+                    for segment in result.get("segments") or []
+                ]
+                result = {**result, "segments": segments}
+            results.append(result)
+            offsets.append(offset)
+        stitched = stitch_results(results, offsets)
+        stitched["refine"] = self._stats()
+        return stitched
+
+    def _snapshot(self, force: bool = False) -> Optional[Tuple[int, Dict[str, Any]]]:
+        """Take the transcript for writing if it is new and a write is due."""
+        if not self.outputs or self._taken == self._version:
+            return None
+        now = time.perf_counter()
+        if not force and now - self._taken_at < self.write_interval:
+            return None
+        self._taken, self._taken_at = self._version, now
+        return self._version, self._result()
+
+    def _write(self, snapshot: Optional[Tuple[int, Dict[str, Any]]]) -> None:
+        """Replace every output with a snapshot unless a newer one is there."""
+        if snapshot is None:
+            return
+        version, result = snapshot
+        with self._write_lock:
+            if version <= self._written:
+                return
+            temporary = {
+                format: path.with_name(f".{path.name}.{os.getpid()}.tmp")
+                for format, path in self.outputs.items()
+            }
+            try:
+                for path in temporary.values():
+                    path.parent.mkdir(parents=True, exist_ok=True)
+                write_results(result, temporary)
+                for format, path in temporary.items():
+                    os.replace(path, self.outputs[format])
+                self._written = version
+            finally:
+                for path in temporary.values():
+                    if path.exists():
+                        path.unlink()
+
+
+class Refiner:
+    """Transcribes queued windows with the final model on a background thread.
+
+    Windows are transcribed in the order they are submitted, and `on_result`
+    is called on the refiner thread for each one.
+    """
+
+    def __init__(
+        self,
+        engine: Any,
+        on_result: Callable[[int, Dict[str, Any]], None],
+        on_error: Optional[Callable[[int, Exception], None]] = None,
+        language: Optional[str] = None,
+        **options: Any,
+    ):
+        """Start the refiner thread.
+
+        Args:
+            engine: Loaded TranscriptionEngine with the larger model, or a
+                function returning one, called on the refiner thread so
+                loading a large model does not hold up the draft
+            on_result: Called with each window's index and final result
+            on_error: Called with a window's index and the error when its
+                transcription fails (the refiner carries on)
+            language: Language code; when None it is detected on the first
+                window and reused for the rest
+            **options: Passed to engine.transcribe, e.g. vad=False
+        """
+        self.engine = engine
+        self.on_result = on_result
+        self.on_error = on_error
+        self.language = language
+        self.options = options
+        self._queue: queue.Queue[Any] = queue.Queue()
+        self._thread = threading.Thread(target=self._work, name="refiner", daemon=True)
+        self._thread.start()
+
+    def submit(self, index: int, audio: np.ndarray) -> None:
+        """Queue a window for final transcription."""
+        self._queue.put((index, audio))
+
+    def close(self) -> None:
+        """Wait until every submitted window has been transcribed."""
+        self._queue.put(_DONE)
+        self._thread.join()
+
+    def cancel(self) -> None:
+        """Drop the windows not yet started and wait for the current one."""
+        try:
+            while True:
+                self._queue.get_nowait()
+        except queue.Empty:
+            pass
+        self.close()
+
+    def _work(self) -> None:
+        load_error: Optional[Exception] = None
+        if callable(self.engine):
+            try:
+                self.engine = self.engine()
+            except Exception as e:
+                load_error = e
+
+        while True:
+            job = self._queue.get()
+            if job is _DONE:
+                return
+            index, audio = job
+            try:
+                if load_error is not None:
+                    raise load_error
+                with stage("refine", audio_seconds=len(audio) / SAMPLE_RATE):
+                    result = self.engine.transcribe(
+                        audio, language=self.language, **self.options
+                    )
+                self.language = self.language or result.get("language")
+                self.on_result(index, result)
+            except Exception as e:
+                if self.on_error is None:
+                    raise
+                self.on_error(index, e)
+
+
+def transcribe_refined(
+    draft_engine: Any,
+    final_engine: Any,
+    audio: Union[str, Path, np.ndarray],
+    outputs: Optional[Mapping[str, Path]] = None,
+    language: Optional[str] = None,
+    window_seconds: float = 30.0,
+    on_draft: Optional[Callable[[int, Dict[str, Any]], None]] = None,
+    **options: Any,
+) -> Dict[str, Any]:
+    """Transcribe audio with a fast draft model, then refine it window by window.
+
+    The audio is cut into windows at quiet points. The draft model
+    transcribes them in order on the calling thread, and each draft is
+    written to `outputs` as soon as it is done; meanwhile the final model
+    re-transcribes the drafted windows on a background thread and replaces
+    them one by one.
+
+    Args:
+        draft_engine: Loaded TranscriptionEngine with the small model
+        final_engine: Loaded TranscriptionEngine with the larger model, or a
+            function loading one in the background (see Refiner)
+        audio: Path to an audio file, or 16 kHz mono float32 samples
+        outputs: Files (format -> path) kept up to date as windows finish
+        language: Language code (optional, detected on the first window)
+        window_seconds: Longest window
+        on_draft: Called with each window's index and draft result
+        **options: Passed to both engines' transcribe, e.g. vad=False
+
+    Returns:
+        Final result; result["refine"] holds the window counts and the
+        seconds from the call to the first text, the full draft and the
+        final transcript
+    """
+    transcript = RefinedTranscript(outputs)
+    with stage("decode") as record:
+        audio = load_audio(audio, sample_rate=SAMPLE_RATE)
+        record["audio_seconds"] = len(audio) / SAMPLE_RATE
+    windows = plan_windows(audio, window_seconds)
+
+    def offset(index: int) -> float:
+        return windows[index][0] / SAMPLE_RATE
+
+    refiner = Refiner(
+        final_engine,
+        on_result=lambda index, result: transcript.update(
+            index, result, offset(index), final=True
+        ),
+        on_error=lambda index, error: transcript.fail(),
+        language=language,
+        **options,
+    )
+    try:
+        for index, (start, end) in enumerate(windows):
+            with stage("draft", audio_seconds=(end - start) / SAMPLE_RATE):
+                result = draft_engine.transcribe(
+                    audio[start:end], language=language, **options
+                )
+            language = language or result.get("language")
+            transcript.update(index, result, offset(index))
+            refiner.submit(index, audio[start:end])
+            if on_draft:
+                on_draft(index, result)
+    except BaseException:
+        # A failed draft or Ctrl-C should not wait for the whole queue.
+        refiner.cancel()
+        raise
+    else:
+        refiner.close()
+    finally:
+        transcript.flush()
+
+    return transcript.result()
@@ -0,0 +1,214 @@
+"""Process-wide registry of loaded Whisper models."""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+# Approximate resident size of each Whisper checkpoint, used when the loaded
+# model cannot report its own parameter size.
+MODEL_SIZES_MB = {
+    "tiny": 75,
+    "base": 145,
+    "small": 485,
+    "medium": 1530,
+    "large": 3090,
+    "large-v2": 3090,
+    "large-v3": 3090,
+}
+
+DEFAULT_MAX_MB = 4096
+MAX_MB_ENV = "WHISPER_TRANSCRIBER_MODEL_CACHE_MB"
+
+RegistryKey = Tuple[str, str]
+
+
+def estimate_model_bytes(model: Any, name: str) -> int:
+    """Estimate the memory held by a loaded model.
+
+    Args:
+        model: Loaded model object
+        name: Model name, used for the fallback size table
+
+    Returns:
+        Estimated size in bytes
+    """
+    reported = getattr(model, "memory_bytes", None)
+    if isinstance(reported, int):
+        return reported
+
+    parameters = getattr(model, "parameters", None)
+    if callable(parameters):
+        try:
+            total = sum(p.numel() * p.element_size() for p in parameters())
+            buffers = getattr(model, "buffers", None)
+            if callable(buffers):
+                total += sum(b.numel() * b.element_size() for b in buffers())
+            if total > 0:
+                return int(total)
+        except Exception:
+            pass
+
+    return MODEL_SIZES_MB.get(name, MODEL_SIZES_MB["base"]) * 1024 * 1024
+
+
+class ModelRegistry:
+    """Shares loaded models across engines with LRU eviction under a RAM budget."""
+
+    def __init__(self, max_bytes: Optional[int] = None):
+        """Initialize the registry.
+
+        Args:
+            max_bytes: Memory budget for cached models
+                (default: $WHISPER_TRANSCRIBER_MODEL_CACHE_MB or 4096 MB)
+        """
+        if max_bytes is None:
+            max_mb = float(os.environ.get(MAX_MB_ENV, DEFAULT_MAX_MB))
+            max_bytes = int(max_mb * 1024 * 1024)
+
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[RegistryKey, Tuple[Any, int]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._key_locks: Dict[Hashable, threading.Lock] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.load_seconds = 0.0
+        self.load_times: Dict[str, float] = {}
+
+    def get(
+        self,
+        name: str,
+        device: str,
+        loader: Callable[[], Any],
+        size_bytes: Optional[int] = None,
+    ) -> Any:
+        """Return the model for (name, device), loading it on a miss.
+
+        Args:
+            name: Model name
+            device: Device the model is loaded on
+            loader: Callable that loads the model when it is not cached
+            size_bytes: Known model size (default: estimated after loading)
+
+        Returns:
+            Loaded model
+        """
+        key = (name, device)
+        with self._lock:
+            cached = self._lookup(key)
+            if cached is not None:
+                return cached
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        # Load outside the registry lock so other models stay available, but
+        # serialize loads of the same key so it is only loaded once.
+        with key_lock:
+            with self._lock:
+                cached = self._lookup(key)
+                if cached is not None:
+                    return cached
+                self.misses += 1
+
+            start = time.perf_counter()
+            model = loader()
+            elapsed = time.perf_counter() - start
+
+            if size_bytes is None:
+                size_bytes = estimate_model_bytes(model, name)
+
+            with self._lock:
+                self.load_seconds += elapsed
+                self.load_times[f"{name}@{device}"] = elapsed
+                self._entries[key] = (model, size_bytes)
+                self._evict(keep=key)
+
+        return model
+
+    def _lookup(self, key: RegistryKey) -> Any:
+        """Return a cached model and mark it most recently used. Caller holds the lock."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def _evict(self, keep: RegistryKey) -> None:
+        """Drop least recently used models until within budget. Caller holds the lock."""
+        while self.current_bytes > self.max_bytes:
+            victim = next((k for k in self._entries if k != keep), None)
+            if victim is None:
+                break
+            del self._entries[victim]
+            self.evictions += 1
+
+    @property
+    def current_bytes(self) -> int:
+        """Total estimated size of cached models."""
+        return sum(size for _, size in self._entries.values())
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def evict(self, name: str, device: str) -> bool:
+        """Remove a model from the registry.
+
+        Returns:
+            True if the model was cached
+        """
+        with self._lock:
+            return self._entries.pop((name, device), None) is not None
+
+    def clear(self) -> None:
+        """Remove all cached models and reset statistics."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+            self.load_seconds = 0.0
+            self.load_times = {}
+
+    def stats(self) -> Dict[str, Any]:
+        """Return cache statistics for sizing the budget."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "models": [f"{name}@{device}" for name, device in self._entries],
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "load_seconds": self.load_seconds,
+                "load_times": dict(self.load_times),
+                "current_bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+    def summary(self) -> str:
+        """Return the statistics as one line for verbose output."""
+        stats = self.stats()
+        return (
+            f"Model registry: {len(stats['models'])} loaded, "
+            f"{stats['current_bytes'] / 2**20:.0f} of {stats['max_bytes'] / 2**20:.0f} MB, "
+            f"{stats['hits']} hits, {stats['misses']} misses, "
+            f"{stats['evictions']} evictions, {stats['load_seconds']:.2f}s loading"
+        )
+
+
+_registry: Optional[ModelRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_registry() -> ModelRegistry:
+    """Return the process-wide model registry."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = ModelRegistry()
+        return _registry
@@ -0,0 +1,246 @@
+"""CPU budgets for engines running side by side.
+
+Left alone, every torch instance sizes its thread pool to all the cores of
+the machine, so several engines in parallel oversubscribe the CPU and
+spend their time switching threads. `plan_workers` picks how many engines
+the cores and free memory can hold (or one per GPU), `plan_budgets`
+divides the cores between them, and each worker applies its
+`ThreadBudget` before it loads its model.
+"""
+
+import os
+import sys
+from contextlib import contextmanager
+from importlib.util import find_spec
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+try:
+    from transcriber.registry import MODEL_SIZES_MB
+except ImportError:
+    from .registry import MODEL_SIZES_MB
+
+# Fewest cores worth giving one engine; Whisper's matrix products stop
+# scaling well somewhere past four to eight threads.
+MIN_THREADS_PER_WORKER = 4
+
+# Memory an engine needs besides its weights' on-disk size: activations,
+# decoder caches and decoded audio. Weights themselves take about twice
+# their checkpoint size once loaded as float32 tensors.
+WEIGHT_MEMORY_FACTOR = 2
+WORKER_OVERHEAD_MB = 300
+
+# Read by OpenMP, MKL and OpenBLAS when they start, e.g. in torch or numpy
+# imported after a budget is applied, and in subprocesses.
+THREAD_ENV_VARS = ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS")
+
+
+class ThreadBudget:
+    """The share of the CPU one engine may use."""
+
+    def __init__(
+        self,
+        threads: int,
+        interop_threads: int = 1,
+        cpus: Optional[Sequence[int]] = None,
+    ):
+        """Initialize the budget.
+
+        Args:
+            threads: Intra-op threads (torch.set_num_threads)
+            interop_threads: Inter-op threads (torch.set_num_interop_threads)
+            cpus: Cores the engine is pinned to (None: not pinned)
+        """
+        self.threads = max(1, threads)
+        self.interop_threads = max(1, interop_threads)
+        self.cpus = sorted(cpus) if cpus is not None else None
+
+    def __repr__(self) -> str:
+        return (
+            f"ThreadBudget(threads={self.threads}, "
+            f"interop_threads={self.interop_threads}, cpus={self.cpus})"
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(vars(self))
+
+    def apply(self) -> None:
+        """Limit a process that runs one engine, and what it starts, to this budget.
+
+        Applies both the process-wide settings (apply_to_process) and the
+        calling thread's (apply_to_thread).
+        """
+        self.apply_to_process()
+        self.apply_to_thread()
+
+    def apply_to_process(self) -> None:
+        """Set the limits every thread of the process shares.
+
+        Sets the thread-count environment variables for libraries loaded
+        later, and torch's inter-op pool if torch is already imported. Call
+        it once per process; engines sharing a process (see serve) then
+        apply only their own thread's settings.
+        """
+        for name in THREAD_ENV_VARS:
+            os.environ[name] = str(self.threads)
+        torch = _loaded_torch()
+        if torch is not None:
+            try:
+                torch.set_num_interop_threads(self.interop_threads)
+            except RuntimeError:
+                pass  # only settable once per process, before any parallel work
+
+    def apply_to_thread(self) -> None:
+        """Limit the calling thread, and the threads it starts later.
+
+        Pins the thread to `cpus` where the OS supports it (Linux); threads
+        and processes started from it afterwards inherit the pinning. Sets
+        torch's intra-op thread count if torch is already imported.
+        """
+        if self.cpus is not None and hasattr(os, "sched_setaffinity"):
+            os.sched_setaffinity(0, self.cpus)
+        torch = _loaded_torch()
+        if torch is not None:
+            torch.set_num_threads(self.threads)
+
+    @contextmanager
+    def applied(self) -> Iterator["ThreadBudget"]:
+        """Apply the thread's budget inside the block, then restore its pinning.
+
+        For work done on a shared thread, such as loading a worker's model
+        from the main thread; the intra-op thread count stays set.
+        """
+        previous = available_cpus()
+        self.apply_to_thread()
+        try:
+            yield self
+        finally:
+            if self.cpus is not None and hasattr(os, "sched_setaffinity"):
+                os.sched_setaffinity(0, previous)
+
+
+def _loaded_torch() -> Any:
+    # Importing torch here would slow down engines that never use it.
+    return sys.modules.get("torch")
+
+
+def available_cpus() -> List[int]:
+    """Return the cores this process may run on."""
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def available_memory_bytes() -> Optional[int]:
+    """Return the memory available to new processes, or None if unknown."""
+    try:
+        with open("/proc/meminfo", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (AttributeError, OSError, ValueError):
+        return None
+
+
+def cuda_device_count() -> int:
+    """Return how many CUDA devices torch sees, or 0 if torch is missing."""
+    if find_spec("torch") is None:
+        return 0
+    import torch
+
+    return int(torch.cuda.device_count())
+
+
+def worker_memory_bytes(model: str) -> int:
+    """Estimate the peak memory of one engine running a model."""
+    weights = MODEL_SIZES_MB.get(model, MODEL_SIZES_MB["base"])
+    return (weights * WEIGHT_MEMORY_FACTOR + WORKER_OVERHEAD_MB) * 1024 * 1024
+
+
+def plan_workers(
+    model: str,
+    cpus: Optional[Sequence[int]] = None,
+    memory_bytes: Optional[int] = None,
+    threads: Optional[int] = None,
+    device: str = "cpu",
+) -> int:
+    """Choose how many engines to run at once.
+
+    Args:
+        model: Model every engine loads
+        cpus: Cores to share (default: those available to this process)
+        memory_bytes: Memory to share (default: what the OS reports free)
+        threads: Threads each engine gets (default: MIN_THREADS_PER_WORKER)
+        device: Device the engines run on; "cuda" and "auto" (when torch
+            sees a GPU) plan one engine per GPU, a numbered GPU just one
+
+    Returns:
+        As many engines as both the cores and the memory hold, at least 1
+    """
+    if device != "cpu":
+        gpus = cuda_device_count() if device in ("cuda", "auto") else 1
+        if gpus or device != "auto":
+            return max(1, gpus)
+    cores = len(cpus) if cpus is not None else len(available_cpus())
+    workers = max(1, cores // (threads or MIN_THREADS_PER_WORKER))
+    if memory_bytes is None:
+        memory_bytes = available_memory_bytes()
+    if memory_bytes is not None:
+        workers = min(workers, memory_bytes // worker_memory_bytes(model))
+    return max(1, int(workers))
+
+
+def plan_budgets(
+    workers: int,
+    cpus: Optional[Sequence[int]] = None,
+    threads: Optional[int] = None,
+    pin: bool = False,
+) -> List[ThreadBudget]:
+    """Divide the cores between engines.
+
+    Each engine gets a contiguous run of cores (neighbouring core numbers
+    usually share caches and a socket), so with `pin` no two engines run
+    on the same core unless there are more engines than cores.
+
+    Args:
+        workers: Engines running at once
+        cpus: Cores to share (default: those available to this process)
+        threads: Intra-op threads per engine (default: its share of cores)
+        pin: Pin every engine to its share of the cores
+
+    Returns:
+        One budget per engine
+    """
+    cpus = sorted(cpus) if cpus is not None else available_cpus()
+    workers = max(1, workers)
+    budgets: List[ThreadBudget] = []
+    for index in range(workers):
+        if workers <= len(cpus):
+            share = cpus[
+                index * len(cpus) // workers : (index + 1) * len(cpus) // workers
+            ]
+        else:
+            share = [cpus[index % len(cpus)]]
+        budgets.append(ThreadBudget(threads or len(share), cpus=share if pin else None))
+    return budgets
+
+
+def plan_devices(device: str, workers: int) -> List[str]:
+    """Give each engine a device, spreading "cuda" and "auto" over the GPUs.
+
+    Args:
+        device: Device the engines run on
+        workers: Engines running at once
+
+    Returns:
+        One device per engine: "cuda:<n>" in turn when there are several
+        GPUs, otherwise `device` itself
+    """
+    workers = max(1, workers)
+    gpus = cuda_device_count() if device in ("cuda", "auto") else 0
+    if gpus <= 1:
+        return [device] * workers
+    return [f"cuda:{index % gpus}" for index in range(workers)]
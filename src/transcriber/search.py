@@ -0,0 +1,355 @@
+"""Full-text search over an archive of transcript files.
+
+`TranscriptIndex` keeps an SQLite database with one row per transcript
+segment and an FTS5 inverted index over their text, so a query returns the
+file and timecode of every hit. Updating the index re-reads only files whose
+size or modification time changed since the last update.
+"""
+
+import json
+import os
+import re
+import sqlite3
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+try:
+    from transcriber.cache import default_cache_dir
+except ImportError:
+    from .cache import default_cache_dir
+
+TRANSCRIPT_DIR_ENV = "WHISPER_TRANSCRIBER_TRANSCRIPT_DIR"
+SCHEMA_VERSION = 1
+
+# Transcript formats read, best first. When one transcription was saved in
+# several formats (meeting.json, meeting.srt) only the best file is indexed.
+SOURCE_FORMATS = (".json", ".srt", ".vtt", ".txt")
+
+# (start seconds, end seconds, text); times are None for plain text.
+Segment = Tuple[Optional[float], Optional[float], str]
+# A subtitle cue being parsed: start, end and its text lines.
+_Cue = Tuple[float, float, List[str]]
+
+_TIMESTAMP = re.compile(r"(?:(\d+):)?(\d{1,2}):(\d{1,2})(?:[.,](\d{1,3}))?")
+
+_SCHEMA = """
+CREATE TABLE files (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL
+);
+CREATE TABLE segments (
+    id INTEGER PRIMARY KEY,
+    file_id INTEGER NOT NULL,
+    start_seconds REAL,
+    end_seconds REAL,
+    text TEXT NOT NULL
+);
+CREATE INDEX segments_by_file ON segments (file_id);
+CREATE VIRTUAL TABLE segments_fts USING fts5 (
+    text,
+    content = 'segments',
+    content_rowid = 'id',
+    tokenize = 'unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER segments_insert AFTER INSERT ON segments BEGIN
+    INSERT INTO segments_fts (rowid, text) VALUES (new.id, new.text);
+END;
+CREATE TRIGGER segments_delete AFTER DELETE ON segments BEGIN
+    INSERT INTO segments_fts (segments_fts, rowid, text)
+    VALUES ('delete', old.id, old.text);
+END;
+"""
+
+
+def default_transcript_dir() -> Path:
+    """Return the transcript archive ($WHISPER_TRANSCRIBER_TRANSCRIPT_DIR).
+
+    Defaults to ~/Documents/Transcripts, where the shell script saves.
+    """
+    configured = os.environ.get(TRANSCRIPT_DIR_ENV)
+    if configured:
+        return Path(configured).expanduser()
+    return Path.home() / "Documents" / "Transcripts"
+
+
+def default_index_path() -> Path:
+    """Return the index database path inside the cache directory."""
+    return default_cache_dir() / "search.sqlite"
+
+
+def find_transcripts(root: Union[str, Path]) -> Dict[str, os.stat_result]:
+    """Find the transcript files under a directory.
+
+    Args:
+        root: Directory searched recursively; hidden directories are skipped
+
+    Returns:
+        Mapping of absolute path to its stat result, one file per transcript
+    """
+    best: Dict[str, Tuple[int, str]] = {}
+    for directory, subdirectories, files in os.walk(Path(root).resolve()):
+        subdirectories[:] = [d for d in subdirectories if not d.startswith(".")]
+        for name in files:
+            stem, suffix = os.path.splitext(os.path.join(directory, name))
+            rank = _format_rank(suffix)
+            if rank is not None and (stem not in best or rank < best[stem][0]):
+                best[stem] = (rank, stem + suffix)
+
+    found: Dict[str, os.stat_result] = {}
+    for _, path in best.values():
+        try:
+            found[path] = os.stat(path)
+        except OSError:
+            continue
+    return found
+
+
+def _format_rank(suffix: str) -> Optional[int]:
+    try:
+        return SOURCE_FORMATS.index(suffix.lower())
+    except ValueError:
+        return None
+
+
+def read_transcript(path: Union[str, Path]) -> List[Segment]:
+    """Read the timed segments of a JSON, SRT, VTT or text transcript.
+
+    JSON files without a "segments" list (other tools' files) give no
+    segments; text files give one untimed segment per non-empty line.
+    """
+    path = Path(path)
+    suffix = path.suffix.lower()
+    with open(path, encoding="utf-8", errors="replace") as f:
+        if suffix == ".json":
+            return _json_segments(json.load(f))
+        text = f.read()
+    if suffix in (".srt", ".vtt"):
+        return parse_subtitles(text)
+    return [(None, None, line.strip()) for line in text.splitlines() if line.strip()]
+
+
+def _json_segments(data: Any) -> List[Segment]:
+    if not isinstance(data, dict) or not isinstance(data.get("segments"), list):
+        return []
+    segments: List[Segment] = []
+    for segment in data["segments"]:
+        if not isinstance(segment, dict):
+            continue
+        text = str(segment.get("text") or "").strip()
+        if text:
+            segments.append(
+                (_number(segment.get("start")), _number(segment.get("end")), text)
+            )
+    return segments
+
+
+def _number(value: Any) -> Optional[float]:
+    return float(value) if isinstance(value, (int, float)) else None
+
+
+def parse_subtitles(text: str) -> List[Segment]:
+    """Parse SRT or WebVTT cues, accepting "," or "." before milliseconds."""
+    cues: List[_Cue] = []
+    lines: Optional[List[str]] = None
+    for line in text.splitlines():
+        if "-->" in line:
+            start, _, end = line.partition("-->")
+            try:
+                cue: _Cue = (_seconds(start), _seconds(end), [])
+            except ValueError:
+                lines = None
+                continue
+            cues.append(cue)
+            lines = cue[2]
+        elif not line.strip():
+            lines = None
+        elif lines is not None:
+            lines.append(line.strip())
+    return [(start, end, " ".join(lines)) for start, end, lines in cues if lines]
+
+
+def _seconds(timestamp: str) -> float:
+    match = _TIMESTAMP.search(timestamp)
+    if match is None:
+        raise ValueError(f"Not a timestamp: {timestamp!r}")
+    hours, minutes, seconds, millis = match.groups()
+    return (
+        int(hours or 0) * 3600
+        + int(minutes) * 60
+        + int(seconds)
+        + int((millis or "0").ljust(3, "0")) / 1000
+    )
+
+
+def phrase_query(text: str) -> str:
+    """Quote text as one FTS5 phrase: its words, in order, next to each other."""
+    return '"' + text.replace('"', '""') + '"'
+
+
+class TranscriptIndex:
+    """Incremental full-text index of transcript segments."""
+
+    def __init__(self, path: Optional[Path] = None):
+        """Open the index, creating it if needed.
+
+        Args:
+            path: Database file (default: <cache dir>/search.sqlite)
+
+        Raises:
+            RuntimeError: If this Python's SQLite lacks the FTS5 extension
+        """
+        self.path = Path(path) if path else default_index_path()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(self.path), timeout=30)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        version = self._db.execute("PRAGMA user_version").fetchone()[0]
+        if version != SCHEMA_VERSION:
+            self._create()
+
+    def _create(self) -> None:
+        with self._db:
+            for table in ("segments_fts", "segments", "files"):
+                self._db.execute(f"DROP TABLE IF EXISTS {table}")
+            try:
+                self._db.executescript(_SCHEMA)
+            except sqlite3.OperationalError as e:
+                raise RuntimeError(
+                    f"SQLite {sqlite3.sqlite_version} cannot build the index: {e}"
+                ) from e
+            self._db.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def close(self) -> None:
+        """Close the database."""
+        self._db.close()
+
+    def __enter__(self) -> "TranscriptIndex":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def rebuild(self) -> None:
+        """Drop everything indexed so the next update re-reads every file."""
+        self._create()
+
+    def update(self, roots: Iterable[Union[str, Path]]) -> Dict[str, int]:
+        """Bring the index up to date with the transcripts under some directories.
+
+        Files indexed before that are no longer under these directories'
+        transcripts are dropped; files under other directories are kept.
+
+        Args:
+            roots: Directories searched recursively
+
+        Returns:
+            Counts of "added", "updated", "removed" and "unchanged" files
+        """
+        roots = [Path(root).resolve() for root in roots]
+        found: Dict[str, os.stat_result] = {}
+        for root in roots:
+            found.update(find_transcripts(root))
+        prefixes = tuple(os.path.join(str(root), "") for root in roots)
+
+        counts = dict.fromkeys(("added", "updated", "removed", "unchanged"), 0)
+        with self._db:
+            known = {
+                path: (file_id, size, mtime_ns)
+                for file_id, path, size, mtime_ns in self._db.execute(
+                    "SELECT id, path, size, mtime_ns FROM files"
+                )
+            }
+            for path, (file_id, _, _) in known.items():
+                if path not in found and path.startswith(prefixes):
+                    self._drop(file_id)
+                    counts["removed"] += 1
+
+            for path, stat in found.items():
+                entry = known.get(path)
+                if entry and entry[1:] == (stat.st_size, stat.st_mtime_ns):
+                    counts["unchanged"] += 1
+                    continue
+                try:
+                    segments = read_transcript(path)
+                except (OSError, ValueError):
+                    segments = []  # recorded anyway, so it is retried only once changed
+                if entry:
+                    file_id = entry[0]
+                    self._db.execute(
+                        "DELETE FROM segments WHERE file_id = ?", (file_id,)
+                    )
+                    self._db.execute(
+                        "UPDATE files SET size = ?, mtime_ns = ? WHERE id = ?",
+                        (stat.st_size, stat.st_mtime_ns, file_id),
+                    )
+                    counts["updated"] += 1
+                else:
+                    cursor = self._db.execute(
+                        "INSERT INTO files (path, size, mtime_ns) VALUES (?, ?, ?)",
+                        (path, stat.st_size, stat.st_mtime_ns),
+                    )
+                    file_id = cursor.lastrowid
+                    counts["added"] += 1
+                self._db.executemany(
+                    "INSERT INTO segments (file_id, start_seconds, end_seconds, text)"
+                    " VALUES (?, ?, ?, ?)",
+                    ((file_id, start, end, text) for start, end, text in segments),
+                )
+        return counts
+
+    def _drop(self, file_id: int) -> None:
+        self._db.execute("DELETE FROM segments WHERE file_id = ?", (file_id,))
+        self._db.execute("DELETE FROM files WHERE id = ?", (file_id,))
+
+    def search(
+        self,
+        query: str,
+        limit: int = 20,
+        raw: bool = False,
+        marks: Tuple[str, str] = ("", ""),
+    ) -> List[Dict[str, Any]]:
+        """Find the segments matching a query, best match first.
+
+        Args:
+            query: Words to find as a phrase, or an FTS5 query if `raw`
+            limit: Most hits returned
+            raw: Pass the query to FTS5 unchanged (AND, OR, NEAR, prefix*)
+            marks: Strings put around matched words in each hit's "highlighted"
+
+        Returns:
+            Hits with "path", "start", "end", "text" and "highlighted"
+
+        Raises:
+            ValueError: If the query is empty or not valid FTS5 syntax
+        """
+        if not query.strip():
+            raise ValueError("Empty search query")
+        try:
+            rows = self._db.execute(
+                "SELECT files.path, segments.start_seconds, segments.end_seconds,"
+                " segments.text, highlight(segments_fts, 0, ?, ?)"
+                " FROM segments_fts"
+                " JOIN segments ON segments.id = segments_fts.rowid"
+                " JOIN files ON files.id = segments.file_id"
+                " WHERE segments_fts MATCH ? ORDER BY rank LIMIT ?",
+                (*marks, query if raw else phrase_query(query), limit),
+            ).fetchall()
+        except sqlite3.OperationalError as e:
+            raise ValueError(f"Invalid search query {query!r}: {e}") from None
+        return [
+            {
+                "path": path,
+                "start": start,
+                "end": end,
+                "text": text,
+                "highlighted": highlighted,
+            }
+            for path, start, end, text, highlighted in rows
+        ]
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the database path and the numbers of files and segments."""
+        files = self._db.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+        segments = self._db.execute("SELECT COUNT(*) FROM segments").fetchone()[0]
+        return {"path": str(self.path), "files": files, "segments": segments}
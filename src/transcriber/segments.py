@@ -0,0 +1,359 @@
+"""Compact columnar storage for transcript segments.
+
+A day-long recording yields tens of thousands of segments, and as Python
+dicts each one costs about a kilobyte: a dict, boxed floats, a token list of
+boxed ints and a string. `SegmentStore` keeps the same data as a handful of
+NumPy arrays, one flat token array with offsets and a single text buffer,
+and hands out ordinary segment dicts only while they are being read.
+"""
+
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Union,
+)
+
+import numpy as np
+
+FLOAT_FIELDS = (
+    "start",
+    "end",
+    "temperature",
+    "avg_logprob",
+    "compression_ratio",
+    "no_speech_prob",
+)
+INT_FIELDS = ("id", "seek")
+# Word timings are stored as columns when every word has exactly these keys.
+WORD_FIELDS = (("word", "start", "end", "probability"), ("word", "start", "end"))
+
+
+class SegmentStore:
+    """Read-only sequence of segments backed by columns.
+
+    Indexing and iteration yield segment dicts equal to the ones the store
+    was built from, with keys in the same order, so code written for a list
+    of dicts keeps working. Fields every segment carries with a plain value
+    (timestamps, probabilities, ids, text, tokens and words) are stored as
+    columns; anything else is kept per segment as given.
+    """
+
+    def __init__(self, segments: Sequence[Mapping[str, Any]] = ()):
+        """Build a store from segment dicts.
+
+        Args:
+            segments: Segments as produced by a backend or stitch_results
+        """
+        self._count = len(segments)
+        self._keys: List[str] = list(segments[0]) if self._count else []
+        self._floats: Dict[str, np.ndarray] = {}
+        self._ints: Dict[str, np.ndarray] = {}
+        self._text: Optional[str] = None
+        self._text_offsets = np.zeros(1, dtype=np.int64)
+        self._tokens: Optional[np.ndarray] = None
+        self._token_offsets = np.zeros(1, dtype=np.int64)
+        self._words: Optional[Dict[str, Any]] = None
+        self._extras: List[Optional[Dict[str, Any]]] = []
+
+        columnar = {key for key in self._keys if _is_column(key, segments)}
+        self._columns = columnar
+        for key in self._keys:
+            if key not in columnar:
+                continue
+            values = [segment[key] for segment in segments]
+            if key in FLOAT_FIELDS:
+                self._floats[key] = np.array(values, dtype=np.float64)
+            elif key in INT_FIELDS:
+                self._ints[key] = np.array(values, dtype=np.int64)
+            elif key == "text":
+                self._text = "".join(values)
+                self._text_offsets = _offsets(len(text) for text in values)
+            elif key == "tokens":
+                self._token_offsets = _offsets(len(tokens) for tokens in values)
+                tokens = np.fromiter(
+                    (token for tokens in values for token in tokens),
+                    dtype=np.int64,
+                    count=int(self._token_offsets[-1]),
+                )
+                # Vocabularies fit in 32 bits; the check keeps odd ids exact.
+                fits = (
+                    not len(tokens) or -(2**31) <= tokens.min() <= tokens.max() < 2**31
+                )
+                self._tokens = tokens.astype(np.int32) if fits else tokens
+            elif key == "words":
+                self._words = _word_columns(values)
+
+        # Values not stored as columns, kept per segment; None for the usual
+        # segment that has none.
+        for segment in segments:
+            extra = {k: v for k, v in segment.items() if k not in columnar}
+            self._extras.append(extra or None)
+
+    @classmethod
+    def from_segments(
+        cls, segments: Union["SegmentStore", Sequence[Mapping[str, Any]]]
+    ) -> "SegmentStore":
+        """Return `segments` as a store, reusing it if it already is one."""
+        return segments if isinstance(segments, SegmentStore) else cls(segments)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return self.iter_segments()
+
+    def __getitem__(self, index: Any) -> Any:
+        if isinstance(index, slice):
+            return [self._segment(i, self._keys) for i in range(self._count)[index]]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("segment index out of range")
+        return self._segment(index, self._keys)
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, (SegmentStore, list, tuple)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"<SegmentStore {self._count} segments, {self.nbytes} bytes>"
+
+    def iter_segments(
+        self, fields: Optional[Sequence[str]] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """Yield segment dicts, optionally with only some of the fields.
+
+        Args:
+            fields: Keys to include (default: all); writers that only need
+                timestamps and text skip building token and word lists
+
+        Yields:
+            One freshly built dict per segment
+        """
+        keys = self._keys if fields is None else [k for k in self._keys if k in fields]
+        for index in range(self._count):
+            yield self._segment(index, keys, fields)
+
+    def tolist(self) -> List[Dict[str, Any]]:
+        """Return the legacy list of segment dicts (also used by json_default)."""
+        return list(self)
+
+    def to_arrays(self) -> Tuple[Dict[str, np.ndarray], Dict[str, Any]]:
+        """Return the columns as named arrays plus a JSON-able layout.
+
+        Text buffers are UTF-8 bytes; their offsets count characters of the
+        decoded text. Together they rebuild the store with from_arrays.
+        """
+        arrays: Dict[str, np.ndarray] = {}
+        for key, column in {**self._floats, **self._ints}.items():
+            arrays[f"segment_{key}"] = column
+        if self._text is not None:
+            arrays["text"] = _utf8(self._text)
+            arrays["text_offsets"] = self._text_offsets
+        if self._tokens is not None:
+            arrays["tokens"] = self._tokens
+            arrays["token_offsets"] = self._token_offsets
+        if self._words is not None:
+            arrays["word_offsets"] = self._words["offsets"]
+            arrays["word_text"] = _utf8(self._words["text"])
+            arrays["word_text_offsets"] = self._words["text_offsets"]
+            for key in self._words["keys"][1:]:
+                arrays[f"word_{key}"] = self._words[key]
+        layout = {
+            "count": self._count,
+            "keys": self._keys,
+            "columns": [key for key in self._keys if key in self._columns],
+            "word_keys": list(self._words["keys"]) if self._words else None,
+            "extras": {str(i): extra for i, extra in enumerate(self._extras) if extra},
+        }
+        return arrays, layout
+
+    @classmethod
+    def from_arrays(
+        cls, arrays: Mapping[str, np.ndarray], layout: Mapping[str, Any]
+    ) -> "SegmentStore":
+        """Rebuild a store from the output of to_arrays."""
+        store = cls()
+        store._count = layout["count"]
+        store._keys = list(layout["keys"])
+        store._columns = set(layout["columns"])
+        for key in store._columns:
+            if key in FLOAT_FIELDS:
+                store._floats[key] = arrays[f"segment_{key}"]
+            elif key in INT_FIELDS:
+                store._ints[key] = arrays[f"segment_{key}"]
+        if "text" in store._columns:
+            store._text = bytes(arrays["text"]).decode("utf-8")
+            store._text_offsets = arrays["text_offsets"]
+        if "tokens" in store._columns:
+            store._tokens = arrays["tokens"]
+            store._token_offsets = arrays["token_offsets"]
+        if "words" in store._columns:
+            word_keys = tuple(layout["word_keys"])
+            store._words = {
+                "keys": word_keys,
+                "offsets": arrays["word_offsets"],
+                "text": bytes(arrays["word_text"]).decode("utf-8"),
+                "text_offsets": arrays["word_text_offsets"],
+            }
+            for key in word_keys[1:]:
+                store._words[key] = arrays[f"word_{key}"]
+        extras = layout.get("extras") or {}
+        store._extras = [extras.get(str(i)) for i in range(store._count)]
+        return store
+
+    @property
+    def text(self) -> str:
+        """Concatenated text of all segments."""
+        return self._text or ""
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held by the store's columns."""
+        arrays = [self._text_offsets, self._token_offsets]
+        arrays += list(self._floats.values()) + list(self._ints.values())
+        if self._tokens is not None:
+            arrays.append(self._tokens)
+        if self._words is not None:
+            arrays += [v for v in self._words.values() if isinstance(v, np.ndarray)]
+        texts = [self._text or ""] + ([self._words["text"]] if self._words else [])
+        text_bytes = sum(len(text.encode("utf-8")) for text in texts)
+        return sum(a.nbytes for a in arrays) + text_bytes
+
+    def _segment(
+        self, index: int, keys: Sequence[str], fields: Optional[Sequence[str]] = None
+    ) -> Dict[str, Any]:
+        segment: Dict[str, Any] = {}
+        extra = self._extras[index] or {}
+        for key in keys:
+            if key not in self._columns:
+                if key in extra:
+                    segment[key] = extra[key]
+            elif key in self._floats:
+                segment[key] = float(self._floats[key][index])
+            elif key in self._ints:
+                segment[key] = int(self._ints[key][index])
+            elif key == "text":
+                start, end = self._text_offsets[index : index + 2]
+                segment[key] = self.text[start:end]
+            elif key == "tokens":
+                assert self._tokens is not None
+                start, end = self._token_offsets[index : index + 2]
+                segment[key] = self._tokens[start:end].tolist()
+            elif key == "words":
+                segment[key] = self._segment_words(index)
+        for key, value in extra.items():
+            # Keys the first segment did not have go last.
+            if key not in segment and (fields is None or key in fields):
+                segment[key] = value
+        return segment
+
+    def _segment_words(self, index: int) -> List[Dict[str, Any]]:
+        words = self._words
+        assert words is not None
+        first, last = words["offsets"][index : index + 2]
+        text, text_offsets = words["text"], words["text_offsets"]
+        numbers = [(key, words[key]) for key in words["keys"][1:]]
+        segment_words = []
+        for i in range(first, last):
+            word: Dict[str, Any] = {"word": text[text_offsets[i] : text_offsets[i + 1]]}
+            for key, column in numbers:
+                word[key] = float(column[i])
+            segment_words.append(word)
+        return segment_words
+
+
+def compact_result(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Replace a result's segment list with a SegmentStore, in place."""
+    segments = result.get("segments")
+    if segments is not None:
+        result["segments"] = SegmentStore.from_segments(segments)
+    return result
+
+
+def legacy_result(result: Mapping[str, Any]) -> Dict[str, Any]:
+    """Return a copy of a result with its segments as a list of dicts."""
+    legacy = dict(result)
+    segments = legacy.get("segments")
+    if isinstance(segments, SegmentStore):
+        legacy["segments"] = segments.tolist()
+    return legacy
+
+
+def _utf8(text: str) -> np.ndarray:
+    return np.frombuffer(text.encode("utf-8"), dtype=np.uint8)
+
+
+def _offsets(lengths: Iterator[int]) -> np.ndarray:
+    """Return cumulative offsets (n + 1 entries, starting at 0) for lengths."""
+    return np.concatenate(([0], np.cumsum(np.fromiter(lengths, dtype=np.int64))))
+
+
+def _is_column(key: str, segments: Sequence[Mapping[str, Any]]) -> bool:
+    """Whether every segment holds a value of the column's type under `key`.
+
+    Checks look at the set of value types rather than at every value, so
+    they stay cheap for hundreds of thousands of words and tokens.
+    """
+    if not all(key in segment for segment in segments):
+        return False
+    values = [segment[key] for segment in segments]
+    if key in FLOAT_FIELDS:
+        return _all_numbers(values)
+    if key in INT_FIELDS:
+        return _all_numbers(values, integer=True)
+    if key == "text":
+        return _types(values) <= {str}
+    if key == "tokens":
+        return _types(values) <= {list} and _all_numbers(
+            (token for tokens in values for token in tokens), integer=True
+        )
+    if key == "words":
+        if not _types(values) <= {list}:
+            return False
+        words = [word for segment_words in values for word in segment_words]
+        if not _types(words) <= {dict}:
+            return False
+        layouts = {tuple(word) for word in words}
+        if len(layouts) > 1 or not layouts <= set(WORD_FIELDS):
+            return False
+        return _types(word["word"] for word in words) <= {str} and all(
+            _all_numbers(word[k] for word in words) for k in next(iter(layouts), ())[1:]
+        )
+    return False
+
+
+def _types(values: Iterable[Any]) -> Set[type]:
+    return set(map(type, values))
+
+
+def _all_numbers(values: Iterable[Any], integer: bool = False) -> bool:
+    allowed = (int, np.integer) if integer else (int, float, np.integer, np.floating)
+    return all(
+        issubclass(kind, allowed) and not issubclass(kind, bool)
+        for kind in _types(values)
+    )
+
+
+def _word_columns(values: Sequence[List[Dict[str, Any]]]) -> Dict[str, Any]:
+    """Return flat word columns with per-segment offsets."""
+    words = [word for segment_words in values for word in segment_words]
+    keys = tuple(words[0]) if words else WORD_FIELDS[0]
+    columns: Dict[str, Any] = {
+        "keys": keys,
+        "offsets": _offsets(len(segment_words) for segment_words in values),
+        "text": "".join(word["word"] for word in words),
+        "text_offsets": _offsets(len(word["word"]) for word in words),
+    }
+    for key in keys[1:]:
+        columns[key] = np.array([word[key] for word in words], dtype=np.float64)
+    return columns
@@ -0,0 +1,722 @@
+"""Long-running transcription service with warm models and a bounded job queue.
+
+`TranscriptionService` keeps one warm `TranscriptionEngine` per worker and
+runs jobs from a queue shared by all models, rejecting new jobs when it is
+full. `make_server` exposes it over HTTP on a TCP port or a Unix socket:
+
+    POST /jobs                       submit (JSON {"path": ...} or raw audio body)
+    GET  /jobs/<id>                  job status
+    GET  /jobs/<id>/transcript       transcript (?format=txt|srt|vtt|json|...)
+    GET  /health                     queue and worker statistics
+
+The JSON {"path": ...} form reads a file on the server's disk, so it is
+only accepted for files inside the directories given as `allow_dirs`.
+"""
+
+import io
+import json
+import os
+import queue
+import shutil
+import socket
+import socketserver
+import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from operator import attrgetter
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union, cast
+from urllib.parse import parse_qs, urlparse
+
+try:
+    from transcriber.cache import TranscriptCache
+    from transcriber.engine import DEFAULT_BATCH_SIZE, TranscriptionEngine
+    from transcriber.formatters import (
+        available_formats,
+        get_formatter,
+        json_default,
+        write_result,
+    )
+    from transcriber.registry import ModelRegistry
+    from transcriber.scheduler import ThreadBudget, plan_budgets
+except ImportError:
+    from .cache import TranscriptCache
+    from .engine import DEFAULT_BATCH_SIZE, TranscriptionEngine
+    from .formatters import (
+        available_formats,
+        get_formatter,
+        json_default,
+        write_result,
+    )
+    from .registry import ModelRegistry
+    from .scheduler import ThreadBudget, plan_budgets
+
+CONTENT_TYPES = {
+    "json": "application/json",
+    "npz": "application/x-npz",
+    "srt": "application/x-subrip",
+    "vtt": "text/vtt",
+}
+
+# Seconds a connection may stall while sending a request before it is dropped.
+REQUEST_TIMEOUT = 60.0
+
+EngineFactory = Callable[[str], TranscriptionEngine]
+
+
+class QueueFull(Exception):
+    """The job queue is at capacity; retry later."""
+
+
+class IncompleteUpload(ValueError):
+    """The client sent less audio than its Content-Length announced."""
+
+
+class PathNotAllowed(ValueError):
+    """A submitted local path is outside every allowed directory."""
+
+
+class Job:
+    """One transcription request and its outcome."""
+
+    def __init__(
+        self,
+        path: Path,
+        model: str,
+        language: Optional[str] = None,
+        vad: bool = True,
+        cleanup: bool = False,
+    ):
+        self.id = uuid.uuid4().hex
+        self.path = path
+        self.model = model
+        self.language = language
+        self.vad = vad
+        self.cleanup = cleanup
+        self.status = "queued"
+        self.created = time.time()
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self.error: Optional[str] = None
+        self.result: Optional[Dict[str, Any]] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Describe the job for API responses (without the transcript)."""
+        info: Dict[str, Any] = {
+            "id": self.id,
+            "status": self.status,
+            "model": self.model,
+            "created": self.created,
+            "started": self.started,
+            "finished": self.finished,
+        }
+        if self.error is not None:
+            info["error"] = self.error
+        if self.result is not None:
+            info["language"] = self.result.get("language")
+            info["segments"] = len(self.result.get("segments", []))
+        return info
+
+
+class TranscriptionService:
+    """Runs queued jobs on warm engines with a fixed number of workers per model."""
+
+    def __init__(
+        self,
+        models: Dict[str, int],
+        backend: str = "whisper",
+        device: str = "cpu",
+        max_queue: int = 16,
+        cache: Optional[TranscriptCache] = None,
+        keep_jobs: int = 1000,
+        engine_factory: Optional[EngineFactory] = None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        threads: Optional[int] = None,
+        pin: bool = False,
+    ):
+        """Initialize the service.
+
+        Args:
+            models: Model name to number of concurrent workers; only these
+                models are served
+            backend: Inference backend for every model
+            device: Device to run on
+            max_queue: Jobs allowed to wait for a worker; submit raises
+                QueueFull beyond this
+            cache: Transcript cache shared by all workers
+            keep_jobs: Finished jobs remembered for status/transcript requests
+            engine_factory: Builds an engine for a model (default: a
+                TranscriptionEngine with its own model copy per worker)
+            batch_size: Most queued jobs a worker takes at once; short ones
+                share model batches (see TranscriptionEngine.transcribe_many)
+            threads: CPU threads per worker (default: the available cores
+                divided between all workers of all models)
+            pin: Pin each worker to its own cores (Linux)
+        """
+        if not models:
+            raise ValueError("At least one model must be served")
+        self.models = dict(models)
+        self.backend = backend
+        self.device = device
+        self.max_queue = max_queue
+        self.cache = cache
+        self.keep_jobs = keep_jobs
+        self.engine_factory = engine_factory or self._default_engine
+        self.batch_size = max(batch_size, 1)
+        self.budgets = plan_budgets(sum(self.models.values()), threads=threads, pin=pin)
+        self.spool_dir = Path(tempfile.mkdtemp(prefix="whisper_serve_"))
+
+        self._jobs: OrderedDict[str, Job] = OrderedDict()
+        self._queues: Dict[str, queue.Queue[Optional[Job]]] = {
+            model: queue.Queue() for model in self.models
+        }
+        self._queued = 0
+        self._running = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._lock = threading.Lock()
+        self._workers: List[threading.Thread] = []
+        self._engines: List[TranscriptionEngine] = []
+
+    def _default_engine(self, model: str) -> TranscriptionEngine:
+        # A private registry gives each worker its own model instance, so
+        # concurrent jobs never share a model's decoding state. Finished jobs
+        # keep their results, so their segments are stored compactly.
+        return TranscriptionEngine(
+            model=model,
+            device=self.device,
+            backend=self.backend,
+            cache=self.cache,
+            registry=ModelRegistry(),
+            compact=True,
+        )
+
+    def start(self) -> None:
+        """Load every worker's model, then start taking jobs."""
+        # The workers are threads of one process: the thread-count variables
+        # and torch's inter-op pool are set once, then each worker applies
+        # only its own thread's pinning and intra-op threads.
+        max(self.budgets, key=attrgetter("threads")).apply_to_process()
+        for model, concurrency in self.models.items():
+            for index in range(concurrency):
+                budget = self.budgets[len(self._workers)]
+                with budget.applied():
+                    engine = self.engine_factory(model)
+                self._engines.append(engine)
+                worker = threading.Thread(
+                    target=self._work,
+                    args=(model, engine, budget),
+                    name=f"serve-{model}-{index}",
+                    daemon=True,
+                )
+                self._workers.append(worker)
+        for worker in self._workers:
+            worker.start()
+
+    def submit(
+        self,
+        path: Path,
+        model: Optional[str] = None,
+        language: Optional[str] = None,
+        vad: bool = True,
+        cleanup: bool = False,
+    ) -> Job:
+        """Queue a transcription job.
+
+        Args:
+            path: Audio file to transcribe
+            model: Served model (default: the first one)
+            language: Language code, None to auto-detect
+            vad: Skip silence before inference
+            cleanup: Delete the file once the job has finished
+
+        Returns:
+            The queued job
+
+        Raises:
+            ValueError: If the model is not served
+            QueueFull: If max_queue jobs are already waiting
+        """
+        model = model or next(iter(self.models))
+        if model not in self.models:
+            raise ValueError(
+                f"Model '{model}' is not served. Available: {', '.join(self.models)}"
+            )
+        job = Job(Path(path), model, language=language, vad=vad, cleanup=cleanup)
+        with self._lock:
+            if self._queued >= self.max_queue:
+                self._rejected += 1
+                raise QueueFull(f"Job queue is full ({self.max_queue} waiting)")
+            self._queued += 1
+            self._jobs[job.id] = job
+            self._forget_old_jobs()
+        self._queues[model].put(job)
+        return job
+
+    def ensure_capacity(self) -> None:
+        """Raise QueueFull (and count the rejection) if submit would fail now."""
+        with self._lock:
+            if self._queued >= self.max_queue:
+                self._rejected += 1
+                raise QueueFull(f"Job queue is full ({self.max_queue} waiting)")
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Return a job by id, or None if unknown or forgotten."""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return queue depth, worker counts, job totals and loaded models."""
+        registries = [
+            engine.registry.stats()
+            for engine in self._engines
+            if isinstance(getattr(engine, "registry", None), ModelRegistry)
+        ]
+        with self._lock:
+            return {
+                "models": dict(self.models),
+                "backend": self.backend,
+                "queued": self._queued,
+                "max_queue": self.max_queue,
+                "running": self._running,
+                "completed": self._completed,
+                "failed": self._failed,
+                "rejected": self._rejected,
+                # Each worker has a private registry (see _default_engine).
+                "registry": {
+                    "models": sum(len(s["models"]) for s in registries),
+                    "current_bytes": sum(s["current_bytes"] for s in registries),
+                    "load_seconds": sum(s["load_seconds"] for s in registries),
+                    "evictions": sum(s["evictions"] for s in registries),
+                },
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the workers after their current job and remove spooled uploads."""
+        for model, concurrency in self.models.items():
+            for _ in range(concurrency):
+                self._queues[model].put(None)
+        if wait:
+            for worker in self._workers:
+                worker.join()
+        shutil.rmtree(self.spool_dir, ignore_errors=True)
+
+    def _forget_old_jobs(self) -> None:
+        # Called with the lock held; only finished jobs are dropped.
+        excess = len(self._jobs) - self.keep_jobs
+        if excess <= 0:
+            return
+        for job_id in [j.id for j in self._jobs.values() if j.finished][:excess]:
+            del self._jobs[job_id]
+
+    def _work(
+        self, model: str, engine: TranscriptionEngine, budget: ThreadBudget
+    ) -> None:
+        budget.apply_to_thread()
+        jobs = self._queues[model]
+        while True:
+            job = jobs.get()
+            if job is None:
+                return
+            # Take whatever else is already waiting, up to a batch.
+            batch = [job]
+            stop = False
+            while len(batch) < self.batch_size:
+                try:
+                    extra = jobs.get_nowait()
+                except queue.Empty:
+                    break
+                if extra is None:
+                    stop = True
+                    break
+                batch.append(extra)
+
+            groups: Dict[Tuple[Optional[str], bool], List[Job]] = {}
+            for job in batch:
+                groups.setdefault((job.language, job.vad), []).append(job)
+            for group in groups.values():
+                self._run(engine, group)
+            if stop:
+                return
+
+    def _run(self, engine: TranscriptionEngine, jobs: List[Job]) -> None:
+        """Run jobs with the same options, batching them when there are several."""
+        with self._lock:
+            self._queued -= len(jobs)
+            self._running += len(jobs)
+        for job in jobs:
+            job.status = "running"
+            job.started = time.time()
+        try:
+            language, vad = jobs[0].language, jobs[0].vad
+            if len(jobs) == 1:
+                results: List[Any] = [
+                    engine.transcribe(str(jobs[0].path), language=language, vad=vad)
+                ]
+            else:
+                results = engine.transcribe_many(
+                    [str(job.path) for job in jobs],
+                    language=language,
+                    vad=vad,
+                    batch_size=self.batch_size,
+                )
+        except Exception as e:
+            results = [e] * len(jobs)
+
+        for job, result in zip(jobs, results):
+            if isinstance(result, Exception):
+                job.error = str(result) or type(result).__name__
+                job.status = "failed"
+            else:
+                job.result = result
+                job.status = "done"
+            job.finished = time.time()
+            if job.cleanup:
+                try:
+                    os.unlink(job.path)
+                except OSError:
+                    pass
+            with self._lock:
+                self._running -= 1
+                if job.status == "done":
+                    self._completed += 1
+                else:
+                    self._failed += 1
+
+
+class _ServiceServer:
+    """What _Handler reads from its server; set by make_server."""
+
+    service: TranscriptionService
+    max_upload_bytes: Optional[int] = None
+    allow_dirs: Tuple[Path, ...] = ()
+    request_timeout: Optional[float] = REQUEST_TIMEOUT
+    verbose = False
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Maps the HTTP API onto a TranscriptionService."""
+
+    server_version = "whisper-transcriber"
+    protocol_version = "HTTP/1.1"
+
+    @property
+    def service(self) -> TranscriptionService:
+        return self._server.service
+
+    def setup(self) -> None:
+        super().setup()
+        # A client that stops sending must not hold a worker thread forever.
+        self.connection.settimeout(self._server.request_timeout)
+
+    @property
+    def _server(self) -> _ServiceServer:
+        return cast(_ServiceServer, self.server)
+
+    def address_string(self) -> str:
+        # Unix socket peers have no (host, port) address, despite the typing.
+        address: Any = self.client_address
+        if isinstance(address, tuple):
+            return str(address[0])
+        return "unix"
+
+    def log_message(self, format: str, *args: Any) -> None:
+        if self._server.verbose:
+            super().log_message(format, *args)
+
+    def do_GET(self) -> None:
+        url = urlparse(self.path)
+        parts = [p for p in url.path.split("/") if p]
+        if parts == ["health"]:
+            self._send_json(HTTPStatus.OK, {"status": "ok", **self.service.stats()})
+            return
+        if len(parts) in (2, 3) and parts[0] == "jobs":
+            job = self.service.get(parts[1])
+            if job is None:
+                self._send_error(HTTPStatus.NOT_FOUND, f"Unknown job {parts[1]}")
+            elif len(parts) == 2:
+                self._send_json(HTTPStatus.OK, job.to_dict())
+            elif parts[2] == "transcript":
+                query = parse_qs(url.query)
+                self._send_transcript(job, query.get("format", ["txt"])[0])
+            else:
+                self._send_error(HTTPStatus.NOT_FOUND, "Not found")
+            return
+        self._send_error(HTTPStatus.NOT_FOUND, "Not found")
+
+    def do_POST(self) -> None:
+        url = urlparse(self.path)
+        if url.path.rstrip("/") != "/jobs":
+            self._send_error(HTTPStatus.NOT_FOUND, "Not found")
+            return
+
+        # Reject before reading an upload so a full queue costs the client
+        # as little as possible.
+        try:
+            self.service.ensure_capacity()
+        except QueueFull:
+            self._reject_full()
+            return
+
+        length = self.headers.get("Content-Length")
+        if length is None:
+            self._send_error(HTTPStatus.LENGTH_REQUIRED, "Content-Length required")
+            return
+        try:
+            size = int(length)
+        except ValueError:
+            size = -1
+        if size < 0:
+            self.close_connection = True
+            self._send_error(
+                HTTPStatus.BAD_REQUEST, f"Invalid Content-Length: {length}"
+            )
+            return
+        max_upload = self._server.max_upload_bytes
+        if max_upload is not None and size > max_upload:
+            self.close_connection = True
+            self._send_error(
+                HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                f"Upload exceeds {max_upload} bytes",
+            )
+            return
+
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        content_type = self.headers.get("Content-Type", "").split(";")[0].strip()
+        path: Optional[Path] = None
+        cleanup = False
+        try:
+            if content_type == "application/json":
+                options = json.loads(self.rfile.read(size) or b"{}")
+                path = self._local_path(options.get("path"))
+            else:
+                options = query
+                path = self._spool(size, query.get("filename", "upload"))
+                cleanup = True
+            job = self.service.submit(
+                path,
+                model=options.get("model"),
+                language=options.get("language"),
+                vad=_as_bool(options.get("vad", True)),
+                cleanup=cleanup,
+            )
+        except (QueueFull, ValueError, socket.timeout) as e:
+            if cleanup and path is not None:
+                os.unlink(path)
+            if isinstance(e, QueueFull):
+                self._reject_full()
+            elif isinstance(e, socket.timeout):
+                self.close_connection = True
+                self._send_error(
+                    HTTPStatus.REQUEST_TIMEOUT, "Timed out reading the request body"
+                )
+            elif isinstance(e, PathNotAllowed):
+                self._send_error(HTTPStatus.FORBIDDEN, str(e))
+            else:
+                if isinstance(e, IncompleteUpload):
+                    self.close_connection = True
+                self._send_error(HTTPStatus.BAD_REQUEST, str(e))
+            return
+
+        self._send_json(
+            HTTPStatus.ACCEPTED,
+            job.to_dict(),
+            headers={"Location": f"/jobs/{job.id}"},
+        )
+
+    def _local_path(self, name: Any) -> Path:
+        """Resolve a submitted local path, which must lie in an allowed directory.
+
+        Raises:
+            PathNotAllowed: If no directory is allowed or the resolved path
+                (after following symlinks) is outside all of them
+            ValueError: If the file does not exist
+        """
+        allow_dirs = self._server.allow_dirs
+        if not allow_dirs:
+            raise PathNotAllowed(
+                "Submitting local paths is disabled; upload the audio instead"
+            )
+        if not name or not isinstance(name, str):
+            raise ValueError(f"File not found: {name}")
+        path = Path(name).resolve()
+        if not any(path == d or d in path.parents for d in allow_dirs):
+            raise PathNotAllowed(f"Path is outside the allowed directories: {name}")
+        if not path.is_file():
+            raise ValueError(f"File not found: {name}")
+        return path
+
+    def _spool(self, size: int, filename: str) -> Path:
+        """Stream the request body into a file in the service's spool dir.
+
+        Raises:
+            IncompleteUpload: If the client sent fewer than `size` bytes; the
+                partial file is removed
+        """
+        suffix = Path(filename).suffix
+        fd, name = tempfile.mkstemp(dir=self.service.spool_dir, suffix=suffix)
+        remaining = size
+        try:
+            with os.fdopen(fd, "wb") as f:
+                while remaining > 0:
+                    chunk = self.rfile.read(min(remaining, 1024 * 1024))
+                    if not chunk:
+                        break
+                    f.write(chunk)
+                    remaining -= len(chunk)
+            if remaining > 0:
+                raise IncompleteUpload(
+                    f"Upload ended after {size - remaining} of {size} bytes"
+                )
+        except BaseException:
+            os.unlink(name)
+            raise
+        return Path(name)
+
+    def _send_transcript(self, job: Job, format: str) -> None:
+        formats = available_formats()
+        if format not in formats:
+            self._send_error(
+                HTTPStatus.BAD_REQUEST,
+                f"Unknown format '{format}'. Available: {', '.join(formats)}",
+            )
+            return
+        if job.status != "done" or job.result is None:
+            self._send_json(HTTPStatus.CONFLICT, job.to_dict())
+            return
+        content_type = CONTENT_TYPES.get(format, "text/plain")
+        if get_formatter(format).binary:
+            binary = io.BytesIO()
+            write_result(job.result, binary, format)
+            self._send_body(HTTPStatus.OK, binary.getvalue(), content_type)
+            return
+        buffer = io.StringIO()
+        write_result(job.result, buffer, format)
+        self._send_body(
+            HTTPStatus.OK,
+            buffer.getvalue().encode("utf-8"),
+            f"{content_type}; charset=utf-8",
+        )
+
+    def _reject_full(self) -> None:
+        # The unread body makes the connection unusable for another request.
+        self.close_connection = True
+        self._send_error(
+            HTTPStatus.TOO_MANY_REQUESTS,
+            "Job queue is full, retry later",
+            headers={"Retry-After": "1", "Connection": "close"},
+        )
+
+    def _send_error(
+        self,
+        status: HTTPStatus,
+        message: str,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> None:
+        self._send_json(status, {"error": message}, headers=headers)
+
+    def _send_json(
+        self,
+        status: HTTPStatus,
+        payload: Dict[str, Any],
+        headers: Optional[Dict[str, str]] = None,
+    ) -> None:
+        body = json.dumps(payload, default=json_default).encode("utf-8")
+        self._send_body(status, body, "application/json", headers)
+
+    def _send_body(
+        self,
+        status: HTTPStatus,
+        body: bytes,
+        content_type: str,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def _as_bool(value: Any) -> bool:
+    if isinstance(value, str):
+        return value.lower() not in ("0", "false", "no", "off")
+    return bool(value)
+
+
+class _TCPServer(_ServiceServer, ThreadingHTTPServer):
+    daemon_threads = True
+
+
+class _UnixServer(
+    _ServiceServer, socketserver.ThreadingMixIn, socketserver.UnixStreamServer
+):
+    daemon_threads = True
+
+
+def make_server(
+    service: TranscriptionService,
+    host: str = "127.0.0.1",
+    port: int = 8765,
+    socket_path: Optional[str] = None,
+    max_upload_bytes: Optional[int] = None,
+    verbose: bool = False,
+    allow_dirs: Sequence[Union[str, Path]] = (),
+    request_timeout: Optional[float] = REQUEST_TIMEOUT,
+) -> socketserver.BaseServer:
+    """Create an HTTP server for the service (not yet serving).
+
+    Args:
+        service: Started transcription service
+        host: Interface to bind for TCP
+        port: TCP port (0 picks a free one)
+        socket_path: Listen on this Unix socket instead of TCP
+        max_upload_bytes: Largest accepted audio upload
+        verbose: Log every request to stderr
+        allow_dirs: Directories whose files may be submitted by path; with
+            none, only uploads are accepted
+        request_timeout: Seconds a client may stall mid-request (None: no limit)
+
+    Returns:
+        Server; call serve_forever() and shutdown() on it
+    """
+    server: Union[_TCPServer, _UnixServer]
+    if socket_path:
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        server = _UnixServer(socket_path, _Handler)
+    else:
+        server = _TCPServer((host, port), _Handler)
+    server.service = service
+    server.max_upload_bytes = max_upload_bytes
+    server.allow_dirs = tuple(Path(d).resolve() for d in allow_dirs)
+    server.request_timeout = request_timeout
+    server.verbose = verbose
+    return server
+
+
+def server_address(server: socketserver.BaseServer) -> str:
+    """Return a human-readable address for a server made by make_server."""
+    address: Any = server.server_address
+    if isinstance(address, tuple):
+        host, port = address[:2]
+        return f"http://{host}:{port}"
+    return f"unix:{address}"
+
+
+def parse_model_spec(spec: str, default_concurrency: int) -> Tuple[str, int]:
+    """Parse "model" or "model=N" into a model name and worker count."""
+    name, _, count = spec.partition("=")
+    if not count:
+        return name, default_concurrency
+    workers = int(count)
+    if workers < 1:
+        raise ValueError(f"Concurrency for {name} must be at least 1")
+    return name, workers
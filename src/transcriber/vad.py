@@ -0,0 +1,223 @@
+"""Energy-based voice activity detection used to skip silence before inference."""
+
+from typing import Any, Dict, List, Literal, Optional, Sequence, Tuple
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+
+# Frames quieter than this (dB below the loudest 5% of frames) are silence.
+DEFAULT_THRESHOLD_DB = -35.0
+
+# Frames below this absolute level (dBFS) are never treated as speech.
+NOISE_FLOOR_DB = -60.0
+
+
+def frame_energy_db(
+    audio: np.ndarray,
+    frame_length: int,
+) -> np.ndarray:
+    """Return the RMS level of each frame in dBFS.
+
+    Args:
+        audio: Mono float32 samples in [-1, 1]
+        frame_length: Frame size in samples
+
+    Returns:
+        One level per frame (the last partial frame is zero-padded)
+    """
+    n_frames = -(-len(audio) // frame_length)
+    padded = np.zeros(n_frames * frame_length, dtype=np.float32)
+    padded[: len(audio)] = audio
+    frames = padded.reshape(n_frames, frame_length)
+    power = np.asarray(np.einsum("ij,ij->i", frames, frames), dtype=np.float32)
+    power /= frame_length
+    return 10.0 * np.log10(np.maximum(power, 1e-12))
+
+
+def _runs(mask: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Return start and end (exclusive) indices of True runs."""
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], mask.astype(np.int8), [0]))))
+    return edges[::2], edges[1::2]
+
+
+def detect_speech(
+    audio: np.ndarray,
+    threshold_db: float = DEFAULT_THRESHOLD_DB,
+    sample_rate: int = SAMPLE_RATE,
+    frame_ms: int = 30,
+    min_speech_ms: int = 250,
+    min_silence_ms: int = 500,
+    pad_ms: int = 200,
+) -> List[Tuple[int, int]]:
+    """Find speech regions in an audio signal.
+
+    Args:
+        audio: Mono float32 samples
+        threshold_db: Speech threshold in dB relative to the loudest frames
+        sample_rate: Sample rate of `audio`
+        frame_ms: Analysis frame length
+        min_speech_ms: Drop speech bursts shorter than this
+        min_silence_ms: Bridge pauses shorter than this
+        pad_ms: Padding kept around each region so word edges are not clipped
+
+    Returns:
+        (start, end) sample ranges of speech, sorted and non-overlapping
+    """
+    if len(audio) == 0:
+        return []
+
+    frame_length = max(1, sample_rate * frame_ms // 1000)
+    levels = frame_energy_db(audio, frame_length)
+    reference = np.percentile(levels, 95)
+    voiced = levels > max(reference + threshold_db, NOISE_FLOOR_DB)
+
+    starts, ends = _runs(voiced)
+    if len(starts) == 0:
+        return []
+
+    # Bridge short pauses between bursts.
+    min_gap = max(1, min_silence_ms // frame_ms)
+    keep_gap = (starts[1:] - ends[:-1]) >= min_gap
+    starts = np.concatenate((starts[:1], starts[1:][keep_gap]))
+    ends = np.concatenate((ends[:-1][keep_gap], ends[-1:]))
+
+    # Drop clicks and other short bursts.
+    long_enough = (ends - starts) >= max(1, min_speech_ms // frame_ms)
+    starts, ends = starts[long_enough], ends[long_enough]
+    if len(starts) == 0:
+        return []
+
+    pad = sample_rate * pad_ms // 1000
+    sample_starts = np.maximum(starts * frame_length - pad, 0)
+    sample_ends = np.minimum(ends * frame_length + pad, len(audio))
+
+    # Padding can make neighbours overlap; merge them.
+    overlap = sample_starts[1:] <= sample_ends[:-1]
+    sample_starts = np.concatenate((sample_starts[:1], sample_starts[1:][~overlap]))
+    sample_ends = np.concatenate((sample_ends[:-1][~overlap], sample_ends[-1:]))
+
+    return list(zip(sample_starts.tolist(), sample_ends.tolist()))
+
+
+class SpeechMap:
+    """Maps timestamps in speech-only audio back to the original timeline."""
+
+    def __init__(
+        self,
+        regions: Sequence[Tuple[int, int]],
+        total_samples: int,
+        sample_rate: int = SAMPLE_RATE,
+    ):
+        """Initialize the map.
+
+        Args:
+            regions: (start, end) sample ranges kept from the original audio
+            total_samples: Length of the original audio
+            sample_rate: Sample rate of the audio
+        """
+        self.regions = list(regions)
+        self.total_samples = total_samples
+        self.sample_rate = sample_rate
+
+        bounds = np.asarray(self.regions, dtype=np.float64).reshape(-1, 2) / sample_rate
+        self._original_starts = bounds[:, 0]
+        lengths = bounds[:, 1] - bounds[:, 0]
+        self._speech_starts = np.concatenate(([0.0], np.cumsum(lengths)[:-1]))
+        self._lengths = lengths
+
+    @property
+    def total_seconds(self) -> float:
+        return self.total_samples / self.sample_rate
+
+    @property
+    def speech_seconds(self) -> float:
+        return float(self._lengths.sum())
+
+    @property
+    def removed_seconds(self) -> float:
+        return self.total_seconds - self.speech_seconds
+
+    def extract(self, audio: np.ndarray) -> np.ndarray:
+        """Concatenate the speech regions of `audio`."""
+        if not self.regions:
+            return audio[:0]
+        return np.concatenate([audio[start:end] for start, end in self.regions])
+
+    def remap(self, times: Any, is_end: bool = False) -> np.ndarray:
+        """Map speech-audio times (seconds) to original-audio times.
+
+        Args:
+            times: Scalar or array of times in the speech-only audio
+            is_end: Treat times as segment ends, so a time on a region
+                boundary maps to the end of the earlier region
+
+        Returns:
+            Times on the original timeline
+        """
+        points = np.asarray(times, dtype=np.float64)
+        if not self.regions:
+            return points
+        side: Literal["left", "right"] = "left" if is_end else "right"
+        index = np.searchsorted(self._speech_starts, points, side=side) - 1
+        index = np.clip(index, 0, len(self._speech_starts) - 1)
+        offset = np.minimum(points - self._speech_starts[index], self._lengths[index])
+        return np.asarray(
+            self._original_starts[index] + np.maximum(offset, 0.0), dtype=np.float64
+        )
+
+    def remap_result(self, result: Dict[str, Any]) -> None:
+        """Rewrite segment (and word) timestamps of a result in place."""
+        segments = result.get("segments") or []
+        if not segments:
+            return
+
+        starts = self.remap([s["start"] for s in segments])
+        ends = self.remap([s["end"] for s in segments], is_end=True)
+        for segment, start, end in zip(segments, starts.tolist(), ends.tolist()):
+            segment["start"] = round(start, 3)
+            segment["end"] = round(end, 3)
+
+            words = segment.get("words")
+            if words:
+                word_starts = self.remap([w["start"] for w in words])
+                word_ends = self.remap([w["end"] for w in words], is_end=True)
+                for word, w_start, w_end in zip(
+                    words, word_starts.tolist(), word_ends.tolist()
+                ):
+                    word["start"] = round(w_start, 3)
+                    word["end"] = round(w_end, 3)
+
+    def stats(self) -> Dict[str, Any]:
+        """Summarize how much audio was removed."""
+        total = self.total_seconds
+        return {
+            "total_seconds": round(total, 3),
+            "speech_seconds": round(self.speech_seconds, 3),
+            "removed_seconds": round(self.removed_seconds, 3),
+            "removed_ratio": round(self.removed_seconds / total, 4) if total else 0.0,
+            "regions": len(self.regions),
+        }
+
+
+def apply_vad(
+    audio: np.ndarray,
+    threshold_db: Optional[float] = None,
+    sample_rate: int = SAMPLE_RATE,
+) -> Tuple[np.ndarray, SpeechMap]:
+    """Strip silence from audio.
+
+    Args:
+        audio: Mono float32 samples
+        threshold_db: Speech threshold relative to the loudest frames
+            (default: DEFAULT_THRESHOLD_DB)
+        sample_rate: Sample rate of `audio`
+
+    Returns:
+        Speech-only audio and the map back to the original timeline
+    """
+    if threshold_db is None:
+        threshold_db = DEFAULT_THRESHOLD_DB
+    regions = detect_speech(audio, threshold_db=threshold_db, sample_rate=sample_rate)
+    speech_map = SpeechMap(regions, len(audio), sample_rate=sample_rate)
+    return speech_map.extract(audio), speech_map
@@ -0,0 +1,297 @@
+"""Long-file mode: cut audio at quiet points and transcribe the windows in parallel."""
+
+import multiprocessing
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.queues import SimpleQueue
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:
+    from transcriber.backends import Backend, get_backend
+    from transcriber.checkpoint import Checkpoint
+    from transcriber.scheduler import ThreadBudget, plan_budgets, plan_devices
+    from transcriber.vad import SAMPLE_RATE, _runs, frame_energy_db
+except ImportError:
+    from .backends import Backend, get_backend
+    from .checkpoint import Checkpoint
+    from .scheduler import ThreadBudget, plan_budgets, plan_devices
+    from .vad import SAMPLE_RATE, _runs, frame_energy_db
+
+# Frames within this many dB of the quietest one count as equally quiet.
+QUIET_MARGIN_DB = 3.0
+
+# Backend owned by each worker process, created once by _init_worker.
+_worker_backend: Optional[Backend] = None
+
+
+def find_split_points(
+    audio: np.ndarray,
+    window_seconds: float,
+    sample_rate: int = SAMPLE_RATE,
+    search_seconds: Optional[float] = None,
+    frame_ms: int = 30,
+) -> List[int]:
+    """Choose where to cut audio so no window is longer than window_seconds.
+
+    Each cut is placed in the middle of the quietest stretch in the last
+    `search_seconds` before the window would overflow, so words are rarely
+    split.
+
+    Args:
+        audio: Mono float32 samples
+        window_seconds: Maximum window length
+        sample_rate: Sample rate of `audio`
+        search_seconds: How far back from the window end to look for a
+            quiet point (default: a quarter of the window, at most 10 s)
+        frame_ms: Energy analysis frame length
+
+    Returns:
+        Sample offsets of the cuts, ascending, excluding 0 and len(audio)
+    """
+    window = int(window_seconds * sample_rate)
+    if window <= 0:
+        raise ValueError("window_seconds must be positive")
+    if len(audio) <= window:
+        return []
+
+    if search_seconds is None:
+        search_seconds = min(10.0, window_seconds / 4)
+    frame_length = max(1, sample_rate * frame_ms // 1000)
+    levels = frame_energy_db(audio, frame_length)
+    search_frames = max(1, int(search_seconds * sample_rate) // frame_length)
+
+    cuts: List[int] = []
+    start = 0
+    while len(audio) - start > window:
+        last_frame = (start + window) // frame_length
+        first_frame = max(start // frame_length + 1, last_frame - search_frames)
+        if first_frame >= last_frame:
+            cut = start + window
+        else:
+            region = levels[first_frame:last_frame]
+            # Cut in the middle of the longest stretch of near-minimum energy,
+            # rather than at its first frame, to leave room on both sides.
+            starts, ends = _runs(region <= region.min() + QUIET_MARGIN_DB)
+            longest = int(np.argmax(ends - starts))
+            middle = first_frame + (starts[longest] + ends[longest]) // 2
+            cut = int(middle) * frame_length
+        cuts.append(cut)
+        start = cut
+    return cuts
+
+
+def plan_windows(
+    audio: np.ndarray,
+    window_seconds: float,
+    sample_rate: int = SAMPLE_RATE,
+) -> List[Tuple[int, int]]:
+    """Return (start, end) sample ranges covering the audio, cut at quiet points."""
+    bounds = [0] + find_split_points(audio, window_seconds, sample_rate) + [len(audio)]
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def stitch_results(
+    results: Sequence[Dict[str, Any]],
+    offsets: Sequence[float],
+) -> Dict[str, Any]:
+    """Join per-window results into one result on the global timeline.
+
+    Segment (and word) timestamps are shifted by each window's offset and
+    segment ids are renumbered so subtitles stay continuously numbered.
+
+    Args:
+        results: Window results in timeline order
+        offsets: Start of each window in seconds
+
+    Returns:
+        Combined result
+    """
+    segments: List[Dict[str, Any]] = []
+    for result, offset in zip(results, offsets):
+        for segment in result.get("segments") or []:
+            segment = dict(segment)
+            segment["id"] = len(segments)
+            segment["start"] = round(segment["start"] + offset, 3)
+            segment["end"] = round(segment["end"] + offset, 3)
+            if segment.get("words"):
+                segment["words"] = [
+                    {
+                        **word,
+                        "start": round(word["start"] + offset, 3),
+                        "end": round(word["end"] + offset, 3),
+                    }
+                    for word in segment["words"]
+                ]
+            segments.append(segment)
+
+    languages = Counter(r["language"] for r in results if r.get("language"))
+    return {
+        "text": "".join(r.get("text", "") for r in results),
+        "segments": segments,
+        "language": languages.most_common(1)[0][0] if languages else None,
+    }
+
+
+def _init_worker(
+    model: str,
+    device: str,
+    backend: str,
+    verbose: bool,
+    slots: "Optional[SimpleQueue[Tuple[ThreadBudget, str]]]" = None,
+) -> None:
+    """Load the model once per worker process, within its CPU budget.
+
+    `slots` holds a (ThreadBudget, device) pair for each worker; the
+    queued device replaces `device`.
+    """
+    global _worker_backend
+    if slots is not None:
+        budget, device = slots.get()
+        budget.apply()
+    _worker_backend = get_backend(backend)(model, device=device, verbose=verbose)
+    _worker_backend.load()
+
+
+def _transcribe_window(audio: np.ndarray, language: Optional[str]) -> Dict[str, Any]:
+    """Transcribe one window in a worker."""
+    assert _worker_backend is not None
+    return _worker_backend.transcribe(audio, language=language)
+
+
+def transcribe_windows(
+    audio: np.ndarray,
+    model: str = "base",
+    device: str = "cpu",
+    backend: str = "whisper",
+    language: Optional[str] = None,
+    workers: int = 2,
+    window_seconds: float = 30.0,
+    verbose: bool = False,
+    sample_rate: int = SAMPLE_RATE,
+    local_backend: Optional[Backend] = None,
+    checkpoint: Optional[Checkpoint] = None,
+    checkpoint_key: str = "",
+    threads: Optional[int] = None,
+    pin: bool = False,
+) -> Dict[str, Any]:
+    """Transcribe long audio as windows spread over a process pool.
+
+    Every worker loads its own copy of the model, so memory use grows with
+    `workers`, and the cores are divided between the workers as in
+    transcribe-batch (see transcriber.scheduler). When no language is given, it is detected on the first
+    window and reused for the rest so all windows decode the same language.
+
+    With a checkpoint, each finished window is recorded as soon as it is
+    done, and windows recorded by an interrupted run are not transcribed
+    again. Windows are planned the same way every time, so a resumed run
+    stitches exactly the result an uninterrupted one would.
+
+    Args:
+        audio: Mono float32 samples
+        model: Model name
+        device: Device to run on
+        backend: Inference backend (see transcriber.backends)
+        language: Language code (optional, detected on the first window)
+        workers: Number of worker processes
+        window_seconds: Maximum window length
+        verbose: Enable verbose output
+        sample_rate: Sample rate of `audio`
+        local_backend: Loaded backend used in-process instead of a pool
+            when workers is 1
+        checkpoint: Sidecar recording finished windows
+        checkpoint_key: Identity of the job, checked before resuming
+        threads: CPU threads per worker (default: the available cores
+            divided between the workers)
+        pin: Pin each worker to its own cores (Linux)
+
+    Returns:
+        Stitched result; result["windows"] reports the window count
+    """
+    windows = plan_windows(audio, window_seconds, sample_rate)
+    offsets = [start / sample_rate for start, _ in windows]
+    started = time.perf_counter()
+
+    results: List[Dict[str, Any]] = []
+    if checkpoint is not None:
+        results = checkpoint.start(checkpoint_key, len(windows))
+        if verbose and results:
+            print(f"Resuming after {len(results)} of {len(windows)} windows")
+
+    def finish(result: Dict[str, Any]) -> None:
+        if checkpoint is not None:
+            checkpoint.add(len(results), result)
+        results.append(result)
+
+    try:
+        if results and language is None:
+            language = results[0].get("language")
+        if workers <= 1 and local_backend is not None:
+            for start, end in windows[len(results) :]:
+                finish(local_backend.transcribe(audio[start:end], language=language))
+                language = language or results[0].get("language")
+        elif len(results) < len(windows):
+            _transcribe_pool(
+                audio,
+                windows[len(results) :],
+                (model, device, backend, verbose),
+                language,
+                workers,
+                finish,
+                threads,
+                pin,
+            )
+    finally:
+        if checkpoint is not None:
+            checkpoint.close()
+
+    if verbose:
+        print(
+            f"Transcribed {len(windows)} windows with {workers} workers "
+            f"in {time.perf_counter() - started:.1f}s"
+        )
+
+    result = stitch_results(results, offsets)
+    result["windows"] = len(windows)
+    return result
+
+
+def _transcribe_pool(
+    audio: np.ndarray,
+    windows: Sequence[Tuple[int, int]],
+    initargs: Tuple[str, str, str, bool],
+    language: Optional[str],
+    workers: int,
+    finish: Callable[[Dict[str, Any]], None],
+    threads: Optional[int] = None,
+    pin: bool = False,
+) -> None:
+    """Transcribe windows over worker processes, passing results on in order."""
+    processes = max(1, min(workers, len(windows)))
+    slots: SimpleQueue[Tuple[ThreadBudget, str]] = multiprocessing.SimpleQueue()
+    for slot in zip(
+        plan_budgets(processes, threads=threads, pin=pin),
+        plan_devices(initargs[1], processes),
+    ):
+        slots.put(slot)
+    with ProcessPoolExecutor(
+        max_workers=processes,
+        initializer=_init_worker,
+        initargs=(*initargs, slots),
+    ) as pool:
+        pending = windows
+        if language is None:
+            start, end = windows[0]
+            first = pool.submit(_transcribe_window, audio[start:end], None).result()
+            finish(first)
+            language = first.get("language")
+            pending = windows[1:]
+
+        for result in pool.map(
+            _transcribe_window,
+            [audio[start:end] for start, end in pending],
+            [language] * len(pending),
+        ):
+            finish(result)
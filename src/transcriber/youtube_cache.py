@@ -0,0 +1,234 @@
+"""Persistent yt-dlp metadata cache and learned download-strategy ordering."""
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+try:
+    from transcriber.cache import default_cache_dir, file_lock, write_atomic
+except ImportError:
+    from .cache import default_cache_dir, file_lock, write_atomic
+
+INFO_TTL_ENV = "WHISPER_TRANSCRIBER_INFO_TTL"
+DEFAULT_INFO_TTL = 6 * 60 * 60  # yt-dlp's signed media URLs last about six hours
+
+# Weight of the newest outcome in a strategy's success score.
+LEARNING_RATE = 0.5
+# Age after which half of what was learned about a strategy is forgotten.
+DEFAULT_HALF_LIFE = 24 * 60 * 60
+
+
+class InfoCache:
+    """Stores yt-dlp info dicts by video id for a limited time.
+
+    The hit/miss counters are shared by every process using the cache
+    directory and updated under a file lock.
+    """
+
+    def __init__(self, directory: Optional[Path] = None, ttl: Optional[float] = None):
+        """Initialize the cache.
+
+        Args:
+            directory: Cache directory (default: <cache dir>/youtube/info)
+            ttl: Seconds an entry stays valid
+                (default: $WHISPER_TRANSCRIBER_INFO_TTL or six hours)
+        """
+        if ttl is None:
+            ttl = float(os.environ.get(INFO_TTL_ENV, DEFAULT_INFO_TTL))
+        self.directory = (
+            Path(directory) if directory else default_cache_dir() / "youtube" / "info"
+        )
+        self.ttl = ttl
+        self._stats_path = self.directory.parent / "info_stats.json"
+        self._stats_lock_path = self.directory.parent / "info_stats.lock"
+        self._lock = threading.Lock()
+
+    def _entry_path(self, video_id: str) -> Path:
+        return self.directory / f"{video_id}.json"
+
+    def get(self, video_id: str) -> Optional[Dict[str, Any]]:
+        """Return the cached info for a video, or None if missing or expired."""
+        path = self._entry_path(video_id)
+        try:
+            with open(path, encoding="utf-8") as f:
+                entry: Dict[str, Any] = json.load(f)
+        except (OSError, ValueError):
+            self._count("misses")
+            return None
+
+        if time.time() - entry.get("fetched", 0) > self.ttl:
+            try:
+                path.unlink()
+            except OSError:
+                pass
+            self._count("expired")
+            return None
+
+        self._count("hits")
+        info: Dict[str, Any] = entry["info"]
+        return info
+
+    def put(self, video_id: str, info: Dict[str, Any]) -> None:
+        """Store an info dict; values JSON cannot represent are stored as strings."""
+        write_atomic(
+            self._entry_path(video_id),
+            json.dumps({"fetched": time.time(), "info": info}, default=str),
+        )
+
+    def _count(self, name: str) -> None:
+        try:
+            with file_lock(self._stats_lock_path, self._lock):
+                counters = _read_json(self._stats_path)
+                counters[name] = counters.get(name, 0) + 1
+                write_atomic(self._stats_path, json.dumps(counters))
+        except OSError:
+            pass
+
+    def stats(self) -> Dict[str, Any]:
+        """Return entry count and hit/miss/expired counters."""
+        counters = _read_json(self._stats_path)
+        hits = counters.get("hits", 0)
+        lookups = hits + counters.get("misses", 0) + counters.get("expired", 0)
+        return {
+            "directory": str(self.directory),
+            "entries": len(list(self.directory.glob("*.json"))),
+            "ttl": self.ttl,
+            "hits": hits,
+            "misses": counters.get("misses", 0),
+            "expired": counters.get("expired", 0),
+            "hit_rate": hits / lookups if lookups else 0.0,
+        }
+
+
+class StrategyStats:
+    """Learns which download strategies currently work and orders them first.
+
+    Each strategy has a success score: an exponential moving average of its
+    outcomes that starts from a prior favouring the default order. Scores
+    drift back to the prior with a half-life, so a strategy that failed
+    yesterday gets retried once YouTube changes again. Updates are made
+    under a file lock, since concurrent downloads share the file.
+    """
+
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        half_life: float = DEFAULT_HALF_LIFE,
+    ):
+        """Initialize the statistics.
+
+        Args:
+            path: JSON file the statistics persist in
+                (default: <cache dir>/youtube/strategies.json)
+            half_life: Seconds after which a learned score is half forgotten
+        """
+        self.path = (
+            Path(path) if path else default_cache_dir() / "youtube" / "strategies.json"
+        )
+        self.half_life = half_life
+        self._lock = threading.Lock()
+        self._lock_path = self.path.with_suffix(".lock")
+
+    @staticmethod
+    def _prior(position: int, count: int) -> float:
+        # Slightly below neutral and decreasing, so untried strategies keep
+        # their default order and any success outranks them.
+        return 0.5 - 0.01 * position / max(count, 1)
+
+    def _score(self, record: Dict[str, Any], prior: float, now: float) -> float:
+        if not record:
+            return prior
+        prior = float(record.get("prior", prior))
+        score = float(record.get("score", prior))
+        age = max(0.0, now - record.get("updated", now))
+        weight = 0.5 ** (age / self.half_life) if self.half_life > 0 else 0.0
+        return prior + (score - prior) * weight
+
+    def order(self, names: Sequence[str]) -> List[str]:
+        """Return strategy names, best current score first (stable on ties)."""
+        records = _read_json(self.path)
+        now = time.time()
+        scores = {
+            name: self._score(records.get(name, {}), self._prior(i, len(names)), now)
+            for i, name in enumerate(names)
+        }
+        return sorted(names, key=lambda name: -scores[name])
+
+    def record(
+        self,
+        name: str,
+        success: bool,
+        seconds: float,
+        names: Sequence[str] = (),
+    ) -> None:
+        """Update a strategy's score and counters with one attempt's outcome.
+
+        Args:
+            name: Strategy name
+            success: Whether the attempt succeeded
+            seconds: Attempt duration
+            names: All strategy names in default order (for the prior)
+        """
+        position = list(names).index(name) if name in names else 0
+        prior = self._prior(position, len(names))
+        try:
+            with file_lock(self._lock_path, self._lock):
+                records = _read_json(self.path)
+                record = records.get(name, {})
+                now = time.time()
+                score = self._score(record, prior, now)
+                record["score"] = score + LEARNING_RATE * (float(success) - score)
+                record["updated"] = now
+                record["prior"] = prior
+                if success:
+                    record["successes"] = record.get("successes", 0) + 1
+                    record["success_seconds"] = (
+                        record.get("success_seconds", 0.0) + seconds
+                    )
+                else:
+                    record["failures"] = record.get("failures", 0) + 1
+                    record["failure_seconds"] = (
+                        record.get("failure_seconds", 0.0) + seconds
+                    )
+                records[name] = record
+                write_atomic(self.path, json.dumps(records, indent=2))
+        except OSError:
+            pass
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Return per-strategy attempts, success rate, mean latency and score."""
+        records = _read_json(self.path)
+        now = time.time()
+        summary = {}
+        for name, record in records.items():
+            successes = record.get("successes", 0)
+            failures = record.get("failures", 0)
+            summary[name] = {
+                "successes": successes,
+                "failures": failures,
+                "success_rate": (
+                    successes / (successes + failures) if successes + failures else 0.0
+                ),
+                "mean_success_seconds": (
+                    record.get("success_seconds", 0.0) / successes
+                    if successes
+                    else None
+                ),
+                "mean_failure_seconds": (
+                    record.get("failure_seconds", 0.0) / failures if failures else None
+                ),
+                "score": self._score(record, 0.5, now),
+            }
+        return summary
+
+
+def _read_json(path: Path) -> Dict[str, Any]:
+    try:
+        with open(path, encoding="utf-8") as f:
+            data: Dict[str, Any] = json.load(f)
+            return data
+    except (OSError, ValueError):
+        return {}
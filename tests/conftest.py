@@ -0,0 +1,100 @@
+"""Shared pytest fixtures."""
+
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Dict, Iterator, List, Tuple
+
+import numpy as np
+import pytest
+
+from transcriber import engine
+from transcriber.backends import whisper_py
+from transcriber.registry import get_registry
+from transcriber.scheduler import THREAD_ENV_VARS
+
+
+def tone(seconds: float, sr: int = 16000, amplitude: float = 0.3) -> np.ndarray:
+    """Return a 220 Hz sine wave."""
+    t = np.arange(int(seconds * sr), dtype=np.float32) / sr
+    return (amplitude * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+
+
+@pytest.fixture(autouse=True)
+def clear_model_registry() -> Iterator[None]:
+    """Start every test with an empty process-wide model registry."""
+    get_registry().clear()
+    yield
+    get_registry().clear()
+
+
+@pytest.fixture(autouse=True)
+def restore_thread_settings(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Undo the thread-count variables that applied CPU budgets set."""
+    for name in THREAD_ENV_VARS:
+        monkeypatch.delenv(name, raising=False)
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache_dir(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> Path:
+    """Keep the transcript cache inside the test's temporary directory."""
+    cache_dir = tmp_path / "cache"
+    monkeypatch.setenv("WHISPER_TRANSCRIBER_CACHE_DIR", str(cache_dir))
+    return cache_dir
+
+
+class FakeWhisperModel:
+    """Stand-in for a loaded Whisper model."""
+
+    def __init__(self, name: str, device: str):
+        self.name = name
+        self.device = device
+        self.calls: List[Tuple[Any, Dict[str, Any]]] = []
+
+    def transcribe(self, audio: Any, **kwargs: Any) -> Dict[str, Any]:
+        self.calls.append((audio, kwargs))
+        return {
+            "text": " Hello world.",
+            "segments": [
+                {"id": 0, "start": 0.0, "end": 1.5, "text": " Hello"},
+                {"id": 1, "start": 1.5, "end": 3.0, "text": " world."},
+            ],
+            "language": "en",
+        }
+
+
+@pytest.fixture
+def fake_whisper(monkeypatch: pytest.MonkeyPatch) -> SimpleNamespace:
+    """Replace the whisper module and audio decoder with lightweight fakes."""
+    loads: List[Tuple[str, str]] = []
+    loaded: List[FakeWhisperModel] = []
+
+    def load_model(name: str, device: str = "cpu") -> FakeWhisperModel:
+        loads.append((name, device))
+        loaded.append(FakeWhisperModel(name, device))
+        return loaded[-1]
+
+    def load_audio(path: str, sr: int = 16000) -> np.ndarray:
+        # Three seconds of uninterrupted tone, so VAD keeps everything.
+        return tone(3.0, sr)
+
+    fake = SimpleNamespace(
+        load_model=load_model,
+        load_audio=load_audio,
+        loads=loads,
+        loaded=loaded,
+    )
+    monkeypatch.setattr(whisper_py, "whisper", fake, raising=False)
+    monkeypatch.setattr(whisper_py, "WHISPER_AVAILABLE", True)
+    monkeypatch.setattr(engine, "WHISPER_AVAILABLE", True)
+
+    def decode(audio: Any, sample_rate: int = 16000) -> np.ndarray:
+        # Arrays pass through; look the decoder up on each call so tests can
+        # swap fake.load_audio.
+        if isinstance(audio, np.ndarray):
+            return np.asarray(audio, dtype=np.float32)
+        decoded: np.ndarray = fake.load_audio(audio, sr=sample_rate)
+        return decoded
+
+    monkeypatch.setattr(engine, "load_audio", decode)
+    monkeypatch.setattr(whisper_py, "load_audio", decode)
+    return fake
@@ -0,0 +1,147 @@
+"""Tests for audio loading: memory-mapped PCM fast path and ffmpeg fallback."""
+
+import struct
+import subprocess
+import wave
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, List, NoReturn
+
+import numpy as np
+import pytest
+
+from tests.conftest import tone
+from transcriber import audio
+from transcriber.audio import load_audio, map_pcm, wav_header, write_wav
+
+
+@pytest.fixture
+def no_ffmpeg(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Fail the test if anything shells out to ffmpeg."""
+
+    def run(*args: Any, **kwargs: Any) -> NoReturn:
+        raise AssertionError("ffmpeg should not be needed")
+
+    monkeypatch.setattr(audio.subprocess, "run", run)
+
+
+def write_float_wav(
+    path: Path, samples: np.ndarray, sample_rate: int = 16000, extensible: bool = False
+) -> None:
+    """Write a 32-bit IEEE float WAV, optionally as WAVE_FORMAT_EXTENSIBLE."""
+    data = samples.astype("<f4").tobytes()
+    if extensible:
+        guid_tail = b"\x00\x00\x00\x00\x10\x00\x80\x00\x00\xaa\x00\x38\x9b\x71"
+        fmt = struct.pack(
+            "<HHIIHHHHI", 0xFFFE, 1, sample_rate, sample_rate * 4, 4, 32, 22, 32, 4
+        )
+        fmt += struct.pack("<H", 3) + guid_tail
+    else:
+        fmt = struct.pack("<HHIIHH", 3, 1, sample_rate, sample_rate * 4, 4, 32)
+    chunks = b"fmt " + struct.pack("<I", len(fmt)) + fmt
+    chunks += b"data" + struct.pack("<I", len(data)) + data
+    path.write_bytes(b"RIFF" + struct.pack("<I", 4 + len(chunks)) + b"WAVE" + chunks)
+
+
+def test_pcm16_wav_is_memory_mapped(tmp_path: Path, no_ffmpeg: None) -> None:
+    samples = tone(1.0)
+    path = tmp_path / "speech.wav"
+    write_wav(path, samples)
+
+    loaded = load_audio(path)
+
+    assert loaded.dtype == np.float32
+    np.testing.assert_allclose(loaded, samples, atol=1 / 32768)
+
+
+@pytest.mark.parametrize("extensible", [False, True])
+def test_float_wav_is_used_in_place(
+    tmp_path: Path, no_ffmpeg: None, extensible: bool
+) -> None:
+    samples = tone(0.5)
+    path = tmp_path / "speech.wav"
+    write_float_wav(path, samples, extensible=extensible)
+
+    loaded = load_audio(path)
+
+    np.testing.assert_array_equal(loaded, samples)
+    # Copy-on-write: writing to the array leaves the file untouched.
+    loaded[:] = 0
+    np.testing.assert_array_equal(load_audio(path), samples)
+
+
+def test_raw_pcm_is_memory_mapped(tmp_path: Path, no_ffmpeg: None) -> None:
+    samples = tone(0.5)
+    path = tmp_path / "capture.raw"
+    (samples * 32768).astype("<i2").tofile(path)
+
+    np.testing.assert_allclose(load_audio(path), samples, atol=1 / 32768)
+
+
+def test_wav_header_skips_extra_chunks_and_clamps_streamed_size(tmp_path: Path) -> None:
+    """Chunks before "data" are skipped; an unfinished size is clamped to the file."""
+    path = tmp_path / "live.wav"
+    write_wav(path, tone(0.25))
+    raw = bytearray(path.read_bytes())
+    data_at = raw.index(b"data")
+    raw[data_at + 4 : data_at + 8] = struct.pack("<I", 0xFFFFFFFF)
+    raw[data_at:data_at] = b"LIST" + struct.pack("<I", 3) + b"abc\x00"
+    path.write_bytes(bytes(raw))
+
+    header = wav_header(path)
+    mapped = map_pcm(path)
+
+    assert header is not None and mapped is not None
+    assert header["dtype"] == "<i2"
+    assert header["data_offset"] == data_at + 12 + 8
+    assert header["data_size"] == 4000 * 2
+    assert len(mapped) == 4000
+
+
+def test_other_formats_are_decoded_through_an_ffmpeg_pipe(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Stereo or resampled input goes to ffmpeg, which writes PCM to stdout."""
+    path = tmp_path / "music.wav"
+    with wave.open(str(path), "wb") as f:
+        f.setnchannels(2)
+        f.setsampwidth(2)
+        f.setframerate(44100)
+        f.writeframes(b"\x00\x00" * 200)
+    commands: List[List[str]] = []
+
+    def run(command: List[str], **kwargs: Any) -> SimpleNamespace:
+        commands.append(command)
+        pcm = np.full(10, 16384, dtype="<i2").tobytes()
+        return SimpleNamespace(stdout=pcm)
+
+    monkeypatch.setattr(audio.subprocess, "run", run)
+
+    loaded = load_audio(path)
+
+    assert map_pcm(path) is None
+    assert commands[0][0] == "ffmpeg"
+    assert commands[0][-1] == "-"
+    np.testing.assert_array_equal(loaded, np.full(10, 0.5, dtype=np.float32))
+
+
+def test_ffmpeg_errors_are_reported(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    def run(command: List[str], **kwargs: Any) -> NoReturn:
+        raise subprocess.CalledProcessError(1, command, stderr=b"x\nInvalid data")
+
+    monkeypatch.setattr(audio.subprocess, "run", run)
+
+    with pytest.raises(RuntimeError, match="Invalid data"):
+        load_audio(tmp_path / "broken.mp3")
+
+
+def test_arrays_are_converted_without_decoding(no_ffmpeg: None) -> None:
+    samples = tone(0.1)
+
+    assert load_audio(samples) is samples
+    stereo = np.stack([samples, samples], axis=1)
+    np.testing.assert_allclose(load_audio(stereo), samples)
+    pcm = (samples * 32768).astype(np.int16)
+    np.testing.assert_allclose(load_audio(pcm), samples, atol=1 / 32768)
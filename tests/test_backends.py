@@ -0,0 +1,348 @@
+"""Tests for transcription backends, run against fake whisper.cpp executables."""
+
+import json
+import sys
+import textwrap
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Tuple
+
+import numpy as np
+import pytest
+
+from tests.conftest import tone
+from transcriber.audio import write_wav
+from transcriber.backends import (
+    WhisperCppBackend,
+    WhisperCppServerBackend,
+    get_backend,
+    whisper_py,
+)
+from transcriber.backends.whisper_cpp import (
+    parse_cli_json,
+    parse_srt,
+    resolve_ggml_model,
+)
+from transcriber.engine import TranscriptionEngine
+from transcriber.registry import ModelRegistry
+
+Calls = Callable[[], List[List[str]]]
+
+FAKE_CLI = """
+import json, os, sys
+
+args = sys.argv[1:]
+with open(os.environ["FAKE_WHISPER_LOG"], "a") as log:
+    log.write(json.dumps(args) + "\\n")
+
+bases = [args[i + 1] for i, arg in enumerate(args) if arg == "-of"]
+for base in bases:
+    if os.environ.get("FAKE_WHISPER_OUTPUT") == "srt":
+        with open(base + ".srt", "w") as f:
+            f.write("1\\n00:00:00,000 --> 00:00:01,500\\nHello\\n\\n"
+                    "2\\n00:00:01,500 --> 00:00:03,000\\nworld.\\n")
+    elif os.environ.get("FAKE_WHISPER_OUTPUT") != "none":
+        with open(base + ".json", "w") as f:
+            json.dump({
+                "result": {"language": "en"},
+                "transcription": [
+                    {"offsets": {"from": 0, "to": 1500}, "text": " Hello"},
+                    {"offsets": {"from": 1500, "to": 3000}, "text": " world."},
+                ],
+            }, f)
+    else:
+        print("error: failed to read audio", file=sys.stderr)
+"""
+
+FAKE_SERVER = """
+import json, os, sys, time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+port = int(sys.argv[sys.argv.index("--port") + 1])
+
+class Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.send_response(200)
+        self.end_headers()
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        if os.environ.get("FAKE_WHISPER_HANG"):
+            time.sleep(60)
+        assert b"RIFF" in body and b"verbose_json" in body
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.end_headers()
+        self.wfile.write(json.dumps({
+            "language": "en",
+            "segments": [
+                {"start": 0.0, "end": 1.5, "text": " Hello"},
+                {"t0": 150, "t1": 300, "text": " world."},
+            ],
+        }).encode())
+
+    def log_message(self, *args):
+        pass
+
+HTTPServer(("127.0.0.1", port), Handler).serve_forever()
+"""
+
+
+def _executable(path: Path, source: str) -> Path:
+    path.write_text(f"#!{sys.executable}\n" + textwrap.dedent(source))
+    path.chmod(0o755)
+    return path
+
+
+@pytest.fixture
+def whisper_cpp(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> Calls:
+    """Put fake whisper-cli/whisper-server binaries and a ggml model in place."""
+    models = tmp_path / "models"
+    models.mkdir()
+    (models / "ggml-base.en.bin").write_bytes(b"\0" * 1024)
+    log = tmp_path / "calls.jsonl"
+
+    monkeypatch.setenv("WHISPER_CPP_MODELS_DIR", str(models))
+    monkeypatch.setenv(
+        "WHISPER_CLI_BIN", str(_executable(tmp_path / "whisper-cli", FAKE_CLI))
+    )
+    monkeypatch.setenv(
+        "WHISPER_SERVER_BIN", str(_executable(tmp_path / "whisper-server", FAKE_SERVER))
+    )
+    monkeypatch.setenv("FAKE_WHISPER_LOG", str(log))
+
+    def calls() -> List[List[str]]:
+        if not log.exists():
+            return []
+        return [json.loads(line) for line in log.read_text().splitlines()]
+
+    return calls
+
+
+def test_resolve_ggml_model_falls_back_to_english_model(whisper_cpp: Calls) -> None:
+    """ggml-<name>.en.bin is used when there is no multilingual model."""
+    assert resolve_ggml_model("base").name == "ggml-base.en.bin"
+    with pytest.raises(FileNotFoundError, match="ggml-large.bin"):
+        resolve_ggml_model("large")
+
+
+def test_parsers_produce_whisper_style_results() -> None:
+    """JSON and SRT output both map back to start/end seconds and text."""
+    from_json = parse_cli_json(
+        {
+            "result": {"language": "de"},
+            "transcription": [{"offsets": {"from": 250, "to": 1250}, "text": " Hallo"}],
+        }
+    )
+    assert from_json == {
+        "text": " Hallo",
+        "segments": [{"id": 0, "start": 0.25, "end": 1.25, "text": " Hallo"}],
+        "language": "de",
+    }
+
+    from_srt = parse_srt("1\n01:00:00,500 --> 01:00:02,000\nline one\nline two\n", "en")
+    assert from_srt["segments"] == [
+        {"id": 0, "start": 3600.5, "end": 3602.0, "text": " line one line two"}
+    ]
+
+
+def test_cli_backend_transcribes_wav_path_without_conversion(
+    whisper_cpp: Calls, tmp_path: Path
+) -> None:
+    """A 16 kHz mono WAV is handed to whisper-cli as-is."""
+    wav = tmp_path / "talk.wav"
+    write_wav(wav, tone(3.0))
+
+    backend = WhisperCppBackend("base")
+    backend.load()
+    result = backend.transcribe(str(wav), language="en")
+
+    assert result["text"] == " Hello world."
+    assert [s["end"] for s in result["segments"]] == [1.5, 3.0]
+    args = whisper_cpp()[0]
+    assert args[args.index("-f") + 1] == str(wav)
+    assert args[args.index("-l") + 1] == "en"
+    assert args[args.index("-m") + 1].endswith("ggml-base.en.bin")
+
+
+def test_cli_backend_falls_back_to_srt_and_reports_missing_output(
+    whisper_cpp: Calls, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """SRT output is parsed when JSON is missing; no output at all is an error."""
+    backend = WhisperCppBackend("base")
+    backend.load()
+
+    monkeypatch.setenv("FAKE_WHISPER_OUTPUT", "srt")
+    result = backend.transcribe(tone(3.0))
+    assert result["text"] == " Hello world."
+
+    monkeypatch.setenv("FAKE_WHISPER_OUTPUT", "none")
+    with pytest.raises(RuntimeError, match="failed to read audio"):
+        backend.transcribe(tone(3.0))
+
+
+def test_engine_runs_whisper_cpp_without_python_whisper(whisper_cpp: Calls) -> None:
+    """The engine works with the whisper-cli backend and still applies VAD remapping."""
+    registry = ModelRegistry()
+    engine = TranscriptionEngine(model="base", backend="whisper-cpp", registry=registry)
+
+    result = engine.transcribe(tone(3.0), vad=True)
+
+    assert result["text"] == " Hello world."
+    assert result["vad"]["total_seconds"] == 3.0
+    assert ("whisper-cpp:base", "cpu") in registry
+    assert registry.current_bytes == 0
+
+
+def test_cli_backend_transcribes_a_batch_in_one_process(whisper_cpp: Calls) -> None:
+    """Each clip gets its own -f/-of pair in a single whisper-cli run."""
+    backend = WhisperCppBackend("base")
+    backend.load()
+
+    results = backend.transcribe_batch([tone(1.0), tone(2.0), tone(3.0)], "en")
+
+    assert [r["text"] for r in results] == [" Hello world."] * 3
+    (args,) = whisper_cpp()
+    assert args.count("-f") == 3
+    assert len({args[i + 1] for i, arg in enumerate(args) if arg == "-of"}) == 3
+
+
+class _FakeTensor(np.ndarray):
+    def to(self, device: str) -> "_FakeTensor":
+        return self
+
+
+def test_whisper_backend_decodes_clips_as_one_batch(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Short clips share one decode per language and split at timestamp tokens."""
+    begin = 1000
+    decodes: List[Tuple[str, Tuple[int, ...]]] = []
+    retried: List[Dict[str, Any]] = []
+
+    def decode(model: Any, mel: np.ndarray, options: Any) -> List[SimpleNamespace]:
+        decodes.append((options.language, mel.shape))
+        good = SimpleNamespace(
+            tokens=[begin, 11, 12, begin + 50, begin + 50, 13, begin + 150],
+            temperature=0.0,
+            avg_logprob=-0.2,
+            compression_ratio=1.1,
+            no_speech_prob=0.1,
+        )
+        bad = SimpleNamespace(**{**vars(good), "avg_logprob": -1.5})
+        return [good if options.language == "en" else bad for _ in range(len(mel))]
+
+    tokenizer = SimpleNamespace(
+        timestamp_begin=begin, decode=lambda tokens: "".join(f" w{t}" for t in tokens)
+    )
+    fake = SimpleNamespace(
+        audio=SimpleNamespace(N_SAMPLES=30 * 16000, SAMPLE_RATE=16000),
+        pad_or_trim=lambda audio: audio,
+        log_mel_spectrogram=lambda audio, n_mels: np.zeros((n_mels, 3000)),
+        DecodingOptions=SimpleNamespace,
+        decode=decode,
+        tokenizer=SimpleNamespace(get_tokenizer=lambda *args, **kwargs: tokenizer),
+    )
+    monkeypatch.setattr(whisper_py, "whisper", fake)
+    monkeypatch.setattr(
+        whisper_py,
+        "torch",
+        SimpleNamespace(stack=lambda arrays: np.stack(arrays).view(_FakeTensor)),
+    )
+
+    def transcribe(audio: np.ndarray, **kwargs: Any) -> Dict[str, Any]:
+        retried.append(kwargs)
+        return {"text": " Hallo"}
+
+    backend = whisper_py.WhisperBackend("base")
+    backend.model = SimpleNamespace(
+        dims=SimpleNamespace(n_mels=80),
+        device="cpu",
+        is_multilingual=True,
+        num_languages=99,
+        detect_language=lambda mel: (None, [{"en": 0.9}, {"de": 0.8}, {"en": 0.7}]),
+        transcribe=transcribe,
+    )
+
+    results = backend.transcribe_batch([tone(2.5), tone(4.0), tone(5.0)])
+
+    assert decodes == [("en", (2, 80, 3000)), ("de", (1, 80, 3000))]
+    assert retried[0]["language"] == "de"
+    assert results[1] == {"text": " Hallo"}
+    assert results[0]["text"] == " w11 w12 w13"
+    assert [(s["start"], s["end"], s["text"]) for s in results[0]["segments"]] == [
+        (0.0, 1.0, " w11 w12"),
+        (1.0, 2.5, " w13"),
+    ]
+    assert results[2]["segments"][1]["end"] == 3.0
+
+
+def test_timed_segments_follow_whisper_transcribe() -> None:
+    """Single trailing timestamps close a segment; no pair means one segment."""
+    begin = 1000
+    tokenizer = SimpleNamespace(
+        timestamp_begin=begin, decode=lambda tokens: "".join(f" w{t}" for t in tokens)
+    )
+
+    def split(tokens: List[int]) -> List[Tuple[float, float, str]]:
+        result = SimpleNamespace(
+            tokens=tokens,
+            temperature=0.0,
+            avg_logprob=-0.2,
+            compression_ratio=1.1,
+            no_speech_prob=0.1,
+        )
+        segments = whisper_py._timed_segments(result, tokenizer, 10.0)
+        return [(s["start"], s["end"], s["text"]) for s in segments]
+
+    assert split([begin, 11, begin + 100]) == [(0.0, 2.0, " w11")]
+    assert split([11, 12, begin + 150]) == [(0.0, 3.0, " w11 w12")]
+    assert split([begin, 11, begin + 50, 12, begin + 100]) == [(0.0, 2.0, " w11 w12")]
+    assert split([begin, 11, 12]) == [(0.0, 10.0, " w11 w12")]
+    assert split([begin, 11, begin + 50, begin + 50, 12]) == [
+        (0.0, 1.0, " w11"),
+        (1.0, 10.0, " w12"),
+    ]
+
+
+def test_server_backend_stays_warm_across_files(whisper_cpp: Calls) -> None:
+    """One whisper-server process serves every transcription until closed."""
+    backend = WhisperCppServerBackend("base", startup_timeout=10)
+    backend.load()
+    try:
+        process = backend.process
+        assert process is not None
+        first = backend.transcribe(tone(1.0))
+        second = backend.transcribe(tone(2.0))
+        assert backend.process is process
+    finally:
+        backend.close()
+
+    assert first["segments"][1] == {
+        "id": 1,
+        "start": 1.5,
+        "end": 3.0,
+        "text": " world.",
+    }
+    assert second["text"] == " Hello world."
+    assert process.poll() is not None
+    assert backend.memory_bytes == 1024
+
+
+def test_server_backend_times_out_on_a_hung_server(
+    whisper_cpp: Calls, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """A server that never answers fails the job instead of blocking it."""
+    monkeypatch.setenv("FAKE_WHISPER_HANG", "1")
+    backend = WhisperCppServerBackend("base", startup_timeout=10, request_timeout=0.2)
+    backend.load()
+    try:
+        with pytest.raises(RuntimeError, match="did not answer within"):
+            backend.transcribe(tone(0.1))
+    finally:
+        backend.close()
+
+
+def test_unknown_backend_is_rejected() -> None:
+    with pytest.raises(ValueError, match="whisper-cpp"):
+        get_backend("nope")
@@ -0,0 +1,146 @@
+"""Tests for batch transcription."""
+
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+import pytest
+from click.testing import CliRunner
+
+from tests.conftest import tone
+from transcriber.audio import write_wav
+from transcriber.backends import StubBackend
+from transcriber.batch import collect_inputs, plan_outputs, run_batch
+from transcriber.cli import main
+from transcriber.outputs import default_output_path
+
+
+def _touch(path: Path) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"audio")
+    return path
+
+
+def test_collect_inputs_from_dirs_globs_and_manifest(tmp_path: Path) -> None:
+    """Directories, globs and manifests are expanded and de-duplicated."""
+    a = _touch(tmp_path / "zoom" / "a.m4a")
+    b = _touch(tmp_path / "zoom" / "nested" / "b.opus")
+    _touch(tmp_path / "zoom" / "notes.txt")
+    c = _touch(tmp_path / "c.mp3")
+    manifest = tmp_path / "list.txt"
+    manifest.write_text("# voice notes\nc.mp3\n\nzoom/a.m4a\n")
+
+    inputs = collect_inputs(
+        [str(tmp_path / "zoom"), str(tmp_path / "*.mp3")],
+        manifest=str(manifest),
+    )
+
+    assert inputs == [a, b, c]
+
+
+def test_plan_outputs_keeps_same_named_inputs_apart(tmp_path: Path) -> None:
+    """Inputs sharing a stem keep their subdirectory; true clashes fail up front."""
+    first = tmp_path / "zoom" / "monday" / "audio.m4a"
+    second = tmp_path / "zoom" / "tuesday" / "audio.m4a"
+    out_dir = tmp_path / "out"
+
+    planned = plan_outputs([first, second], ["txt"], out_dir)
+    unique = plan_outputs([first], ["txt"], out_dir)
+
+    assert planned == [
+        {"txt": out_dir / "monday" / "audio_transcript.txt"},
+        {"txt": out_dir / "tuesday" / "audio_transcript.txt"},
+    ]
+    assert unique == [{"txt": out_dir / "audio_transcript.txt"}]
+    with pytest.raises(ValueError, match="would both be transcribed to"):
+        plan_outputs([first, first.with_suffix(".wav")], ["txt"], out_dir)
+
+
+def test_run_batch_skips_existing_and_reports_failures(
+    fake_whisper: SimpleNamespace, monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    """Existing outputs are skipped and a failing file does not abort the batch."""
+    good = _touch(tmp_path / "good.wav")
+    bad = _touch(tmp_path / "bad.wav")
+    done = _touch(tmp_path / "done.wav")
+    out_dir = tmp_path / "out"
+    out_dir.mkdir()
+    default_output_path(done, "srt", out_dir).write_text("existing")
+
+    original = fake_whisper.load_audio
+
+    def load_audio(path: str, sr: int = 16000) -> np.ndarray:
+        if "bad" in str(path):
+            raise RuntimeError("failed to decode")
+        decoded: np.ndarray = original(path, sr)
+        return decoded
+
+    monkeypatch.setattr(fake_whisper, "load_audio", load_audio)
+
+    summary = run_batch(
+        [good, bad, done], output_dir=out_dir, formats=["srt"], workers=1
+    )
+
+    assert [o["input"] for o in summary.completed] == [str(good)]
+    assert summary.failed[0]["error"] == "failed to decode"
+    assert summary.skipped == [done]
+    assert summary.audio_seconds == 3.0
+    assert (out_dir / "good_transcript.srt").read_text().startswith("1\n")
+    assert fake_whisper.loads == [("base", "cpu")]
+
+
+def test_transcribe_batch_command(
+    fake_whisper: SimpleNamespace, tmp_path: Path
+) -> None:
+    """The CLI prints throughput and writes outputs next to the output dir."""
+    _touch(tmp_path / "in" / "one.wav")
+    _touch(tmp_path / "in" / "two.wav")
+
+    runner = CliRunner()
+    result = runner.invoke(
+        main,
+        [
+            "transcribe-batch",
+            str(tmp_path / "in"),
+            "-d",
+            str(tmp_path / "out"),
+            "-j",
+            "1",
+        ],
+    )
+
+    assert result.exit_code == 0, result.output
+    assert "2 transcribed, 0 skipped, 0 failed" in result.output
+    assert "audio hours per hour" in result.output
+    assert (tmp_path / "out" / "one_transcript.txt").read_text() == "Hello world."
+
+
+def test_run_batch_sends_short_files_through_one_model_batch(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    """Short files are transcribed together; each still gets its own outputs."""
+    calls: List[int] = []
+    original = StubBackend.transcribe_batch
+
+    def transcribe_batch(
+        self: StubBackend, clips: Sequence[Any], language: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        calls.append(len(clips))
+        return original(self, clips, language=language)
+
+    monkeypatch.setattr(StubBackend, "transcribe_batch", transcribe_batch)
+    inputs: List[Path] = []
+    for index, seconds in enumerate([4.0, 9.0, 2.0]):
+        inputs.append(tmp_path / f"note{index}.wav")
+        write_wav(inputs[-1], tone(seconds))
+
+    summary = run_batch(
+        inputs, output_dir=tmp_path / "out", formats=["srt"], backend="stub"
+    )
+
+    assert calls == [3]
+    assert len(summary.completed) == 3
+    assert summary.audio_seconds == 15.0
+    srt = (tmp_path / "out" / "note1_transcript.srt").read_text()
+    assert "00:00:05.000 --> 00:00:09.000" in srt
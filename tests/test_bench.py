@@ -0,0 +1,103 @@
+"""Tests for the benchmark suite."""
+
+import json
+from pathlib import Path
+from typing import Any, Dict, Tuple
+
+from click.testing import CliRunner
+
+from transcriber.backends import StubBackend
+from transcriber.bench import BenchConfig, compare, run_benchmarks, synthetic_audio
+from transcriber.cli import main
+
+
+def _report(**values: Tuple[float, str]) -> Dict[str, Any]:
+    return {
+        "metrics": {
+            name: {"value": value, "unit": "s", "better": better}
+            for name, (value, better) in values.items()
+        }
+    }
+
+
+def test_stub_backend_emits_segments_for_the_whole_audio() -> None:
+    """The stub model covers the audio with placeholder segments."""
+    backend = StubBackend("tiny")
+    backend.load()
+
+    result = backend.transcribe(synthetic_audio(12.0), language="de")
+
+    assert [s["end"] for s in result["segments"]] == [5.0, 10.0, 12.0]
+    assert result["language"] == "de"
+    assert backend.memory_bytes is not None and backend.memory_bytes > 0
+
+
+def test_run_benchmarks_reports_every_metric() -> None:
+    """A small run produces load, RTF, writer, memory, serialization and RSS metrics."""
+    config = BenchConfig(model="tiny", audio_seconds=5, segments=200, repeats=1)
+
+    report = run_benchmarks(config)
+
+    metrics = report["metrics"]
+    for name in (
+        "model_load_cold_seconds",
+        "rtf",
+        "rtf_vad",
+        "srt_segments_per_second",
+        "json_mb_per_second",
+        "segments_memory_reduction",
+        "segments_peak_reduction",
+        "json_stream_seconds",
+        "npz_seconds",
+        "refine_first_text_seconds",
+        "refine_final_seconds",
+        "threads_budgeted_audio_seconds_per_second",
+        "peak_rss_mb",
+    ):
+        assert metrics[name]["value"] > 0, name
+    assert report["config"]["backend"] == "stub"
+    json.dumps(report)
+
+
+def test_compare_respects_metric_direction() -> None:
+    """Slower times and lower throughput are regressions; noise is ignored."""
+    baseline = _report(
+        load=(1.0, "lower"), speed=(100.0, "higher"), rss=(50.0, "lower")
+    )
+    current = _report(load=(1.5, "lower"), speed=(150.0, "higher"), rss=(52.0, "lower"))
+
+    rows = {row["name"]: row for row in compare(current, baseline, tolerance=0.1)}
+
+    assert rows["load"]["status"] == "regressed"
+    assert rows["speed"]["status"] == "improved"
+    assert rows["rss"]["status"] == "unchanged"
+
+
+def test_bench_command_writes_json_and_compares(tmp_path: Path) -> None:
+    """`bench` saves results and flags regressions against a baseline."""
+    baseline = tmp_path / "baseline.json"
+    baseline.write_text(json.dumps(_report(srt_segments_per_second=(1e12, "higher"))))
+    output = tmp_path / "results.json"
+
+    result = CliRunner().invoke(
+        main,
+        [
+            "bench",
+            "--only",
+            "formatters",
+            "--segments",
+            "100",
+            "--repeats",
+            "1",
+            "-o",
+            str(output),
+            "--baseline",
+            str(baseline),
+            "--fail-on-regression",
+        ],
+    )
+
+    assert result.exit_code == 1
+    assert "srt_segments_per_second" in result.output
+    assert "regressed" in result.output
+    assert json.loads(output.read_text())["benchmarks"] == ["formatters"]
@@ -0,0 +1,174 @@
+"""Tests for the content-addressed transcript cache."""
+
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, NoReturn
+
+import numpy as np
+import pytest
+from click.testing import CliRunner
+
+from transcriber import cli
+from transcriber.cache import TranscriptCache, audio_fingerprint, transcript_key
+from transcriber.cli import main
+from transcriber.downloader import YouTubeDownloader
+from transcriber.engine import TranscriptionEngine
+
+RESULT = {
+    "text": "Hi",
+    "segments": [{"start": 0.0, "end": 1.0, "text": "Hi"}],
+    "language": "en",
+}
+
+
+def test_put_get_and_alias(tmp_path: Path) -> None:
+    """Results round-trip by key and through aliases."""
+    cache = TranscriptCache(tmp_path)
+
+    assert cache.get("missing") is None
+    cache.put("abc", RESULT)
+    cache.alias("youtube:xyz", "abc", stem="Talk")
+
+    assert cache.get("abc") == RESULT
+    assert cache.lookup_alias("youtube:xyz") == RESULT
+    assert cache.resolve_alias("youtube:xyz") == {"stem": "Talk", "key": "abc"}
+    stats = cache.stats()
+    assert stats["entries"] == 1
+    assert stats["hits"] == 2
+    assert stats["misses"] == 1
+
+
+def _miss_many(directory: Path) -> None:
+    cache = TranscriptCache(directory)
+    for _ in range(25):
+        cache.get("missing")
+    cache.flush()  # pool workers exit without running atexit handlers
+
+
+def test_counters_survive_concurrent_processes(tmp_path: Path) -> None:
+    """Batch workers sharing a cache do not lose each other's counts."""
+    with ProcessPoolExecutor(max_workers=4) as pool:
+        list(pool.map(_miss_many, [tmp_path] * 4))
+
+    assert TranscriptCache(tmp_path).stats()["misses"] == 100
+
+
+def test_evicts_least_recently_used(tmp_path: Path) -> None:
+    """Entries over the size cap are evicted oldest-access first."""
+    cache = TranscriptCache(tmp_path, max_bytes=250)
+    for index, key in enumerate(["a", "b"]):
+        cache.put(key, {"text": key * 80})
+        os.utime(tmp_path / "transcripts" / f"{key}.json", (index, index))
+    cache.get("a")  # refresh "a" so "b" is the LRU entry
+    cache.put("c", {"text": "c" * 80})
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_tracks_size_and_buffers_lookups(tmp_path: Path) -> None:
+    """Puts keep a running total; lookups are written to stats.json in batches."""
+    cache = TranscriptCache(tmp_path)
+    cache.put("a", RESULT)
+    cache.put("a", {**RESULT, "text": "Hello"})
+    stats_path = tmp_path / "stats.json"
+    size = (tmp_path / "transcripts" / "a.json").stat().st_size
+    assert json.loads(stats_path.read_text()) == {"bytes": size}
+
+    cache.get("a")
+    cache.get("missing")
+    assert "hits" not in json.loads(stats_path.read_text())
+
+    cache.flush()
+    counters = json.loads(stats_path.read_text())
+    assert (counters["hits"], counters["misses"]) == (1, 1)
+
+
+def test_keys_depend_on_audio_and_options() -> None:
+    """Different audio, models or options never share a key."""
+    audio = np.zeros(16000, dtype=np.float32)
+    fingerprint = audio_fingerprint(audio)
+
+    assert fingerprint == audio_fingerprint(audio.copy())
+    assert fingerprint != audio_fingerprint(audio + 0.1)
+    assert transcript_key(fingerprint, "base") != transcript_key(fingerprint, "small")
+    assert transcript_key(fingerprint, "base") != transcript_key(
+        fingerprint, "base", "fr"
+    )
+    assert transcript_key(fingerprint, "base") != transcript_key(
+        fingerprint, "base", vad=False
+    )
+
+
+def test_engine_returns_cached_result(
+    fake_whisper: SimpleNamespace, tmp_path: Path
+) -> None:
+    """A second transcription of the same audio skips the model."""
+    cache = TranscriptCache(tmp_path)
+    engine = TranscriptionEngine(model="tiny", cache=cache)
+
+    first = engine.transcribe("a.wav")
+    second = engine.transcribe("copy-of-a.wav")
+
+    assert second == first
+    assert len(fake_whisper.loaded[0].calls) == 1
+    assert engine.last_cache_key is not None
+    assert cache.get(engine.last_cache_key) == first
+
+
+def test_youtube_cache_hit_skips_download(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    """Known video ids are served from the cache before downloading anything."""
+    cache = TranscriptCache()
+    alias = transcript_key(
+        "youtube:dQw4w9WgXcQ", "base", None, True, cli.DEFAULT_THRESHOLD_DB
+    )
+    cache.put("k1", RESULT)
+    cache.alias(alias, "k1", stem="Never Gonna")
+
+    def fail(*args: Any, **kwargs: Any) -> NoReturn:
+        raise AssertionError("should not download")
+
+    monkeypatch.setattr(YouTubeDownloader, "download_audio", fail)
+    monkeypatch.chdir(tmp_path)
+
+    runner = CliRunner()
+    result = runner.invoke(
+        main,
+        ["youtube", "https://youtu.be/dQw4w9WgXcQ", "--format", "srt", "--cache"],
+    )
+
+    assert result.exit_code == 0, result.output
+    assert "Using cached transcript" in result.output
+    assert (tmp_path / "Never Gonna_transcript.srt").read_text().startswith("1\n")
+
+
+def test_video_id_parsing() -> None:
+    """Video ids are extracted from common URL shapes."""
+    assert YouTubeDownloader.video_id(
+        "https://www.youtube.com/watch?v=dQw4w9WgXcQ&t=1"
+    ) == ("dQw4w9WgXcQ")
+    assert (
+        YouTubeDownloader.video_id("https://youtube.com/shorts/dQw4w9WgXcQ")
+        == "dQw4w9WgXcQ"
+    )
+    assert YouTubeDownloader.video_id("https://example.com/video") is None
+
+
+def test_cache_cli_stats_and_clear() -> None:
+    """`cache stats` and `cache clear` report and empty the cache."""
+    TranscriptCache().put("abc", RESULT)
+    runner = CliRunner()
+
+    stats = runner.invoke(main, ["cache", "stats"])
+    cleared = runner.invoke(main, ["cache", "clear", "--yes"])
+
+    assert "Entries:   1" in stats.output
+    assert "Removed 1 cached transcripts" in cleared.output
+    assert TranscriptCache().stats()["entries"] == 0
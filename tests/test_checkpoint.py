@@ -0,0 +1,121 @@
+"""Tests for checkpointed, resumable transcription."""
+
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pytest
+from click.testing import CliRunner
+
+from tests.conftest import tone
+from transcriber.audio import write_wav
+from transcriber.checkpoint import Checkpoint, checkpoint_path
+from transcriber.cli import main
+from transcriber.engine import TranscriptionEngine
+
+SR = 16000
+
+
+def _long_audio() -> np.ndarray:
+    """Four 25 s stretches of tone separated by one-second pauses."""
+    pause = np.zeros(SR, dtype=np.float32)
+    return np.concatenate([tone(25), pause] * 3 + [tone(25)])
+
+
+class Killed(Exception):
+    """Stands in for the process dying (OOM, pre-emption, Ctrl+C)."""
+
+
+def test_resume_matches_an_uninterrupted_run(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """A run killed part-way resumes where it stopped with identical output."""
+    audio = _long_audio()
+    engine = TranscriptionEngine(model="tiny", backend="stub")
+    expected = engine.transcribe(audio, checkpoint=Checkpoint(tmp_path / "full"))
+    assert expected["windows"] == 4
+
+    # Models are shared through the registry, so one patch covers both runs.
+    assert engine.backend is not None
+    transcribe = engine.backend.transcribe
+    calls: List[int] = []
+    budget = [2]
+
+    def dies_after_budget(
+        audio: np.ndarray, language: Optional[str] = None
+    ) -> Dict[str, Any]:
+        if len(calls) == budget[0]:
+            raise Killed
+        calls.append(len(audio))
+        return transcribe(audio, language=language)
+
+    monkeypatch.setattr(engine.backend, "transcribe", dies_after_budget)
+    path = tmp_path / "talk.checkpoint"
+    with pytest.raises(Killed):
+        engine.transcribe(audio, checkpoint=Checkpoint(path))
+    assert len(path.read_text().splitlines()) == 3
+
+    budget[0] = 99
+    resumed = TranscriptionEngine(model="tiny", backend="stub")
+    result = resumed.transcribe(audio, checkpoint=Checkpoint(path, resume=True))
+
+    assert len(calls) == 4
+    assert result == expected
+
+
+def test_checkpoint_for_other_audio_is_ignored(tmp_path: Path) -> None:
+    path = tmp_path / "talk.checkpoint"
+    checkpoint = Checkpoint(path)
+    checkpoint.start("key-a", 3)
+    checkpoint.add(0, {"text": " A."})
+    checkpoint.close()
+
+    assert Checkpoint(path, resume=True).start("key-b", 3) == []
+    header = json.loads(path.read_text().splitlines()[0])
+    assert header["key"] == "key-b"
+
+
+def test_torn_line_is_dropped_on_resume(tmp_path: Path) -> None:
+    """A line half-written when the process died does not end the checkpoint."""
+    path = tmp_path / "talk.checkpoint"
+    checkpoint = Checkpoint(path)
+    checkpoint.start("key", 3)
+    checkpoint.add(0, {"text": " A."})
+    checkpoint.close()
+    with open(path, "a") as f:
+        f.write('{"window": 1, "res')
+
+    resumed = Checkpoint(path, resume=True)
+    assert resumed.start("key", 3) == [{"text": " A."}]
+    resumed.add(1, {"text": " B."})
+    resumed.close()
+
+    assert Checkpoint(path, resume=True).start("key", 3) == [
+        {"text": " A."},
+        {"text": " B."},
+    ]
+
+
+def test_cli_resume_removes_checkpoint_after_writing(tmp_path: Path) -> None:
+    audio_path = tmp_path / "talk.wav"
+    write_wav(audio_path, _long_audio())
+    output = tmp_path / "talk.txt"
+
+    result = CliRunner().invoke(
+        main,
+        [
+            "transcribe",
+            str(audio_path),
+            "-o",
+            str(output),
+            "--backend",
+            "stub",
+            "--no-cache",
+            "--resume",
+        ],
+    )
+
+    assert result.exit_code == 0, result.output
+    assert output.read_text().startswith("Segment 1.")
+    assert not checkpoint_path(output).exists()
@@ -1,8 +1,11 @@
 """Tests for CLI functionality."""
 
+from typing import List
+
 import pytest
 from click.testing import CliRunner
 
+from transcriber.bench import measure_cli_startup
 from transcriber.cli import main
 from transcriber.downloader import YT_DLP_AVAILABLE
 from transcriber.engine import WHISPER_AVAILABLE
@@ -21,6 +24,13 @@ class TestCLI:
         assert "transcribe" in result.output
         assert "youtube" in result.output
 
+    @pytest.mark.parametrize("args", [["--help"], ["models"], ["youtube", "--help"]])
+    def test_startup_skips_heavy_imports(self, args: List[str]) -> None:
+        """torch, whisper and yt_dlp load only when a command needs them."""
+        _, loaded = measure_cli_startup(args)
+
+        assert loaded == []
+
     def test_models_command(self):
         """Test models listing command."""
         runner = CliRunner()
@@ -45,8 +55,8 @@ class TestCLI:
         """Test transcribe command when Whisper is not available."""
         if not WHISPER_AVAILABLE:
             # Create a dummy file so we can test the whisper availability check
-            import tempfile
             import os
+            import tempfile
 
             with tempfile.NamedTemporaryFile(suffix='.mp3', delete=False) as tmp:
                 tmp_path = tmp.name
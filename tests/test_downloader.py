@@ -1,7 +1,12 @@
 """Tests for YouTube downloader fallback behavior."""
 
+import time
 from pathlib import Path
 from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Literal, Optional, Tuple
+
+import numpy as np
+import pytest
 
 from transcriber import downloader
 
@@ -43,3 +48,335 @@ def test_download_audio_retries_after_first_attempt_fails(monkeypatch, tmp_path)
 
     assert result == Path(expected_output)
     assert len(attempts) == 2
+
+
+def test_expand_url_flattens_channel_tabs(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    """Channel tabs and playlists are flattened into watch URLs."""
+    listing: Dict[str, Any] = {
+        "_type": "playlist",
+        "entries": [
+            {
+                "_type": "playlist",
+                "entries": [
+                    {"id": "aaaaaaaaaaa", "url": "aaaaaaaaaaa", "title": "One"},
+                    None,
+                ],
+            },
+            {"id": "bbbbbbbbbbb", "url": "https://www.youtube.com/watch?v=bbbbbbbbbbb"},
+        ],
+    }
+
+    class FakeYoutubeDL:
+        def __init__(self, opts: Dict[str, Any]) -> None:
+            assert opts["extract_flat"] == "in_playlist"
+
+        def __enter__(self) -> "FakeYoutubeDL":
+            return self
+
+        def __exit__(self, *exc_info: Any) -> Literal[False]:
+            return False
+
+        def extract_info(self, url: str, download: bool = True) -> Dict[str, Any]:  # noqa: ARG002
+            return listing
+
+    monkeypatch.setattr(downloader, "yt_dlp", SimpleNamespace(YoutubeDL=FakeYoutubeDL))
+    monkeypatch.setattr(downloader, "YT_DLP_AVAILABLE", True)
+
+    dl = downloader.YouTubeDownloader(output_dir=str(tmp_path))
+    entries = dl.expand_url("https://www.youtube.com/@channel")
+
+    assert [e["url"] for e in entries] == [
+        "https://www.youtube.com/watch?v=aaaaaaaaaaa",
+        "https://www.youtube.com/watch?v=bbbbbbbbbbb",
+    ]
+    assert entries[0]["title"] == "One"
+    assert dl.expand_url("https://youtu.be/ccccccccccc")[0]["id"] == "ccccccccccc"
+
+
+def _fake_ydl(info: Dict[str, Any]) -> SimpleNamespace:
+    class FakeYoutubeDL:
+        def __init__(self, opts: Dict[str, Any]) -> None:
+            self.opts = opts
+
+        def __enter__(self) -> "FakeYoutubeDL":
+            return self
+
+        def __exit__(self, *exc_info: Any) -> Literal[False]:
+            return False
+
+        def extract_info(self, url: str, download: bool = True) -> Dict[str, Any]:
+            assert download is False
+            assert self.opts["format"].startswith("bestaudio/")
+            return info
+
+        def prepare_filename(self, info: Dict[str, Any]) -> str:
+            return f"/tmp/{info['title']}.{info['ext']}"
+
+    return SimpleNamespace(YoutubeDL=FakeYoutubeDL)
+
+
+def test_stream_audio_decodes_the_media_url_without_a_file(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    """The audio-only format is handed to ffmpeg with its HTTP headers."""
+    info: Dict[str, Any] = {
+        "title": "Talk",
+        "ext": "webm",
+        "requested_formats": [
+            {"url": "https://video", "acodec": "none", "protocol": "https"},
+            {
+                "url": "https://audio",
+                "acodec": "opus",
+                "protocol": "https",
+                "http_headers": {"User-Agent": "test"},
+            },
+        ],
+    }
+    decoded: List[Tuple[str, Optional[Dict[str, str]]]] = []
+
+    def load_audio_url(
+        url: str, sample_rate: int = 16000, headers: Optional[Dict[str, str]] = None
+    ) -> np.ndarray:
+        decoded.append((url, headers))
+        return np.zeros(sample_rate, dtype=np.float32)
+
+    monkeypatch.setattr(downloader, "yt_dlp", _fake_ydl(info))
+    monkeypatch.setattr(downloader, "YT_DLP_AVAILABLE", True)
+    monkeypatch.setattr(downloader, "load_audio_url", load_audio_url)
+    monkeypatch.setattr(downloader.shutil, "which", lambda name: "/usr/bin/ffmpeg")
+
+    downloads = tmp_path / "downloads"
+    dl = downloader.YouTubeDownloader(output_dir=str(downloads))
+    audio, stem = dl.stream_audio("https://youtu.be/test-id")
+
+    assert len(audio) == 16000
+    assert stem == "Talk"
+    assert decoded == [("https://audio", {"User-Agent": "test"})]
+    assert list(downloads.iterdir()) == []
+
+
+def test_stream_audio_refuses_segmented_streams(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    """DASH segment lists cannot be read by ffmpeg; callers fall back."""
+    info: Dict[str, Any] = {
+        "title": "Talk",
+        "ext": "m4a",
+        "url": "https://manifest",
+        "acodec": "mp4a",
+        "protocol": "http_dash_segments",
+    }
+    monkeypatch.setattr(downloader, "yt_dlp", _fake_ydl(info))
+    monkeypatch.setattr(downloader, "YT_DLP_AVAILABLE", True)
+    monkeypatch.setattr(downloader.shutil, "which", lambda name: "/usr/bin/ffmpeg")
+
+    dl = downloader.YouTubeDownloader(output_dir=str(tmp_path))
+    with pytest.raises(downloader.StreamingUnavailable):
+        dl.stream_audio("https://youtu.be/test-id")
+
+
+def test_download_tries_the_last_working_strategy_first(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    """A strategy that worked is tried first next time; failures are counted."""
+    formats: List[str] = []
+
+    class FakeYoutubeDL:
+        def __init__(self, opts: Dict[str, Any]) -> None:
+            self.opts = opts
+
+        def __enter__(self) -> "FakeYoutubeDL":
+            return self
+
+        def __exit__(self, *exc_info: Any) -> Literal[False]:
+            return False
+
+        def extract_info(self, url: str, download: bool = True) -> Dict[str, Any]:
+            formats.append(self.opts["format"])
+            if not self.opts["format"].startswith("140/"):
+                raise RuntimeError("HTTP Error 403: Forbidden")
+            (tmp_path / "sample.m4a").write_bytes(b"audio")
+            return {"id": "abcdefghijk", "ext": "m4a", "title": "sample"}
+
+        def prepare_filename(self, info: Dict[str, Any]) -> str:
+            return str(tmp_path / "sample.m4a")
+
+    monkeypatch.setattr(downloader, "yt_dlp", SimpleNamespace(YoutubeDL=FakeYoutubeDL))
+    monkeypatch.setattr(downloader, "YT_DLP_AVAILABLE", True)
+
+    downloader.YouTubeDownloader(output_dir=str(tmp_path)).download_audio(
+        "https://youtu.be/abcdefghijk"
+    )
+    assert len(formats) == 3
+
+    formats.clear()
+    dl = downloader.YouTubeDownloader(output_dir=str(tmp_path))
+    dl.download_audio("https://youtu.be/abcdefghijk")
+    assert len(formats) == 1
+
+    strategies = dl.stats()["strategies"]
+    assert strategies["itag-140"]["successes"] == 2
+    assert strategies["requested"]["failures"] == 1
+    # The info dict from the download answers later metadata lookups.
+    assert dl.get_video_info("https://youtu.be/abcdefghijk")["title"] == "sample"
+    assert len(formats) == 1
+    assert dl.stats()["info_cache"]["hits"] == 1
+
+
+def _racing_ydl(
+    tmp_path: Path,
+    behaviour: Callable[[str], str],
+    calls: List[Tuple[str, Optional[float]]],
+) -> SimpleNamespace:
+    """yt-dlp stand-in whose extraction hangs, fails or succeeds per format."""
+
+    class FakeYoutubeDL:
+        def __init__(self, opts: Dict[str, Any]) -> None:
+            self.opts = opts
+
+        def __enter__(self) -> "FakeYoutubeDL":
+            return self
+
+        def __exit__(self, *exc_info: Any) -> Literal[False]:
+            return False
+
+        def extract_info(self, url: str, download: bool = True) -> Dict[str, Any]:
+            action = behaviour(self.opts["format"])
+            calls.append((self.opts["format"], self.opts.get("socket_timeout")))
+            if action == "hang":
+                time.sleep(5)
+            if action == "fail":
+                raise RuntimeError("HTTP Error 403: Forbidden")
+            if action == "slow":
+                time.sleep(0.3)
+            return {
+                "id": "abcdefghijk",
+                "ext": "m4a",
+                "title": self.opts["format"],
+                "url": f"https://media/{self.opts['format']}",
+                "acodec": "mp4a",
+            }
+
+        def process_ie_result(
+            self, info: Dict[str, Any], download: bool = True
+        ) -> Dict[str, Any]:
+            if behaviour(self.opts["format"]) == "broken-download":
+                raise RuntimeError("HTTP Error 403: Forbidden")
+            (tmp_path / "sample.m4a").write_bytes(b"audio")
+            return info
+
+        def prepare_filename(self, info: Dict[str, Any]) -> str:
+            return str(tmp_path / "sample.m4a")
+
+    return SimpleNamespace(YoutubeDL=FakeYoutubeDL)
+
+
+def test_race_takes_the_first_strategy_to_succeed(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    """A hanging first strategy does not delay a working one racing beside it."""
+
+    def behaviour(format: str) -> str:
+        if format.startswith("best[height"):
+            return "hang"
+        if format.startswith("bestaudio[ext=m4a]"):
+            return "slow"
+        return "ok"
+
+    calls: List[Tuple[str, Optional[float]]] = []
+    monkeypatch.setattr(downloader, "yt_dlp", _racing_ydl(tmp_path, behaviour, calls))
+    monkeypatch.setattr(downloader, "YT_DLP_AVAILABLE", True)
+
+    dl = downloader.YouTubeDownloader(output_dir=str(tmp_path), race=3)
+    started = time.perf_counter()
+    path = dl.download_audio("https://youtu.be/abcdefghijk")
+
+    assert time.perf_counter() - started < 1
+    assert path == tmp_path / "sample.m4a"
+    assert dl.stats()["strategies"]["itag-140"]["successes"] == 1
+    # Only the three racing strategies were started.
+    assert len(calls) == 3
+
+
+def test_race_falls_back_when_the_winners_download_fails(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    """A winner whose download fails is dropped and the rest race again."""
+
+    def behaviour(format: str) -> str:
+        if format.startswith("best[height"):
+            return "broken-download"
+        return "fail" if format.startswith("bestaudio[ext=m4a]") else "slow"
+
+    calls: List[Tuple[str, Optional[float]]] = []
+    monkeypatch.setattr(downloader, "yt_dlp", _racing_ydl(tmp_path, behaviour, calls))
+    monkeypatch.setattr(downloader, "YT_DLP_AVAILABLE", True)
+
+    dl = downloader.YouTubeDownloader(output_dir=str(tmp_path), race=2)
+    path = dl.download_audio("https://youtu.be/abcdefghijk")
+
+    assert path == tmp_path / "sample.m4a"
+    strategies = dl.stats()["strategies"]
+    assert strategies["requested"]["failures"] == 1
+    assert strategies["requested"]["successes"] == 0
+    assert strategies["itag-140"]["successes"] == 1
+    # The broken winner is not raced again.
+    assert [format for format, _ in calls].count(calls[0][0]) == 1
+
+
+def test_attempt_timeout_abandons_a_hung_strategy(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    """Tried one at a time, a hung strategy is cut off at its deadline."""
+
+    def behaviour(format: str) -> str:
+        return "hang" if format.startswith("best[height") else "fail"
+
+    calls: List[Tuple[str, Optional[float]]] = []
+    monkeypatch.setattr(downloader, "yt_dlp", _racing_ydl(tmp_path, behaviour, calls))
+    monkeypatch.setattr(downloader, "YT_DLP_AVAILABLE", True)
+
+    dl = downloader.YouTubeDownloader(output_dir=str(tmp_path), attempt_timeout=0.2)
+    started = time.perf_counter()
+    with pytest.raises(RuntimeError, match="Forbidden"):
+        dl.download_audio("https://youtu.be/abcdefghijk")
+
+    assert time.perf_counter() - started < 1
+    assert [timeout for _, timeout in calls] == [0.2] * 4
+    strategies = dl.stats()["strategies"]
+    assert strategies["requested"]["failures"] == 1
+    assert sum(s["failures"] for s in strategies.values()) == 4
+
+
+def test_raced_stream_falls_back_when_the_winner_cannot_be_decoded(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    """A raced winner whose stream fails to decode is dropped and recorded once."""
+
+    def behaviour(format: str) -> str:
+        return "ok" if format.startswith("bestaudio/best[height") else "slow"
+
+    def load_audio_url(
+        url: str, sample_rate: int = 16000, headers: Optional[Dict[str, str]] = None
+    ) -> np.ndarray:
+        if "best[height" in url:
+            raise RuntimeError("HTTP Error 403: Forbidden")
+        return np.zeros(sample_rate, dtype=np.float32)
+
+    calls: List[Tuple[str, Optional[float]]] = []
+    monkeypatch.setattr(downloader, "yt_dlp", _racing_ydl(tmp_path, behaviour, calls))
+    monkeypatch.setattr(downloader, "YT_DLP_AVAILABLE", True)
+    monkeypatch.setattr(downloader, "load_audio_url", load_audio_url)
+    monkeypatch.setattr(downloader.shutil, "which", lambda name: "/usr/bin/ffmpeg")
+
+    dl = downloader.YouTubeDownloader(output_dir=str(tmp_path), race=2)
+    audio, stem = dl.stream_audio("https://youtu.be/abcdefghijk")
+
+    assert len(audio) == 16000
+    assert stem == "sample"
+    strategies = dl.stats()["strategies"]
+    assert strategies["requested"]["failures"] == 1
+    assert strategies["requested"]["successes"] == 0
+    assert sum(s["successes"] for s in strategies.values()) == 1
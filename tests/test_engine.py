@@ -1,9 +1,16 @@
 """Tests for transcription engine."""
 
-import pytest
+from typing import Any, Dict, List, NoReturn, Optional, Union
 from unittest.mock import Mock, patch
 
-from transcriber.engine import TranscriptionEngine, WHISPER_AVAILABLE
+import numpy as np
+import pytest
+
+from tests.conftest import tone
+from transcriber.engine import WHISPER_AVAILABLE, TranscriptionEngine
+from transcriber.profiling import Profiler, profiling
+from transcriber.registry import ModelRegistry
+from transcriber.vad import SAMPLE_RATE
 
 
 class TestTranscriptionEngine:
@@ -84,3 +91,67 @@ class TestTranscriptionEngine:
 
         mock_load_model.assert_called_once_with("tiny", device="cpu")
         assert engine.model == mock_model
+
+
+def test_transcribe_many_batches_short_clips_in_input_order(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Short clips share backend batches; long and broken inputs do not."""
+    engine = TranscriptionEngine(model="tiny", backend="stub", registry=ModelRegistry())
+    assert engine.backend is not None
+    batches: List[List[int]] = []
+    transcribe_batch = engine.backend.transcribe_batch
+
+    def record(
+        clips: List[np.ndarray], language: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        batches.append([round(len(clip) / SAMPLE_RATE) for clip in clips])
+        return transcribe_batch(clips, language=language)
+
+    monkeypatch.setattr(engine.backend, "transcribe_batch", record)
+    inputs: List[Union[str, np.ndarray]] = [
+        tone(12.0),
+        tone(45.0),
+        "missing.wav",
+        tone(3.0),
+        tone(8.0),
+    ]
+
+    results = engine.transcribe_many(inputs, vad=False, batch_size=2)
+
+    assert batches == [[3, 8], [12]]
+    assert [r["segments"][-1]["end"] for r in results if isinstance(r, dict)] == [
+        12.0,
+        45.0,
+        3.0,
+        8.0,
+    ]
+    assert isinstance(results[2], Exception)
+    assert results[0] == engine.transcribe(tone(12.0), vad=False)
+
+
+def test_failed_batch_is_retried_one_clip_at_a_time(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """A batch error falls back to per-clip transcription, with VAD remapping."""
+    engine = TranscriptionEngine(model="tiny", backend="stub", registry=ModelRegistry())
+
+    def fail(clips: List[np.ndarray], language: Optional[str] = None) -> NoReturn:
+        raise RuntimeError("out of memory")
+
+    monkeypatch.setattr(engine.backend, "transcribe_batch", fail)
+    silence = np.zeros(SAMPLE_RATE * 2, dtype=np.float32)
+    padded = np.concatenate([silence, tone(6.0)])
+
+    with profiling(Profiler()) as profiler:
+        results = engine.transcribe_many([padded, tone(4.0), silence])
+
+    fallback = [r for r in profiler.records if r["stage"] == "batch_fallback"]
+    assert [r["error"] for r in fallback] == ["RuntimeError: out of memory"]
+    first, second, empty = results
+    assert isinstance(first, dict) and isinstance(second, dict)
+    assert isinstance(empty, dict)
+    assert first["segments"][0]["start"] >= 1.5
+    assert first["vad"]["removed_seconds"] > 1.5
+    assert second["text"] == " Segment 1."
+    assert empty["text"] == ""
@@ -0,0 +1,194 @@
+"""Tests for the streaming output formatters."""
+
+import io
+import json
+from pathlib import Path
+from typing import Any, Dict, Mapping, Optional
+
+import numpy as np
+import pytest
+
+from transcriber import formatters
+from transcriber.bench import synthetic_result
+from transcriber.formatters import (
+    SegmentWriter,
+    available_formats,
+    format_timestamp,
+    get_formatter,
+    iter_json,
+    load_npz,
+    open_writer,
+    register_formatter,
+    write_result,
+    write_results,
+)
+from transcriber.segments import SegmentStore
+
+RESULT: Dict[str, Any] = {
+    "text": " Hello there. General Kenobi! ",
+    "segments": [
+        {"id": 0, "start": 0.0, "end": 1.25, "text": " Hello there.", "tokens": [1, 2]},
+        {
+            "id": 1,
+            "start": 3661.5,
+            "end": 3663.0,
+            "text": " General Kenobi! ",
+            "tokens": [3],
+        },
+    ],
+    "language": "en",
+}
+
+
+@pytest.mark.parametrize(
+    "seconds, expected",
+    [
+        (0, "00:00:00.000"),
+        (3661.5, "01:01:01.500"),
+        (59.9996, "00:01:00.000"),
+        (-0.2, "00:00:00.000"),
+    ],
+)
+def test_format_timestamp(seconds: float, expected: str) -> None:
+    """Timestamps use millisecond precision and never overflow the seconds field."""
+    assert format_timestamp(seconds) == expected
+    assert format_timestamp(seconds, vtt=True) == expected.replace(".", ",")
+
+
+def test_srt_and_vtt_output(tmp_path: Path) -> None:
+    """Subtitle writers produce numbered cues and a WEBVTT header."""
+    write_result(RESULT, tmp_path / "out.srt", "srt")
+    write_result(RESULT, tmp_path / "out.vtt", "vtt")
+
+    assert (tmp_path / "out.srt").read_text() == (
+        "1\n00:00:00.000 --> 00:00:01.250\nHello there.\n\n"
+        "2\n01:01:01.500 --> 01:01:03.000\nGeneral Kenobi!\n\n"
+    )
+    assert (
+        (tmp_path / "out.vtt")
+        .read_text()
+        .startswith("WEBVTT\n\n00:00:00,000 --> 00:00:01,250\nHello there.\n\n")
+    )
+
+
+def test_json_matches_json_dump(tmp_path: Path) -> None:
+    """Streaming JSON output is identical to json.dump(indent=2)."""
+    write_result(RESULT, tmp_path / "out.json", "json")
+    write_result({"text": "", "segments": []}, tmp_path / "empty.json", "json")
+
+    assert (tmp_path / "out.json").read_text() == json.dumps(RESULT, indent=2)
+    assert json.loads((tmp_path / "empty.json").read_text()) == {
+        "text": "",
+        "segments": [],
+    }
+
+
+def test_json_converts_arrays() -> None:
+    """NumPy values are serialized without a pre-pass over the result."""
+    buffer = io.StringIO()
+    with open_writer("json", buffer) as writer:
+        writer.write_segment({"start": np.float32(0.5), "tokens": np.array([1, 2])})
+
+    assert json.loads(buffer.getvalue()) == {
+        "segments": [{"start": 0.5, "tokens": [1, 2]}]
+    }
+
+
+@pytest.mark.parametrize("indent", [2, None])
+def test_iter_json_matches_json_dumps(
+    monkeypatch: pytest.MonkeyPatch, indent: Optional[int]
+) -> None:
+    """Streamed arrays, stores and big containers encode exactly as json.dumps."""
+    monkeypatch.setattr(formatters.structured, "ARRAY_CHUNK", 3)
+    result = synthetic_result(20, decoder_fields=True)
+    value = {
+        **result,
+        "segments": SegmentStore(result["segments"]),
+        "probs": np.array([0.25, np.nan, -np.inf, 1e-7], dtype=np.float32),
+        "grid": np.arange(6).reshape(2, 3),
+        "flags": np.array([True, False]),
+        "big": list(range(2000)),
+        "nested": {1: [], "é": {}, None: [1.5, True, "\n"]},
+    }
+    expected = json.dumps(
+        {**value, "segments": result["segments"]},
+        indent=indent,
+        ensure_ascii=False,
+        default=formatters.json_default,
+    )
+
+    assert "".join(iter_json(value, indent)) == expected
+
+
+def test_npz_round_trips_a_result(tmp_path: Path) -> None:
+    """NPZ output loads back without pickles into an equal result."""
+    result = synthetic_result(30, decoder_fields=True)
+    result["segments"][3]["speaker"] = "alice"
+    path = tmp_path / "out.npz"
+
+    write_result({**result, "segments": SegmentStore(result["segments"])}, path, "npz")
+    with np.load(path, allow_pickle=False) as archive:
+        assert archive["segment_start"].dtype == np.float64
+    loaded = load_npz(path)
+
+    assert isinstance(loaded["segments"], SegmentStore)
+    assert loaded["segments"] == result["segments"]
+    assert {k: v for k, v in loaded.items() if k != "segments"} == {
+        k: v for k, v in result.items() if k != "segments"
+    }
+
+
+def test_txt_streams_stripped_text() -> None:
+    """Streamed text matches the stripped concatenation of segment texts."""
+    buffer = io.StringIO()
+    writer = open_writer("txt", buffer)
+    for segment in [
+        {"text": "  "},
+        {"text": " Hello"},
+        {"text": " world. "},
+        {"text": " "},
+    ]:
+        writer.write_segment(segment)
+    writer.close()
+
+    assert buffer.getvalue() == "Hello world."
+
+
+def test_writer_flushes_incrementally(tmp_path: Path) -> None:
+    """Segments reach the file before the writer is closed."""
+    path = tmp_path / "live.srt"
+    writer = open_writer("srt", path, flush_every=1)
+    writer.write_segment(RESULT["segments"][0])
+
+    assert path.read_text().startswith("1\n00:00:00.000")
+    writer.close()
+
+
+def test_write_results_reads_segments_once() -> None:
+    """Every format is written from a single pass over the segments."""
+    outputs = {"txt": io.StringIO(), "srt": io.StringIO(), "json": io.StringIO()}
+
+    write_results({**RESULT, "segments": iter(RESULT["segments"])}, outputs)
+
+    assert outputs["txt"].getvalue() == "Hello there. General Kenobi!"
+    assert outputs["srt"].getvalue().count(" --> ") == 2
+    assert json.loads(outputs["json"].getvalue()) == RESULT
+
+
+def test_register_custom_formatter(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Third-party writers can be plugged into the registry."""
+    monkeypatch.setattr(formatters, "FORMATTERS", dict(formatters.FORMATTERS))
+
+    @register_formatter("tsv")
+    class TsvWriter(SegmentWriter):
+        def _write_segment(self, segment: Mapping[str, Any]) -> None:
+            self._file.write(f"{segment['start']}\t{segment['text'].strip()}\n")
+
+    buffer = io.StringIO()
+    write_result(RESULT, buffer, "tsv")
+
+    assert "tsv" in available_formats()
+    assert get_formatter("tsv") is TsvWriter
+    assert buffer.getvalue() == "0.0\tHello there.\n3661.5\tGeneral Kenobi!\n"
+    with pytest.raises(ValueError, match="Unknown output format"):
+        get_formatter("docx")
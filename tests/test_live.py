@@ -0,0 +1,149 @@
+"""Tests for live transcription."""
+
+import io
+import wave
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Dict, List
+
+import numpy as np
+from click.testing import CliRunner
+
+from tests.conftest import tone
+from transcriber.cli import main
+from transcriber.formatters import open_writer
+from transcriber.live import LiveTranscriber, PCMStreamSource, RingBuffer, merge_overlap
+
+SR = 16000
+
+
+def _pcm(samples: np.ndarray) -> bytes:
+    return (samples * 32767).astype("<i2").tobytes()
+
+
+class ScriptedEngine:
+    """Returns a scripted transcript for each window it is asked about."""
+
+    def __init__(self, texts: List[str]) -> None:
+        self.texts = list(texts)
+        self.windows: List[int] = []
+
+    def transcribe(self, audio: np.ndarray, **kwargs: Any) -> Dict[str, Any]:
+        self.windows.append(len(audio))
+        text = self.texts.pop(0) if self.texts else ""
+        return {"text": text, "segments": [{"start": 0.0, "end": 1.0, "text": text}]}
+
+
+def test_ring_buffer_wraps_and_reads_by_position() -> None:
+    """Reads address absolute positions across the wrap-around point."""
+    ring = RingBuffer(5)
+    ring.write(np.arange(4, dtype=np.float32))
+    ring.write(np.arange(4, 7, dtype=np.float32))
+
+    assert ring.total == 7
+    assert ring.start == 2
+    assert ring.read(3, 7).tolist() == [3, 4, 5, 6]
+
+
+def test_merge_overlap_drops_repeated_words() -> None:
+    """Words repeated from the overlapping audio are removed."""
+    assert (
+        merge_overlap("the quick brown fox".split(), "Brown fox, jumps over")
+        == "jumps over"
+    )
+    assert merge_overlap([], "hello there") == "hello there"
+    assert merge_overlap(["hello"], "world") == "world"
+
+
+def test_pcm_stream_source_handles_partial_samples() -> None:
+    """Odd byte counts are carried over to the next read."""
+    data = _pcm(np.array([0.5, -0.5], dtype=np.float32))
+    source = PCMStreamSource(io.BytesIO(data[:3] + data[3:]))
+
+    first = source.read(1)
+    second = source.read(1)
+    assert first is not None and second is not None
+
+    assert np.allclose(np.concatenate((first, second)), [0.5, -0.5], atol=1e-4)
+    assert source.read(1) is None
+
+
+def test_live_transcriber_windows_and_deduplicates(tmp_path: Path) -> None:
+    """Overlapping windows are transcribed once each and their overlap removed."""
+    engine = ScriptedEngine(
+        ["the quick brown fox", "brown fox jumps over", "over the lazy dog"]
+    )
+    emitted: List[str] = []
+    writer = open_writer("txt", tmp_path / "live.txt")
+    transcriber = LiveTranscriber(
+        engine,
+        window_seconds=4,
+        overlap_seconds=1,
+        writer=writer,
+        on_text=emitted.append,
+        save_audio=tmp_path / "live.wav",
+    )
+
+    stats = transcriber.run(PCMStreamSource(io.BytesIO(_pcm(tone(9)))))
+
+    assert emitted == ["the quick brown fox", "jumps over", "the lazy dog"]
+    assert engine.windows == [4 * SR, 4 * SR, 3 * SR]
+    assert stats["audio_seconds"] == 9.0
+    assert (
+        tmp_path / "live.txt"
+    ).read_text() == "the quick brown fox jumps over the lazy dog"
+    with wave.open(str(tmp_path / "live.wav")) as recording:
+        assert recording.getnframes() == 9 * SR
+
+
+def test_live_command_reads_pcm_file(
+    fake_whisper: SimpleNamespace, tmp_path: Path
+) -> None:
+    """`live --source FILE` transcribes a raw PCM capture with one model load."""
+    pcm_path = tmp_path / "capture.pcm"
+    pcm_path.write_bytes(_pcm(tone(12)))
+
+    runner = CliRunner()
+    result = runner.invoke(
+        main,
+        [
+            "live",
+            "--source",
+            str(pcm_path),
+            "-o",
+            str(tmp_path / "live.srt"),
+            "--format",
+            "srt",
+        ],
+    )
+
+    assert result.exit_code == 0, result.output
+    assert "Hello world." in result.output
+    assert fake_whisper.loads == [("base", "cpu")]
+    assert (tmp_path / "live.srt").read_text().startswith("1\n00:00:00.000")
+
+
+def test_live_refine_replaces_drafts_in_outputs(tmp_path: Path) -> None:
+    """Drafts print at once; the larger model's text replaces them on disk."""
+    draft = ScriptedEngine(["the quick brown fox", "brown fox jumps over"])
+    final = ScriptedEngine(["the quick brown fox", "brown fox leaps over"])
+    emitted: List[str] = []
+    refined: List[str] = []
+    transcriber = LiveTranscriber(
+        draft,
+        window_seconds=4,
+        overlap_seconds=1,
+        on_text=emitted.append,
+        refine_engine=final,
+        outputs={"txt": tmp_path / "live.txt"},
+        on_refine=refined.append,
+    )
+
+    stats = transcriber.run(PCMStreamSource(io.BytesIO(_pcm(tone(7)))))
+
+    assert emitted == ["the quick brown fox", "jumps over"]
+    assert refined == ["leaps over"]
+    assert final.windows == draft.windows
+    assert (tmp_path / "live.txt").read_text() == "the quick brown fox leaps over"
+    assert stats["refine"]["final_windows"] == 2
+    assert stats["refine"]["time_to_final"] >= stats["refine"]["time_to_first_text"]
@@ -0,0 +1,69 @@
+"""Tests for output path naming and multi-format output."""
+
+import json
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from click.testing import CliRunner
+
+from transcriber.cli import main
+from transcriber.outputs import expand_formats, output_paths
+
+
+def test_expand_formats() -> None:
+    """Repeated, comma-separated and "all" values are normalized."""
+    assert expand_formats(["srt,json", "srt"]) == ["srt", "json"]
+    assert expand_formats(["all"]) == ["txt", "srt", "vtt", "json"]
+    with pytest.raises(ValueError, match="Unknown output format 'doc'"):
+        expand_formats(["doc"])
+
+
+def test_output_paths_default_and_templates(tmp_path: Path) -> None:
+    """Default naming, templates and plain paths resolve one path per format."""
+    audio = tmp_path / "meeting.m4a"
+
+    assert output_paths(audio, ["srt", "json"]) == {
+        "srt": Path("meeting_transcript.srt"),
+        "json": Path("meeting_transcript.json"),
+    }
+    assert output_paths(audio, ["srt"], output="subs/{stem}.{format}")[
+        "srt"
+    ].as_posix() == ("subs/meeting.srt")
+    assert output_paths(audio, ["txt"], output="notes.md")["txt"].name == "notes.md"
+    assert output_paths(audio, ["srt", "vtt"], output="out/talk.srt")[
+        "vtt"
+    ].as_posix() == ("out/talk.vtt")
+    with pytest.raises(ValueError, match="must include"):
+        output_paths(audio, ["srt", "vtt"], output="out/{stem}.txt")
+
+
+def test_transcribe_writes_all_formats_from_one_pass(
+    fake_whisper: SimpleNamespace, tmp_path: Path
+) -> None:
+    """`--format srt --format json` transcribes once and writes both files."""
+    audio = tmp_path / "call.wav"
+    audio.write_bytes(b"audio")
+
+    runner = CliRunner()
+    result = runner.invoke(
+        main,
+        [
+            "transcribe",
+            str(audio),
+            "--format",
+            "srt,json",
+            "-o",
+            str(tmp_path / "{stem}.{format}"),
+        ],
+    )
+
+    assert result.exit_code == 0, result.output
+    model = fake_whisper.loaded[0]
+    assert len(model.calls) == 1
+    assert (
+        (tmp_path / "call.srt")
+        .read_text()
+        .startswith("1\n00:00:00.000 --> 00:00:01.500")
+    )
+    assert json.loads((tmp_path / "call.json").read_text())["language"] == "en"
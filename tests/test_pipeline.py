@@ -0,0 +1,180 @@
+"""Tests for the download/transcribe pipeline."""
+
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Dict, List, NoReturn, Tuple
+
+import numpy as np
+import pytest
+from click.testing import CliRunner
+
+from tests.conftest import tone
+from transcriber.cli import main
+from transcriber.downloader import StreamingUnavailable, YouTubeDownloader
+from transcriber.pipeline import DiskBudget, payload_size, run_pipeline
+
+
+def test_fetches_ahead_while_processing(tmp_path: Path) -> None:
+    """Item N+1 is fetched while item N is processed, bounded by prefetch."""
+    fetched: List[int] = []
+    in_flight: List[Tuple[int, List[int]]] = []
+
+    def fetch(item: int) -> Path:
+        fetched.append(item)
+        path = tmp_path / f"{item}.m4a"
+        path.write_bytes(b"x" * 10)
+        return path
+
+    def process(item: int, path: Path) -> Dict[str, Any]:
+        in_flight.append((item, list(fetched)))
+        time.sleep(0.05)
+        return {"ok": True}
+
+    summary = run_pipeline(range(4), fetch, process, cleanup=lambda p: p.unlink())
+
+    assert [o["item"] for o in summary.completed] == [0, 1, 2, 3]
+    # While item 0 was processed, item 1 had already been fetched.
+    assert any(item == 0 and 1 in seen for item, seen in in_flight)
+    assert list(tmp_path.iterdir()) == []
+    assert summary.utilisation()["process"] > 0.5
+    assert summary.bottleneck == "process"
+
+
+def test_failures_are_reported_and_do_not_stop_the_run() -> None:
+    """Fetch and process errors become failed outcomes."""
+
+    def fetch(item: str) -> str:
+        if item == "bad-download":
+            raise RuntimeError("HTTP 403")
+        return item
+
+    def process(item: str, payload: str) -> Dict[str, Any]:
+        if item == "bad-audio":
+            raise ValueError("cannot decode")
+        return {"ok": True}
+
+    summary = run_pipeline(["bad-download", "ok", "bad-audio"], fetch, process)
+
+    assert [o["error"] for o in summary.failed] == ["HTTP 403", "cannot decode"]
+    assert [o["item"] for o in summary.completed] == ["ok"]
+
+
+def test_disk_budget_blocks_until_space_is_released() -> None:
+    """A full budget holds back the producer until the consumer frees space."""
+    budget = DiskBudget(max_bytes=100)
+    budget.add(150)
+    released = threading.Event()
+
+    def free() -> None:
+        time.sleep(0.05)
+        released.set()
+        budget.release(150)
+
+    threading.Thread(target=free).start()
+    budget.wait_for_room()
+
+    assert released.is_set()
+    assert budget.peak == 150
+
+
+def test_streamed_audio_counts_against_the_budget(tmp_path: Path) -> None:
+    """Decoded audio waiting in the queue counts as much as a downloaded file."""
+    download = tmp_path / "video.m4a"
+    download.write_bytes(b"\0" * 1000)
+
+    assert payload_size(download) == 1000
+    assert payload_size({"audio": tone(1.0), "stem": "video"}) == 16000 * 4
+    assert payload_size({"result": {}, "stem": "video"}) == 0
+
+
+def test_youtube_playlist_is_pipelined(
+    fake_whisper: SimpleNamespace, monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    """A playlist is expanded, transcribed per video and downloads are deleted."""
+    downloads = tmp_path / "downloads"
+    downloads.mkdir()
+
+    def expand_url(self: YouTubeDownloader, url: str) -> List[Dict[str, Any]]:
+        return [
+            {
+                "url": f"https://youtu.be/video{n:06d}",
+                "id": f"video{n:06d}",
+                "title": None,
+            }
+            for n in range(3)
+        ]
+
+    def download_audio(
+        self: YouTubeDownloader, url: str, quality: str = "best", format: str = "m4a"
+    ) -> Path:
+        path = downloads / f"{url.rsplit('/', 1)[1]}.m4a"
+        path.write_bytes(b"audio")
+        return path
+
+    def stream_audio(
+        self: YouTubeDownloader, url: str, quality: str = "best"
+    ) -> NoReturn:
+        raise StreamingUnavailable("No directly readable audio stream")
+
+    monkeypatch.setattr(YouTubeDownloader, "expand_url", expand_url)
+    monkeypatch.setattr(YouTubeDownloader, "stream_audio", stream_audio)
+    monkeypatch.setattr(YouTubeDownloader, "download_audio", download_audio)
+
+    result = CliRunner().invoke(
+        main,
+        [
+            "youtube",
+            "https://www.youtube.com/playlist?list=PL123",
+            "-d",
+            str(tmp_path / "out"),
+            "--no-cache",
+        ],
+    )
+
+    assert result.exit_code == 0, result.output
+    assert "Done: 3 transcribed, 0 failed" in result.output
+    assert "Utilisation: download" in result.output
+    assert sorted(p.name for p in (tmp_path / "out").iterdir()) == [
+        f"video{n:06d}_transcript.txt" for n in range(3)
+    ]
+    assert list(downloads.iterdir()) == []
+
+
+def test_youtube_requires_stem_in_output_for_several_videos() -> None:
+    result = CliRunner().invoke(
+        main,
+        ["youtube", "https://youtu.be/aaaaaaaaaaa", "https://youtu.be/bbbbbbbbbbb"]
+        + ["-o", "out.txt"],
+    )
+
+    assert result.exit_code == 2
+    assert "{stem}" in result.output
+
+
+def test_youtube_streams_audio_without_downloading(
+    fake_whisper: SimpleNamespace, monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    """Streamed samples go straight to the engine; nothing is downloaded."""
+
+    def stream_audio(
+        self: YouTubeDownloader, url: str, quality: str = "best"
+    ) -> Tuple[np.ndarray, str]:
+        return tone(3.0), "Talk"
+
+    def download_audio(
+        self: YouTubeDownloader, url: str, quality: str = "best", format: str = "m4a"
+    ) -> NoReturn:
+        raise AssertionError("should not download")
+
+    monkeypatch.setattr(YouTubeDownloader, "stream_audio", stream_audio)
+    monkeypatch.setattr(YouTubeDownloader, "download_audio", download_audio)
+
+    result = CliRunner().invoke(
+        main, ["youtube", "https://youtu.be/aaaaaaaaaaa", "-d", str(tmp_path)]
+    )
+
+    assert result.exit_code == 0, result.output
+    assert (tmp_path / "Talk_transcript.txt").read_text().strip() == "Hello world."
+    assert isinstance(fake_whisper.loaded[0].calls[0][0], np.ndarray)
@@ -0,0 +1,80 @@
+"""Tests for per-stage instrumentation."""
+
+import json
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from tests.conftest import tone
+from transcriber.audio import write_wav
+from transcriber.cli import main
+from transcriber.profiling import Profiler, profiling, stage
+
+
+def test_stages_are_only_recorded_while_profiling() -> None:
+    with stage("inference") as record:
+        record["audio_seconds"] = 10.0
+
+    profiler = Profiler()
+    with profiling(profiler):
+        with stage("inference") as record:
+            record["audio_seconds"] = 10.0
+        with pytest.raises(ValueError):
+            with stage("write"):
+                raise ValueError("disk full")
+
+    inference, write = profiler.records
+    assert inference["stage"] == "inference"
+    assert inference["rtf"] == pytest.approx(inference["wall_seconds"] / 10.0)
+    assert inference["cpu_seconds"] >= 0
+    assert inference["peak_rss_bytes"] > 0
+    assert write["failed"] is True
+    assert write["rtf"] is None
+
+
+def test_prometheus_textfile_sums_stages(tmp_path: Path) -> None:
+    profiler = Profiler(labels={"command": 'say "hi"'})
+    with profiling(profiler):
+        for _ in range(2):
+            with stage("decode", audio_seconds=5.0):
+                pass
+
+    path = tmp_path / "transcriber.prom"
+    profiler.write_prometheus(path)
+    lines = path.read_text().splitlines()
+
+    assert "# TYPE whisper_transcriber_stage_wall_seconds gauge" in lines
+    labels = '{command="say \\"hi\\"",stage="decode"}'
+    assert f"whisper_transcriber_stage_calls{labels} 2" in lines
+    assert f"whisper_transcriber_stage_audio_seconds{labels} 10" in lines
+
+
+def test_cli_profile_reports_each_stage(tmp_path: Path) -> None:
+    audio_path = tmp_path / "talk.wav"
+    write_wav(audio_path, tone(12.0))
+    jsonl = tmp_path / "stages.jsonl"
+
+    result = CliRunner().invoke(
+        main,
+        [
+            "transcribe",
+            str(audio_path),
+            "-o",
+            str(tmp_path / "talk.txt"),
+            "--backend",
+            "stub",
+            "--no-cache",
+            "--profile",
+            "--profile-jsonl",
+            str(jsonl),
+        ],
+    )
+
+    assert result.exit_code == 0, result.output
+    records = [json.loads(line) for line in jsonl.read_text().splitlines()]
+    stages = [r["stage"] for r in records]
+    assert stages == ["model_load", "decode", "vad", "inference", "write", "total"]
+    assert records[-1]["audio_seconds"] == pytest.approx(12.0)
+    assert all(r["command"] == "transcribe" for r in records)
+    assert "Peak RSS" in result.output
@@ -0,0 +1,183 @@
+"""Tests for two-tier draft-then-refine transcription."""
+
+import json
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pytest
+from click.testing import CliRunner
+
+from tests.conftest import tone
+from transcriber.audio import write_wav
+from transcriber.cli import main
+from transcriber.refine import RefinedTranscript, Refiner, transcribe_refined
+
+SR = 16000
+
+
+class LabelEngine:
+    """Transcribes every window as "<label> <n>." and records what it saw."""
+
+    def __init__(
+        self, label: str, on_call: Optional[Callable[[], object]] = None
+    ) -> None:
+        self.label = label
+        self.on_call = on_call
+        self.calls: List[Tuple[int, Dict[str, Any]]] = []
+
+    def transcribe(
+        self, audio: np.ndarray, language: Optional[str] = None, **options: Any
+    ) -> Dict[str, Any]:
+        self.calls.append((len(audio), options))
+        if self.on_call:
+            self.on_call()
+        text = f" {self.label} {len(self.calls)}."
+        seconds = len(audio) / SR
+        return {
+            "text": text,
+            "segments": [{"start": 0.0, "end": seconds, "text": text}],
+            "language": "en",
+        }
+
+
+def test_draft_is_written_first_and_replaced_by_the_final_text(tmp_path: Path) -> None:
+    """Every window is on disk as a draft before the final model sees it."""
+    output = tmp_path / "talk.json"
+    on_disk: List[Dict[str, Any]] = []
+    draft = LabelEngine("Draft")
+    final = LabelEngine(
+        "Final", on_call=lambda: on_disk.append(json.loads(output.read_text()))
+    )
+    audio = np.concatenate([tone(8), np.zeros(SR, np.float32), tone(8)])
+
+    result = transcribe_refined(
+        draft, final, audio, {"json": output}, window_seconds=10, vad=False
+    )
+
+    assert len(draft.calls) == len(final.calls) == 2
+    assert final.calls[0][1] == {"vad": False}
+    # When the final model starts on window 1, window 1 is already a draft.
+    first = on_disk[0]["segments"][0]
+    assert first["text"] == " Draft 1." and first["draft"] is True
+    assert [s["text"] for s in result["segments"]] == [" Final 1.", " Final 2."]
+    assert result["segments"][1]["start"] == first["end"]
+    saved = json.loads(output.read_text())
+    assert all("draft" not in segment for segment in saved["segments"])
+    stats = saved["refine"]
+    assert stats["windows"] == stats["final_windows"] == 2
+    assert 0 < stats["time_to_first_text"] <= stats["time_to_final"]
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_late_drafts_and_failures_keep_the_final_text() -> None:
+    """A draft never overwrites a final window; a failed window keeps its draft."""
+    transcript = RefinedTranscript()
+    transcript.update(0, {"text": " Final.", "segments": []}, final=True)
+    transcript.update(0, {"text": " Draft.", "segments": []})
+    transcript.update(1, {"text": " Draft.", "segments": []}, offset=5.0)
+    transcript.fail()
+
+    assert transcript.result()["text"] == " Final. Draft."
+    assert transcript.stats()["failed_windows"] == 1
+    assert transcript.stats()["time_to_final"] is None
+
+
+def test_rewrites_are_throttled_until_flushed(tmp_path: Path) -> None:
+    """Updates within write_interval wait for the next rewrite or flush()."""
+    output = tmp_path / "talk.json"
+    transcript = RefinedTranscript({"json": output}, write_interval=60.0)
+
+    transcript.update(0, {"text": " One.", "segments": []})
+    transcript.update(1, {"text": " Two.", "segments": []}, offset=5.0)
+
+    assert json.loads(output.read_text())["text"] == " One."
+    transcript.flush()
+    assert json.loads(output.read_text())["text"] == " One. Two."
+    output.unlink()
+    transcript.flush()
+    assert not output.exists()
+
+
+def test_refiner_loads_its_engine_on_its_own_thread() -> None:
+    """A factory is called once, in the background; errors go to on_error."""
+    loads: List[int] = []
+    results: List[Any] = []
+    errors: List[int] = []
+
+    def load() -> LabelEngine:
+        loads.append(1)
+        return LabelEngine("Final")
+
+    refiner = Refiner(
+        load,
+        on_result=lambda index, result: results.append((index, result["text"])),
+        language="de",
+    )
+    refiner.submit(3, tone(1))
+    refiner.submit(4, tone(1))
+    refiner.close()
+
+    failing = Refiner(
+        lambda: 1 / 0,
+        on_result=lambda i, result: results.append(i),
+        on_error=lambda i, e: errors.append(i),
+    )
+    failing.submit(0, tone(1))
+    failing.close()
+
+    assert loads == [1]
+    assert results == [(3, " Final 1."), (4, " Final 2.")]
+    assert errors == [0]
+
+
+def test_failed_draft_does_not_wait_for_the_queued_windows() -> None:
+    """Windows the final model has not started are dropped when a draft fails."""
+    release = threading.Event()
+
+    def fail_third() -> None:
+        if len(draft.calls) == 3:
+            threading.Timer(0.2, release.set).start()
+            raise RuntimeError("draft failed")
+
+    draft = LabelEngine("Draft", on_call=fail_third)
+    final = LabelEngine("Final", on_call=lambda: release.wait(5))
+    audio = np.concatenate([np.concatenate([tone(4), np.zeros(SR, np.float32)])] * 4)
+
+    with pytest.raises(RuntimeError, match="draft failed"):
+        transcribe_refined(draft, final, audio, window_seconds=5, vad=False)
+
+    assert len(final.calls) == 1
+
+
+def test_transcribe_command_refines_with_a_second_model(tmp_path: Path) -> None:
+    audio_path = tmp_path / "talk.wav"
+    write_wav(audio_path, tone(12))
+    output = tmp_path / "talk.json"
+
+    result = CliRunner().invoke(
+        main,
+        [
+            "transcribe",
+            str(audio_path),
+            "-o",
+            str(output),
+            "--format",
+            "json",
+            "--model",
+            "tiny",
+            "--refine-model",
+            "small",
+            "--backend",
+            "stub",
+            "--no-cache",
+        ],
+    )
+
+    assert result.exit_code == 0, result.output
+    assert f"Draft written to {output}" in result.output
+    assert "final transcript after" in result.output
+    saved = json.loads(output.read_text())
+    assert saved["text"] == " Segment 1. Segment 2. Segment 3."
+    assert saved["refine"]["final_windows"] == 1
@@ -0,0 +1,74 @@
+"""Tests for the shared model registry."""
+
+from types import SimpleNamespace
+from typing import List
+
+from transcriber.engine import TranscriptionEngine
+from transcriber.registry import ModelRegistry
+
+
+def test_get_loads_once_and_counts_hits() -> None:
+    """Repeated lookups reuse the loaded model."""
+    registry = ModelRegistry(max_bytes=100)
+    loads: List[int] = []
+
+    def loader() -> object:
+        loads.append(1)
+        return object()
+
+    first = registry.get("base", "cpu", loader, size_bytes=10)
+    second = registry.get("base", "cpu", loader, size_bytes=10)
+
+    assert first is second
+    assert len(loads) == 1
+    stats = registry.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert "base@cpu" in stats["load_times"]
+
+
+def test_evicts_least_recently_used_over_budget() -> None:
+    """Models are evicted in LRU order once the budget is exceeded."""
+    registry = ModelRegistry(max_bytes=25)
+
+    registry.get("tiny", "cpu", object, size_bytes=10)
+    registry.get("base", "cpu", object, size_bytes=10)
+    registry.get("tiny", "cpu", object, size_bytes=10)  # tiny is now most recent
+    registry.get("small", "cpu", object, size_bytes=10)
+
+    assert ("tiny", "cpu") in registry
+    assert ("small", "cpu") in registry
+    assert ("base", "cpu") not in registry
+    assert registry.stats()["evictions"] == 1
+
+
+def test_oversized_model_is_kept() -> None:
+    """A single model larger than the budget is still served."""
+    registry = ModelRegistry(max_bytes=5)
+
+    model = registry.get("large", "cpu", object, size_bytes=50)
+
+    assert registry.get("large", "cpu", object) is model
+    assert len(registry) == 1
+
+
+def test_engines_share_loaded_model(fake_whisper: SimpleNamespace) -> None:
+    """Engines with the same model and device reuse one load."""
+    first = TranscriptionEngine(model="tiny")
+    second = TranscriptionEngine(model="tiny")
+    third = TranscriptionEngine(model="tiny", device="cuda")
+
+    assert first.model is second.model
+    assert third.model is not first.model
+    assert fake_whisper.loads == [("tiny", "cpu"), ("tiny", "cuda")]
+
+
+def test_summary_reports_loads_and_memory() -> None:
+    registry = ModelRegistry(max_bytes=100 * 2**20)
+    registry.get("base", "cpu", object, size_bytes=10 * 2**20)
+    registry.get("base", "cpu", object)
+
+    summary = registry.summary()
+
+    assert "1 loaded, 10 of 100 MB" in summary
+    assert "1 hits, 1 misses, 0 evictions" in summary
@@ -0,0 +1,131 @@
+"""Tests for CPU thread budgets and worker planning."""
+
+import os
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from tests.conftest import tone
+from transcriber import scheduler
+from transcriber.audio import write_wav
+from transcriber.cli import main
+from transcriber.scheduler import (
+    ThreadBudget,
+    available_cpus,
+    plan_budgets,
+    plan_devices,
+    plan_workers,
+    worker_memory_bytes,
+)
+
+GB = 1024**3
+
+
+def test_plan_budgets_divides_cores_into_contiguous_shares() -> None:
+    """Each worker gets its own run of cores; extra workers share round-robin."""
+    budgets = plan_budgets(3, cpus=range(8), pin=True)
+    crowded = plan_budgets(3, cpus=[0, 1], pin=True)
+
+    assert [b.cpus for b in budgets] == [[0, 1], [2, 3, 4], [5, 6, 7]]
+    assert [b.threads for b in budgets] == [2, 3, 3]
+    assert [b.cpus for b in crowded] == [[0], [1], [0]]
+    assert plan_budgets(2, cpus=range(8), threads=6)[0].threads == 6
+    assert plan_budgets(2, cpus=range(8))[0].cpus is None
+
+
+def test_plan_workers_is_bounded_by_cores_and_memory() -> None:
+    cores = range(64)
+
+    assert plan_workers("base", cores, memory_bytes=256 * GB) == 16
+    assert plan_workers("base", cores, memory_bytes=256 * GB, threads=8) == 8
+    assert plan_workers("large-v3", cores, memory_bytes=20 * GB) == 3
+    assert plan_workers("large-v3", cores, memory_bytes=GB) == 1
+    assert worker_memory_bytes("large-v3") > worker_memory_bytes("tiny")
+
+
+def test_gpu_devices_run_one_worker_per_gpu(monkeypatch: pytest.MonkeyPatch) -> None:
+    """CUDA plans one engine per GPU; "auto" without a GPU plans for the CPU."""
+    cores = range(64)
+    monkeypatch.setattr(scheduler, "cuda_device_count", lambda: 2)
+
+    assert plan_workers("base", cores, memory_bytes=256 * GB, device="cuda") == 2
+    assert plan_workers("base", cores, memory_bytes=256 * GB, device="cuda:1") == 1
+    assert plan_devices("cuda", 3) == ["cuda:0", "cuda:1", "cuda:0"]
+    assert plan_devices("cpu", 2) == ["cpu", "cpu"]
+
+    monkeypatch.setattr(scheduler, "cuda_device_count", lambda: 0)
+    assert plan_workers("base", cores, memory_bytes=256 * GB, device="auto") == 16
+    assert plan_workers("base", cores, memory_bytes=256 * GB, device="cuda") == 1
+    assert plan_devices("auto", 2) == ["auto", "auto"]
+
+
+@pytest.mark.skipif(
+    not hasattr(os, "sched_setaffinity"), reason="CPU pinning needs Linux"
+)
+def test_applied_budget_pins_the_thread_and_restores_it() -> None:
+    cpus = available_cpus()
+    budget = ThreadBudget(1, cpus=cpus[:1])
+
+    with budget.applied():
+        pinned = sorted(os.sched_getaffinity(0))
+
+    assert pinned == cpus[:1]
+    assert sorted(os.sched_getaffinity(0)) == cpus
+    # Thread-count variables are process-wide; applied() leaves them alone.
+    assert "OMP_NUM_THREADS" not in os.environ
+
+
+def test_transcribe_batch_sizes_workers_automatically(tmp_path: Path) -> None:
+    (tmp_path / "in").mkdir()
+    write_wav(tmp_path / "in" / "one.wav", tone(2))
+
+    result = CliRunner().invoke(
+        main,
+        [
+            "transcribe-batch",
+            str(tmp_path / "in"),
+            "-d",
+            str(tmp_path / "out"),
+            "--backend",
+            "stub",
+            "--device",
+            "auto",
+            "--threads",
+            "64",
+            "--no-cache",
+        ],
+    )
+
+    # 64 threads per worker leave room for one worker.
+    assert result.exit_code == 0, result.output
+    assert "with 1 worker(s)" in result.output
+    assert (tmp_path / "out" / "one_transcript.txt").read_text() == "Segment 1."
+
+
+def test_transcribe_takes_a_thread_budget(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    for name in scheduler.THREAD_ENV_VARS:
+        monkeypatch.setenv(name, "")
+    audio = tmp_path / "one.wav"
+    write_wav(audio, tone(2))
+
+    result = CliRunner().invoke(
+        main,
+        [
+            "transcribe",
+            str(audio),
+            "-o",
+            str(tmp_path / "one.txt"),
+            "--backend",
+            "stub",
+            "--threads",
+            "2",
+            "--no-cache",
+        ],
+    )
+
+    assert result.exit_code == 0, result.output
+    assert os.environ["OMP_NUM_THREADS"] == "2"
+    assert (tmp_path / "one.txt").read_text() == "Segment 1."
@@ -0,0 +1,124 @@
+"""Tests for the transcript search index."""
+
+import os
+from pathlib import Path
+from typing import List, Tuple
+
+import pytest
+from click.testing import CliRunner
+
+from transcriber.cli import main
+from transcriber.formatters import write_result
+from transcriber.search import TranscriptIndex, parse_subtitles
+
+RESULT = {
+    "text": " The budget is approved. Next item: hiring.",
+    "segments": [
+        {"start": 0.0, "end": 2.5, "text": " The budget is approved."},
+        {"start": 3661.5, "end": 3663.0, "text": " Next item: hiring."},
+    ],
+}
+
+
+@pytest.fixture
+def archive(tmp_path: Path) -> Path:
+    directory = tmp_path / "Transcripts"
+    (directory / "2024").mkdir(parents=True)
+    write_result(RESULT, directory / "2024" / "board.json", "json")
+    write_result(RESULT, directory / "2024" / "board.srt", "srt")
+    (directory / "call.srt").write_text(
+        "1\n00:00:01,000 --> 00:00:04,200\nWe ship on Friday,\nno matter what.\n\n"
+        "2\n00:01:00,000 --> 00:01:02,000\nCafé break.\n"
+    )
+    (directory / "voice_note.txt").write_text("Remember the milk\n\nand the budget\n")
+    return directory
+
+
+def test_parse_subtitles_accepts_both_millisecond_separators() -> None:
+    """SRT and VTT cues parse whichever decimal separator they use."""
+    vtt = "WEBVTT\n\n00:01.500 --> 00:03.000 align:start\nHello\n\n"
+    srt = "7\n01:00:00,250 --> 01:00:01,000\nWorld\n"
+
+    assert parse_subtitles(vtt) == [(1.5, 3.0, "Hello")]
+    assert parse_subtitles(srt) == [(3600.25, 3601.0, "World")]
+
+
+def test_phrase_search_returns_file_and_timecode(archive: Path, tmp_path: Path) -> None:
+    """Phrase queries find the file and start time of the matching segment."""
+    with TranscriptIndex(tmp_path / "index.sqlite") as db:
+        counts = db.update([archive])
+        hits = db.search("next item hiring")
+        multiline = db.search("friday no matter")
+        stats = db.stats()
+
+        # The phrase's words must be adjacent and in order.
+        assert db.search("hiring next") == []
+        assert [hit["text"] for hit in db.search("cafe")] == ["Café break."]
+        marked = db.search("budget", marks=("[", "]"))
+
+    # board.srt repeats board.json, so only the JSON is indexed.
+    assert counts["added"] == 3
+    assert stats == {"path": str(tmp_path / "index.sqlite"), "files": 3, "segments": 6}
+    assert hits == [
+        {
+            "path": str(archive / "2024" / "board.json"),
+            "start": 3661.5,
+            "end": 3663.0,
+            "text": "Next item: hiring.",
+            "highlighted": "Next item: hiring.",
+        }
+    ]
+    assert multiline[0]["start"] == 1.0
+    assert sorted(hit["highlighted"] for hit in marked) == [
+        "The [budget] is approved.",
+        "and the [budget]",
+    ]
+
+
+def test_update_reads_only_changed_files(
+    archive: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Unchanged files are not re-read and deleted files leave the index."""
+    db = TranscriptIndex(tmp_path / "index.sqlite")
+    db.update([archive])
+
+    read: List[str] = []
+
+    def read_transcript(path: str) -> List[Tuple[float, float, str]]:
+        read.append(os.path.basename(path))
+        return [(0.0, 1.0, "Fresh words")]
+
+    monkeypatch.setattr("transcriber.search.read_transcript", read_transcript)
+    call = archive / "call.srt"
+    call.write_text(call.read_text() + "\n")
+    (archive / "voice_note.txt").unlink()
+
+    counts = db.update([archive])
+
+    assert read == ["call.srt"]
+    assert counts == {"added": 0, "updated": 1, "removed": 1, "unchanged": 1}
+    assert db.search("no matter what") == []
+    assert db.search("fresh words")[0]["path"] == str(call)
+    assert db.search("milk") == []
+    db.close()
+
+
+def test_index_and_search_commands(archive: Path, tmp_path: Path) -> None:
+    """`index` then `search` print hits as path and timecode."""
+    index_path = str(tmp_path / "index.sqlite")
+    runner = CliRunner()
+
+    indexed = runner.invoke(main, ["index", str(archive), "--index-path", index_path])
+    found = runner.invoke(
+        main, ["search", "ship", "on", "friday", "--index-path", index_path]
+    )
+    invalid = runner.invoke(
+        main, ["search", "budget AND (", "--raw", "--index-path", index_path]
+    )
+
+    assert indexed.exit_code == 0, indexed.output
+    assert "Indexed 3 new" in indexed.output
+    assert found.exit_code == 0, found.output
+    assert f"{archive / 'call.srt'}  00:00:01.000  We ship on Friday," in found.output
+    assert invalid.exit_code == 1
+    assert "Invalid search query" in invalid.output
@@ -0,0 +1,93 @@
+"""Tests for the columnar segment store."""
+
+import io
+import json
+import pickle
+from types import SimpleNamespace
+from typing import Any, Dict, List
+
+import pytest
+
+from tests.conftest import tone
+from transcriber.bench import synthetic_result
+from transcriber.engine import TranscriptionEngine
+from transcriber.formatters import write_result
+from transcriber.segments import SegmentStore, legacy_result
+
+
+@pytest.fixture
+def result() -> Dict[str, Any]:
+    return synthetic_result(50, decoder_fields=True)
+
+
+def test_store_round_trips_segments(result: Dict[str, Any]) -> None:
+    segments = result["segments"]
+    store = SegmentStore(segments)
+
+    assert len(store) == 50
+    assert store == segments
+    assert store[-1] == segments[-1]
+    assert list(store[0]) == list(segments[0])
+    assert store[10:12] == segments[10:12]
+    assert pickle.loads(pickle.dumps(store)) == segments
+    assert store.text == "".join(s["text"] for s in segments)
+    with pytest.raises(IndexError):
+        store[50]
+
+
+def test_irregular_fields_are_kept_per_segment() -> None:
+    """Values that do not fit a column survive unchanged, in their place."""
+    segments: List[Dict[str, Any]] = [
+        {"start": 0.0, "end": None, "text": " A.", "speaker": "alice"},
+        {"start": 1.0, "end": 2.0, "text": " B.", "tokens": [7, 2**40]},
+    ]
+    store = SegmentStore(segments)
+
+    assert store == segments
+    assert list(store[0]) == ["start", "end", "text", "speaker"]
+    assert list(store.iter_segments(["start", "tokens"])) == [
+        {"start": 0.0},
+        {"start": 1.0, "tokens": [7, 2**40]},
+    ]
+
+
+@pytest.mark.parametrize("format", ["txt", "srt", "vtt", "json"])
+def test_writers_produce_the_same_output_from_a_store(
+    result: Dict[str, Any], format: str
+) -> None:
+    legacy, compact = io.StringIO(), io.StringIO()
+    write_result(result, legacy, format)
+    write_result(
+        {**result, "segments": SegmentStore(result["segments"])}, compact, format
+    )
+
+    assert compact.getvalue() == legacy.getvalue()
+
+
+def test_store_is_much_smaller_than_dicts(result: Dict[str, Any]) -> None:
+    store = SegmentStore(result["segments"])
+    as_json = json.dumps(result["segments"]).encode()
+
+    # Even the JSON text is larger than the columns, let alone the dicts.
+    assert store.nbytes < len(as_json) / 2
+
+
+def test_engine_returns_dicts_unless_asked_to_compact(
+    fake_whisper: SimpleNamespace,
+) -> None:
+    result = TranscriptionEngine(model="tiny").transcribe(tone(3.0), vad=False)
+
+    assert isinstance(result["segments"], list)
+    result["segments"][0]["text"] = "edited"
+
+
+def test_compact_engine_returns_a_store(fake_whisper: SimpleNamespace) -> None:
+    engine = TranscriptionEngine(model="tiny", compact=True)
+
+    result = engine.transcribe(tone(3.0), vad=False)
+
+    assert isinstance(result["segments"], SegmentStore)
+    legacy = legacy_result(result)
+    assert isinstance(legacy["segments"], list)
+    assert legacy["segments"] == result["segments"]
+    json.dumps(legacy)
@@ -0,0 +1,382 @@
+"""Tests for the transcription service and its HTTP API."""
+
+import http.client
+import io
+import json
+import os
+import socket
+import sys
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pytest
+
+from tests.conftest import tone
+from transcriber import scheduler
+from transcriber.audio import write_wav
+from transcriber.engine import TranscriptionEngine
+from transcriber.formatters import load_npz
+from transcriber.server import (
+    QueueFull,
+    TranscriptionService,
+    make_server,
+    parse_model_spec,
+)
+
+
+@pytest.fixture
+def audio_file(tmp_path: Path) -> Path:
+    path = tmp_path / "speech.wav"
+    write_wav(path, tone(12.0))
+    return path
+
+
+def start_server(service: TranscriptionService, **kwargs: Any) -> Any:
+    server = make_server(service, port=0, **kwargs)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def request(
+    server: Any,
+    method: str,
+    path: str,
+    body: Any = None,
+    headers: Optional[Dict[str, str]] = None,
+) -> Tuple[http.client.HTTPResponse, bytes]:
+    host, port = server.server_address[:2]
+    connection = http.client.HTTPConnection(host, port, timeout=10)
+    connection.request(method, path, body=body, headers=headers or {})
+    response = connection.getresponse()
+    data = response.read()
+    connection.close()
+    return response, data
+
+
+def wait_for(server: Any, job_id: str) -> Dict[str, Any]:
+    for _ in range(200):
+        response, data = request(server, "GET", f"/jobs/{job_id}")
+        status: Dict[str, Any] = json.loads(data)
+        if status["status"] in ("done", "failed"):
+            return status
+        time.sleep(0.02)
+    raise AssertionError("job did not finish")
+
+
+def test_submit_poll_and_fetch_transcript(audio_file: Path, tmp_path: Path) -> None:
+    """A local file is transcribed by a warm stub model and served as SRT."""
+    service = TranscriptionService({"base": 2}, backend="stub", max_queue=4)
+    service.start()
+    server = start_server(service, allow_dirs=[tmp_path])
+    try:
+        response, data = request(
+            server,
+            "POST",
+            "/jobs",
+            body=json.dumps({"path": str(audio_file)}),
+            headers={"Content-Type": "application/json"},
+        )
+        assert response.status == 202
+        job = json.loads(data)
+        assert response.getheader("Location") == f"/jobs/{job['id']}"
+
+        assert wait_for(server, job["id"])["status"] == "done"
+        response, data = request(
+            server, "GET", f"/jobs/{job['id']}/transcript?format=srt"
+        )
+        assert response.status == 200
+        assert (response.getheader("Content-Type") or "").startswith(
+            "application/x-subrip"
+        )
+        assert data.decode().startswith("1\n00:00:00")
+        assert "Segment 3." in data.decode()
+
+        response, data = request(
+            server, "GET", f"/jobs/{job['id']}/transcript?format=npz"
+        )
+        assert response.status == 200
+        assert response.getheader("Content-Type") == "application/x-npz"
+        assert load_npz(io.BytesIO(data))["segments"][-1]["text"] == " Segment 3."
+
+        response, data = request(server, "GET", "/health")
+        health = json.loads(data)
+        assert health["completed"] == 1
+        assert health["registry"]["models"] == 2
+    finally:
+        server.shutdown()
+        service.shutdown()
+
+
+def test_uploaded_audio_is_spooled_and_removed(audio_file: Path) -> None:
+    service = TranscriptionService({"base": 1}, backend="stub")
+    service.start()
+    server = start_server(service)
+    try:
+        response, data = request(
+            server,
+            "POST",
+            "/jobs?filename=speech.wav&vad=false",
+            body=audio_file.read_bytes(),
+            headers={"Content-Type": "audio/wav"},
+        )
+        assert response.status == 202
+        job_id = json.loads(data)["id"]
+        assert wait_for(server, job_id)["segments"] == 3
+        assert list(service.spool_dir.iterdir()) == []
+    finally:
+        server.shutdown()
+        service.shutdown()
+
+
+def test_bad_lengths_and_truncated_uploads_are_rejected(audio_file: Path) -> None:
+    """Malformed lengths get a 400; a cut-off upload queues nothing."""
+    service = TranscriptionService({"base": 1}, backend="stub")
+    server = start_server(service)
+    try:
+        for length in ("abc", "-1"):
+            response, data = request(
+                server, "POST", "/jobs", headers={"Content-Length": length}
+            )
+            assert response.status == 400
+            assert "Invalid Content-Length" in json.loads(data)["error"]
+
+        with socket.create_connection(server.server_address[:2], timeout=10) as sock:
+            sock.sendall(
+                b"POST /jobs?filename=speech.wav HTTP/1.1\r\n"
+                b"Content-Type: audio/wav\r\nContent-Length: 100000\r\n\r\n"
+                + audio_file.read_bytes()[:1000]
+            )
+            sock.shutdown(socket.SHUT_WR)
+            reply = sock.makefile("rb").read().decode()
+        assert reply.startswith("HTTP/1.1 400")
+        assert "Upload ended after 1000 of 100000 bytes" in reply
+        assert service.stats()["queued"] == 0
+        assert list(service.spool_dir.iterdir()) == []
+    finally:
+        server.shutdown()
+        service.shutdown(wait=False)
+
+
+def test_local_paths_must_be_inside_an_allowed_directory(
+    audio_file: Path, tmp_path: Path
+) -> None:
+    """The path form is refused without --allow-dir and outside it, symlinks too."""
+    allowed = tmp_path / "allowed"
+    allowed.mkdir()
+    (allowed / "link.wav").symlink_to(audio_file)
+    service = TranscriptionService({"base": 1}, backend="stub")
+    closed = start_server(service)
+    server = start_server(service, allow_dirs=[allowed])
+
+    def submit(target: Any, path: Path) -> Tuple[int, str]:
+        response, data = request(
+            target,
+            "POST",
+            "/jobs",
+            body=json.dumps({"path": str(path)}),
+            headers={"Content-Type": "application/json"},
+        )
+        return response.status, json.loads(data)["error"]
+
+    try:
+        assert submit(closed, audio_file) == (
+            403,
+            "Submitting local paths is disabled; upload the audio instead",
+        )
+        assert submit(server, audio_file)[0] == 403
+        assert submit(server, allowed / ".." / audio_file.name)[0] == 403
+        assert submit(server, allowed / "link.wav")[0] == 403
+        assert submit(server, allowed / "missing.wav")[0] == 400
+        assert service.stats()["queued"] == 0
+    finally:
+        server.shutdown()
+        closed.shutdown()
+        service.shutdown(wait=False)
+
+
+def test_stalled_request_bodies_time_out(audio_file: Path) -> None:
+    """A client that stops mid-body gets a 408 instead of holding a worker."""
+    service = TranscriptionService({"base": 1}, backend="stub")
+    server = start_server(service, request_timeout=0.2)
+    try:
+        with socket.create_connection(server.server_address[:2], timeout=10) as sock:
+            started = time.perf_counter()
+            sock.sendall(
+                b"POST /jobs?filename=speech.wav HTTP/1.1\r\n"
+                b"Content-Type: audio/wav\r\nContent-Length: 100000\r\n\r\n"
+                + audio_file.read_bytes()[:1000]
+            )
+            reply = sock.makefile("rb").read().decode()
+        assert time.perf_counter() - started < 5
+        assert reply.startswith("HTTP/1.1 408")
+        assert list(service.spool_dir.iterdir()) == []
+    finally:
+        server.shutdown()
+        service.shutdown(wait=False)
+
+
+def test_full_queue_is_rejected_with_429(audio_file: Path) -> None:
+    """Jobs beyond max_queue are refused until a worker frees a slot."""
+    service = TranscriptionService({"base": 1}, backend="stub", max_queue=1)
+    # Workers not started: the first job stays queued.
+    server = start_server(service)
+    try:
+        service.submit(audio_file)
+        with pytest.raises(QueueFull):
+            service.submit(audio_file)
+
+        response, data = request(
+            server,
+            "POST",
+            "/jobs",
+            body=audio_file.read_bytes(),
+            headers={"Content-Type": "audio/wav"},
+        )
+        assert response.status == 429
+        assert response.getheader("Retry-After") == "1"
+        assert service.stats()["rejected"] == 2
+    finally:
+        server.shutdown()
+        service.shutdown(wait=False)
+
+
+def test_waiting_jobs_are_transcribed_as_one_batch(
+    audio_file: Path, tmp_path: Path
+) -> None:
+    """A worker takes every queued job with the same options at once."""
+    batches: List[Tuple[int, bool]] = []
+
+    class Engine(TranscriptionEngine):
+        def transcribe_many(
+            self,
+            audio_paths: Sequence[Union[str, np.ndarray]],
+            *args: Any,
+            **kwargs: Any,
+        ) -> List[Union[Dict[str, Any], Exception]]:
+            batches.append((len(audio_paths), kwargs["vad"]))
+            return super().transcribe_many(audio_paths, *args, **kwargs)
+
+    service = TranscriptionService(
+        {"base": 1},
+        backend="stub",
+        engine_factory=lambda model: Engine(model=model, backend="stub"),
+    )
+    jobs = [service.submit(audio_file) for _ in range(3)]
+    jobs.append(service.submit(audio_file, vad=False))
+    jobs.append(service.submit(tmp_path / "missing.wav"))
+    service.start()
+    try:
+        for _ in range(200):
+            if all(job.finished for job in jobs):
+                break
+            time.sleep(0.02)
+    finally:
+        service.shutdown()
+
+    assert batches == [(4, True)]  # the lone vad=False job runs on its own
+    assert [job.status for job in jobs] == ["done"] * 4 + ["failed"]
+    assert jobs[0].result is not None
+    assert jobs[0].result["segments"][-1]["end"] == 12.0
+    assert service.stats()["completed"] == 4
+
+
+def test_workers_set_only_their_own_thread_budget(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Two budgets share one process: process-wide limits are set once."""
+    calls: List[Tuple[str, str, Any]] = []
+
+    def record(setting: str) -> Callable[..., None]:
+        def call(*args: Any) -> None:
+            calls.append((setting, threading.current_thread().name, args[-1]))
+
+        return call
+
+    torch = SimpleNamespace(
+        set_num_threads=record("threads"), set_num_interop_threads=record("interop")
+    )
+    monkeypatch.setitem(sys.modules, "torch", torch)
+    monkeypatch.setattr(scheduler, "available_cpus", lambda: [0, 1, 2, 3])
+    monkeypatch.setattr(os, "sched_setaffinity", record("cpus"), raising=False)
+
+    service = TranscriptionService({"base": 2}, backend="stub", pin=True)
+    service.start()
+    try:
+        for _ in range(200):
+            if sum(name.startswith("serve-") for _, name, _ in calls) == 4:
+                break
+            time.sleep(0.02)
+    finally:
+        service.shutdown()
+
+    workers = sorted(c for c in calls if c[1].startswith("serve-"))
+    assert workers == [
+        ("cpus", "serve-base-0", [0, 1]),
+        ("cpus", "serve-base-1", [2, 3]),
+        ("threads", "serve-base-0", 2),
+        ("threads", "serve-base-1", 2),
+    ]
+    assert [c for c in calls if c[0] == "interop"] == [("interop", "MainThread", 1)]
+    assert os.environ["OMP_NUM_THREADS"] == "2"
+
+
+def test_errors_for_unknown_models_jobs_and_unfinished_transcripts(
+    audio_file: Path, tmp_path: Path
+) -> None:
+    service = TranscriptionService({"base": 1}, backend="stub")
+    server = start_server(service, allow_dirs=[tmp_path])
+    try:
+        response, data = request(
+            server,
+            "POST",
+            "/jobs",
+            body=json.dumps({"path": str(audio_file), "model": "large"}),
+            headers={"Content-Type": "application/json"},
+        )
+        assert response.status == 400
+        assert "not served" in json.loads(data)["error"]
+
+        assert request(server, "GET", "/jobs/missing")[0].status == 404
+
+        job = service.submit(audio_file)
+        response, data = request(server, "GET", f"/jobs/{job.id}/transcript")
+        assert response.status == 409
+        assert json.loads(data)["status"] == "queued"
+    finally:
+        server.shutdown()
+        service.shutdown(wait=False)
+
+
+def test_serves_over_a_unix_socket(audio_file: Path, tmp_path: Path) -> None:
+    service = TranscriptionService({"tiny": 1}, backend="stub")
+    service.start()
+    socket_path = str(tmp_path / "serve.sock")
+    server = make_server(service, socket_path=socket_path)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    class UnixConnection(http.client.HTTPConnection):
+        def connect(self) -> None:
+            self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.sock.connect(socket_path)
+
+    try:
+        connection = UnixConnection("localhost", timeout=10)
+        connection.request("GET", "/health")
+        response = connection.getresponse()
+        assert response.status == 200
+        assert json.loads(response.read())["models"] == {"tiny": 1}
+        connection.close()
+    finally:
+        server.shutdown()
+        service.shutdown()
+
+
+def test_parse_model_spec() -> None:
+    assert parse_model_spec("small", 3) == ("small", 3)
+    assert parse_model_spec("small=2", 3) == ("small", 2)
+    with pytest.raises(ValueError):
+        parse_model_spec("small=0", 1)
@@ -0,0 +1,97 @@
+"""Tests for the voice activity detection pre-pass."""
+
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from tests.conftest import tone
+from transcriber.engine import TranscriptionEngine
+from transcriber.vad import SpeechMap, apply_vad, detect_speech
+
+SR = 16000
+
+
+def _silence(seconds: float) -> np.ndarray:
+    return np.zeros(int(seconds * SR), dtype=np.float32)
+
+
+def test_detect_speech_finds_regions() -> None:
+    """Speech between long silences is found with padding around it."""
+    audio = np.concatenate((_silence(2), tone(1), _silence(3), tone(2), _silence(1)))
+
+    regions = detect_speech(audio, pad_ms=0)
+
+    assert len(regions) == 2
+    assert regions[0][0] / SR == pytest.approx(2.0, abs=0.03)
+    assert regions[0][1] / SR == pytest.approx(3.0, abs=0.03)
+    assert regions[1][0] / SR == pytest.approx(6.0, abs=0.03)
+    assert regions[1][1] / SR == pytest.approx(8.0, abs=0.03)
+
+
+def test_detect_speech_bridges_short_pauses_and_drops_clicks() -> None:
+    """Short pauses are bridged and very short bursts ignored."""
+    audio = np.concatenate(
+        (tone(1), _silence(0.2), tone(1), _silence(2), tone(0.05), _silence(2))
+    )
+
+    regions = detect_speech(audio, pad_ms=0)
+
+    assert len(regions) == 1
+    assert regions[0][1] / SR == pytest.approx(2.2, abs=0.03)
+
+
+def test_silent_audio_has_no_speech() -> None:
+    """Digital silence and low-level noise are never treated as speech."""
+    noise = np.random.default_rng(0).normal(0, 1e-4, SR * 2).astype(np.float32)
+
+    assert detect_speech(_silence(2)) == []
+    assert detect_speech(noise) == []
+
+
+def test_speech_map_remaps_times() -> None:
+    """Times in speech-only audio map back to the original timeline."""
+    speech_map = SpeechMap([(2 * SR, 3 * SR), (6 * SR, 8 * SR)], 9 * SR, sample_rate=SR)
+
+    assert speech_map.remap([0.0, 0.5, 1.0, 2.5]).tolist() == [2.0, 2.5, 6.0, 7.5]
+    assert speech_map.remap(1.0, is_end=True) == 3.0
+    assert speech_map.stats()["removed_seconds"] == 6.0
+
+
+def test_engine_skips_silence_and_remaps_segments(
+    fake_whisper: SimpleNamespace, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """The model only sees speech; segments are reported on the original timeline."""
+    audio = np.concatenate((_silence(2), tone(1.5), _silence(3), tone(1.5)))
+    monkeypatch.setattr(fake_whisper, "load_audio", lambda path, sr=SR: audio)
+
+    engine = TranscriptionEngine(model="tiny")
+    result = engine.transcribe("meeting.wav")
+
+    fed_audio = fake_whisper.loaded[0].calls[0][0]
+    assert len(fed_audio) < len(audio)
+    assert result["vad"]["removed_seconds"] > 2.0
+    assert result["duration"] == 8.0
+    assert result["segments"][0]["start"] == pytest.approx(1.8, abs=0.03)
+    assert result["segments"][1]["end"] == pytest.approx(7.4, abs=0.06)
+
+
+def test_engine_returns_empty_result_for_silence(
+    fake_whisper: SimpleNamespace, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Pure silence never reaches the model."""
+    monkeypatch.setattr(fake_whisper, "load_audio", lambda path, sr=SR: _silence(5))
+
+    result = TranscriptionEngine(model="tiny").transcribe("quiet.wav")
+
+    assert result["segments"] == []
+    assert fake_whisper.loaded[0].calls == []
+
+
+def test_apply_vad_without_silence_is_lossless() -> None:
+    """Audio without pauses passes through unchanged."""
+    audio = tone(2)
+    speech, speech_map = apply_vad(audio)
+
+    assert np.array_equal(speech, audio)
+    assert speech_map.removed_seconds == 0.0
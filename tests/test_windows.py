@@ -0,0 +1,124 @@
+"""Tests for parallel long-file transcription."""
+
+import multiprocessing
+import os
+from multiprocessing.queues import SimpleQueue
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Dict, Tuple
+
+import numpy as np
+import pytest
+
+from tests.conftest import tone
+from transcriber import windows
+from transcriber.engine import TranscriptionEngine
+from transcriber.scheduler import THREAD_ENV_VARS, ThreadBudget
+from transcriber.windows import find_split_points, plan_windows, stitch_results
+
+SR = 16000
+
+
+def _speech_with_pauses(*parts: float) -> np.ndarray:
+    """Alternate tone and silence: parts are seconds of tone, silence, tone..."""
+    chunks = []
+    for index, seconds in enumerate(parts):
+        if index % 2:
+            chunks.append(np.zeros(int(seconds * SR), dtype=np.float32))
+        else:
+            chunks.append(tone(seconds))
+    return np.concatenate(chunks)
+
+
+def test_split_points_land_in_silence() -> None:
+    """Cuts are placed in the pauses closest to the window limit."""
+    audio = _speech_with_pauses(25, 1, 25, 1, 10)
+
+    cuts = find_split_points(audio, window_seconds=30)
+
+    assert len(cuts) == 2
+    assert 25 * SR <= cuts[0] < 26 * SR
+    assert 51 * SR <= cuts[1] < 52 * SR
+
+
+def test_windows_cover_audio_without_exceeding_length() -> None:
+    """Windows tile the audio exactly, even when there is no pause to cut at."""
+    audio = tone(95)
+
+    windows = plan_windows(audio, window_seconds=30)
+
+    assert windows[0][0] == 0 and windows[-1][1] == len(audio)
+    assert all(end - start <= 30 * SR for start, end in windows)
+    assert all(a[1] == b[0] for a, b in zip(windows, windows[1:]))
+
+
+def test_stitch_results_shifts_times_and_renumbers() -> None:
+    """Segment ids run on across windows and timestamps become global."""
+    window: Dict[str, Any] = {
+        "text": " Hi.",
+        "segments": [
+            {
+                "id": 0,
+                "start": 0.5,
+                "end": 1.0,
+                "text": " Hi.",
+                "words": [{"word": " Hi.", "start": 0.5, "end": 1.0}],
+            }
+        ],
+        "language": "en",
+    }
+
+    result = stitch_results([window, window], [0.0, 29.75])
+
+    assert result["text"] == " Hi. Hi."
+    assert [s["id"] for s in result["segments"]] == [0, 1]
+    assert result["segments"][1]["start"] == 30.25
+    assert result["segments"][1]["words"][0]["end"] == 30.75
+    assert window["segments"][0]["start"] == 0.5
+
+
+def test_engine_transcribes_windows_in_parallel(
+    fake_whisper: SimpleNamespace, tmp_path: Path
+) -> None:
+    """Long audio is split across workers and written with continuous numbering."""
+    audio = _speech_with_pauses(25, 1, 25, 1, 10)
+    engine = TranscriptionEngine(model="tiny")
+
+    result = engine.transcribe(audio, vad=False, workers=2, chunk_length=30)
+
+    assert result["windows"] == 3
+    starts = [s["start"] for s in result["segments"]]
+    assert len(starts) == 6
+    assert starts == sorted(starts)
+    assert starts[2] == pytest.approx(25.5, abs=0.1)
+
+    srt = tmp_path / "long.srt"
+    engine.save(result, srt, "srt")
+    assert srt.read_text().split("\n\n")[5].startswith("6\n")
+
+
+def test_short_audio_stays_in_process(fake_whisper: SimpleNamespace) -> None:
+    """Audio that fits in one window never starts a process pool."""
+    engine = TranscriptionEngine(model="tiny")
+
+    result = engine.transcribe(tone(3.0), vad=False, workers=4, chunk_length=30)
+
+    assert "windows" not in result
+    assert len(fake_whisper.loaded[0].calls) == 1
+
+
+def test_window_workers_apply_their_budget_and_device(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """A pool worker takes its own thread budget and device from the queue."""
+    for name in THREAD_ENV_VARS:
+        monkeypatch.setenv(name, "")
+    monkeypatch.setattr(windows, "_worker_backend", None)
+    slots: SimpleQueue[Tuple[ThreadBudget, str]] = multiprocessing.SimpleQueue()
+    slots.put((ThreadBudget(3), "cuda:1"))
+
+    windows._init_worker("tiny", "cpu", "stub", False, slots)
+
+    assert os.environ["OMP_NUM_THREADS"] == "3"
+    assert windows._worker_backend is not None
+    assert windows._worker_backend.device == "cuda:1"
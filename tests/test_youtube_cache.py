@@ -0,0 +1,76 @@
+"""Tests for the yt-dlp info cache and learned strategy ordering."""
+
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pytest
+
+from transcriber import youtube_cache
+from transcriber.youtube_cache import InfoCache, StrategyStats
+
+NAMES = ("requested", "m4a", "itag-140", "any")
+
+
+def test_info_cache_expires_entries(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    now = [1000.0]
+    monkeypatch.setattr(youtube_cache.time, "time", lambda: now[0])
+    cache = InfoCache(tmp_path, ttl=60)
+
+    assert cache.get("abc") is None
+    cache.put("abc", {"id": "abc", "title": "Talk", "upload_date": object()})
+    now[0] += 30
+    info = cache.get("abc")
+    assert info is not None and info["title"] == "Talk"
+    now[0] += 60
+    assert cache.get("abc") is None
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["expired"]) == (1, 1, 1)
+    assert stats["entries"] == 0
+    assert abs(stats["hit_rate"] - 1 / 3) < 1e-9
+
+
+def test_successful_strategy_moves_first_and_is_forgotten(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    now = [0.0]
+    monkeypatch.setattr(youtube_cache.time, "time", lambda: now[0])
+    stats = StrategyStats(tmp_path / "strategies.json", half_life=3600)
+
+    assert stats.order(NAMES) == list(NAMES)
+
+    stats.record("requested", False, 2.0, names=NAMES)
+    stats.record("itag-140", True, 1.0, names=NAMES)
+    assert stats.order(NAMES) == ["itag-140", "m4a", "any", "requested"]
+
+    # Persisted: a fresh instance sees the same ordering.
+    assert StrategyStats(tmp_path / "strategies.json").order(NAMES)[0] == "itag-140"
+
+    # After many half-lives everything decays back to the default order.
+    now[0] += 3600 * 50
+    assert stats.order(NAMES) == list(NAMES)
+
+    counters = stats.stats()
+    assert counters["itag-140"]["successes"] == 1
+    assert counters["itag-140"]["mean_success_seconds"] == 1.0
+    assert counters["requested"]["failures"] == 1
+    assert counters["requested"]["success_rate"] == 0.0
+
+
+def _attempt_many(directory: Path) -> None:
+    stats = StrategyStats(directory / "strategies.json")
+    cache = InfoCache(directory / "info")
+    for _ in range(20):
+        stats.record("m4a", False, 1.0, names=NAMES)
+        cache.get("missing")
+
+
+def test_counters_survive_concurrent_processes(tmp_path: Path) -> None:
+    """Concurrent downloads sharing the files do not lose each other's updates."""
+    with ProcessPoolExecutor(max_workers=4) as pool:
+        list(pool.map(_attempt_many, [tmp_path] * 4))
+
+    assert StrategyStats(tmp_path / "strategies.json").stats()["m4a"]["failures"] == 80
+    assert InfoCache(tmp_path / "info").stats()["misses"] == 80